@@ -32,47 +32,22 @@ except Exception as _e:
 
 # 安装 Bot 消息发送 Hook
 from .utils.bot_send_hook import install_bot_hooks
-from .utils.database.models import WavesUser
+from .utils.database.models import WavesUser  # noqa: F401
 from .utils.database.waves_subscribe import WavesSubscribe
-from .utils.database.waves_user_activity import WavesUserActivity
-from .utils.database.waves_group_activity import WavesGroupActivity, ANN_PUSH_GUARD
+from .utils.database.waves_group_activity import ANN_PUSH_GUARD
 from .utils.database.waves_user_sdk import WavesUserSdk  # noqa: F401
 from .utils.plugin_checker import is_from_waves_plugin
 
 # ===== 活跃度批量写入缓冲 =====
-# 内存中暂存活跃度记录，定时批量写入，避免高并发写入损坏数据库
-# value: (user_id, bot_id, bot_self_id, sender_avatar)
-_activity_buffer: dict[str, tuple[str, str, str, str]] = {}
-# 群活跃度缓冲 value: (group_id, bot_id, bot_self_id)
-_group_activity_buffer: dict[str, tuple[str, str, str]] = {}
-_FLUSH_INTERVAL = 60  # 秒
-
+# hook 只写内存缓冲 (每个 key 保留最新时间)，定时批量 upsert，避免高并发写入损坏数据库
+from .utils.activity_buffer import (
+    record_user_activity,
+    record_group_activity,
+    flush_activity_buffer as _flush_activity_buffer,
+)
+from .utils.char_state import flush_char_views, close_char_state
 
-async def _flush_activity_buffer():
-    """将缓冲区中的活跃度记录批量写入数据库"""
-    if _activity_buffer:
-        pending = dict(_activity_buffer)
-        _activity_buffer.clear()
-
-        for key, (user_id, bot_id, bot_self_id, sender_avatar) in pending.items():
-            try:
-                await WavesUserActivity.update_user_activity(user_id, bot_id, bot_self_id)
-            except Exception as e:
-                logger.warning(f"[鸣潮·插件] 批量活跃度写入失败: {e}")
-            if sender_avatar:
-                try:
-                    await WavesUser.update_avatar_url(user_id, bot_id, sender_avatar)
-                except Exception as e:
-                    logger.warning(f"[鸣潮·插件] 头像更新失败: {e}")
-
-    if _group_activity_buffer:
-        group_pending = dict(_group_activity_buffer)
-        _group_activity_buffer.clear()
-        for key, (group_id, bot_id, bot_self_id) in group_pending.items():
-            try:
-                await WavesGroupActivity.update_group_activity(group_id, bot_id, bot_self_id)
-            except Exception as e:
-                logger.warning(f"[鸣潮·插件] 批量群活跃度写入失败: {e}")
+_FLUSH_INTERVAL = 60  # 秒
 
 
 _shutdown_event = asyncio.Event()
@@ -90,6 +65,10 @@ async def _activity_flush_loop():
             await _flush_activity_buffer()
         except Exception as e:
             logger.warning(f"[鸣潮·插件] 活跃度刷写循环异常: {e}")
+        try:
+            await flush_char_views()
+        except Exception as e:
+            logger.warning(f"[鸣潮·插件] 角色查看计数刷写异常: {e}")
 
 # 启动后台刷写任务
 _flush_task = asyncio.get_event_loop().create_task(_activity_flush_loop())
@@ -107,6 +86,7 @@ async def _flush_on_shutdown():
     logger.info("[鸣潮·插件] 刷写活跃度缓冲区...")
     await _flush_activity_buffer()
     logger.info("[鸣潮·插件] 活跃度缓冲区刷写完成")
+    await close_char_state()
 
 
 # 注册 WavesSubscribe 的 hook
@@ -140,13 +120,7 @@ async def waves_user_activity_hook(
     if not user_id:
         return
 
-    key = f"{user_id}:{bot_id}:{bot_self_id}"
-    # 同一刷写周期内空头像不应覆盖已缓存的非空值
-    if not sender_avatar:
-        existing = _activity_buffer.get(key)
-        if existing:
-            sender_avatar = existing[3]
-    _activity_buffer[key] = (user_id, bot_id, bot_self_id, sender_avatar)
+    record_user_activity(user_id, bot_id, bot_self_id, sender_avatar)
 
 # 注册群活跃度 hook
 async def waves_group_activity_hook(group_id: str, bot_id: str, bot_self_id: str):
@@ -156,7 +130,7 @@ async def waves_group_activity_hook(group_id: str, bot_id: str, bot_self_id: str
         return
     if not group_id:
         return
-    _group_activity_buffer[f"{group_id}:{bot_id}:{bot_self_id}"] = (group_id, bot_id, bot_self_id)
+    record_group_activity(group_id, bot_id, bot_self_id)
 
 # 安装 hooks 并注册
 install_bot_hooks()
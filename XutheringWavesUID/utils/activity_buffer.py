@@ -0,0 +1,86 @@
+"""用户 / 群活跃度写缓冲 (write-behind)。
+
+消息 hook 只把 (key -> 最新时间戳) 写进内存, 同一 key 在一个刷写周期内只保留最后
+一次; 后台循环定时调用 ``flush_activity_buffer`` 批量 upsert, 退出前再刷一次。
+``WavesUserActivity`` 的读接口会先看这里的待写值, 保证读到的时间不落后于缓冲。
+"""
+import time
+from typing import Dict, Tuple, Optional
+
+from gsuid_core.logger import logger
+
+UserKey = Tuple[str, str, str]  # (user_id, bot_id, bot_self_id)
+GroupKey = Tuple[str, str, str]  # (group_id, bot_id, bot_self_id)
+
+# value: (最后活跃时间, sender_avatar)
+_user_buffer: Dict[UserKey, Tuple[int, str]] = {}
+_group_buffer: Dict[GroupKey, int] = {}
+
+
+def record_user_activity(user_id: str, bot_id: str, bot_self_id: str, sender_avatar: str = "") -> None:
+    key = (user_id, bot_id, bot_self_id)
+    # 同一刷写周期内空头像不应覆盖已缓存的非空值
+    if not sender_avatar:
+        existing = _user_buffer.get(key)
+        if existing:
+            sender_avatar = existing[1]
+    _user_buffer[key] = (int(time.time()), sender_avatar)
+
+
+def record_group_activity(group_id: str, bot_id: str, bot_self_id: str) -> None:
+    _group_buffer[(group_id, bot_id, bot_self_id)] = int(time.time())
+
+
+def get_pending_user_time(key: UserKey) -> Optional[int]:
+    item = _user_buffer.get(key)
+    return item[0] if item else None
+
+
+def get_pending_user_times() -> Dict[UserKey, int]:
+    return {k: v[0] for k, v in _user_buffer.items()}
+
+
+def _restore_users(pending: Dict[UserKey, Tuple[int, str]]) -> None:
+    for key, (ts, avatar) in pending.items():
+        cur = _user_buffer.get(key)
+        if cur is None or cur[0] < ts:
+            _user_buffer[key] = (ts, avatar or (cur[1] if cur else ""))
+
+
+def _restore_groups(pending: Dict[GroupKey, int]) -> None:
+    for key, ts in pending.items():
+        if _group_buffer.get(key, 0) < ts:
+            _group_buffer[key] = ts
+
+
+async def flush_activity_buffer() -> None:
+    """将缓冲区中的活跃度记录批量写入数据库; 写入失败的记录放回缓冲等下次刷写。"""
+    from .database.models import WavesUser
+    from .database.waves_user_activity import WavesUserActivity
+    from .database.waves_group_activity import WavesGroupActivity
+
+    if _user_buffer:
+        pending = dict(_user_buffer)
+        _user_buffer.clear()
+        try:
+            await WavesUserActivity.bulk_update_activity({k: v[0] for k, v in pending.items()})
+        except Exception as e:
+            logger.warning(f"[鸣潮·插件] 批量活跃度写入失败: {e}")
+            _restore_users(pending)
+        else:
+            for (user_id, bot_id, _), (_, sender_avatar) in pending.items():
+                if not sender_avatar:
+                    continue
+                try:
+                    await WavesUser.update_avatar_url(user_id, bot_id, sender_avatar)
+                except Exception as e:
+                    logger.warning(f"[鸣潮·插件] 头像更新失败: {e}")
+
+    if _group_buffer:
+        group_pending = dict(_group_buffer)
+        _group_buffer.clear()
+        try:
+            await WavesGroupActivity.bulk_update_group_activity(group_pending)
+        except Exception as e:
+            logger.warning(f"[鸣潮·插件] 批量群活跃度写入失败: {e}")
+            _restore_groups(group_pending)
@@ -0,0 +1,213 @@
+"""库街区只读接口请求合并 (single-flight) 与短 TTL 响应缓存。
+
+同一 (url, method, params, body, token) 的并发请求共享一个进行中的 Future,
+只有首个请求真正打到库洛服务器; 其余请求等待并拿到结果副本。可按接口类别
+配置短 TTL, 成功响应在 TTL 内直接复用。只对 ``COALESCE_ENDPOINTS`` 中的只读
+接口生效, 签到 / 刷新 / 登录等有副作用的接口不经过这里。
+"""
+import json
+import time
+import asyncio
+import hashlib
+from typing import Any, Dict, Tuple, Mapping, Callable, Optional, Awaitable
+
+from .request_util import KuroApiResp
+from .api import (
+    BBS_LIST,
+    ANN_LIST_URL,
+    BASE_DATA_URL,
+    ROLE_DATA_URL,
+    SKIN_DATA_URL,
+    WIKI_HOME_URL,
+    WIKI_TREE_URL,
+    MOTOR_DATA_URL,
+    ANN_CONTENT_URL,
+    PERIOD_LIST_URL,
+    ROLE_DETAIL_URL,
+    SLASH_INDEX_URL,
+    TOWER_INDEX_URL,
+    WIKI_DETAIL_URL,
+    EXPLORE_DATA_URL,
+    SLASH_DETAIL_URL,
+    TOWER_DETAIL_URL,
+    MATRIX_INDEX_URL,
+    MATRIX_DETAIL_URL,
+    CALABASH_DATA_URL,
+    MORE_ACTIVITY_URL,
+    CHALLENGE_DATA_URL,
+    WIKI_ENTRY_DETAIL_URL,
+)
+
+# 接口类别: player 为玩家数据 (TTL 取 ApiCacheTTL 配置), static 为 wiki / 公告等公共数据
+COALESCE_ENDPOINTS: Dict[str, str] = {
+    BASE_DATA_URL: "player",
+    ROLE_DATA_URL: "player",
+    ROLE_DETAIL_URL: "player",
+    CALABASH_DATA_URL: "player",
+    SKIN_DATA_URL: "player",
+    MOTOR_DATA_URL: "player",
+    EXPLORE_DATA_URL: "player",
+    CHALLENGE_DATA_URL: "player",
+    TOWER_INDEX_URL: "player",
+    TOWER_DETAIL_URL: "player",
+    SLASH_INDEX_URL: "player",
+    SLASH_DETAIL_URL: "player",
+    MATRIX_INDEX_URL: "player",
+    MATRIX_DETAIL_URL: "player",
+    MORE_ACTIVITY_URL: "player",
+    WIKI_TREE_URL: "static",
+    WIKI_HOME_URL: "static",
+    WIKI_DETAIL_URL: "static",
+    WIKI_ENTRY_DETAIL_URL: "static",
+    ANN_LIST_URL: "static",
+    ANN_CONTENT_URL: "static",
+    BBS_LIST: "static",
+    PERIOD_LIST_URL: "static",
+}
+
+STATIC_CACHE_TTL = 60
+# 缓存条目上限, 超出时先清过期, 仍超出则整体清空
+MAX_CACHE_ENTRIES = 2048
+
+
+def get_endpoint_ttl(url: str) -> Optional[int]:
+    """返回接口的缓存 TTL (秒); 非合并接口返回 None。"""
+    kind = COALESCE_ENDPOINTS.get(url)
+    if kind is None:
+        return None
+    if kind == "static":
+        return STATIC_CACHE_TTL
+
+    from ...wutheringwaves_config import WutheringWavesConfig
+
+    return max(int(WutheringWavesConfig.get_config("ApiCacheTTL").data or 0), 0)
+
+
+def make_request_key(
+    url: str,
+    method: str,
+    header: Optional[Mapping[str, str]],
+    params: Optional[Dict[str, Any]],
+    json_data: Optional[Dict[str, Any]],
+    data: Optional[Dict[str, Any]],
+) -> str:
+    token = ""
+    if header:
+        # 角色数据接口多用 did + b-at 鉴权, token 头仅部分接口携带
+        token = "|".join(str(header.get(k, "")) for k in ("token", "b-at", "did"))
+    raw = json.dumps(
+        [url, method, params, json_data, data, token],
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class _LeaderCancelled(Exception):
+    """首发请求被取消 (如命令超时); 等待方本身没有被取消, 应重新发起。"""
+
+
+class RequestCoalescer:
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._cache: Dict[str, Tuple[float, KuroApiResp]] = {}
+        self.total = 0
+        self.deduped = 0
+        self.cache_hits = 0
+
+    def _get_cached(self, key: str) -> Optional[KuroApiResp]:
+        item = self._cache.get(key)
+        if item is None:
+            return None
+        expire_at, resp = item
+        if expire_at < time.monotonic():
+            self._cache.pop(key, None)
+            return None
+        return resp
+
+    def _put_cache(self, key: str, resp: KuroApiResp, ttl: int) -> None:
+        if len(self._cache) >= MAX_CACHE_ENTRIES:
+            now = time.monotonic()
+            self._cache = {k: v for k, v in self._cache.items() if v[0] >= now}
+            if len(self._cache) >= MAX_CACHE_ENTRIES:
+                self._cache.clear()
+        self._cache[key] = (time.monotonic() + ttl, resp)
+
+    async def run(
+        self,
+        key: str,
+        ttl: int,
+        factory: Callable[[], Awaitable[KuroApiResp]],
+    ) -> KuroApiResp:
+        self.total += 1
+
+        if ttl > 0:
+            cached = self._get_cached(key)
+            if cached is not None:
+                self.cache_hits += 1
+                return cached.model_copy(deep=True)
+
+        while True:
+            fut = self._inflight.get(key)
+            if fut is None:
+                return await self._lead(key, ttl, factory)
+            try:
+                # shield: 单个等待方被取消不影响首发请求与其他等待方
+                resp = await asyncio.shield(fut)
+            except _LeaderCancelled:
+                # 首发方已退出, 由最先醒来的等待方接替首发, 其余等待方跟随它
+                continue
+            self.deduped += 1
+            return resp.model_copy(deep=True)
+
+    async def _lead(
+        self,
+        key: str,
+        ttl: int,
+        factory: Callable[[], Awaitable[KuroApiResp]],
+    ) -> KuroApiResp:
+        fut = asyncio.get_running_loop().create_future()
+        self._inflight[key] = fut
+        try:
+            resp = await factory()
+        except asyncio.CancelledError:
+            if not fut.done():
+                fut.set_exception(_LeaderCancelled())
+                fut.exception()
+            raise
+        except Exception as e:
+            if not fut.done():
+                fut.set_exception(e)
+                # 无等待方时避免 "exception was never retrieved"
+                fut.exception()
+            raise
+        else:
+            if not fut.done():
+                fut.set_result(resp)
+            if ttl > 0 and resp.success:
+                self._put_cache(key, resp.model_copy(deep=True), ttl)
+            return resp
+        finally:
+            self._inflight.pop(key, None)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        saved = self.deduped + self.cache_hits
+        return {
+            "total": self.total,
+            "deduped": self.deduped,
+            "cache_hits": self.cache_hits,
+            "inflight": len(self._inflight),
+            "cached": len(self._cache),
+            "saved_rate": saved / self.total if self.total else 0.0,
+        }
+
+
+request_coalescer = RequestCoalescer()
+
+
+def get_coalesce_stats() -> Dict[str, Any]:
+    return request_coalescer.stats()
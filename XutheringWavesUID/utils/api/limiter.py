@@ -0,0 +1,183 @@
+"""库街区接口自适应限流 (令牌桶 + AIMD) 与熔断。
+
+按「接口族 + 代理」分桶: 接口族取 host 加路径首段 (aki 下再细分一层, 如
+``api.kurobbs.com/aki/roleBox``)。成功响应线性提高速率, 429 / 5xx / 风控类
+错误码按比例降速; 连续失败达到阈值后熔断, 冷却期内直接返回 WAVES_CODE_999,
+冷却结束放行一个探测请求, 成功则恢复, 失败则冷却时间翻倍。
+"""
+import time
+import asyncio
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+from gsuid_core.logger import logger
+
+from .request_util import RespCode
+
+# 视为上游限流 / 故障的库洛业务码 (ERROR 为非 JSON 响应, 多为网关维护页)
+THROTTLE_CODES = {
+    RespCode.ERROR.value,
+    RespCode.SERVER_ERROR.value,
+    RespCode.SERVER_EXTERNAL_ERROR.value,
+    RespCode.DANGER_ENV.value,
+}
+
+MIN_RATE = 0.5
+ADDITIVE_STEP = 0.5
+DECREASE_FACTOR = 0.5
+FAILURE_THRESHOLD = 5
+BASE_COOLDOWN = 30.0
+MAX_COOLDOWN = 300.0
+PROBE_TIMEOUT = 30.0
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+def get_family(url: str, proxy: Optional[str] = None) -> str:
+    parts = urlsplit(url)
+    segs = [s for s in parts.path.split("/") if s]
+    family = parts.netloc
+    if segs:
+        family += f"/{segs[0]}"
+        if segs[0] == "aki" and len(segs) > 1:
+            family += f"/{segs[1]}"
+    return f"{family}@{proxy or 'direct'}"
+
+
+def _get_max_rate() -> float:
+    from ...wutheringwaves_config import WutheringWavesConfig
+
+    return float(WutheringWavesConfig.get_config("ApiRateLimit").data or 0)
+
+
+def _breaker_enabled() -> bool:
+    from ...wutheringwaves_config import WutheringWavesConfig
+
+    return bool(WutheringWavesConfig.get_config("ApiCircuitBreaker").data)
+
+
+class ApiGuard:
+    """单个接口族的令牌桶 + 熔断器。"""
+
+    def __init__(self, family: str, max_rate: float):
+        self.family = family
+        self.max_rate = max_rate
+        self.rate = max_rate
+        self.tokens = max_rate
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+        self.state = CLOSED
+        self.failures = 0
+        self.cooldown = BASE_COOLDOWN
+        self.open_until = 0.0
+        self._probing = False
+        self._probe_at = 0.0
+
+        self.throttled = 0
+        self.rejected = 0
+
+    # ---------- 令牌桶 ----------
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.max_rate, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self) -> None:
+        max_rate = _get_max_rate()
+        if max_rate <= 0:
+            return
+        if max_rate != self.max_rate:
+            self.max_rate = max_rate
+            self.rate = min(self.rate, max_rate) or max_rate
+
+        async with self._lock:
+            self._refill()
+            if self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+
+    # ---------- 熔断 ----------
+    def allow(self) -> bool:
+        if not _breaker_enabled() or self.state == CLOSED:
+            return True
+        if self.state == OPEN:
+            if time.monotonic() < self.open_until:
+                self.rejected += 1
+                return False
+            self.state = HALF_OPEN
+            self._probing = False
+        # 半开: 只放行一个探测请求; 探测超时未反馈 (如被取消) 则允许重新探测
+        if self._probing and time.monotonic() - self._probe_at < PROBE_TIMEOUT:
+            self.rejected += 1
+            return False
+        self._probing = True
+        self._probe_at = time.monotonic()
+        return True
+
+    def on_success(self) -> None:
+        if self.max_rate > 0:
+            self.rate = min(self.max_rate, self.rate + ADDITIVE_STEP)
+        self.failures = 0
+        if self.state != CLOSED:
+            logger.info(f"[鸣潮·API] {self.family} 熔断恢复")
+            self.state = CLOSED
+            self.cooldown = BASE_COOLDOWN
+            self._probing = False
+
+    def on_throttle(self) -> None:
+        self.throttled += 1
+        if self.max_rate > 0:
+            self.rate = max(MIN_RATE, self.rate * DECREASE_FACTOR)
+
+    def on_failure(self) -> None:
+        self.on_throttle()
+        self.failures += 1
+        if self.state == HALF_OPEN:
+            self.cooldown = min(self.cooldown * 2, MAX_COOLDOWN)
+            self._trip()
+        elif self.state == CLOSED and self.failures >= FAILURE_THRESHOLD:
+            self._trip()
+
+    def _trip(self) -> None:
+        self.state = OPEN
+        self.open_until = time.monotonic() + self.cooldown
+        self._probing = False
+        logger.warning(f"[鸣潮·API] {self.family} 连续失败 {self.failures} 次, 熔断 {self.cooldown:.0f}s")
+
+    def record(self, status: int, code: Any) -> None:
+        """按 HTTP 状态码与库洛业务码反馈。"""
+        if status == 429 or status >= 500 or code in THROTTLE_CODES:
+            self.on_failure()
+        else:
+            self.on_success()
+
+    def snapshot(self) -> Dict[str, Any]:
+        remain = max(0.0, self.open_until - time.monotonic()) if self.state == OPEN else 0.0
+        return {
+            "family": self.family,
+            "state": self.state,
+            "rate": round(self.rate, 2),
+            "failures": self.failures,
+            "open_remain": round(remain, 1),
+            "throttled": self.throttled,
+            "rejected": self.rejected,
+        }
+
+
+_guards: Dict[str, ApiGuard] = {}
+
+
+def get_guard(url: str, proxy: Optional[str] = None) -> ApiGuard:
+    family = get_family(url, proxy)
+    guard = _guards.get(family)
+    if guard is None:
+        guard = _guards[family] = ApiGuard(family, _get_max_rate())
+    return guard
+
+
+def get_guard_states() -> List[Dict[str, Any]]:
+    return [g.snapshot() for g in _guards.values()]
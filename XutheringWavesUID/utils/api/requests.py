@@ -2,7 +2,6 @@ import json
 import random
 import string
 import asyncio
-import inspect
 from typing import Any, Dict, List, Tuple, Union, Literal, Mapping, Optional
 
 import aiohttp
@@ -14,9 +13,12 @@ from ..hint import WAVES_ERROR_CODE
 from ..util import timed_async_cache
 from .captcha.base import CaptchaResult
 from ..error_reply import WAVES_CODE_999, WAVES_CODE_104
+from .route import need_proxy, install_routes
+from .limiter import get_guard
+from .coalesce import request_coalescer, get_endpoint_ttl, make_request_key
 from .captcha.errors import CaptchaError
 from ..constants import WAVES_GAME_ID
-from ..database.models import WavesUser
+from ..database.models import WavesUser, set_did_bat_cache, invalidate_did_bat_cache
 from ..resource.RESOURCE_PATH import CACHE_PATH
 from ...wutheringwaves_config import WutheringWavesConfig
 from .request_util import (
@@ -76,7 +78,6 @@ from .api import (
     WIKI_ENTRY_DETAIL_URL,
     CALCULATOR_REFRESH_DATA_URL,
     get_local_proxy_url,
-    get_need_proxy_func,
 )
 
 
@@ -148,6 +149,15 @@ class WavesApi:
             },
             update_data={"bat": access_token},
         )
+        invalidate_did_bat_cache(waves_user.uid)
+        set_did_bat_cache(
+            waves_user.cookie,
+            waves_user.uid,
+            waves_user.game_id,
+            waves_user.uid,
+            waves_user.did or "",
+            access_token,
+        )
         return waves_user
 
     async def get_used_headers(
@@ -160,19 +170,11 @@ class WavesApi:
         }
         if needToken:
             headers["token"] = cookie
-        waves_user: Optional[WavesUser] = await WavesUser.select_data_by_cookie_and_uid(
-            cookie=cookie,
-            uid=uid,
-            game_id=game_id,
-        ) or await WavesUser.select_data_by_cookie(
-            cookie=cookie,
-        )
-
-        if not waves_user:
+        did_bat = await WavesUser.select_did_bat(cookie=cookie, uid=uid, game_id=game_id)
+        if not did_bat:
             return headers
 
-        headers["did"] = waves_user.did or ""
-        headers["b-at"] = waves_user.bat or ""
+        headers["did"], headers["b-at"] = did_bat
         return headers
 
     async def get_ck_result(self, uid, user_id, bot_id) -> tuple[bool, Optional[str]]:
@@ -1128,13 +1130,39 @@ class WavesApi:
         if header is None:
             header = await get_base_header()
 
-        proxy_func = get_need_proxy_func()
-        if inspect.stack()[1].function in proxy_func or "all" in proxy_func:
-            proxy_url = get_local_proxy_url()
-        else:
-            proxy_url = None
+        # 按路由表 (直接调用方方法名) 判断是否走本地代理, 见 route.py
+        proxy_url = get_local_proxy_url() if need_proxy() else None
+
+        ttl = get_endpoint_ttl(url)
+        if ttl is not None and WutheringWavesConfig.get_config("ApiCoalesce").data:
+            key = make_request_key(url, method, header, params, json_data, data)
+            return await request_coalescer.run(
+                key,
+                ttl,
+                lambda: self._do_waves_request(
+                    url, method, header, params, json_data, data, proxy_url, max_retries, retry_delay
+                ),
+            )
+        return await self._do_waves_request(
+            url, method, header, params, json_data, data, proxy_url, max_retries, retry_delay
+        )
+
+    async def _do_waves_request(
+        self,
+        url: str,
+        method: Literal["GET", "POST"],
+        header: Mapping[str, str],
+        params: Optional[Dict[str, Any]],
+        json_data: Optional[Dict[str, Any]],
+        data: Optional[Dict[str, Any]],
+        proxy_url: Optional[str],
+        max_retries: int,
+        retry_delay: float,
+    ) -> KuroApiResp[Union[str, Dict[str, Any], List[Any]]]:
+        guard = get_guard(url, proxy_url)
 
         async def do_request(req_data, client_session: aiohttp.ClientSession) -> KuroApiResp[Any]:
+            await guard.acquire()
             async with client_session.request(
                 method,
                 url=url,
@@ -1158,6 +1186,7 @@ class WavesApi:
                         pass
 
                 logger.debug(f"[鸣潮·API] url:[{url}] params:[{params}] headers:[{header}] data:[{req_data}] raw_data:{raw_data}")
+                guard.record(resp.status, raw_data.get("code") if isinstance(raw_data, dict) else None)
                 # 统一解析为 KuroApiResp
                 return KuroApiResp[Any].model_validate(raw_data)
 
@@ -1173,6 +1202,9 @@ class WavesApi:
             return {"code": WAVES_CODE_999, "data": "验证码破解失败"}
 
         for attempt in range(max_retries):
+            if not guard.allow():
+                logger.warning(f"[鸣潮·API] url:[{url}] {guard.family} 熔断中, 跳过请求")
+                return KuroApiResp(code=WAVES_CODE_999, msg="库街区服务繁忙或维护中，请稍后再试", data=None)
             try:
                 client = await self.get_session(proxy=proxy_url)
                 if not client:
@@ -1196,6 +1228,7 @@ class WavesApi:
                     return await do_request(retry_data, client)
                 elif isinstance(res_data, dict) and res_data.get("geeTest") is True:
                     logger.warning(f"[鸣潮·API] url:[{url}] 触发验证码！")
+                    guard.on_throttle()
                     return KuroApiResp(code=WAVES_CODE_104, msg=WAVES_ERROR_CODE[WAVES_CODE_104], data=res_data)
                     #return {"code": WAVES_CODE_999, "msg": "验证码破解失败"}
 
@@ -1203,11 +1236,17 @@ class WavesApi:
 
             except aiohttp.ClientError as e:
                 logger.warning(f"[鸣潮·API] url:[{url}] 网络请求失败, 尝试次数 {attempt + 1}", e)
+                guard.on_failure()
                 if attempt < max_retries - 1:
                     await asyncio.sleep(retry_delay)
             except Exception as e:
                 logger.warning(f"[鸣潮·API] url:[{url}] 发生未知错误, 尝试次数 {attempt + 1}", e)
+                if isinstance(e, asyncio.TimeoutError):
+                    guard.on_failure()
                 if attempt < max_retries - 1:
                     await asyncio.sleep(retry_delay)
 
         raise TypeError("请求服务器失败，已达最大重试次数")
+
+
+install_routes(WavesApi)
@@ -0,0 +1,57 @@
+"""库街区接口代理路由表。
+
+原先 ``_waves_request`` 每次请求都用 ``inspect.stack()[1].function`` 取调用方
+方法名来判断是否走本地代理, 需要遍历并物化整条调用栈 (含源码行), 在最热的网络
+路径上开销很大。这里在导入时扫描 WavesApi 中直接调用 ``_waves_request`` 的方法,
+包一层只设置 ContextVar 的 wrapper; ``_waves_request`` 读取当前路由名即可, 语义
+与原先的直接调用方方法名一致, ``NeedProxyFunc`` 配置不变。
+
+微基准见 route_bench.py。
+"""
+import inspect
+import functools
+from contextvars import ContextVar
+from typing import Any, Set, Callable, Optional
+
+current_route: ContextVar[str] = ContextVar("waves_api_route", default="")
+
+ROUTE_TARGET = "_waves_request"
+
+
+def _calls_target(func: Callable[..., Any]) -> bool:
+    # 穿透 timed_async_cache 等 functools.wraps 装饰器
+    code = getattr(inspect.unwrap(func), "__code__", None)
+    return code is not None and ROUTE_TARGET in code.co_names
+
+
+def _wrap_route(name: str, func: Callable[..., Any]) -> Callable[..., Any]:
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        token = current_route.set(name)
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            current_route.reset(token)
+
+    return wrapper
+
+
+def install_routes(cls: type) -> Set[str]:
+    """为 cls 中直接调用 _waves_request 的协程方法登记路由名, 返回登记的方法名。"""
+    routed: Set[str] = set()
+    for name, func in list(vars(cls).items()):
+        if name == ROUTE_TARGET or not callable(func) or not _calls_target(func):
+            continue
+        setattr(cls, name, _wrap_route(name, func))
+        routed.add(name)
+    return routed
+
+
+def need_proxy(route: Optional[str] = None) -> bool:
+    from .api import get_need_proxy_func
+
+    proxy_func = get_need_proxy_func()
+    if "all" in proxy_func:
+        return True
+    return (route if route is not None else current_route.get()) in proxy_func
+
@@ -0,0 +1,63 @@
+"""接口代理路由: inspect.stack() 与静态路由表的对照基准。
+
+在深调用栈下分别计时两种判断方式的单次开销 (扣除空实现的基线)。在 gsuid_core 环境下运行:
+
+    python -m XutheringWavesUID.utils.api.route_bench [调用深度] [轮数]
+"""
+import sys
+import time
+import asyncio
+import inspect
+
+from .route import current_route, install_routes
+
+PROXY_FUNC = ["get_role_detail_info"]
+
+
+class BaseApi:
+    async def get_role_detail_info(self):
+        return await self._waves_request()
+
+
+class NoopApi(BaseApi):
+    async def _waves_request(self):
+        return True
+
+
+class StackApi(BaseApi):
+    async def _waves_request(self):
+        return inspect.stack()[1].function in PROXY_FUNC
+
+
+class RouteApi(BaseApi):
+    async def _waves_request(self):
+        return current_route.get() in PROXY_FUNC
+
+
+install_routes(BaseApi)
+
+
+async def _deep(n: int, api: BaseApi):
+    if n == 0:
+        return await api.get_role_detail_info()
+    return await _deep(n - 1, api)
+
+
+async def _timeit(api: BaseApi, depth: int, rounds: int) -> float:
+    assert await _deep(depth, api) is True
+    start = time.perf_counter()
+    for _ in range(rounds):
+        await _deep(depth, api)
+    return time.perf_counter() - start
+
+
+async def run(depth: int = 60, rounds: int = 2000) -> None:
+    base = await _timeit(NoopApi(), depth, rounds)
+    for label, api in (("inspect.stack()", StackApi()), ("static route table", RouteApi())):
+        cost = (await _timeit(api, depth, rounds) - base) / rounds * 1e6
+        print(f"{label:<20} depth={depth} {cost:10.2f} us/request")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    asyncio.run(run(*args))
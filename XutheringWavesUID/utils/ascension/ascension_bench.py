@@ -0,0 +1,121 @@
+"""突破数值预编译表的对照基准。
+
+遍历全部角色的每个 (突破, 等级) 与全部武器的每个 (突破, 等级, 谐振), 逐个比对
+预编译实现与原实现 (deepcopy + 现场解析技能树) 的结果, 再分别计时。编译缓存会先
+清空重建一次以计入编译耗时。在 gsuid_core 环境下运行:
+
+    python -m XutheringWavesUID.utils.ascension.ascension_bench [轮数]
+"""
+import sys
+import copy
+import time
+from typing import Any, List, Tuple, Callable
+
+from . import char as ac
+from . import weapon as aw
+from .compiled import COMPILED_PATH
+
+
+def _legacy_char_detail(char_id: str, level: int, breach: int) -> ac.WavesCharResult:
+    result = ac.WavesCharResult()
+    char_data = ac.char_id_data[char_id]
+    result.name = char_data["name"]
+    result.starLevel = char_data["starLevel"]
+    result.stats = copy.deepcopy(char_data["stats"][str(breach)][str(level)])
+    result.statsWeakness = copy.deepcopy(char_data["statsWeakness"])
+    result.skillTrees = char_data["skillTree"]
+    result.fixed_skill = ac.compile_fixed_skill(char_id, char_data, breach >= 3)
+    return result
+
+
+def _legacy_weapon_detail(weapon_id: str, level: int, breach: int, reson: int) -> aw.WavesWeaponResult:
+    result = aw.WavesWeaponResult()
+    weapon_data = aw.weapon_id_data[weapon_id]
+    result.name = weapon_data["name"]
+    result.starLevel = weapon_data["starLevel"]
+    result.type = weapon_data["type"]
+    result.effectName = weapon_data["effectName"]
+    result.stats = copy.deepcopy(weapon_data["stats"][str(breach)][str(level)])
+    result.param = weapon_data["param"]
+    result.resonLevel = reson
+    for stat in result.stats:
+        if stat["isPercent"]:
+            stat["value"] = f"{stat['value'] / 100:.1f}%"
+        elif stat["isRatio"]:
+            stat["value"] = f"{stat['value'] * 100:.1f}%"
+        else:
+            stat["value"] = f"{int(stat['value'])}"
+    result.effect, result.sub_effect = aw.render_effect(weapon_data, reson)
+    return result
+
+
+def _char_view(r: ac.WavesCharResult) -> Tuple:
+    return (r.name, r.starLevel, r.stats, r.statsWeakness, r.skillTrees, r.fixed_skill)
+
+
+def _weapon_view(r: aw.WavesWeaponResult) -> Tuple:
+    return (r.name, r.starLevel, r.type, r.effectName, r.stats, r.param, r.effect, r.sub_effect)
+
+
+def _bench(fn: Callable[..., Any], cases: List[Tuple], rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for args in cases:
+            fn(*args)
+    return time.perf_counter() - start
+
+
+def _compare(name, new_fn, old_fn, view, cases, rounds) -> bool:
+    diff = [args for args in cases if view(new_fn(*args)) != view(old_fn(*args))]
+    if diff:
+        print(f"[不一致] {name}: {len(diff)} 个, 例如 {diff[:5]}")
+    t_new = _bench(new_fn, cases, rounds)
+    t_old = _bench(old_fn, cases, rounds)
+    n = len(cases) * rounds
+    print(
+        f"{name:<18} 查询 {n:>8}  原实现 {t_old / n * 1e6:8.2f}us  "
+        f"预编译 {t_new / n * 1e6:6.2f}us  x{t_old / max(t_new, 1e-9):.1f}"
+    )
+    return not diff
+
+
+def run(rounds: int = 3) -> bool:
+    ac.ensure_data_loaded()
+    aw.ensure_data_loaded()
+    for old in COMPILED_PATH.glob("*.msgpack"):
+        old.unlink()
+
+    for kind, table in (("char", ac._char_table), ("weapon", aw._weapon_table)):
+        table.reset()
+        start = time.perf_counter()
+        table.rows()
+        t_compile = time.perf_counter() - start
+        table.reset()
+        start = time.perf_counter()
+        table.rows()
+        t_load = time.perf_counter() - start
+        print(f"{kind:<6} 编译 {t_compile * 1000:8.1f}ms  读缓存 {t_load * 1000:6.1f}ms")
+
+    char_cases = [
+        (char_id, int(level), int(breach))
+        for char_id, data in ac.char_id_data.items()
+        for breach, levels in data["stats"].items()
+        for level in levels
+    ]
+    weapon_cases = [
+        (weapon_id, int(level), int(breach), reson)
+        for weapon_id, data in aw.weapon_id_data.items()
+        for breach, levels in data["stats"].items()
+        for level in levels
+        for reson in range(1, 6)
+    ]
+
+    ok = _compare("get_char_detail", ac.get_char_detail, _legacy_char_detail, _char_view, char_cases, rounds)
+    ok &= _compare(
+        "get_weapon_detail", aw.get_weapon_detail, _legacy_weapon_detail, _weapon_view, weapon_cases, rounds
+    )
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if run(int(sys.argv[1]) if len(sys.argv) > 1 else 3) else 1)
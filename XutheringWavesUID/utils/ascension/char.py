@@ -1,12 +1,12 @@
-import copy
 import re
-from typing import Union, Optional
+from typing import Any, Dict, Union, Optional
 
 from msgspec import json as msgjson
 
 from gsuid_core.logger import logger
 
 from .model import CharacterModel
+from .compiled import CompiledTable, stat_key
 from .constant import fixed_name, sum_percentages
 from ..resource.RESOURCE_PATH import MAP_DETAIL_PATH
 
@@ -36,6 +36,8 @@ def ensure_data_loaded(force: bool = False):
         force: 如果为 True，强制重新加载所有数据，即使已经加载过
     """
     global _data_loaded
+    if force:
+        _char_table.reset()
     if (_data_loaded and not force) or not MAP_PATH.exists():
         return
     read_char_json_files(MAP_PATH)
@@ -43,7 +45,9 @@ def ensure_data_loaded(force: bool = False):
 
 
 class WavesCharResult:
-    def __init__(self):
+    def __init__(self, char_id: Optional[str] = None):
+        self._char_id = char_id
+        self._skill_trees: Optional[Dict[str, Any]] = None
         self.name = ""
         self.starLevel = 4
         self.stats = {"life": 0.0, "atk": 0.0, "def": 0.0}
@@ -54,9 +58,24 @@ class WavesCharResult:
             "breakWeaknessRatio": 10000,
             "weaknessMastery": 0
         },
-        self.skillTrees = {}
         self.fixed_skill = {}
 
+    @property
+    def skillTrees(self) -> Dict[str, Any]:
+        """技能树原始数据, 访问时才从 char_id_data 取。"""
+        if self._skill_trees is None:
+            self._skill_trees = {}
+            if self._char_id is not None:
+                ensure_data_loaded()
+                char_data = char_id_data.get(self._char_id)
+                if char_data:
+                    self._skill_trees = char_data["skillTree"]
+        return self._skill_trees
+
+    @skillTrees.setter
+    def skillTrees(self, value: Dict[str, Any]):
+        self._skill_trees = value
+
 
 def get_breach(breach: Union[int, None], level: int):
     if breach is None:
@@ -114,37 +133,19 @@ def extract_param_index(skill_desc: str, search_pattern: str) -> Optional[int]:
     return None
 
 
-def get_char_detail(char_id: Union[str, int], level: int, breach: Union[int, None] = None) -> WavesCharResult:
-    """
-    breach 突破
-    resonLevel 谐振
-    """
-    ensure_data_loaded()
-    result = WavesCharResult()
-    if str(char_id) not in char_id_data:
-        logger.exception(f"[鸣潮·角色升级] get_char_detail char_id: {char_id} not found")
-        return result
-
-    breach = get_breach(breach, level)
-
-    char_data = char_id_data[str(char_id)]
-    result.name = char_data["name"]
-    result.starLevel = char_data["starLevel"]
-    result.stats = copy.deepcopy(char_data["stats"][str(breach)][str(level)])
-    result.statsWeakness = copy.deepcopy(char_data["statsWeakness"])
-    result.skillTrees = char_data["skillTree"]
-
-    char_data["skillTree"].items()
+def compile_fixed_skill(char_id: str, char_data: Dict[str, Any], advanced: bool) -> Dict[str, str]:
+    """固有技能带来的属性加成; advanced 即突破 >= 3 (技能树上的属性节点生效)。"""
+    fixed_skill: Dict[str, str] = {}
     for key, value in char_data["skillTree"].items():
         skill_info = value.get("skill", {})
         name = skill_info.get("name", "")
-        if name in fixed_name and breach >= 3:
+        if name in fixed_name and advanced:
             name = name.replace("提升", "").replace("全", "")
-            if name not in result.fixed_skill:
-                result.fixed_skill[name] = "0%"
+            if name not in fixed_skill:
+                fixed_skill[name] = "0%"
 
             try:
-                result.fixed_skill[name] = sum_percentages(skill_info["param"][0], result.fixed_skill[name])
+                fixed_skill[name] = sum_percentages(skill_info["param"][0], fixed_skill[name])
             except (IndexError, KeyError, TypeError) as e:
                 logger.warning(f"[鸣潮·角色升级] get_char_detail param[0] failed for char_id {char_id}, skill {name}: {e}")
 
@@ -152,8 +153,8 @@ def get_char_detail(char_id: Union[str, int], level: int, breach: Union[int, Non
             for i, orig_name in enumerate(fixed_name):
                 if skill_info["desc"].startswith(orig_name) or skill_info["desc"].startswith(f"{char_data['name']}的{orig_name}"):
                     name = orig_name.replace("提升", "").replace("全", "")
-                    if name not in result.fixed_skill:
-                        result.fixed_skill[name] = "0%"
+                    if name not in fixed_skill:
+                        fixed_skill[name] = "0%"
 
                     # Use original name (with 提升) for pattern matching in desc
                     search_pattern = orig_name if skill_info["desc"].startswith(orig_name) else f"{char_data['name']}的{orig_name}"
@@ -163,16 +164,76 @@ def get_char_detail(char_id: Union[str, int], level: int, breach: Union[int, Non
                         desc_text = re.sub(r'<[^>]+>', '', skill_info.get("desc", ""))
                         match = re.search(re.escape(search_pattern) + r'(\d+(?:\.\d+)?%?)', desc_text)
                         if match:
-                            result.fixed_skill[name] = sum_percentages(match.group(1), result.fixed_skill[name])
+                            fixed_skill[name] = sum_percentages(match.group(1), fixed_skill[name])
                         else:
                             logger.warning(f"[鸣潮·角色升级] get_char_detail extract_param failed for char_id {char_id}, skill {name}")
                     else:
                         try:
                             param_value = skill_info["param"][param_index]
-                            result.fixed_skill[name] = sum_percentages(param_value, result.fixed_skill[name])
+                            fixed_skill[name] = sum_percentages(param_value, fixed_skill[name])
                         except (IndexError, KeyError, TypeError) as e:
                             logger.warning(f"[鸣潮·角色升级] get_char_detail param[{param_index}] failed for char_id {char_id}, skill {name}: {e}")
+    return fixed_skill
+
+
+def _compile_char(char_id: str, char_data: Dict[str, Any]) -> Dict[str, Any]:
+    stat_keys: list = []
+    stats: Dict[str, Any] = {}
+    for breach, levels in char_data["stats"].items():
+        for level, value in levels.items():
+            if not stat_keys:
+                stat_keys = list(value)
+            # 键与 statKeys 一致的存成数组, 个别不一致的原样保留
+            stats[stat_key(breach, level)] = list(value.values()) if list(value) == stat_keys else value
+    return {
+        "name": char_data["name"],
+        "starLevel": char_data["starLevel"],
+        "statKeys": stat_keys,
+        "stats": stats,
+        "statsWeakness": char_data.get("statsWeakness"),
+        # [突破 < 3, 突破 >= 3]
+        "fixedSkill": [
+            compile_fixed_skill(char_id, char_data, False),
+            compile_fixed_skill(char_id, char_data, True),
+        ],
+    }
+
+
+def _compile_chars(raw: Dict[str, Any]) -> Dict[str, Any]:
+    rows = {}
+    for char_id, char_data in raw.items():
+        try:
+            rows[char_id] = _compile_char(char_id, char_data)
+        except Exception as e:
+            logger.warning(f"[鸣潮·角色升级] 编译角色数值失败 char_id {char_id}: {e}")
+    return rows
+
+
+_char_table = CompiledTable("char", MAP_PATH, _compile_chars)
+
+
+def get_char_detail(char_id: Union[str, int], level: int, breach: Union[int, None] = None) -> WavesCharResult:
+    """
+    breach 突破
+    resonLevel 谐振
+
+    数值与固有技能加成取自预编译表, 返回的 dict 均为副本, 可随意修改。
+    """
+    row = _char_table.rows().get(str(char_id))
+    if row is None:
+        logger.exception(f"[鸣潮·角色升级] get_char_detail char_id: {char_id} not found")
+        return WavesCharResult()
+
+    breach = get_breach(breach, level)
 
+    result = WavesCharResult(str(char_id))
+    result.name = row["name"]
+    result.starLevel = row["starLevel"]
+    stats = row["stats"][stat_key(breach, level)]
+    result.stats = dict(zip(row["statKeys"], stats)) if isinstance(stats, list) else dict(stats)
+    if row["statsWeakness"] is not None:
+        result.statsWeakness = dict(row["statsWeakness"])
+    result.fixed_skill = dict(row["fixedSkill"][1 if breach >= 3 else 0])
     return result
 
 
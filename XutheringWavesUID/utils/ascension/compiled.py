@@ -0,0 +1,108 @@
+"""角色 / 武器突破数值的预编译表。
+
+``get_char_detail`` / ``get_weapon_detail`` 在每次构造 WuWaCalc、每一行排行里都会被调用,
+原实现每次都要 deepcopy 数值并把整棵技能树按正则重新解析一遍。这里把 map 目录下的
+原始 JSON 一次性编译成紧凑的查表结构 (按 "突破/等级" 索引的数值、预先算好的固有技能
+加成等), 以 msgpack 落盘到 ``CACHE_PATH/ascension``:
+
+- 文件名带资源版本 (编译版本 + 各 JSON 的文件名 / 大小 / mtime 摘要), 资源更新后
+  自动重编译并清掉旧版本文件;
+- 进程内只在首次查询时读盘 (或编译), 之后都是字典直取;
+- ``reset`` 在资源重新加载 (ensure_data_loaded(force=True)) 时调用。
+
+具体编译哪些字段由 char.py / weapon.py 传入的 compile_fn 决定。
+"""
+import os
+import hashlib
+import threading
+from pathlib import Path
+from typing import Any, Dict, Callable, Optional
+
+from msgspec import json as msgjson
+from msgspec import msgpack
+
+from gsuid_core.logger import logger
+
+from ..resource.RESOURCE_PATH import CACHE_PATH
+
+COMPILE_VERSION = 1
+COMPILED_PATH = CACHE_PATH / "ascension"
+
+
+def stat_key(breach: Any, level: Any) -> str:
+    return f"{breach}/{level}"
+
+
+def source_version(directory: Path) -> str:
+    """目录下全部 JSON 的 (相对路径, 大小, mtime) 摘要。"""
+    digest = hashlib.sha1(str(COMPILE_VERSION).encode())
+    for file in sorted(directory.rglob("*.json")):
+        stat = file.stat()
+        digest.update(
+            f"{file.relative_to(directory).as_posix()}:{stat.st_size}:{stat.st_mtime_ns};".encode()
+        )
+    return digest.hexdigest()[:16]
+
+
+class CompiledTable:
+    def __init__(
+        self,
+        kind: str,
+        source_dir: Path,
+        compile_fn: Callable[[Dict[str, Any]], Dict[str, Any]],
+    ):
+        self.kind = kind
+        self.source_dir = source_dir
+        self.compile_fn = compile_fn
+        self._lock = threading.Lock()
+        self._rows: Optional[Dict[str, Any]] = None
+
+    def reset(self) -> None:
+        with self._lock:
+            self._rows = None
+
+    def rows(self) -> Dict[str, Any]:
+        """{id: 编译行}; 资源目录不存在时返回空表且不缓存, 等资源下载后再编译。"""
+        rows = self._rows
+        if rows is not None:
+            return rows
+        with self._lock:
+            if self._rows is not None:
+                return self._rows
+            if not self.source_dir.exists():
+                return {}
+            self._rows = self._load_or_compile()
+            return self._rows
+
+    def _load_or_compile(self) -> Dict[str, Any]:
+        version = source_version(self.source_dir)
+        path = COMPILED_PATH / f"{self.kind}_{version}.msgpack"
+        if path.exists():
+            try:
+                return msgpack.decode(path.read_bytes())
+            except Exception as e:
+                logger.warning(f"[鸣潮·突破数值] 编译缓存损坏, 将重新编译 {path}: {e}")
+
+        raw: Dict[str, Any] = {}
+        for file in self.source_dir.rglob("*.json"):
+            try:
+                raw[file.name.split(".")[0]] = msgjson.decode(file.read_bytes())
+            except Exception as e:
+                logger.warning(f"[鸣潮·突破数值] 读取失败 {file}: {e}")
+        rows = self.compile_fn(raw)
+        self._write(path, rows)
+        logger.info(f"[鸣潮·突破数值] 已编译 {self.kind} 数值表 {len(rows)} 项 (版本 {version})")
+        return rows
+
+    def _write(self, path: Path, rows: Dict[str, Any]) -> None:
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp.write_bytes(msgpack.encode(rows))
+            tmp.replace(path)
+            for old in path.parent.glob(f"{self.kind}_*.msgpack"):
+                if old != path:
+                    old.unlink(missing_ok=True)
+        except OSError as e:
+            tmp.unlink(missing_ok=True)
+            logger.warning(f"[鸣潮·突破数值] 写入编译缓存失败 {path}: {e}")
@@ -1,11 +1,11 @@
-import copy
-from typing import Union, Optional
+from typing import Any, Dict, List, Tuple, Union, Optional
 
 from msgspec import json as msgjson
 
 from gsuid_core.logger import logger
 
 from .model import WeaponModel
+from .compiled import CompiledTable, stat_key
 from .constant import fixed_name
 from ..resource.RESOURCE_PATH import MAP_DETAIL_PATH
 
@@ -35,6 +35,8 @@ def ensure_data_loaded(force: bool = False):
         force: 如果为 True，强制重新加载所有数据，即使已经加载过
     """
     global _data_loaded
+    if force:
+        _weapon_table.reset()
     if (_data_loaded and not force) or not MAP_PATH.exists():
         return
     read_weapon_json_files(MAP_PATH)
@@ -76,6 +78,75 @@ def get_breach(breach: Union[int, None], level: int):
     return breach
 
 
+# 预编译的谐振等级
+_RESON_LEVELS = range(1, 6)
+
+
+def _format_stat(stat: Dict[str, Any]) -> Dict[str, Any]:
+    stat = dict(stat)
+    if stat["isPercent"]:
+        stat["value"] = f"{stat['value'] / 100:.1f}%"
+    elif stat["isRatio"]:
+        stat["value"] = f"{stat['value'] * 100:.1f}%"
+    else:
+        stat["value"] = f"{int(stat['value'])}"
+    return stat
+
+
+def render_effect(weapon_data: Dict[str, Any], resonLevel: int) -> Tuple[str, Dict[str, str]]:
+    """按谐振等级代入参数后的 (效果描述, 副属性加成)。"""
+    effect = weapon_data["effect"]
+    for i, p in enumerate(weapon_data["param"]):
+        _temp = "{" + str(i) + "}"
+        effect = effect.replace(f"{_temp}", str(p[min(resonLevel, len(p)) - 1]))
+
+    sub_effect = {}
+    for i, v in enumerate(fixed_name):
+        if effect.startswith(v):
+            value = weapon_data["param"][0][resonLevel - 1]
+            name = v.replace("提升", "").replace("全", "")
+            sub_effect = {"name": name, "value": f"{value}"}
+    return effect, sub_effect
+
+
+def _compile_weapon(weapon_data: Dict[str, Any]) -> Dict[str, Any]:
+    effects: List[Optional[list]] = []
+    for reson in _RESON_LEVELS:
+        try:
+            effects.append(list(render_effect(weapon_data, reson)))
+        except Exception:
+            # 参数不全的留空, 查询时现算 (并照旧抛错)
+            effects.append(None)
+    return {
+        "name": weapon_data["name"],
+        "starLevel": weapon_data["starLevel"],
+        "type": weapon_data["type"],
+        "effectName": weapon_data["effectName"],
+        "param": weapon_data["param"],
+        "effect": weapon_data["effect"],
+        "stats": {
+            stat_key(breach, level): [_format_stat(stat) for stat in stats]
+            for breach, levels in weapon_data["stats"].items()
+            for level, stats in levels.items()
+        },
+        # [谐振1, ..., 谐振5] -> [效果描述, 副属性加成]
+        "effects": effects,
+    }
+
+
+def _compile_weapons(raw: Dict[str, Any]) -> Dict[str, Any]:
+    rows = {}
+    for weapon_id, weapon_data in raw.items():
+        try:
+            rows[weapon_id] = _compile_weapon(weapon_data)
+        except Exception as e:
+            logger.warning(f"[鸣潮·武器升级] 编译武器数值失败 weapon_id {weapon_id}: {e}")
+    return rows
+
+
+_weapon_table = CompiledTable("weapon", MAP_PATH, _compile_weapons)
+
+
 def get_weapon_detail(
     weapon_id: Union[str, int],
     level: int,
@@ -85,44 +156,33 @@ def get_weapon_detail(
     """
     breach 突破
     resonLevel 谐振
+
+    数值与效果描述取自预编译表, stats / sub_effect 为副本, param 与编译表共享, 不要修改。
     """
-    ensure_data_loaded()
     result = WavesWeaponResult()
-    if str(weapon_id) not in weapon_id_data:
+    row = _weapon_table.rows().get(str(weapon_id))
+    if row is None:
         return result
 
     breach = get_breach(breach, level)
 
-    weapon_data = weapon_id_data[str(weapon_id)]
-    result.name = weapon_data["name"]
-    result.starLevel = weapon_data["starLevel"]
-    result.type = weapon_data["type"]
-    result.effectName = weapon_data["effectName"]
-    result.stats = copy.deepcopy(weapon_data["stats"][str(breach)][str(level)])
-    result.param = weapon_data["param"]
-    effect = weapon_data["effect"]
+    result.name = row["name"]
+    result.starLevel = row["starLevel"]
+    result.type = row["type"]
+    result.effectName = row["effectName"]
+    result.stats = [dict(stat) for stat in row["stats"][stat_key(breach, level)]]
+    result.param = row["param"]
     if resonLevel is None:
         resonLevel = 1
     result.resonLevel = resonLevel
-    for i, p in enumerate(weapon_data["param"]):
-        _temp = "{" + str(i) + "}"
-        effect = effect.replace(f"{_temp}", str(p[min(resonLevel, len(p)) - 1]))
-    result.effect = effect
 
-    for stat in result.stats:
-        if stat["isPercent"]:
-            stat["value"] = f"{stat['value'] / 100:.1f}%"
-        elif stat["isRatio"]:
-            stat["value"] = f"{stat['value'] * 100:.1f}%"
-        else:
-            stat["value"] = f"{int(stat['value'])}"
-
-    result.sub_effect = {}
-    for i, v in enumerate(fixed_name):
-        if result.effect.startswith(v):
-            value = weapon_data["param"][0][resonLevel - 1]
-            name = v.replace("提升", "").replace("全", "")
-            result.sub_effect = {"name": name, "value": f"{value}"}
+    compiled = row["effects"][resonLevel - 1] if resonLevel in _RESON_LEVELS else None
+    if compiled is None:
+        effect, sub_effect = render_effect(row, resonLevel)
+    else:
+        effect, sub_effect = compiled[0], dict(compiled[1])
+    result.effect = effect
+    result.sub_effect = sub_effect
 
     return result
 
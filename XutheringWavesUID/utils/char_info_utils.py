@@ -1,21 +1,158 @@
-from typing import Any, Dict, Union, Optional, Generator
+import asyncio
+import threading
+from pathlib import Path
+from collections import OrderedDict
+from typing import Any, Dict, List, Tuple, Union, Callable, Optional, Generator
 
 from .api.model import RoleDetailData
-from .player_store import read_player_json
+from .player_store import (
+    read_player_roles,
+    add_write_listener,
+    resolve_player_path,
+    read_player_json_sync,
+)
 from .resource.constant import SPECIAL_CHAR, SPECIAL_CHAR_RANK_MAP
 from .resource.RESOURCE_PATH import PLAYER_PATH
 
 PATTERN = r"[\u4e00-\u9fa5a-zA-Z0-9\U0001F300-\U0001FAFF\U00002600-\U000027BF\U00002B00-\U00002BFF\U00003200-\U000032FF-—·()（）]{1,15}"
 
+# 解析后对象相对落盘字节的估算放大系数 (gz / 角色容器先按解压比折算)
+_GZ_RATIO = 10
+_OBJ_OVERHEAD = 4
+
+
+class PanelCache:
+    """进程级面板解析缓存: (uid, 文件名) -> 已校验的 RoleDetailData。
+
+    - 以落盘文件 (mtime_ns, size) 为版本戳, 其它 worker 写盘后自动失效;
+      本进程 write_player_json 落盘时经回调直接失效。
+    - 按估算字节数做 LRU 淘汰, 上限取 PanelCacheSize 配置 (MB, 0 关闭)。
+    - 命中时直接交出缓存内的共享对象, 不再逐个 deep copy (其开销与重新校验相当)。
+      调用方一律只读; 需要原地修改 (换武器/换声骸、ensure_default_modal 等) 时先对
+      单个角色 ``model_copy(deep=True)``, 见 get_char_detail_for_id / get_remote_role_detail_info。
+    """
+
+    def __init__(self):
+        self._data: "OrderedDict[Tuple[str, str], Tuple[Tuple[int, int], int, Any]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def max_bytes() -> int:
+        from ..wutheringwaves_config import WutheringWavesConfig
+
+        size = WutheringWavesConfig.get_config("PanelCacheSize").data
+        return max(int(size or 0), 0) * 1024 * 1024
+
+    def get(self, key: Tuple[str, str], stamp: Tuple[int, int]) -> Optional[Any]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or item[0] != stamp:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[2]
+
+    def put(self, key: Tuple[str, str], stamp: Tuple[int, int], nbytes: int, value: Any) -> None:
+        limit = self.max_bytes()
+        with self._lock:
+            self._pop(key)
+            if nbytes > limit:
+                return
+            self._data[key] = (stamp, nbytes, value)
+            self._bytes += nbytes
+            while self._bytes > limit and self._data:
+                self._pop(next(iter(self._data)))
+
+    def invalidate(self, uid: str, name: Optional[str] = None) -> None:
+        with self._lock:
+            for key in [k for k in self._data if k[0] == uid and (name is None or k[1] == name)]:
+                self._pop(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(self._data),
+            "bytes": self._bytes,
+        }
+
+    def _pop(self, key: Tuple[str, str]) -> None:
+        item = self._data.pop(key, None)
+        if item is not None:
+            self._bytes -= item[1]
+
+
+panel_cache = PanelCache()
+
+
+def _on_player_json_write(path: Path) -> None:
+    if path.parent.parent == PLAYER_PATH:
+        panel_cache.invalidate(path.parent.name, path.name)
+
+
+add_write_listener(_on_player_json_write)
+
+
+def _load_cached_sync(uid: str, name: str, parse: Callable[[Any], Any]) -> Optional[Any]:
+    real = resolve_player_path(PLAYER_PATH / uid / name)
+    if real is None:
+        return None
+    try:
+        st = real.stat()
+    except OSError:
+        return None
+    stamp = (st.st_mtime_ns, st.st_size)
+    key = (uid, name)
+    cached = panel_cache.get(key, stamp)
+    if cached is not None:
+        return cached
+
+    data = read_player_json_sync(PLAYER_PATH / uid / name)
+    if not data:
+        return None
+    value = parse(data)
+    ratio = 1 if real.suffix == ".json" else _GZ_RATIO
+    panel_cache.put(key, stamp, st.st_size * ratio * _OBJ_OVERHEAD, value)
+    return value
+
+
+def _parse_raw_data(data: List[Dict]) -> Tuple[RoleDetailData, ...]:
+    return tuple(RoleDetailData(**r) for r in data)
+
+
+def _parse_rover(data: Dict) -> Dict[str, RoleDetailData]:
+    out: Dict[str, RoleDetailData] = {}
+    for k, v in data.items():
+        try:
+            out[str(k)] = RoleDetailData(**v)
+        except Exception:
+            continue
+    return out
+
+
+def get_panel_cache_stats() -> Dict[str, Any]:
+    return panel_cache.stats()
+
+
 async def get_all_role_detail_info_list(
     uid: str,
 ) -> Union[Generator[RoleDetailData, Any, None], None]:
-    path = PLAYER_PATH / uid / "rawData.json"
-    player_data = await read_player_json(path)
-    if not player_data:
+    roles = await asyncio.to_thread(_load_cached_sync, uid, "rawData.json", _parse_raw_data)
+    if not roles:
         return None
 
-    return iter(RoleDetailData(**r) for r in player_data)
+    return iter(roles)
 
 
 async def get_all_role_detail_info(uid: str) -> Union[Dict[str, RoleDetailData], None]:
@@ -44,34 +181,34 @@ async def get_all_roleid_detail_info_int(
 
 
 async def get_char_detail_for_id(uid: str, char_id: str) -> Optional[RoleDetailData]:
-    """按 char_id 取当前落盘面板数据(漂泊者以 rover.json 为准), 无则 None。"""
-    all_role_detail = await get_all_roleid_detail_info(uid)
+    """按 char_id 取当前落盘面板数据(漂泊者以 rover.json 为准), 无则 None。
+
+    只按角色读取对应记录, 不解压整份 rawData。返回独立副本, 面板渲染可原地修改。
+    """
     if char_id in SPECIAL_CHAR:
         canon = SPECIAL_CHAR_RANK_MAP[char_id]
         rover_map = await get_rover_detail_map(uid)
         if canon in rover_map:
-            all_role_detail = {**(all_role_detail or {}), canon: rover_map[canon]}
+            return rover_map[canon].model_copy(deep=True)
         query_list = SPECIAL_CHAR[char_id]
     else:
         query_list = [char_id]
-    for tid in query_list:
-        if all_role_detail and tid in all_role_detail:
-            return all_role_detail[tid]
+    ids = [int(tid) for tid in query_list if str(tid).isdigit()]
+    found = await read_player_roles(PLAYER_PATH / uid / "rawData.json", ids)
+    if not found:
+        return None
+    for rid in ids:
+        if rid in found:
+            return RoleDetailData(**found[rid])
     return None
 
 
 async def get_rover_detail_map(uid: str) -> Dict[str, RoleDetailData]:
-    """读 rover.json → {canonical_id: RoleDetailData}。"""
-    data = await read_player_json(PLAYER_PATH / uid / "rover.json")
+    """读 rover.json → {canonical_id: RoleDetailData}; 值为缓存共享对象, 只读。"""
+    data = await asyncio.to_thread(_load_cached_sync, uid, "rover.json", _parse_rover)
     if not data:
         return {}
-    out: Dict[str, RoleDetailData] = {}
-    for k, v in data.items():
-        try:
-            out[str(k)] = RoleDetailData(**v)
-        except Exception:
-            continue
-    return out
+    return dict(data)
 
 
 def lookup_chain(role_detail_info_map, role_id) -> tuple[int, str]:
@@ -0,0 +1,185 @@
+"""角色持有矩阵: 群持有率 / 共鸣链分布统计。
+
+面板保存 (save_card_info) 时把 roleId -> 共鸣链 写成 uid 的持有向量
+(见 ``WavesCharOwnership``)。统计时一次查出一批 uid 的向量, 拼成 uid x 槽位 的
+uint8 矩阵, 用 numpy 按列计数; 没有 numpy 时退回逐行累加。
+
+rawData 被其它途径改写 (面板编辑、数据导入等) 时经 player_store 落盘回调标记过期,
+与没有向量的 uid 一样在下次统计时读 rawData 懒重建。
+"""
+import asyncio
+from pathlib import Path
+from typing import Any, Dict, List, Tuple, Iterable, Optional
+
+from gsuid_core.logger import logger
+
+from .player_store import add_write_listener, read_player_json
+from .resource.RESOURCE_PATH import PLAYER_PATH
+from .database.waves_char_ownership import WavesCharSlot, WavesCharOwnership
+
+
+def _import_np():
+    try:
+        import numpy as np  # type: ignore
+        return np
+    except Exception:
+        return None
+
+
+np = _import_np()
+
+_BG_TASKS: set = set()
+_slot_lock = asyncio.Lock()
+_slot_map: Optional[Dict[int, int]] = None
+# 本进程内 rawData 已被改写、向量待重建的 uid
+_stale: set = set()
+
+
+def _on_player_json_write(path: Path) -> None:
+    if path.name == "rawData.json" and path.parent.parent == PLAYER_PATH:
+        _stale.add(path.parent.name)
+
+
+add_write_listener(_on_player_json_write)
+
+
+def _chain_num(item: Dict[str, Any]) -> int:
+    """同 RoleDetailData.get_chain_num, 直接读原始 dict 免去模型校验。"""
+    return sum(1 for c in item.get("chainList") or [] if c.get("unlocked"))
+
+
+async def _get_slots(role_ids: Iterable[int] = ()) -> Dict[int, int]:
+    global _slot_map
+    wanted = {int(r) for r in role_ids}
+    async with _slot_lock:
+        if _slot_map is None:
+            _slot_map = await WavesCharSlot.get_slot_map()
+        if wanted - set(_slot_map):
+            _slot_map = await WavesCharSlot.ensure_roles(wanted)
+        return _slot_map
+
+
+async def update_ownership(
+    uid: str,
+    items: List[Dict[str, Any]],
+    removed_ids: Iterable[int] = (),
+    replace: bool = False,
+) -> Optional[bytes]:
+    """按面板原始数据更新持有向量; replace=True 表示 items 是该 uid 的全部角色。
+
+    增量更新时该 uid 尚无向量则不写, 留给下次统计整份重建。
+    """
+    removed = [int(r) for r in removed_ids]
+    chains = {int(it["role"]["roleId"]): min(_chain_num(it), 6) for it in items}
+    slots = await _get_slots([*chains, *removed])
+    values = {slots[r]: 0 for r in removed}
+    values.update({slots[r]: c + 1 for r, c in chains.items()})
+    vector = await WavesCharOwnership.update_slots(uid, values, replace)
+    if vector is not None:
+        _stale.discard(uid)
+    return vector
+
+
+def schedule_ownership_update(
+    uid: str,
+    items: List[Dict[str, Any]],
+    removed_ids: Iterable[int] = (),
+    replace: bool = False,
+) -> None:
+    """后台更新持有向量, 不阻塞刷新出图。"""
+
+    async def _run():
+        try:
+            await update_ownership(uid, items, list(removed_ids), replace)
+        except Exception as e:
+            logger.warning(f"[鸣潮·角色持有] 持有向量更新失败 uid={uid}: {e}")
+
+    task = asyncio.create_task(_run())
+    _BG_TASKS.add(task)
+    task.add_done_callback(_BG_TASKS.discard)
+
+
+async def _rebuild_from_raw(uid: str, semaphore: asyncio.Semaphore) -> Optional[bytes]:
+    async with semaphore:
+        try:
+            data = await read_player_json(PLAYER_PATH / uid / "rawData.json")
+        except Exception as e:
+            logger.warning(f"[鸣潮·角色持有] 面板读取失败 uid={uid}: {e}")
+            return None
+    if not data:
+        return None
+    return await update_ownership(uid, data, replace=True)
+
+
+async def load_ownership(uids: Iterable[str]) -> Tuple[Dict[str, bytes], List[int]]:
+    """一批 uid 的持有向量 ({uid: chains}, 槽位 -> roleId)。
+
+    无向量或已过期的 uid 读 rawData 重建, 没有面板数据的 uid 不出现在结果里。
+    """
+    uid_list = list(dict.fromkeys(u for u in uids if u))
+    vectors = await WavesCharOwnership.select_by_uids(uid_list)
+    missing = [u for u in uid_list if u not in vectors or u in _stale]
+    if missing:
+        semaphore = asyncio.Semaphore(20)
+        rebuilt = await asyncio.gather(*(_rebuild_from_raw(u, semaphore) for u in missing))
+        for uid, vector in zip(missing, rebuilt):
+            if vector is None:
+                vectors.pop(uid, None)
+            else:
+                vectors[uid] = vector
+        logger.info(f"[鸣潮·角色持有] 重建 {len(missing)} 个 uid 的持有向量")
+
+    slots = await _get_slots()
+    slot_roles = [0] * (max(slots.values()) + 1 if slots else 0)
+    for role_id, slot in slots.items():
+        slot_roles[slot] = role_id
+    return vectors, slot_roles
+
+
+def aggregate_hold_rate(vectors: Iterable[bytes], slot_roles: List[int]) -> Dict[str, Any]:
+    """按 uid 集合统计持有率与共鸣链分布, 输出格式同群持有率数据。"""
+    rows = list(vectors)
+    total = len(rows)
+    if total == 0:
+        return {}
+    width = len(slot_roles)
+
+    if np is not None:
+        matrix = np.zeros((total, width), dtype=np.uint8)
+        for i, row in enumerate(rows):
+            n = min(len(row), width)
+            matrix[i, :n] = np.frombuffer(row, dtype=np.uint8, count=n)
+        # chain_counts[s][c]: 槽位 s 上 c 链的 uid 数
+        chain_counts = np.stack(
+            [(matrix == c + 1).sum(axis=0) for c in range(7)], axis=1
+        ).tolist()
+    else:
+        chain_counts = [[0] * 7 for _ in range(width)]
+        for row in rows:
+            for slot, value in enumerate(row[:width]):
+                if value:
+                    chain_counts[slot][value - 1] += 1
+
+    char_hold_rate = []
+    for slot, per_chain in enumerate(chain_counts):
+        player_count = sum(per_chain)
+        if player_count == 0:
+            continue
+        char_hold_rate.append(
+            {
+                "char_id": slot_roles[slot],
+                "player_count": player_count,
+                "hold_rate": round(player_count / total * 100, 1),
+                "chain_hold_rate": {
+                    str(chain): round(count / player_count * 100, 2)
+                    for chain, count in enumerate(per_chain)
+                    if count > 0
+                },
+            }
+        )
+    return {"total_player_count": total, "char_hold_rate": char_hold_rate}
+
+
+async def get_hold_rate_for_uids(uids: Iterable[str]) -> Dict[str, Any]:
+    vectors, slot_roles = await load_ownership(uids)
+    return aggregate_hold_rate(vectors.values(), slot_roles)
@@ -1,134 +1,115 @@
-"""per-uid 角色面板状态记录 (state.json)。
+"""per-uid 角色面板状态记录 (sidecar.db, 旧 state.json 首次访问时导入)。
 
 记录用户对每个角色的查看 / 刷新次数、最近时间戳, 以及培养建议发送状态。
+计数与读改写都在 sidecar_store 的写事务里完成, 并发命令不会互相覆盖。
 建议透传到 caller 用模块级 _PENDING_ADVICE (key=uid), pop-once 语义。
 """
-import json
 import time
+import asyncio
 from pathlib import Path
 from typing import Any, Dict, Optional
 
-import aiofiles
 from gsuid_core.logger import logger
 
+from . import sidecar_store
 from .resource.RESOURCE_PATH import PLAYER_PATH
 
 
-def _state_path(uid: str) -> Path:
-    return PLAYER_PATH / uid / "state.json"
-
-
-def _default_char_record() -> Dict[str, Any]:
-    return {
-        "view_count": 0,
-        "refresh_count": 0,
-        "last_view_at": 0,
-        "last_refresh_at": 0,
-        "last_advice_sent_at": 0,
-        "last_advice_text": "",
-        "advice_dirty": True,
-    }
+def _uid_dir(uid: str) -> Path:
+    return PLAYER_PATH / uid
 
 
 async def load_state(uid: str) -> Optional[Dict[str, Any]]:
-    """None = 读取失败 (caller 应 skip); 文件不存在视为首次, 返回空骨架。"""
-    path = _state_path(uid)
-    if not path.exists():
-        return {"chars": {}}
+    """按旧 state.json 结构返回全部状态; None = 读取失败 (caller 应 skip), 无记录返回空骨架。"""
     try:
-        async with aiofiles.open(path, "r", encoding="utf-8") as f:
-            return json.loads(await f.read())
+        return await asyncio.to_thread(sidecar_store.read_state_sync, _uid_dir(uid))
     except Exception as e:
         logger.warning(f"[鸣潮·角色状态] load {uid}: {e}")
         return None
 
 
-async def save_state(uid: str, state: Dict[str, Any]) -> bool:
-    path = _state_path(uid)
-    path.parent.mkdir(parents=True, exist_ok=True)
+async def _update_chars(uid: str, groups) -> Optional[Dict[str, Dict[str, Any]]]:
     try:
-        async with aiofiles.open(path, "w", encoding="utf-8") as f:
-            await f.write(json.dumps(state, ensure_ascii=False, indent=2))
-        return True
+        return await asyncio.to_thread(sidecar_store.update_chars_sync, _uid_dir(uid), groups)
     except Exception as e:
         logger.warning(f"[鸣潮·角色状态] save {uid}: {e}")
-        return False
-
-
-def _get_char(state: Dict[str, Any], char_id: str) -> Dict[str, Any]:
-    chars = state.setdefault("chars", {})
-    if char_id not in chars:
-        chars[char_id] = _default_char_record()
-    return chars[char_id]
+        return None
 
 
 async def record_view(uid: str, char_id: str) -> Optional[Dict[str, Any]]:
-    """记录 view; 失败返回 None 让 caller skip advice 流程, 不重试。"""
-    state = await load_state(uid)
-    if state is None:
-        return None
-    rec = _get_char(state, char_id)
-    rec["view_count"] = int(rec.get("view_count", 0)) + 1
-    rec["last_view_at"] = int(time.time())
-    if not await save_state(uid, state):
+    """记录 view (先进内存缓冲, 由 flush_char_views 批量落盘); 失败返回 None 让 caller skip advice 流程。"""
+    try:
+        return await asyncio.to_thread(
+            sidecar_store.record_view_sync, _uid_dir(uid), str(char_id), int(time.time())
+        )
+    except Exception as e:
+        logger.warning(f"[鸣潮·角色状态] 记录查看失败 uid={uid}: {e}")
         return None
-    return rec
+
+
+async def flush_char_views() -> int:
+    """把缓冲的查看计数写入各 uid 的 sidecar.db, 返回写入的 uid 数。"""
+    return await asyncio.to_thread(sidecar_store.flush_views_sync)
+
+
+async def close_char_state() -> None:
+    """退出时落盘剩余查看计数并关闭常驻连接。"""
+    await asyncio.to_thread(sidecar_store.close_all_sync)
 
 
 async def record_advice_sent(uid: str, char_id: str, advice: str) -> bool:
-    state = await load_state(uid)
-    if state is None:
-        return False
-    rec = _get_char(state, char_id)
-    rec["advice_dirty"] = False
-    rec["last_advice_sent_at"] = int(time.time())
-    rec["last_advice_text"] = advice
-    return await save_state(uid, state)
+    values = {
+        "advice_dirty": False,
+        "last_advice_sent_at": int(time.time()),
+        "last_advice_text": advice,
+    }
+    return await _update_chars(uid, [([char_id], {}, values)]) is not None
 
 
 async def record_refresh_batch(uid: str, changed_ids, unchanged_ids) -> bool:
-    """一次性更新多角色刷新状态 (用于刷新场景, 单次落盘)。失败返回 False。"""
-    state = await load_state(uid)
-    if state is None:
-        return False
+    """一次性更新多角色刷新状态 (用于刷新场景, 单个事务)。失败返回 False。"""
     now = int(time.time())
-    for cid in changed_ids:
-        rec = _get_char(state, str(cid))
-        rec["refresh_count"] = int(rec.get("refresh_count", 0)) + 1
-        rec["last_refresh_at"] = now
-        rec["advice_dirty"] = True
-    for cid in unchanged_ids:
-        rec = _get_char(state, str(cid))
-        rec["refresh_count"] = int(rec.get("refresh_count", 0)) + 1
-        rec["last_refresh_at"] = now
-    return await save_state(uid, state)
+    groups = [
+        (list(changed_ids), {"refresh_count": 1}, {"last_refresh_at": now, "advice_dirty": True}),
+        (list(unchanged_ids), {"refresh_count": 1}, {"last_refresh_at": now}),
+    ]
+    return await _update_chars(uid, groups) is not None
+
 
+# ─── 持有角色列表校验节流 (uid 级状态) ───────────────────────────────
 
-# ─── 持有角色列表校验节流 (state.json 顶层) ──────────────────────────
+
+async def _transact_uid_state(uid: str, func) -> Optional[Dict[str, int]]:
+    try:
+        return await asyncio.to_thread(sidecar_store.transact_uid_state_sync, _uid_dir(uid), func)
+    except Exception as e:
+        logger.warning(f"[鸣潮·角色状态] save {uid}: {e}")
+        return None
 
 
 async def bump_single_refresh(uid: str, every: int, max_interval: int) -> bool:
     """单角色刷新计数 +1; 计数达 every / 距上次校验超 max_interval / 从未校验 返回 True。"""
-    state = await load_state(uid)
-    if state is None:
+    due = False
+
+    def _bump(state: Dict[str, int]) -> Optional[Dict[str, int]]:
+        nonlocal due
+        last = state["last_owned_check_at"]
+        count = state["single_refresh_count"] + 1
+        if last == 0 or int(time.time()) - last > max_interval or count >= every:
+            # 计数交给随后的 mark_owned_checked 清零
+            due = True
+            return None
+        return {"single_refresh_count": count}
+
+    if await _transact_uid_state(uid, _bump) is None:
         return False
-    last = int(state.get("last_owned_check_at", 0) or 0)
-    count = int(state.get("single_refresh_count", 0)) + 1
-    if last == 0 or int(time.time()) - last > max_interval or count >= every:
-        return True
-    state["single_refresh_count"] = count
-    await save_state(uid, state)
-    return False
+    return due
 
 
 async def mark_owned_checked(uid: str) -> bool:
     """记录一次持有角色列表校验, 单刷计数清零。"""
-    state = await load_state(uid)
-    if state is None:
-        return False
-    state["single_refresh_count"] = 0
-    state["last_owned_check_at"] = int(time.time())
-    return await save_state(uid, state)
+    changes = {"single_refresh_count": 0, "last_owned_check_at": int(time.time())}
+    return await _transact_uid_state(uid, lambda _state: changes) is not None
 
 
 # ─── 跨函数透传 advice 文本 (key=id(ev), pop-once) ────────────────────
@@ -4,7 +4,8 @@ trans_adapter 里的 exec_list 只在 @on_core_start_before 执行；插件热
 不会重跑 start-before 钩子，于是「模型已加新列、实表还没有」时全表 ORM 查询会报 no such
 column。这里配合 @on_core_start（reload 会重跑本插件该钩子）兜底：逐表对比模型列与实表列，
 把模型有、实表缺的列 ALTER ADD 补上。幂等；表不存在则跳过（create_all 负责建表）。每条 ALTER
-独立事务，互不影响。
+独立事务，互不影响。索引同理：create_all 只在建表时建索引，已有表上新声明的索引由
+auto_create_missing_indexes 补建。
 
 表清单不手写：从调用方模块名推出本插件包前缀，扫 SQLModel 子类收集该前缀下的 table 即可，
 新增表/列自动覆盖。
@@ -117,3 +118,40 @@ async def auto_add_missing_columns(
             logger.info(f"{log_prefix} {sql}")
         except Exception as e:
             logger.warning(f"{log_prefix} 执行失败: {sql} -> {e}")
+
+
+async def auto_create_missing_indexes(
+    module_name: str,
+    log_prefix: str = "[自动补索引]",
+) -> None:
+    tables = _plugin_tables(module_name)
+    if not tables:
+        return
+
+    def _existing_indexes(sync_conn, table_name):
+        insp = sa_inspect(sync_conn)
+        if not insp.has_table(table_name):
+            return None
+        return {idx["name"] for idx in insp.get_indexes(table_name)}
+
+    pending = []
+    try:
+        async with engine.connect() as conn:
+            for table in tables:
+                existing = await conn.run_sync(_existing_indexes, table.name)
+                if existing is None:
+                    continue
+                for index in table.indexes:
+                    if index.name and index.name not in existing:
+                        pending.append(index)
+    except Exception as e:
+        logger.warning(f"{log_prefix} 读取索引失败: {e}")
+        return
+
+    for index in pending:
+        try:
+            async with engine.begin() as conn:
+                await conn.run_sync(lambda sync_conn: index.create(sync_conn, checkfirst=True))
+            logger.info(f"{log_prefix} 创建索引 {index.table.name}.{index.name}")
+        except Exception as e:
+            logger.warning(f"{log_prefix} 创建索引失败: {index.name} -> {e}")
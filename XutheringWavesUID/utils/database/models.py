@@ -1,7 +1,8 @@
-from typing import Any, Dict, List, Type, TypeVar, Optional
+import time
+from typing import Any, Dict, List, Type, Tuple, TypeVar, Optional
 
 from sqlmodel import Field, col, select
-from sqlalchemy import null, delete, update
+from sqlalchemy import Index, null, delete, update
 from sqlalchemy.sql import or_, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -22,9 +23,12 @@ from .waves_user_activity import WavesUserActivity
 from .waves_group_activity import WavesGroupActivity
 from .waves_user_sdk import WavesUserSdk
 from .waves_gacha_cloud import WavesGachaCloud
+from .waves_char_rank_index import WavesCharRankIndex
+from .waves_char_ownership import WavesCharSlot, WavesCharOwnership
+from .waves_gacha_stats import WavesGachaStats
 
 from gsuid_core.server import on_core_start
-from .auto_migrate import auto_add_missing_columns
+from .auto_migrate import auto_add_missing_columns, auto_create_missing_indexes
 
 exec_list.extend(
     [
@@ -159,7 +163,7 @@ class WavesBind(Bind, table=True):
         uid: str,
         game_name: Optional[str] = None,
     ) -> int:
-        """删除特征码并清理体力记录"""
+        """删除特征码并清理体力记录、群排行索引 (仍被他人绑定时由排行侧懒回填)"""
         res = await super().delete_uid(
             user_id=user_id,
             bot_id=bot_id,
@@ -171,11 +175,46 @@ class WavesBind(Bind, table=True):
                 await WavesStaminaRecord.delete_by_uid(user_id, bot_id, uid)
             except Exception:
                 logger.exception("[鸣潮·数据库] 删除特征码时清理体力记录失败")
+            try:
+                await WavesCharRankIndex.delete_by_uid(uid)
+            except Exception:
+                logger.exception("[鸣潮·数据库] 删除特征码时清理排行索引失败")
         return res
 
 
+# get_used_headers 每次 API 请求都要按 (cookie, uid) 取 did / bat, 走进程内缓存;
+# key=(cookie, 请求uid, game_id), value=(行uid, did, bat, 过期时间)。
+# refresh_bat_token 写穿, update_token_by_login / delete_cookie 按 uid 失效, TTL 兜底其他写入路径。
+_DID_BAT_CACHE: Dict[Tuple[str, str, Optional[int]], Tuple[str, str, str, float]] = {}
+_DID_BAT_CACHE_TTL = 300
+_DID_BAT_CACHE_MAX = 4096
+
+
+def invalidate_did_bat_cache(uid: Optional[str] = None) -> None:
+    """按 uid 失效 did / bat 缓存, 不传则全部清空。"""
+    if uid is None:
+        _DID_BAT_CACHE.clear()
+        return
+    for key in [k for k, v in _DID_BAT_CACHE.items() if k[1] == uid or v[0] == uid]:
+        _DID_BAT_CACHE.pop(key, None)
+
+
+def set_did_bat_cache(cookie: str, uid: str, game_id: Optional[int], row_uid: str, did: str, bat: str) -> None:
+    if len(_DID_BAT_CACHE) >= _DID_BAT_CACHE_MAX:
+        now = time.time()
+        for key in [k for k, v in _DID_BAT_CACHE.items() if v[3] <= now]:
+            _DID_BAT_CACHE.pop(key, None)
+        if len(_DID_BAT_CACHE) >= _DID_BAT_CACHE_MAX:
+            _DID_BAT_CACHE.clear()
+    _DID_BAT_CACHE[(cookie, uid, game_id)] = (row_uid, did, bat, time.time() + _DID_BAT_CACHE_TTL)
+
+
 class WavesUser(User, table=True):
-    __table_args__: Dict[str, Any] = {"extend_existing": True}
+    __table_args__: Any = (
+        Index("ix_WavesUser_cookie_uid_game", "cookie", "uid", "game_id"),
+        Index("ix_WavesUser_user_bot_uid", "user_id", "bot_id", "uid"),
+        {"extend_existing": True},
+    )
     cookie: str = Field(default="", title="Cookie")
     uid: str = Field(default=None, title="游戏UID")
     platform: str = Field(default="", title="ck平台")
@@ -284,23 +323,54 @@ class WavesUser(User, table=True):
         return data[0] if data else None
 
     @classmethod
+    async def select_did_bat(
+        cls,
+        cookie: str,
+        uid: str,
+        game_id: Optional[int] = None,
+    ) -> Optional[Tuple[str, str]]:
+        """按 (cookie, uid) 取 (did, bat), 查不到时退回仅按 cookie 查; 带进程内缓存。"""
+        key = (cookie, uid, game_id)
+        cached = _DID_BAT_CACHE.get(key)
+        if cached is not None and cached[3] > time.time():
+            return cached[1], cached[2]
+
+        waves_user = await cls.select_data_by_cookie_and_uid(
+            cookie=cookie,
+            uid=uid,
+            game_id=game_id,
+        ) or await cls.select_data_by_cookie(
+            cookie=cookie,
+        )
+        if not waves_user:
+            _DID_BAT_CACHE.pop(key, None)
+            return None
+
+        did, bat = waves_user.did or "", waves_user.bat or ""
+        set_did_bat_cache(cookie, uid, game_id, waves_user.uid or "", did, bat)
+        return did, bat
+
+    @classmethod
+    @with_session
     async def get_user_by_attr(
         cls: Type[T_WavesUser],
+        session: AsyncSession,
         user_id: str,
         bot_id: str,
         attr_key: str,
         attr_value: str,
         game_id: Optional[int] = None,
     ) -> Optional[Any]:
-        user_list = await cls.select_data_list(user_id=user_id, bot_id=bot_id)
-        if not user_list:
-            return None
-        for user in user_list:
-            if getattr(user, attr_key) != attr_value:
-                continue
-            if game_id is not None and user.game_id not in (0, game_id):
-                continue
-            return user
+        filters = [
+            cls.user_id == user_id,
+            cls.bot_id == bot_id,
+            getattr(cls, attr_key) == attr_value,
+        ]
+        if game_id is not None:
+            filters.append(col(cls.game_id).in_((0, game_id)))
+        sql = select(cls).where(*filters).order_by(col(cls.id)).limit(1)
+        result = await session.execute(sql)
+        return result.scalars().first()
 
     @classmethod
     @with_session
@@ -369,6 +439,7 @@ class WavesUser(User, table=True):
             sql = delete(cls).where(and_(*conditions))
 
         result = await session.execute(sql)
+        invalidate_did_bat_cache(uid)
         return result.rowcount
 
     @classmethod
@@ -404,6 +475,7 @@ class WavesUser(User, table=True):
             .values(cookie=new_token, did=new_did)
         )
         result = await session.execute(sql)
+        invalidate_did_bat_cache(uid)
         return result.rowcount
 
     @classmethod
@@ -811,3 +883,4 @@ class WavesGachaCloudAdmin(GsAdminModel):
 @on_core_start
 async def _waves_auto_migrate():
     await auto_add_missing_columns(__name__, log_prefix="[鸣潮·补列]")
+    await auto_create_missing_indexes(__name__, log_prefix="[鸣潮·补索引]")
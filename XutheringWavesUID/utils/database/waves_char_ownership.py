@@ -0,0 +1,133 @@
+"""角色持有矩阵表。
+
+``WavesCharSlot`` 给每个出现过的 roleId 分配一个只增不改的槽位 (即自增 id - 1);
+``WavesCharOwnership`` 每个 uid 一行, ``chains`` 为按槽位排列的字节向量:
+0 表示未持有, 否则为 共鸣链数 + 1。向量可以比当前槽位数短, 缺的部分视为未持有。
+
+``save_card_info`` 保存面板时更新, 群持有率直接取一批 uid 的向量拼成矩阵统计,
+不再逐个解压 rawData。
+"""
+
+import time
+from typing import Any, Dict, Type, TypeVar, Iterable, Optional
+
+from sqlmodel import Field, col, select
+from sqlalchemy import Index
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from gsuid_core.utils.database.base_models import BaseIDModel, with_session
+
+T_WavesCharSlot = TypeVar("T_WavesCharSlot", bound="WavesCharSlot")
+T_WavesCharOwnership = TypeVar("T_WavesCharOwnership", bound="WavesCharOwnership")
+
+# SQLite 单条语句变量上限 999, IN 查询按块拆分
+_IN_CHUNK = 500
+
+
+class WavesCharSlot(BaseIDModel, table=True):
+    """角色槽位表。"""
+
+    __tablename__ = "WavesCharSlot"
+    __table_args__: Any = (
+        Index("ix_WavesCharSlot_role_id", "role_id", unique=True),
+        {"extend_existing": True},
+    )
+
+    role_id: int = Field(default=0, title="角色ID")
+
+    @classmethod
+    @with_session
+    async def get_slot_map(
+        cls: Type[T_WavesCharSlot],
+        session: AsyncSession,
+    ) -> Dict[int, int]:
+        """{roleId: 槽位}。"""
+        result = await session.execute(select(cls))
+        return {row.role_id: row.id - 1 for row in result.scalars().all()}
+
+    @classmethod
+    @with_session
+    async def ensure_roles(
+        cls: Type[T_WavesCharSlot],
+        session: AsyncSession,
+        role_ids: Iterable[int],
+    ) -> Dict[int, int]:
+        """给未登记的 roleId 分配槽位, 返回完整的 {roleId: 槽位}。"""
+        result = await session.execute(select(cls))
+        rows = result.scalars().all()
+        known = {row.role_id for row in rows}
+        new_ids = sorted({int(r) for r in role_ids} - known)
+        for role_id in new_ids:
+            session.add(cls(role_id=role_id))
+        if new_ids:
+            await session.flush()
+            result = await session.execute(select(cls))
+            rows = result.scalars().all()
+        return {row.role_id: row.id - 1 for row in rows}
+
+
+class WavesCharOwnership(BaseIDModel, table=True):
+    """每个 uid 的角色持有向量。"""
+
+    __tablename__ = "WavesCharOwnership"
+    __table_args__: Any = (
+        Index("ix_WavesCharOwnership_uid", "uid", unique=True),
+        {"extend_existing": True},
+    )
+
+    uid: str = Field(default="", title="鸣潮UID")
+    chains: bytes = Field(default=b"", title="持有向量(共鸣链+1)")
+    updated_time: Optional[int] = Field(default=None, title="更新时间")
+
+    @classmethod
+    @with_session
+    async def select_by_uids(
+        cls: Type[T_WavesCharOwnership],
+        session: AsyncSession,
+        uids: Iterable[str],
+    ) -> Dict[str, bytes]:
+        """取一批 uid 的持有向量 {uid: chains}, IN 查询分块。"""
+        uid_list = list(dict.fromkeys(u for u in uids if u))
+        out: Dict[str, bytes] = {}
+        for i in range(0, len(uid_list), _IN_CHUNK):
+            sql = select(cls.uid, cls.chains).where(
+                col(cls.uid).in_(uid_list[i : i + _IN_CHUNK])
+            )
+            result = await session.execute(sql)
+            for uid, chains in result.all():
+                out[uid] = bytes(chains or b"")
+        return out
+
+    @classmethod
+    @with_session
+    async def update_slots(
+        cls: Type[T_WavesCharOwnership],
+        session: AsyncSession,
+        uid: str,
+        values: Dict[int, int],
+        replace: bool = False,
+    ) -> Optional[bytes]:
+        """写入 {槽位: 共鸣链+1 (0 为移除)}, 返回新向量。
+
+        replace=True 时先清空该 uid 的旧向量; 否则为增量更新, 该 uid 尚无向量时不写
+        (只有部分角色无法得到完整向量), 返回 None。
+        """
+        if not uid:
+            return None
+        result = await session.execute(select(cls).where(cls.uid == uid))
+        row = result.scalars().first()
+        if row is None:
+            if not replace:
+                return None
+            row = cls(uid=uid)
+        vector = bytearray() if replace else bytearray(row.chains or b"")
+        if values:
+            need = max(values) + 1
+            if len(vector) < need:
+                vector.extend(b"\x00" * (need - len(vector)))
+            for slot, value in values.items():
+                vector[slot] = value
+        row.chains = bytes(vector.rstrip(b"\x00"))
+        row.updated_time = int(time.time())
+        session.add(row)
+        return row.chains
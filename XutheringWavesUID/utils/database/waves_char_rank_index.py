@@ -0,0 +1,164 @@
+"""群角色排行物化索引表。
+
+每个 (char_key, uid) 一行，存群排行所需的评分 / 期望伤害 / 合鸣 / 共鸣链。
+``save_card_info`` 刷新面板时写入，群排行直接按角色查一次索引即可，不再逐个解压
+rawData 跑 WuWaCalc。``char_key`` 为漂泊者 canonical id（同 rover.json 的 key），
+普通角色即 roleId。``role_id=0`` 的行表示「该 uid 无此角色 / 无有效声骸」的负缓存。
+``calc_version`` 与当前评分版本不一致的行视为缺失，由排行侧懒重算回填。
+"""
+
+import time
+from typing import Any, Dict, List, Optional, Type, TypeVar, Iterable
+
+from sqlmodel import Field, col, select
+from sqlalchemy import Index, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from gsuid_core.utils.database.base_models import BaseIDModel, with_session
+
+T_WavesCharRankIndex = TypeVar("T_WavesCharRankIndex", bound="WavesCharRankIndex")
+
+# SQLite 单条语句变量上限 999, IN 查询按块拆分
+_IN_CHUNK = 500
+
+
+class WavesCharRankIndex(BaseIDModel, table=True):
+    """群角色排行索引表。"""
+
+    __tablename__ = "WavesCharRankIndex"
+    __table_args__: Any = (
+        Index("ix_WavesCharRankIndex_char_uid", "char_key", "uid", unique=True),
+        {"extend_existing": True},
+    )
+
+    char_key: str = Field(default="", title="角色ID(漂泊者为canonical)")
+    uid: str = Field(default="", title="鸣潮UID", index=True)
+    role_id: int = Field(default=0, title="实际角色ID")
+    level: int = Field(default=0, title="角色等级")
+    chain: int = Field(default=0, title="共鸣链")
+    chain_name: str = Field(default="", title="共鸣链名")
+    score: float = Field(default=0.0, title="声骸评分")
+    score_bg: str = Field(default="", title="评分背景")
+    expected_damage: str = Field(default="", title="期望伤害")
+    expected_damage_int: int = Field(default=0, title="期望伤害数值")
+    sonata_name: str = Field(default="", title="合鸣效果")
+    calc_version: str = Field(default="", title="评分版本")
+    updated_time: Optional[int] = Field(default=None, title="更新时间")
+
+    @classmethod
+    @with_session
+    async def select_by_char(
+        cls: Type[T_WavesCharRankIndex],
+        session: AsyncSession,
+        char_key: str,
+        uids: Iterable[str],
+    ) -> List[T_WavesCharRankIndex]:
+        """按角色取一批 uid 的索引行（含负缓存行），IN 查询分块。"""
+        uid_list = list(dict.fromkeys(u for u in uids if u))
+        rows: List[T_WavesCharRankIndex] = []
+        for i in range(0, len(uid_list), _IN_CHUNK):
+            chunk = uid_list[i : i + _IN_CHUNK]
+            sql = select(cls).where(
+                cls.char_key == char_key,
+                col(cls.uid).in_(chunk),
+            )
+            result = await session.execute(sql)
+            rows.extend(result.scalars().all())
+        return rows
+
+    @classmethod
+    @with_session
+    async def upsert_entries(
+        cls: Type[T_WavesCharRankIndex],
+        session: AsyncSession,
+        uid: str,
+        entries: Dict[str, Dict[str, Any]],
+    ) -> int:
+        """写入同一 uid 的多条索引: {char_key: 字段字典}。返回写入条数。"""
+        if not uid or not entries:
+            return 0
+        now = int(time.time())
+        keys = list(entries.keys())
+        existing: Dict[str, T_WavesCharRankIndex] = {}
+        for i in range(0, len(keys), _IN_CHUNK):
+            sql = select(cls).where(
+                cls.uid == uid,
+                col(cls.char_key).in_(keys[i : i + _IN_CHUNK]),
+            )
+            result = await session.execute(sql)
+            for row in result.scalars().all():
+                existing[row.char_key] = row
+
+        for char_key, fields in entries.items():
+            row = existing.get(char_key)
+            if row is None:
+                row = cls(char_key=char_key, uid=uid)
+            for k, v in fields.items():
+                setattr(row, k, v)
+            row.updated_time = now
+            session.add(row)
+        return len(entries)
+
+    @classmethod
+    @with_session
+    async def upsert_by_char(
+        cls: Type[T_WavesCharRankIndex],
+        session: AsyncSession,
+        char_key: str,
+        entries: Dict[str, Dict[str, Any]],
+    ) -> int:
+        """写入同一角色的多个 uid: {uid: 字段字典}, 用于群排行懒回填。"""
+        if not char_key or not entries:
+            return 0
+        now = int(time.time())
+        uids = list(entries.keys())
+        existing: Dict[str, T_WavesCharRankIndex] = {}
+        for i in range(0, len(uids), _IN_CHUNK):
+            sql = select(cls).where(
+                cls.char_key == char_key,
+                col(cls.uid).in_(uids[i : i + _IN_CHUNK]),
+            )
+            result = await session.execute(sql)
+            for row in result.scalars().all():
+                existing[row.uid] = row
+
+        for uid, fields in entries.items():
+            row = existing.get(uid)
+            if row is None:
+                row = cls(char_key=char_key, uid=uid)
+            for k, v in fields.items():
+                setattr(row, k, v)
+            row.updated_time = now
+            session.add(row)
+        return len(entries)
+
+    @classmethod
+    @with_session
+    async def delete_by_uid(
+        cls: Type[T_WavesCharRankIndex],
+        session: AsyncSession,
+        uid: str,
+    ) -> int:
+        sql = delete(cls).where(col(cls.uid) == uid)
+        result = await session.execute(sql)
+        return result.rowcount or 0
+
+    @classmethod
+    @with_session
+    async def delete_by_char(
+        cls: Type[T_WavesCharRankIndex],
+        session: AsyncSession,
+        char_key: str,
+        uids: Iterable[str],
+    ) -> int:
+        """删除同一角色下一批 uid 的索引行 (面板已不存在的残留行)。"""
+        uid_list = list(dict.fromkeys(u for u in uids if u))
+        count = 0
+        for i in range(0, len(uid_list), _IN_CHUNK):
+            sql = delete(cls).where(
+                cls.char_key == char_key,
+                col(cls.uid).in_(uid_list[i : i + _IN_CHUNK]),
+            )
+            result = await session.execute(sql)
+            count += result.rowcount or 0
+        return count
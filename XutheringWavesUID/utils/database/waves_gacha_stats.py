@@ -0,0 +1,128 @@
+"""抽卡统计物化表。
+
+每个 uid 一行，存 ``get_gacha_stats`` 的完整结果 (``stats`` JSON) 以及群抽卡排行
+用到的关键列。``save_gacha_stats`` 写 gachaStats.json 时同步写入，群排行只需按
+uid 查一次再排序。``source_version`` 为原始抽卡文件版本 (文件名 / inode / mtime /
+size) 的 JSON，与磁盘当前版本不一致的行视为过期，由排行侧重算回填。
+"""
+
+import json
+import time
+from typing import Any, Dict, List, Optional, Type, TypeVar, Iterable
+
+from sqlmodel import Field, col, select
+from sqlalchemy import Index, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from gsuid_core.utils.database.base_models import BaseIDModel, with_session
+
+T_WavesGachaStats = TypeVar("T_WavesGachaStats", bound="WavesGachaStats")
+
+# SQLite 单条语句变量上限 999, IN 查询按块拆分
+_IN_CHUNK = 500
+
+CHAR_POOL = "角色精准调谐"
+WEAPON_POOL = "武器精准调谐"
+
+
+def source_version_key(source_version: Optional[Dict[str, Any]]) -> str:
+    """把抽卡文件版本字典序列化为可直接比较的字符串。"""
+    if not source_version:
+        return ""
+    return json.dumps(source_version, sort_keys=True, ensure_ascii=False)
+
+
+class WavesGachaStats(BaseIDModel, table=True):
+    """抽卡统计表。"""
+
+    __tablename__ = "WavesGachaStats"
+    __table_args__: Any = (
+        Index("ix_WavesGachaStats_uid", "uid", unique=True),
+        {"extend_existing": True},
+    )
+
+    uid: str = Field(default="", title="鸣潮UID")
+    source_version: str = Field(default="", title="抽卡文件版本")
+    total_count: int = Field(default=0, title="限定池总抽数", index=True)
+    char_total: int = Field(default=0, title="角色池总抽数")
+    weapon_total: int = Field(default=0, title="武器池总抽数")
+    char_avg: float = Field(default=0.0, title="角色池平均五星")
+    weapon_avg: float = Field(default=0.0, title="武器池平均五星")
+    char_avg_up: float = Field(default=0.0, title="角色池平均UP")
+    weapon_avg_up: float = Field(default=0.0, title="武器池平均UP")
+    char_up: int = Field(default=0, title="角色UP数")
+    weapon_up: int = Field(default=0, title="武器UP数")
+    char_remain: int = Field(default=0, title="角色池已垫")
+    weapon_remain: int = Field(default=0, title="武器池已垫")
+    stats: str = Field(default="", title="完整统计JSON")
+    updated_time: Optional[int] = Field(default=None, title="更新时间")
+
+    def get_stats(self) -> Dict[str, Any]:
+        try:
+            data = json.loads(self.stats) if self.stats else {}
+        except Exception:
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    @classmethod
+    @with_session
+    async def select_by_uids(
+        cls: Type[T_WavesGachaStats],
+        session: AsyncSession,
+        uids: Iterable[str],
+    ) -> List[T_WavesGachaStats]:
+        """取一批 uid 的统计行，IN 查询分块。"""
+        uid_list = list(dict.fromkeys(u for u in uids if u))
+        rows: List[T_WavesGachaStats] = []
+        for i in range(0, len(uid_list), _IN_CHUNK):
+            sql = select(cls).where(col(cls.uid).in_(uid_list[i : i + _IN_CHUNK]))
+            result = await session.execute(sql)
+            rows.extend(result.scalars().all())
+        return rows
+
+    @classmethod
+    @with_session
+    async def upsert_stats(
+        cls: Type[T_WavesGachaStats],
+        session: AsyncSession,
+        uid: str,
+        source_version: Optional[Dict[str, Any]],
+        stats: Dict[str, Any],
+    ) -> bool:
+        """写入 uid 的统计结果 (``_total_to_stats`` 的输出)。"""
+        if not uid:
+            return False
+        result = await session.execute(select(cls).where(cls.uid == uid))
+        row = result.scalars().first()
+        if row is None:
+            row = cls(uid=uid)
+
+        char_pool = stats.get(CHAR_POOL, {})
+        weapon_pool = stats.get(WEAPON_POOL, {})
+        row.source_version = source_version_key(source_version)
+        row.char_total = char_pool.get("total", 0)
+        row.weapon_total = weapon_pool.get("total", 0)
+        row.total_count = row.char_total + row.weapon_total
+        row.char_avg = char_pool.get("avg", 0) or 0
+        row.weapon_avg = weapon_pool.get("avg", 0) or 0
+        row.char_avg_up = char_pool.get("avg_up", 0) or 0
+        row.weapon_avg_up = weapon_pool.get("avg_up", 0) or 0
+        row.char_up = char_pool.get("up_count", 0)
+        row.weapon_up = weapon_pool.get("up_count", 0)
+        row.char_remain = char_pool.get("remain", 0)
+        row.weapon_remain = weapon_pool.get("remain", 0)
+        row.stats = json.dumps(stats, ensure_ascii=False)
+        row.updated_time = int(time.time())
+        session.add(row)
+        return True
+
+    @classmethod
+    @with_session
+    async def delete_by_uid(
+        cls: Type[T_WavesGachaStats],
+        session: AsyncSession,
+        uid: str,
+    ) -> int:
+        sql = delete(cls).where(col(cls.uid) == uid)
+        result = await session.execute(sql)
+        return result.rowcount or 0
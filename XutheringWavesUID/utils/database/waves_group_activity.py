@@ -1,7 +1,7 @@
 from contextvars import ContextVar
-from typing import Any, Dict, Optional, Set, Type, TypeVar
+from typing import Any, Dict, Optional, Set, Tuple, Type, TypeVar
 
-from sqlmodel import Field, select
+from sqlmodel import Field, col, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql import and_
 
@@ -61,6 +61,34 @@ class WavesGroupActivity(BaseBotIDModel, table=True):
 
         return True
 
+    @classmethod
+    @with_session
+    async def bulk_update_group_activity(
+        cls: Type[T_WavesGroupActivity],
+        session: AsyncSession,
+        entries: Dict[Tuple[str, str, str], int],
+    ) -> int:
+        """批量写入群活跃时间 {(group_id, bot_id, bot_self_id): 时间戳}"""
+        if not entries:
+            return 0
+        group_ids = list(dict.fromkeys(k[0] for k in entries))
+        existing: Dict[Tuple[str, str, str], T_WavesGroupActivity] = {}
+        for i in range(0, len(group_ids), 500):
+            sql = select(cls).where(col(cls.group_id).in_(group_ids[i : i + 500]))
+            result = await session.execute(sql)
+            for row in result.scalars().all():
+                existing.setdefault((row.group_id, row.bot_id, row.bot_self_id), row)
+
+        for key, ts in entries.items():
+            record = existing.get(key)
+            if record is None:
+                group_id, bot_id, bot_self_id = key
+                record = existing[key] = cls(group_id=group_id, bot_id=bot_id, bot_self_id=bot_self_id)
+            if not record.last_active_time or record.last_active_time < ts:
+                record.last_active_time = ts
+            session.add(record)
+        return len(entries)
+
     @classmethod
     @with_session
     async def get_active_group_ids(
@@ -1,14 +1,19 @@
-from typing import Any, Dict, Optional, Set, Type, TypeVar
+from typing import Any, Dict, List, Optional, Set, Tuple, Type, TypeVar, Iterable
 
-from sqlmodel import Field, select
-from sqlalchemy import update
+from sqlmodel import Field, col, select
+from sqlalchemy import Index, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql import and_, or_
 
 from gsuid_core.utils.database.base_models import BaseBotIDModel, with_session
 
+from ..activity_buffer import get_pending_user_time, get_pending_user_times
+
 T_WavesUserActivity = TypeVar("T_WavesUserActivity", bound="WavesUserActivity")
 
+# SQLite 单条语句变量上限 999, IN 查询按块拆分
+_IN_CHUNK = 500
+
 
 class WavesUserActivity(BaseBotIDModel, table=True):
     """用户活跃度记录表
@@ -18,7 +23,10 @@ class WavesUserActivity(BaseBotIDModel, table=True):
     """
 
     __tablename__ = "WavesUserActivity"
-    __table_args__: Dict[str, Any] = {"extend_existing": True}
+    __table_args__: Any = (
+        Index("ix_WavesUserActivity_user_bot_self", "user_id", "bot_id", "bot_self_id"),
+        {"extend_existing": True},
+    )
 
     user_id: str = Field(default="", title="用户ID")
     bot_self_id: str = Field(default="", title="BotSelfID")
@@ -91,6 +99,50 @@ class WavesUserActivity(BaseBotIDModel, table=True):
 
         return True
 
+    @classmethod
+    @with_session
+    async def bulk_update_activity(
+        cls: Type[T_WavesUserActivity],
+        session: AsyncSession,
+        entries: Dict[Tuple[str, str, str], int],
+    ) -> int:
+        """批量写入活跃时间 {(user_id, bot_id, bot_self_id): 时间戳}
+
+        一个事务内按 user_id 分块取出已有记录, 规则同 update_user_activity
+        (含旧数据迁移), 时间只前进不后退。
+        """
+        if not entries:
+            return 0
+        user_ids = list(dict.fromkeys(k[0] for k in entries))
+        rows: List[T_WavesUserActivity] = []
+        for i in range(0, len(user_ids), _IN_CHUNK):
+            sql = select(cls).where(col(cls.user_id).in_(user_ids[i : i + _IN_CHUNK]))
+            result = await session.execute(sql)
+            rows.extend(result.scalars().all())
+
+        exact: Dict[Tuple[str, str, str], T_WavesUserActivity] = {}
+        legacy: Dict[Tuple[str, str], T_WavesUserActivity] = {}
+        for row in rows:
+            exact.setdefault((row.user_id, row.bot_id, row.bot_self_id), row)
+            if not row.bot_self_id:
+                legacy.setdefault((row.user_id, row.bot_id), row)
+
+        for (user_id, bot_id, bot_self_id), ts in entries.items():
+            record = exact.get((user_id, bot_id, bot_self_id))
+            if record is None:
+                # 兼容旧数据：bot_id 里存的是 bot_self_id，且 bot_self_id 为空
+                record = legacy.pop((user_id, bot_self_id), None)
+                if record is not None:
+                    record.bot_id = bot_id
+                    record.bot_self_id = bot_self_id
+                else:
+                    record = cls(user_id=user_id, bot_id=bot_id, bot_self_id=bot_self_id)
+                exact[(user_id, bot_id, bot_self_id)] = record
+            if not record.last_active_time or record.last_active_time < ts:
+                record.last_active_time = ts
+            session.add(record)
+        return len(entries)
+
     @classmethod
     @with_session
     async def get_user_last_active_time(
@@ -109,6 +161,11 @@ class WavesUserActivity(BaseBotIDModel, table=True):
         Returns:
             Optional[int]: 最后活跃时间戳，不存在返回 None
         """
+        # 缓冲区里的待写时间一定不早于库里的值
+        pending = get_pending_user_time((user_id, bot_id, bot_self_id))
+        if pending is not None:
+            return pending
+
         sql = select(cls).where(
             and_(
                 cls.user_id == user_id,
@@ -182,7 +239,60 @@ class WavesUserActivity(BaseBotIDModel, table=True):
             )
         )
         result = await session.execute(sql)
-        return {uid for uid in result.scalars().all() if uid}
+        active = {uid for uid in result.scalars().all() if uid}
+        active.update(k[0] for k, t in get_pending_user_times().items() if k[0] and t >= threshold_time)
+        return active
+
+    @classmethod
+    @with_session
+    async def get_last_active_times(
+        cls: Type[T_WavesUserActivity],
+        session: AsyncSession,
+        keys: Iterable[Tuple[str, str, str]],
+    ) -> Dict[Tuple[str, str, str], Optional[int]]:
+        """批量获取 (user_id, bot_id, bot_self_id) 的最后活跃时间
+
+        按 user_id 分块 IN 查询, 匹配规则同 get_user_last_active_time (含旧数据兼容)。
+        """
+        key_list = list(dict.fromkeys(keys))
+        user_ids = list(dict.fromkeys(k[0] for k in key_list if k[0]))
+        rows: List[T_WavesUserActivity] = []
+        for i in range(0, len(user_ids), _IN_CHUNK):
+            sql = select(cls).where(col(cls.user_id).in_(user_ids[i : i + _IN_CHUNK]))
+            result = await session.execute(sql)
+            rows.extend(result.scalars().all())
+
+        exact: Dict[Tuple[str, str, str], Optional[int]] = {}
+        legacy: Dict[Tuple[str, str], Optional[int]] = {}
+        for row in rows:
+            exact.setdefault((row.user_id, row.bot_id, row.bot_self_id), row.last_active_time)
+            if not row.bot_self_id:
+                legacy.setdefault((row.user_id, row.bot_id), row.last_active_time)
+
+        pending = get_pending_user_times()
+        result_map: Dict[Tuple[str, str, str], Optional[int]] = {}
+        for user_id, bot_id, bot_self_id in key_list:
+            key = (user_id, bot_id, bot_self_id)
+            if key in pending:
+                result_map[key] = pending[key]
+            elif key in exact:
+                result_map[key] = exact[key]
+            else:
+                result_map[key] = legacy.get((user_id, bot_self_id))
+        return result_map
+
+    @classmethod
+    async def get_active_keys(
+        cls,
+        keys: Iterable[Tuple[str, str, str]],
+        active_days: int,
+    ) -> Set[Tuple[str, str, str]]:
+        """批量筛出 active_days 天内活跃的 (user_id, bot_id, bot_self_id)"""
+        import time
+
+        threshold_time = int(time.time()) - active_days * 24 * 60 * 60
+        times = await cls.get_last_active_times(keys)
+        return {k for k, t in times.items() if t is not None and t >= threshold_time}
 
     @classmethod
     @with_session
@@ -76,15 +76,21 @@ class WavesCharRank(BaseModel):
 
 
 async def get_waves_char_rank(uid, all_role_detail, need_expected_damage=False, need_overall_score=False):
+    from .score_pool import score_char_ranks
+
     if not all_role_detail:
         all_role_detail = await get_all_role_detail_info(uid)
-    return _compute_char_rank(all_role_detail, need_expected_damage, need_overall_score)
+    if isinstance(all_role_detail, dict):
+        temp = list(all_role_detail.values())
+    else:
+        temp = list(all_role_detail) if all_role_detail else []
+    return await score_char_ranks(temp, need_expected_damage, need_overall_score)
 
 
 def _compute_one_char_rank(role_detail, need_expected_damage=False, need_overall_score=False):
     """单角色评分计算; role_detail 可为 dict 或 RoleDetailData。
 
-    入参/返回值均可 pickle, 供 gsuid_core.pool.to_process 丢进程池并行调用。
+    入参/返回值均可 pickle, 供 score_pool.map_in_pool 丢进程池并行调用。
     """
     from .calc import WuWaCalc
     if not isinstance(role_detail, RoleDetailData):
@@ -1,4 +1,6 @@
+import json
 from pathlib import Path
+from functools import lru_cache
 from typing import Dict, List, Optional, Set, Tuple
 
 from PIL import Image, ImageDraw, ImageFont
@@ -28,14 +30,71 @@ def waves_font_back_origin(size: int) -> ImageFont.FreeTypeFont:
     return ImageFont.truetype(str(FONT_BACK_PATH), size=size, index=2)
 
 
-# 构建字体 cmap 集合，用于快速判断字符是否需要 fallback
+# 字体覆盖表: 字体文件 → 码位区间, 存在字体旁的 font_coverage.json (按文件大小 + mtime 校验),
+# 启动时直接读表, 只有字体更新后才用 fontTools 重新解析
+COVERAGE_PATH = Path(__file__).parent / "font_coverage.json"
+_COVERAGE_VERSION = 1
+
+
+def _cmap_to_ranges(codepoints) -> List[List[int]]:
+    ranges: List[List[int]] = []
+    for cp in sorted(codepoints):
+        if ranges and cp == ranges[-1][1] + 1:
+            ranges[-1][1] = cp
+        else:
+            ranges.append([cp, cp])
+    return ranges
+
+
+def _load_coverage(paths: Tuple[Path, ...]) -> Dict[str, Set[int]]:
+    try:
+        table = json.loads(COVERAGE_PATH.read_text(encoding="utf-8"))
+        if table.get("version") != _COVERAGE_VERSION:
+            table = {}
+    except Exception:
+        table = {}
+    fonts = table.get("fonts", {}) if table else {}
+
+    result: Dict[str, Set[int]] = {}
+    dirty = False
+    for path in paths:
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        entry = fonts.get(path.name)
+        if not entry or entry.get("size") != stat.st_size or entry.get("mtime_ns") != stat.st_mtime_ns:
+            from fontTools.ttLib import TTFont
+
+            entry = {
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "ranges": _cmap_to_ranges(TTFont(str(path), lazy=True).getBestCmap().keys()),
+            }
+            fonts[path.name] = entry
+            dirty = True
+        cps: Set[int] = set()
+        for start, end in entry["ranges"]:
+            cps.update(range(start, end + 1))
+        result[path.name] = cps
+
+    if dirty:
+        try:
+            tmp = COVERAGE_PATH.with_suffix(".tmp")
+            tmp.write_text(json.dumps({"version": _COVERAGE_VERSION, "fonts": fonts}), encoding="utf-8")
+            tmp.replace(COVERAGE_PATH)
+        except OSError:
+            pass
+    return result
+
+
+# 字体 cmap 集合，用于快速判断字符是否需要 fallback
 _waves_cmap: Set[int] = set()
 _emoji_cmap: Set[int] = set()
 try:
-    from fontTools.ttLib import TTFont
-
-    _waves_cmap = set(TTFont(str(FONT_ORIGIN_PATH)).getBestCmap().keys())
-    _emoji_cmap = set(TTFont(str(EMOJI_ORIGIN_PATH)).getBestCmap().keys())
+    _coverage = _load_coverage((FONT_ORIGIN_PATH, EMOJI_ORIGIN_PATH))
+    _waves_cmap = _coverage.get(FONT_ORIGIN_PATH.name, set())
+    _emoji_cmap = _coverage.get(EMOJI_ORIGIN_PATH.name, set())
 except ImportError:
     import logging
 
@@ -54,6 +113,8 @@ except Exception:
 # fallback 字体缓存 (按 size 缓存)
 _font_back_cache: Dict[int, ImageFont.FreeTypeFont] = {}
 _EMOJI_FONT_SIZE = 109
+# 分段 / 测量结果缓存条数
+_LAYOUT_CACHE_SIZE = 4096
 
 
 def _get_font_back(size: int) -> ImageFont.FreeTypeFont:
@@ -137,7 +198,9 @@ def _split_emoji_segments(text: str) -> List[Tuple[str, bool]]:
     return segments
 
 
+@lru_cache(maxsize=256)
 def _emoji_image(text: str, target_size: int) -> Optional[Image.Image]:
+    """emoji 簇缩放到目标字号后的图块 (缓存, 调用方只读不改)。"""
     font = _get_emoji_font()
     try:
         bbox = font.getbbox(text)
@@ -170,13 +233,7 @@ def text_width_with_emoji_fallback(
             is_emoji = False
 
         if not is_emoji:
-            width += draw_text_with_fallback(
-                ImageDraw.Draw(Image.new("RGBA", (1, 1))),
-                (0, 0),
-                segment,
-                font=font,
-                fallback_font=fallback_font,
-            )
+            width += text_width_with_fallback(segment, font, fallback_font)
     return width
 
 
@@ -241,6 +298,51 @@ def draw_text_with_emoji_fallback(
     return total_width
 
 
+@lru_cache(maxsize=_LAYOUT_CACHE_SIZE)
+def _layout_runs(
+    text: str,
+    font: ImageFont.FreeTypeFont,
+    fallback_font: Optional[ImageFont.FreeTypeFont],
+) -> Tuple[Tuple[Tuple[str, ImageFont.FreeTypeFont, float], ...], float]:
+    """单行文本按主字体覆盖分段并测量, 返回 ((段文本, 字体, 宽度), ...) 和总宽度。"""
+    if not _waves_cmap or not _need_fallback(text):
+        width = font.getlength(text)
+        return ((text, font, width),), width
+
+    if fallback_font is None:
+        fallback_font = _get_font_back(font.size)
+
+    # 构建分段: [(segment_text, segment_font), ...]
+    segments = []
+    seg = ""
+    seg_font = font
+    for char in text:
+        f = font if ord(char) in _waves_cmap else fallback_font
+        if f is seg_font:
+            seg += char
+        else:
+            if seg:
+                segments.append((seg, seg_font))
+            seg = char
+            seg_font = f
+    if seg:
+        segments.append((seg, seg_font))
+
+    runs = tuple((s, f, f.getlength(s)) for s, f in segments)
+    return runs, sum(w for _, _, w in runs)
+
+
+def text_width_with_fallback(
+    text: str,
+    font: ImageFont.FreeTypeFont,
+    fallback_font: Optional[ImageFont.FreeTypeFont] = None,
+) -> float:
+    """与 draw_text_with_fallback 的返回值一致, 只测量不绘制; 多行取最宽一行。"""
+    if not text:
+        return 0
+    return max(_layout_runs(line, font, fallback_font)[1] for line in text.split("\n"))
+
+
 def draw_text_with_fallback(
     draw: ImageDraw.ImageDraw,
     xy: Tuple[int, int],
@@ -280,30 +382,14 @@ def draw_text_with_fallback(
             max_width = max(max_width, w)
         return max_width
 
-    if not _waves_cmap or not text or not _need_fallback(text):
+    if font is None or not text:
         draw.text(xy, text, fill=fill, font=font, anchor=anchor, **kwargs)
         return font.getlength(text) if font else 0
 
-    if fallback_font is None:
-        fallback_font = _get_font_back(font.size)
-
-    # 构建分段: [(segment_text, segment_font), ...]
-    segments = []
-    seg = ""
-    seg_font = font
-    for char in text:
-        f = font if ord(char) in _waves_cmap else fallback_font
-        if f is seg_font:
-            seg += char
-        else:
-            if seg:
-                segments.append((seg, seg_font))
-            seg = char
-            seg_font = f
-    if seg:
-        segments.append((seg, seg_font))
-
-    total_width = sum(f.getlength(s) for s, f in segments)
+    runs, total_width = _layout_runs(text, font, fallback_font)
+    if len(runs) == 1 and runs[0][1] is font:
+        draw.text(xy, text, fill=fill, font=font, anchor=anchor, **kwargs)
+        return total_width
 
     # 根据 anchor 的水平分量调整起始 x
     x, y = xy
@@ -315,9 +401,9 @@ def draw_text_with_fallback(
 
     # 每段使用左对齐 anchor 绘制
     seg_anchor = "l" + (anchor or "la")[1] if anchor else None
-    for seg_text, seg_f in segments:
+    for seg_text, seg_f, seg_w in runs:
         draw.text((x, y), seg_text, fill=fill, font=seg_f, anchor=seg_anchor, **kwargs)
-        x += seg_f.getlength(seg_text)
+        x += seg_w
 
     return total_width
 
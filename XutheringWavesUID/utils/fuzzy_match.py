@@ -1,13 +1,19 @@
 """基于拼音 + 字面相似度的"你可能想找"通用模糊匹配。
 
 pypinyin / rapidfuzz 都是可选依赖, 缺则降级。
+
+每张别名表首次查询时建一次 ``_CandidateIndex``: 预先算好每个名字的小写、拼音、
+排序拼音、拼音音节多重集, 以及 拼音二元组 / 汉字 → 名字 的倒排表。查询先用倒排表
+筛出至少共享一个 n-gram 的候选, 再按原规则精确打分 (有 rapidfuzz 时批量 cdist)。
+别名表被替换 (重新加载) 后按对象 / 规模变化自动重建。
 """
 
 from __future__ import annotations
 
 import difflib
-from collections import Counter
-from typing import Dict, List, Tuple, Iterable
+from functools import lru_cache
+from collections import Counter, OrderedDict
+from typing import Dict, List, Tuple, Sequence
 
 from gsuid_core.logger import logger
 
@@ -25,48 +31,49 @@ def _import_pypinyin():
 
 def _import_rapidfuzz():
     try:
-        from rapidfuzz import fuzz  # type: ignore
-        return fuzz
+        from rapidfuzz import fuzz, process  # type: ignore
+        return fuzz, process
     except Exception:
         logger.warning("[鸣潮·模糊匹配] 未安装rapidfuzz，安装后模糊匹配更快, 且支持'近子串'容错加分。")
         logger.info("[鸣潮·模糊匹配] 安装方法 Linux/Mac: 在当前目录下执行 source .venv/bin/activate && uv pip install rapidfuzz")
         logger.info("[鸣潮·模糊匹配] 安装方法 Windows: 在当前目录下执行 .venv\\Scripts\\activate; uv pip install rapidfuzz")
-        return None
+        return None, None
 
 
 lazy_pinyin, Style = _import_pypinyin()
 _HAS_PYPINYIN = lazy_pinyin is not None
 
-_rf_fuzz = _import_rapidfuzz()
+_rf_fuzz, _rf_process = _import_rapidfuzz()
 _HAS_RAPIDFUZZ = _rf_fuzz is not None
 
+# rapidfuzz.process.cdist 返回 numpy 数组
+try:
+    import numpy  # noqa: F401
+
+    _HAS_CDIST = _HAS_RAPIDFUZZ
+except ImportError:
+    _HAS_CDIST = False
 
-_pinyin_cache: Dict[str, str] = {}
-_pinyin_token_cache: Dict[str, str] = {}
+# 候选少于此数时逐对打分, 省去 cdist 的调用开销
+_CDIST_MIN = 32
+# 缓存的别名表索引数
+_MAX_INDEXES = 8
 
 
+@lru_cache(maxsize=4096)
 def _to_pinyin(s: str) -> str:
-    """中文转无声调拼音串(无空格)，非中文小写保留。命中缓存后直接返回。"""
-    if s in _pinyin_cache:
-        return _pinyin_cache[s]
+    """中文转无声调拼音串(无空格)，非中文小写保留。"""
     if _HAS_PYPINYIN:
-        result = "".join(lazy_pinyin(s, style=Style.NORMAL)).lower()
-    else:
-        result = s.lower()
-    _pinyin_cache[s] = result
-    return result
+        return "".join(lazy_pinyin(s, style=Style.NORMAL)).lower()
+    return s.lower()
 
 
+@lru_cache(maxsize=4096)
 def _to_pinyin_tokens(s: str) -> str:
     """中文转无声调拼音, 音节间用空格分隔。"""
-    if s in _pinyin_token_cache:
-        return _pinyin_token_cache[s]
     if _HAS_PYPINYIN:
-        result = " ".join(lazy_pinyin(s, style=Style.NORMAL)).lower()
-    else:
-        result = s.lower()
-    _pinyin_token_cache[s] = result
-    return result
+        return " ".join(lazy_pinyin(s, style=Style.NORMAL)).lower()
+    return s.lower()
 
 
 def _ratio(a: str, b: str) -> float:
@@ -77,47 +84,135 @@ def _ratio(a: str, b: str) -> float:
     return difflib.SequenceMatcher(None, a, b).ratio()
 
 
-def _reorder_ratio(query: str, name: str, query_py_sorted: str, name_py_sorted: str) -> float:
-    """处理音节顺序颠倒 — 拼音 token 多重集重合率, 比字符级度量更严格。
-
-    无 pypinyin 时退化为整串拼音字母排序 ratio。
-    """
-    if not _HAS_PYPINYIN:
-        return _ratio(query_py_sorted, name_py_sorted)
-    qt = _to_pinyin_tokens(query).split()
-    nt = _to_pinyin_tokens(name).split()
-    if not qt or not nt:
-        return 0.0
-    overlap = sum((Counter(qt) & Counter(nt)).values())
-    return overlap / max(len(qt), len(nt))
-
-
-def _score_pair(query_norm: str, query_py: str, query_py_sorted: str, name: str) -> float:
-    """对比 query 和单个候选名，返回 [0,1] 分数。"""
-    n_lower = name.lower()
-    n_py = _to_pinyin(name)
-    n_py_sorted = "".join(sorted(n_py))
-
-    s = max(
-        _ratio(query_norm, n_lower),
-        _ratio(query_py, n_py),
-        _reorder_ratio(query_norm, name, query_py_sorted, n_py_sorted),
-    )
+def _ngrams(py: str, raw: str, tokens: List[str]) -> set:
+    """倒排表的键: 拼音相邻二元组、原文中的非 ASCII 单字、拼音音节,
+    以及排序后拼音的二元组 (对应音节 / 字母顺序颠倒的打分项)。"""
+    grams = {py[i : i + 2] for i in range(len(py) - 1)}
+    grams.update(ch for ch in raw if not ch.isascii() and not ch.isspace())
+    grams.update(f"t:{t}" for t in tokens)
+    py_sorted = "".join(sorted(py))
+    grams.update(f"s:{py_sorted[i : i + 2]}" for i in range(len(py_sorted) - 1))
+    return grams
+
+
+class _CandidateIndex:
+    """单张别名表 {规范名: [别名, ...]} 的预计算索引。"""
+
+    def __init__(self, candidates: Dict[str, List[str]]):
+        self.canonicals: List[str] = list(candidates)
+        # 以下按「名字条目」展开, owner 为所属规范名序号
+        self.owner: List[int] = []
+        self.lower: List[str] = []
+        self.py: List[str] = []
+        self.py_sorted: List[str] = []
+        self.tokens: List[Counter] = []
+        self.token_len: List[int] = []
+        self.postings: Dict[str, List[int]] = {}
+
+        for ci, (canonical, aliases) in enumerate(candidates.items()):
+            for name in (canonical, *aliases):
+                i = len(self.owner)
+                py = _to_pinyin(name)
+                tokens = _to_pinyin_tokens(name).split()
+                self.owner.append(ci)
+                self.lower.append(name.lower())
+                self.py.append(py)
+                self.py_sorted.append("".join(sorted(py)))
+                self.tokens.append(Counter(tokens))
+                self.token_len.append(len(tokens))
+                for gram in _ngrams(py, name, tokens):
+                    self.postings.setdefault(gram, []).append(i)
+
+    def shortlist(self, q_py: str, q_raw: str, q_tokens: List[str]) -> Sequence[int]:
+        """与查询至少共享一个 n-gram 的条目; 查询太短无 n-gram 时返回全部。"""
+        grams = _ngrams(q_py, q_raw, q_tokens)
+        if not grams:
+            return range(len(self.owner))
+        hit = set()
+        for gram in grams:
+            hit.update(self.postings.get(gram, ()))
+        return sorted(hit)
+
+
+_indexes: "OrderedDict[int, Tuple[Dict[str, List[str]], Tuple[int, int], _CandidateIndex]]" = OrderedDict()
+
+
+def _get_index(candidates: Dict[str, List[str]]) -> _CandidateIndex:
+    signature = (len(candidates), sum(len(v) for v in candidates.values()))
+    cached = _indexes.get(id(candidates))
+    if cached is not None and cached[0] is candidates and cached[1] == signature:
+        _indexes.move_to_end(id(candidates))
+        return cached[2]
+    index = _CandidateIndex(candidates)
+    _indexes[id(candidates)] = (candidates, signature, index)
+    while len(_indexes) > _MAX_INDEXES:
+        _indexes.popitem(last=False)
+    return index
+
+
+def _batch_ratio(query: str, choices: List[str], partial: bool = False) -> List[float]:
+    """query 与每个候选的相似度 [0,1]; 任一方为空记 0 (同 _ratio)。"""
+    if not query:
+        return [0.0] * len(choices)
+    if _HAS_CDIST and len(choices) >= _CDIST_MIN:
+        scorer = _rf_fuzz.partial_ratio if partial else _rf_fuzz.ratio
+        row = _rf_process.cdist([query], choices, scorer=scorer, workers=1)[0]
+        return [float(v) / 100.0 if c else 0.0 for v, c in zip(row, choices)]
+    if partial:
+        return [_rf_fuzz.partial_ratio(query, c) / 100.0 if c else 0.0 for c in choices]
+    return [_ratio(query, c) for c in choices]
+
+
+def _score_entries(
+    index: _CandidateIndex,
+    entries: Sequence[int],
+    q_lower: str,
+    q_py: str,
+    q_py_sorted: str,
+    q_tokens: Counter,
+    q_token_len: int,
+) -> List[float]:
+    """对一批名字条目打分, 规则同原逐对打分: 字面 / 拼音 / 音节重排取最大, 再加子串分。"""
+    scores = [
+        max(a, b)
+        for a, b in zip(
+            _batch_ratio(q_lower, [index.lower[i] for i in entries]),
+            _batch_ratio(q_py, [index.py[i] for i in entries]),
+        )
+    ]
+
+    # 音节顺序颠倒 — 拼音 token 多重集重合率; 无 pypinyin 时退化为整串拼音字母排序 ratio
+    if _HAS_PYPINYIN:
+        for k, i in enumerate(entries):
+            if q_token_len and index.token_len[i]:
+                overlap = sum((q_tokens & index.tokens[i]).values())
+                scores[k] = max(scores[k], overlap / max(q_token_len, index.token_len[i]))
+    else:
+        for k, r in enumerate(_batch_ratio(q_py_sorted, [index.py_sorted[i] for i in entries])):
+            scores[k] = max(scores[k], r)
 
     # 子串加分: 短拼音串 <3 字符时跳过, 避免短缩写产生大量噪声命中
-    if query_py and n_py:
-        short = min(len(query_py), len(n_py))
-        long_ = max(len(query_py), len(n_py))
-        if short >= 3:
-            if query_py in n_py or n_py in query_py:
-                s = max(s, 0.6 + 0.4 * short / long_)
-            elif _HAS_RAPIDFUZZ:
-                # 近子串: 用 partial_ratio 容许 typo / 漏字
-                pr = _rf_fuzz.partial_ratio(query_py, n_py) / 100.0
-                if pr >= 0.85:
-                    s = max(s, pr * (0.6 + 0.4 * short / long_))
-
-    return s
+    near: List[Tuple[int, float]] = []
+    for k, i in enumerate(entries):
+        n_py = index.py[i]
+        if not q_py or not n_py:
+            continue
+        short = min(len(q_py), len(n_py))
+        if short < 3:
+            continue
+        weight = 0.6 + 0.4 * short / max(len(q_py), len(n_py))
+        if q_py in n_py or n_py in q_py:
+            scores[k] = max(scores[k], weight)
+        elif _HAS_RAPIDFUZZ:
+            near.append((k, weight))
+
+    # 近子串: 用 partial_ratio 容许 typo / 漏字
+    if near:
+        partials = _batch_ratio(q_py, [index.py[entries[k]] for k, _ in near], partial=True)
+        for (k, weight), pr in zip(near, partials):
+            if pr >= 0.85:
+                scores[k] = max(scores[k], pr * weight)
+    return scores
 
 
 def fuzzy_suggest(
@@ -144,21 +239,22 @@ def fuzzy_suggest(
     q_lower = q.lower()
     q_py = _to_pinyin(q)
     q_py_sorted = "".join(sorted(q_py))
+    q_token_list = _to_pinyin_tokens(q).split()
+
+    index = _get_index(candidates)
+    entries = index.shortlist(q_py, q, q_token_list)
+    scores = _score_entries(
+        index, entries, q_lower, q_py, q_py_sorted, Counter(q_token_list), len(q_token_list)
+    )
+
+    best: Dict[int, float] = {}
+    for i, s in zip(entries, scores):
+        owner = index.owner[i]
+        if s > best.get(owner, 0.0):
+            best[owner] = s
 
-    scores: Dict[str, float] = {}
-    for canonical, aliases in candidates.items():
-        names: Iterable[str] = (canonical, *aliases)
-        best = 0.0
-        for name in names:
-            s = _score_pair(q_lower, q_py, q_py_sorted, name)
-            if s > best:
-                best = s
-                if best >= 0.99:
-                    break
-        if best >= min_score:
-            scores[canonical] = best
-
-    result = sorted(scores.items(), key=lambda x: -x[1])[:top_n]
+    ranked = sorted((ci for ci, s in best.items() if s >= min_score), key=lambda ci: (-best[ci], ci))
+    result = [(index.canonicals[ci], best[ci]) for ci in ranked[:top_n]]
     if result:
         detail = ", ".join(f"{n}:{s:.3f}" for n, s in result)
         logger.info(f"[鸣潮·fuzzy] {query!r} (py={q_py!r}) → {detail}")
@@ -37,6 +37,7 @@ from .resource.RESOURCE_PATH import (
     CUSTOM_MR_BG_PATH,
     CUSTOM_MR_CARD_PATH,
 )
+from .texture_cache import open_texture
 from ..wutheringwaves_config.wutheringwaves_config import ShowConfig
 
 ICON = Path(__file__).parent.parent.parent / "ICON.png"
@@ -151,12 +152,25 @@ def pil_to_b64(img: Image.Image, quality: int = 0) -> str:
     quality=0: PNG无损（默认）
     quality>0: WebP有损压缩（保留透明通道），推荐80
     """
+    data, ext = _pil_to_bytes(img, quality)
+    return f"data:image/{ext};base64," + base64.b64encode(data).decode('utf-8')
+
+
+def pil_to_url(img: Image.Image, quality: int = 0) -> str:
+    """同 pil_to_b64，但返回渲染资源地址（见 render_assets），HTML 不再内联图片。"""
+    from .render_assets import bytes_asset_url
+
+    data, ext = _pil_to_bytes(img, quality)
+    return bytes_asset_url(data, ext)
+
+
+def _pil_to_bytes(img: Image.Image, quality: int) -> Tuple[bytes, str]:
     buffered = BytesIO()
     if quality > 0:
         img.save(buffered, format="WEBP", quality=quality)
-        return "data:image/webp;base64," + base64.b64encode(buffered.getvalue()).decode('utf-8')
+        return buffered.getvalue(), "webp"
     img.save(buffered, format="PNG")
-    return "data:image/png;base64," + base64.b64encode(buffered.getvalue()).decode('utf-8')
+    return buffered.getvalue(), "png"
 
 
 def img_to_b64(path: Union[str, Path], quality: int = 0, bake: bool = False,
@@ -168,11 +182,38 @@ def img_to_b64(path: Union[str, Path], quality: int = 0, bake: bool = False,
     bake=True + quality>0: 烘焙缓存，命中时跳过PIL，直接读文件
     cover_size: (w, h) 模拟 object-fit:cover 居中裁切到指定尺寸
     """
-    from .resource.RESOURCE_PATH import BAKE_PATH
+    path = Path(path) if not isinstance(path, Path) else path
+    if not path.exists():
+        return ""
+    src, ext = _load_img_asset(path, quality, bake, cover_size)
+    if isinstance(src, Path):
+        with open(src, "rb") as f:
+            src = f.read()
+    return f"data:image/{ext};base64,{base64.b64encode(src).decode('utf-8')}"
+
+
+def img_to_url(path: Union[str, Path], quality: int = 0, bake: bool = False,
+               cover_size: Optional[Tuple[int, int]] = None) -> str:
+    """同 img_to_b64，但返回渲染资源地址；原图 / 烘焙命中时不读文件内容。"""
+    from .render_assets import file_asset_url, bytes_asset_url
 
     path = Path(path) if not isinstance(path, Path) else path
     if not path.exists():
         return ""
+    src, ext = _load_img_asset(path, quality, bake, cover_size)
+    if isinstance(src, Path):
+        return file_asset_url(src)
+    return bytes_asset_url(src, ext)
+
+
+def _load_img_asset(
+    path: Path,
+    quality: int,
+    bake: bool,
+    cover_size: Optional[Tuple[int, int]],
+) -> Tuple[Union[Path, bytes], str]:
+    """按 img_to_b64 的参数取图片内容：返回 (可直接使用的文件 或 编码后的字节, 扩展名)。"""
+    from .resource.RESOURCE_PATH import BAKE_PATH
 
     size_tag = f"_{cover_size[0]}x{cover_size[1]}" if cover_size else ""
 
@@ -187,14 +228,12 @@ def img_to_b64(path: Union[str, Path], quality: int = 0, bake: bool = False,
         top = (new_h - th) // 2
         return img.crop((left, top, left + tw, top + th))
 
-    # 烘焙命中：直接读 bake 文件，不打开 PIL
+    # 烘焙命中：直接用 bake 文件，不打开 PIL
     if bake and quality > 0:
-        import hashlib
         path_hash = hashlib.md5(str(path.resolve()).encode()).hexdigest()[:8]
         bake_path = BAKE_PATH / f"{path.stem}_{path_hash}_q{quality}{size_tag}.webp"
         if bake_path.exists() and bake_path.stat().st_mtime >= path.stat().st_mtime:
-            with open(bake_path, "rb") as f:
-                return "data:image/webp;base64," + base64.b64encode(f.read()).decode('utf-8')
+            return bake_path, "webp"
         # 未命中：PIL 打开 → WebP → 写入烘焙
         img = _apply_cover(Image.open(path).convert("RGBA"))
         buffered = BytesIO()
@@ -204,21 +243,20 @@ def img_to_b64(path: Union[str, Path], quality: int = 0, bake: bool = False,
             bake_path.write_bytes(data)
         except Exception:
             pass
-        return "data:image/webp;base64," + base64.b64encode(data).decode('utf-8')
+        return data, "webp"
 
     # 不烘焙
     if quality > 0:
         img = _apply_cover(Image.open(path).convert("RGBA"))
         buffered = BytesIO()
         img.save(buffered, format="WEBP", quality=quality)
-        return "data:image/webp;base64," + base64.b64encode(buffered.getvalue()).decode('utf-8')
+        return buffered.getvalue(), "webp"
 
     # quality=0: 原格式直读（不支持 cover_size）
     ext = path.suffix.lstrip(".").lower()
     if ext == "jpg":
         ext = "jpeg"
-    with open(path, "rb") as f:
-        return f"data:image/{ext};base64,{base64.b64encode(f.read()).decode('utf-8')}"
+    return path, ext
 
 
 ELEMENT_COLOR_MAP = {
@@ -538,7 +576,7 @@ def get_square_avatar_path(resource_id: Union[int, str]) -> Path:
 
 
 async def get_square_avatar(resource_id: Union[int, str]) -> Image.Image:
-    return Image.open(get_square_avatar_path(resource_id)).convert("RGBA")
+    return open_texture(get_square_avatar_path(resource_id))
 
 
 async def cropped_square_avatar(item_icon: Image.Image, size: int) -> Image.Image:
@@ -573,7 +611,7 @@ def get_square_weapon_path(resource_id: Union[int, str]) -> Path:
 
 
 async def get_square_weapon(resource_id: Union[int, str]) -> Image.Image:
-    return Image.open(get_square_weapon_path(resource_id)).convert("RGBA")
+    return open_texture(get_square_weapon_path(resource_id))
 
 
 async def get_attribute(name: str = "", is_simple: bool = False) -> Image.Image:
@@ -584,14 +622,14 @@ async def get_attribute(name: str = "", is_simple: bool = False) -> Image.Image:
     path = TEXT_PATH / name
     if not path.exists():
         return Image.new("RGBA", (100, 100), (0, 0, 0, 0))
-    return Image.open(path).convert("RGBA")
+    return open_texture(path)
 
 
 async def get_attribute_prop(name: str = "") -> Image.Image:
     if (TEXT_PATH / "attribute_prop" / f"attr_prop_{name}.png").exists():
-        return Image.open(TEXT_PATH / "attribute_prop" / f"attr_prop_{name}.png").convert("RGBA")
+        return open_texture(TEXT_PATH / "attribute_prop" / f"attr_prop_{name}.png")
     else:
-        return Image.open(TEXT_PATH / "attribute_prop" / "attr_prop_攻击.png").convert("RGBA")
+        return open_texture(TEXT_PATH / "attribute_prop" / "attr_prop_攻击.png")
 
 async def get_attribute_skill(name: str = "", locale: Optional[str] = None) -> Image.Image:
     if not name:
@@ -677,9 +715,9 @@ def get_skill_branch_emblem_b64(
 
 async def get_attribute_effect(name: str = "") -> Image.Image:
     if (TEXT_PATH / "attribute_effect" / f"attr_{name}.png").exists():
-        return Image.open(TEXT_PATH / "attribute_effect" / f"attr_{name}.png").convert("RGBA")
+        return open_texture(TEXT_PATH / "attribute_effect" / f"attr_{name}.png")
     else:
-        return Image.open(TEXT_PATH / "attribute_effect" / "attr.png").convert("RGBA")
+        return open_texture(TEXT_PATH / "attribute_effect" / "attr.png")
 
 
 def get_sonata_label(sonata_name: str) -> str:
@@ -706,11 +744,11 @@ async def get_weapon_type(name: str = "") -> Image.Image:  # 出新武器改这
     path = TEXT_PATH / f"weapon_type/weapon_type_{name}.png"
     if not path.exists():
         return Image.new("RGBA", (100, 100), (0, 0, 0, 0))
-    return Image.open(path).convert("RGBA")
+    return open_texture(path)
 
 
 def get_waves_bg(w: int = 0, h: int = 0, bg: str = "bg", crop: bool = True) -> Image.Image:
-    img = Image.open(TEXT_PATH / f"{bg}.jpg").convert("RGBA")
+    img = open_texture(TEXT_PATH / f"{bg}.jpg")
     return crop_center_img(img, w, h) if crop else img
 
 
@@ -1,5 +1,5 @@
 import json
-from typing import Dict, List, Optional
+from typing import Dict, List, Tuple, Iterable, Optional, FrozenSet
 
 from msgspec import json as msgjson
 
@@ -37,6 +37,9 @@ _echo_i18n_reverse: Dict[str, str] = {}
 
 _data_loaded = False
 
+# 子串索引只展开不超过此长度的串, 更长的 (少见的长别名) 仍线性扫描, 控制内存
+_MAX_EXPAND_LEN = 24
+
 
 def _normalize(name: str) -> str:
     """归一化名称: 小写并去除空格"""
@@ -72,7 +75,7 @@ def add_dictionaries(dict1, dict2):
     return {key: list(set(dict1.get(key, []) + dict2.get(key, []))) for key in all_keys}
 
 
-def load_alias_data():
+def load_alias_data(rebuild_index: bool = True):
     global char_alias_data, weapon_alias_data, sonata_alias_data, echo_alias_data
     if CHAR_ALIAS.exists():
         with open(CHAR_ALIAS, "r", encoding="UTF-8") as f:
@@ -146,6 +149,10 @@ def load_alias_data():
     with open(CUSTOM_ECHO_ALIAS_PATH, "w", encoding="UTF-8") as f:
         f.write(json.dumps(echo_alias_data, indent=2, ensure_ascii=False))
 
+    # 自定义别名增删后由调用方重新 load, 索引随之整体替换
+    if rebuild_index:
+        _rebuild_index()
+
 
 def ensure_data_loaded(force: bool = False):
     """确保所有数据已加载
@@ -159,7 +166,7 @@ def ensure_data_loaded(force: bool = False):
     if _data_loaded and not force:
         return
 
-    load_alias_data()
+    load_alias_data(rebuild_index=False)
 
     # 加载 i18n 反向查找表
     _char_i18n_reverse = _build_i18n_reverse(LOCALIZATION_PATH / "char_i18n.json")
@@ -228,60 +235,159 @@ def ensure_data_loaded(force: bool = False):
     with open(CUSTOM_ID2NAME_PATH, "w", encoding="UTF-8") as f:
         f.write(json.dumps(id2name, indent=2, ensure_ascii=False))
 
+    _rebuild_index()
     _data_loaded = True
 
 
-def alias_to_char_name(char_name: str) -> str:
+class _SubstringIndex:
+    """「查询串是哪些候选串的子串」→ 最靠前的候选序号。
+
+    候选 (名字 / 别名) 都很短, 预先展开全部子串, 查询即一次哈希;
+    超过 ``_MAX_EXPAND_LEN`` 的候选按序号顺序线性兜底。items 需按序号递增给出。
+    """
+
+    __slots__ = ("_first", "_long")
+
+    def __init__(self, items: Iterable[Tuple[int, str]]):
+        first: Dict[str, int] = {}
+        long_items: List[Tuple[int, str]] = []
+        for order, text in items:
+            # 空串是任何串的子串
+            first.setdefault("", order)
+            if len(text) > _MAX_EXPAND_LEN:
+                long_items.append((order, text))
+                continue
+            for i in range(len(text)):
+                for j in range(i + 1, len(text) + 1):
+                    first.setdefault(text[i:j], order)
+        self._first = first
+        self._long = tuple(long_items)
+
+    def first(self, query: str) -> Optional[int]:
+        best = self._first.get(query)
+        for order, text in self._long:
+            if best is not None and order >= best:
+                break
+            if query in text:
+                return order
+        return best
+
+
+def _min_order(*orders: Optional[int]) -> Optional[int]:
+    found = [o for o in orders if o is not None]
+    return min(found) if found else None
+
+
+class _ResolverIndex:
+    """名称解析索引, 每次加载数据后整体构建、只读, 替换时一次赋值。
+
+    各查找与原先按字典顺序逐项扫描的规则等价: 序号即别名字典中的顺序,
+    多个条目命中时取序号最小者。
+    """
+
+    def __init__(self):
+        self.char_keys: List[str] = list(char_alias_data)
+        self.char_aliases: List[List[str]] = list(char_alias_data.values())
+        # 角色: 先精确 (名字或别名), 再名字子串
+        self.char_exact: Dict[str, int] = {}
+        for order, (key, aliases) in enumerate(char_alias_data.items()):
+            self.char_exact.setdefault(key, order)
+            for alias in aliases:
+                self.char_exact.setdefault(alias, order)
+        self.char_substr = _SubstringIndex(enumerate(self.char_keys))
+        self.char_names: FrozenSet[str] = frozenset(self.char_exact)
+
+        # 武器: 名字子串或别名精确, 逐项判断取最靠前
+        self.weapon_keys: List[str] = list(weapon_alias_data)
+        self.weapon_alias_exact: Dict[str, int] = {}
+        for order, aliases in enumerate(weapon_alias_data.values()):
+            for alias in aliases:
+                self.weapon_alias_exact.setdefault(alias, order)
+        self.weapon_substr = _SubstringIndex(enumerate(self.weapon_keys))
+
+        # 声骸: 名字 / 非空别名子串, 或别名精确
+        self.echo_keys: List[str] = list(echo_alias_data)
+        self.echo_alias_exact: Dict[str, int] = {}
+        echo_items: List[Tuple[int, str]] = []
+        for order, (key, aliases) in enumerate(echo_alias_data.items()):
+            echo_items.append((order, key))
+            for alias in aliases:
+                self.echo_alias_exact.setdefault(alias, order)
+                if alias:
+                    echo_items.append((order, alias))
+        self.echo_substr = _SubstringIndex(echo_items)
+
+        # 合鸣: 去掉末尾「套」后的名字 / 别名子串
+        self.sonata_keys: List[str] = list(sonata_alias_data)
+        self.sonata_substr = _SubstringIndex(
+            (order, text.rstrip("套"))
+            for order, (key, aliases) in enumerate(sonata_alias_data.items())
+            for text in [key, *aliases]
+        )
+
+        # 名字 → id, 同名取 id2name 中最靠前的
+        self.name2id: Dict[str, str] = {}
+        for _id, name in id2name.items():
+            self.name2id.setdefault(name, _id)
+
+        self.char_i18n = _char_i18n_reverse
+        self.weapon_i18n = _weapon_i18n_reverse
+        self.echo_i18n = _echo_i18n_reverse
+
+    def match_char(self, char_name: str) -> Tuple[Optional[int], str]:
+        """返回 (命中的角色序号, i18n 转换后的名字)。"""
+        chs = _i18n_to_chs(char_name, self.char_i18n)
+        if chs:
+            char_name = chs
+        order = self.char_exact.get(char_name)
+        if order is None:
+            order = self.char_substr.first(char_name)
+        return order, char_name
+
+    def match_weapon(self, weapon_name: str) -> Optional[int]:
+        return _min_order(self.weapon_substr.first(weapon_name), self.weapon_alias_exact.get(weapon_name))
+
+    def match_echo(self, echo_name: str) -> Optional[int]:
+        return _min_order(self.echo_substr.first(echo_name), self.echo_alias_exact.get(echo_name))
+
+
+_index: Optional[_ResolverIndex] = None
+
+
+def _rebuild_index():
+    global _index
+    _index = _ResolverIndex()
+
+
+def _get_index() -> _ResolverIndex:
     ensure_data_loaded()
-    # 先尝试 i18n 反向查找（忽略大小写和空格）
-    chs = _i18n_to_chs(char_name, _char_i18n_reverse)
-    if chs:
-        char_name = chs
-    for key, aliases in char_alias_data.items():
-        if char_name == key or char_name in aliases:
-            return key
-    for i in char_alias_data:
-        if (char_name in i) or (char_name in char_alias_data[i]):
-            return i
-    return char_name
+    if _index is None:
+        _rebuild_index()
+    return _index  # type: ignore[return-value]
+
+
+def alias_to_char_name(char_name: str) -> str:
+    index = _get_index()
+    order, char_name = index.match_char(char_name)
+    return char_name if order is None else index.char_keys[order]
 
 
 def is_valid_char_name(char_name: str) -> bool:
-    ensure_data_loaded()
-    all_names = set(char_alias_data.keys()) | {alias for aliases in char_alias_data.values() for alias in aliases}
-    return char_name in sorted(all_names, key=len, reverse=True)
+    return char_name in _get_index().char_names
 
 
 def alias_to_char_name_optional(char_name: Optional[str]) -> Optional[str]:
-    ensure_data_loaded()
+    index = _get_index()
     if not char_name:
         return None
-    # 先尝试 i18n 反向查找（忽略大小写和空格）
-    chs = _i18n_to_chs(char_name, _char_i18n_reverse)
-    if chs:
-        char_name = chs
-    for key, aliases in char_alias_data.items():
-        if char_name == key or char_name in aliases:
-            return key
-    for i in char_alias_data:
-        if (char_name in i) or (char_name in char_alias_data[i]):
-            return i
-    return None
+    order, _ = index.match_char(char_name)
+    return None if order is None else index.char_keys[order]
 
 
 def alias_to_char_name_list(char_name: str) -> List[str]:
-    ensure_data_loaded()
-    # 先尝试 i18n 反向查找（忽略大小写和空格）
-    chs = _i18n_to_chs(char_name, _char_i18n_reverse)
-    if chs:
-        char_name = chs
-    for key, aliases in char_alias_data.items():
-        if char_name == key or char_name in aliases:
-            return aliases
-    for i in char_alias_data:
-        if (char_name in i) or (char_name in char_alias_data[i]):
-            return char_alias_data[i]
-    return []
+    index = _get_index()
+    order, _ = index.match_char(char_name)
+    return [] if order is None else index.char_aliases[order]
 
 
 def char_id_to_char_name(char_id: str) -> Optional[str]:
@@ -294,94 +400,64 @@ def char_id_to_char_name(char_id: str) -> Optional[str]:
 
 
 def char_name_to_char_id(char_name: str) -> Optional[str]:
-    ensure_data_loaded()
-    char_name = alias_to_char_name(char_name)
-    for id, name in id2name.items():
-        if char_name == name:
-            from .resource.constant import SPECIAL_CHAR_RANK_MAP
-            mapped_id = SPECIAL_CHAR_RANK_MAP.get(id, id)
-            return mapped_id
-    else:
+    index = _get_index()
+    char_id = index.name2id.get(alias_to_char_name(char_name))
+    if char_id is None:
         return None
+    from .resource.constant import SPECIAL_CHAR_RANK_MAP
+
+    return SPECIAL_CHAR_RANK_MAP.get(char_id, char_id)
 
 
 def alias_to_weapon_name(weapon_name: str) -> str:
-    ensure_data_loaded()
+    index = _get_index()
     # 先尝试 i18n 反向查找（忽略大小写和空格）
-    chs = _i18n_to_chs(weapon_name, _weapon_i18n_reverse)
+    chs = _i18n_to_chs(weapon_name, index.weapon_i18n)
     if chs:
         weapon_name = chs
-    for i in weapon_alias_data:
-        if (weapon_name in i) or (weapon_name in weapon_alias_data[i]):
-            return i
+    order = index.match_weapon(weapon_name)
+    if order is not None:
+        return index.weapon_keys[order]
 
     if "专武" in weapon_name:
         char_name = weapon_name.replace("专武", "")
         name = alias_to_char_name(char_name)
         weapon_name = f"{name}专武"
 
-    for i in weapon_alias_data:
-        if (weapon_name in i) or (weapon_name in weapon_alias_data[i]):
-            return i
+    order = index.match_weapon(weapon_name)
+    if order is not None:
+        return index.weapon_keys[order]
 
     return weapon_name
 
 
 def weapon_name_to_weapon_id(weapon_name: str) -> Optional[str]:
-    ensure_data_loaded()
-    weapon_name = alias_to_weapon_name(weapon_name)
-    for id, name in id2name.items():
-        if weapon_name == name:
-            return id
-    else:
-        return None
+    index = _get_index()
+    return index.name2id.get(alias_to_weapon_name(weapon_name))
 
 
 def alias_to_sonata_name(sonata_name: str | None) -> str | None:
-    ensure_data_loaded()
+    index = _get_index()
     if sonata_name is None:
         return None
-    # Remove "套" character to make it optional
-    normalized_sonata_name = sonata_name.rstrip('套')
-    for i in sonata_alias_data:
-        # Check if normalized input matches the key (with "套" stripped)
-        normalized_key = i.rstrip('套')
-        if normalized_sonata_name in normalized_key:
-            return i
-        # Check if normalized input matches any alias (with "套" stripped)
-        for alias in sonata_alias_data[i]:
-            if normalized_sonata_name in alias.rstrip('套'):
-                return i
-    return None
+    # 「套」可省略: 输入与名字 / 别名都去掉末尾的「套」再比较
+    order = index.sonata_substr.first(sonata_name.rstrip("套"))
+    return None if order is None else index.sonata_keys[order]
 
 
 def alias_to_echo_name(echo_name: str) -> str:
-    ensure_data_loaded()
+    index = _get_index()
     # 先尝试 i18n 反向查找（忽略大小写和空格）
-    chs = _i18n_to_chs(echo_name, _echo_i18n_reverse)
+    chs = _i18n_to_chs(echo_name, index.echo_i18n)
     if chs:
         echo_name = chs
-    for i, j in echo_alias_data.items():
-        if echo_name == i:
-            return i
-        if echo_name in j:
-            return i
-        for k in j:
-            if k and echo_name in k:
-                return i
-        if echo_name in i:
-            return i
-    return echo_name
+    order = index.match_echo(echo_name)
+    return echo_name if order is None else index.echo_keys[order]
 
 
 def echo_name_to_echo_id(echo_name: str) -> Optional[str]:
-    ensure_data_loaded()
-    echo_name = alias_to_echo_name(echo_name)
-    for id, name in id2name.items():
-        if echo_name == name:
-            return id
-    else:
-        return None
+    index = _get_index()
+    return index.name2id.get(alias_to_echo_name(echo_name))
 
 
 def easy_id_to_name(id: str, default: str = "") -> str:
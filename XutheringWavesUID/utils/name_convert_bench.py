@@ -0,0 +1,159 @@
+"""name_convert 解析索引的对照基准。
+
+用当前资源数据生成查询 (全部名字、别名、别名子串、i18n 名、未命中串), 逐个比对
+索引实现与原线性扫描实现的结果, 再分别计时。在 gsuid_core 环境下运行:
+
+    python -m XutheringWavesUID.utils.name_convert_bench [轮数]
+"""
+import sys
+import time
+import random
+from typing import Any, Dict, List, Callable, Optional
+
+from . import name_convert as nc
+
+
+def _legacy_alias_to_char_name(char_name: str) -> str:
+    chs = nc._i18n_to_chs(char_name, nc._char_i18n_reverse)
+    if chs:
+        char_name = chs
+    for key, aliases in nc.char_alias_data.items():
+        if char_name == key or char_name in aliases:
+            return key
+    for i in nc.char_alias_data:
+        if (char_name in i) or (char_name in nc.char_alias_data[i]):
+            return i
+    return char_name
+
+
+def _legacy_is_valid_char_name(char_name: str) -> bool:
+    all_names = set(nc.char_alias_data.keys()) | {
+        alias for aliases in nc.char_alias_data.values() for alias in aliases
+    }
+    return char_name in sorted(all_names, key=len, reverse=True)
+
+
+def _legacy_char_name_to_char_id(char_name: str) -> Optional[str]:
+    from .resource.constant import SPECIAL_CHAR_RANK_MAP
+
+    char_name = _legacy_alias_to_char_name(char_name)
+    for _id, name in nc.id2name.items():
+        if char_name == name:
+            return SPECIAL_CHAR_RANK_MAP.get(_id, _id)
+    return None
+
+
+def _legacy_alias_to_weapon_name(weapon_name: str) -> str:
+    chs = nc._i18n_to_chs(weapon_name, nc._weapon_i18n_reverse)
+    if chs:
+        weapon_name = chs
+    for i in nc.weapon_alias_data:
+        if (weapon_name in i) or (weapon_name in nc.weapon_alias_data[i]):
+            return i
+    if "专武" in weapon_name:
+        name = _legacy_alias_to_char_name(weapon_name.replace("专武", ""))
+        weapon_name = f"{name}专武"
+    for i in nc.weapon_alias_data:
+        if (weapon_name in i) or (weapon_name in nc.weapon_alias_data[i]):
+            return i
+    return weapon_name
+
+
+def _legacy_weapon_name_to_weapon_id(weapon_name: str) -> Optional[str]:
+    weapon_name = _legacy_alias_to_weapon_name(weapon_name)
+    for _id, name in nc.id2name.items():
+        if weapon_name == name:
+            return _id
+    return None
+
+
+def _legacy_alias_to_sonata_name(sonata_name: Optional[str]) -> Optional[str]:
+    if sonata_name is None:
+        return None
+    normalized = sonata_name.rstrip("套")
+    for i in nc.sonata_alias_data:
+        if normalized in i.rstrip("套"):
+            return i
+        for alias in nc.sonata_alias_data[i]:
+            if normalized in alias.rstrip("套"):
+                return i
+    return None
+
+
+def _legacy_alias_to_echo_name(echo_name: str) -> str:
+    chs = nc._i18n_to_chs(echo_name, nc._echo_i18n_reverse)
+    if chs:
+        echo_name = chs
+    for i, j in nc.echo_alias_data.items():
+        if echo_name == i or echo_name in j:
+            return i
+        for k in j:
+            if k and echo_name in k:
+                return i
+        if echo_name in i:
+            return i
+    return echo_name
+
+
+def _queries(data: Dict[str, List[str]], i18n: Dict[str, str], rng: random.Random) -> List[str]:
+    names = [n for key, aliases in data.items() for n in (key, *aliases)]
+    queries = list(names)
+    for name in names:
+        if len(name) > 1:
+            i = rng.randrange(len(name))
+            queries.append(name[i : rng.randrange(i + 1, len(name) + 1)])
+    queries.extend(list(i18n)[:200])
+    queries.extend(["", "不存在的名字", "xyz", "专武", "长离专武", "套"])
+    return queries
+
+
+def _bench(fn: Callable[[str], Any], queries: List[str], rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for q in queries:
+            fn(q)
+    return time.perf_counter() - start
+
+
+def run(rounds: int = 20) -> bool:
+    nc.ensure_data_loaded()
+    rng = random.Random(0)
+    char_q = _queries(nc.char_alias_data, nc._char_i18n_reverse, rng)
+    weapon_q = _queries(nc.weapon_alias_data, nc._weapon_i18n_reverse, rng)
+    weapon_q += [f"{q}专武" for q in char_q[:100]]
+    echo_q = _queries(nc.echo_alias_data, nc._echo_i18n_reverse, rng)
+    sonata_q = _queries(nc.sonata_alias_data, {}, rng)
+    sonata_q += [f"{q}套" for q in sonata_q[:100]]
+
+    cases = [
+        ("alias_to_char_name", nc.alias_to_char_name, _legacy_alias_to_char_name, char_q),
+        ("is_valid_char_name", nc.is_valid_char_name, _legacy_is_valid_char_name, char_q),
+        ("char_name_to_char_id", nc.char_name_to_char_id, _legacy_char_name_to_char_id, char_q),
+        ("alias_to_weapon_name", nc.alias_to_weapon_name, _legacy_alias_to_weapon_name, weapon_q),
+        ("weapon_name_to_weapon_id", nc.weapon_name_to_weapon_id, _legacy_weapon_name_to_weapon_id, weapon_q),
+        ("alias_to_sonata_name", nc.alias_to_sonata_name, _legacy_alias_to_sonata_name, sonata_q),
+        ("alias_to_echo_name", nc.alias_to_echo_name, _legacy_alias_to_echo_name, echo_q),
+    ]
+
+    start = time.perf_counter()
+    nc._rebuild_index()
+    print(f"索引构建: {(time.perf_counter() - start) * 1000:.1f}ms")
+
+    ok = True
+    for name, new_fn, old_fn, queries in cases:
+        diff = [q for q in queries if new_fn(q) != old_fn(q)]
+        if diff:
+            ok = False
+            print(f"[不一致] {name}: {len(diff)} 个, 例如 {diff[:5]}")
+        t_new = _bench(new_fn, queries, rounds)
+        t_old = _bench(old_fn, queries, rounds)
+        n = len(queries) * rounds
+        print(
+            f"{name:<26} 查询 {n:>7}  线性扫描 {t_old / n * 1e6:8.2f}us  "
+            f"索引 {t_new / n * 1e6:6.2f}us  x{t_old / max(t_new, 1e-9):.1f}"
+        )
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if run(int(sys.argv[1]) if len(sys.argv) > 1 else 20) else 1)
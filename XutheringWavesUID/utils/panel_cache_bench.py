@@ -0,0 +1,45 @@
+"""面板解析缓存的对照基准。
+
+对指定 uid 的 rawData 分别计时: 读盘 + 校验解析 (未命中)、缓存命中、以及命中后逐个
+deep copy (旧出口做法), 单位为每次取整份角色列表。在 gsuid_core 环境下运行:
+
+    python -m XutheringWavesUID.utils.panel_cache_bench <uid> [轮数]
+"""
+import sys
+import time
+from typing import Callable
+
+from .resource.RESOURCE_PATH import PLAYER_PATH
+from .player_store import read_player_json_sync
+from .char_info_utils import panel_cache, _parse_raw_data, _load_cached_sync
+
+
+def _timeit(fn: Callable[[], object], rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - start) / rounds
+
+
+def run(uid: str, rounds: int = 200) -> None:
+    def parse():
+        return _parse_raw_data(read_player_json_sync(PLAYER_PATH / uid / "rawData.json"))
+
+    def hit():
+        return _load_cached_sync(uid, "rawData.json", _parse_raw_data)
+
+    def hit_deep_copy():
+        return [r.model_copy(deep=True) for r in hit()]
+
+    roles = parse()
+    panel_cache.clear()
+    if hit() is None:
+        print(f"uid {uid} 没有 rawData 或 PanelCacheSize 为 0")
+        return
+    print(f"uid {uid} 角色数 {len(roles)}")
+    for label, fn in (("读盘+解析", parse), ("缓存命中", hit), ("命中+deep copy", hit_deep_copy)):
+        print(f"{label:<14} {_timeit(fn, rounds) * 1e3:10.3f} ms/次")
+
+
+if __name__ == "__main__":
+    run(sys.argv[1], *[int(a) for a in sys.argv[2:3]])
@@ -1,13 +1,19 @@
 import os
 import gzip
 import json
+import zlib
 import asyncio
+import sqlite3
 import itertools
 from pathlib import Path
-from typing import Any, Optional, Union
+from datetime import datetime
+from contextlib import closing
+from typing import Any, Dict, List, Callable, Iterable, Optional, Union
 
 from gsuid_core.logger import logger
 
+from . import sidecar_store
+
 _GZIP_NAMES = {
     "rawData.json",
     "rover.json",
@@ -17,20 +23,395 @@ _GZIP_NAMES = {
     "slashData.json",
 }
 
+# 按角色分条存储: 逻辑文件名 → sqlite 容器 (每个 roleId 一行 zlib 压缩 JSON, 主键即索引)。
+# 单角色读写只触及对应行; 旧 .gz / 明文在首次写入或【压缩数据】时迁移。
+_ROLE_STORE_NAMES = {
+    "rawData.json": "rawData.db",
+}
+
+# 按卡池分段存储: 逻辑文件名 → sqlite 容器。每个卡池的记录 (新→旧) 切成若干段,
+# 新拉到的记录只追加一段, 旧段不动; 读取时按段号倒序拼回完整 JSON, 与 .gz 格式一致。
+# 容器内的 checkpoints 只记录写入前各池条数, 追加写下可据此还原写入前的完整内容。
+_SEGMENT_STORE_NAMES = {
+    "gacha_logs.json": "gacha_logs.db",
+}
+_SEGMENT_STORE_FILES = set(_SEGMENT_STORE_NAMES.values())
+# 单池段数超过上限时合并为一段, 避免长期追加后读取需要拼接过多小段
+_MAX_POOL_SEGMENTS = 64
+_SEGMENT_DATA_KEY = "data"
+
+# baseInfo.json / charListData.json 等小文件存进 uid 目录下的 sidecar.db (见 sidecar_store)
+_SIDECAR_DOC_NAMES = sidecar_store.DOC_NAMES
+
 PathLike = Union[str, Path]
 _tmp_counter = itertools.count()
+# 落盘回调 (如面板解析缓存失效), 参数为逻辑路径 (不带 .gz)
+_write_listeners: List[Callable[[Path], None]] = []
+
+
+def add_write_listener(func: Callable[[Path], None]) -> None:
+    if func not in _write_listeners:
+        _write_listeners.append(func)
+
+
+def _notify_write(p: Path) -> None:
+    for func in _write_listeners:
+        try:
+            func(p)
+        except Exception as e:
+            logger.warning(f"[鸣潮·player_store] 落盘回调失败 {p}: {e}")
 
 
 def _is_gzip(name: str) -> bool:
     return name in _GZIP_NAMES
 
 
+def _role_store_path(p: Path) -> Optional[Path]:
+    name = _ROLE_STORE_NAMES.get(p.name)
+    return p.with_name(name) if name else None
+
+
+def _segment_store_path(p: Path) -> Optional[Path]:
+    name = _SEGMENT_STORE_NAMES.get(p.name)
+    return p.with_name(name) if name else None
+
+
 def _load(p: Path) -> Any:
+    if p.name in _SEGMENT_STORE_FILES:
+        return _load_segment_store(p)
+    if p.suffix == ".db":
+        return _load_role_store(p)
     opener = gzip.open if p.suffix == ".gz" else open
     with opener(p, "rt", encoding="utf-8") as f:
         return json.load(f)
 
 
+def _candidates(p: Path) -> List[Path]:
+    """存在的落盘候选, 按优先级: 角色容器 > .gz > 明文。"""
+    cands = []
+    db = _role_store_path(p) or _segment_store_path(p)
+    if db is not None and db.exists():
+        cands.append(db)
+    if _is_gzip(p.name):
+        gp = p.with_name(p.name + ".gz")
+        if gp.exists():
+            cands.append(gp)
+    if p.exists():
+        cands.append(p)
+    return cands
+
+
+def _legacy_paths(p: Path) -> List[Path]:
+    return [p.with_name(p.name + ".gz"), p]
+
+
+# ─── 角色容器 (sqlite) ───────────────────────────────────────────────
+
+
+def _pack(obj: Any) -> bytes:
+    return zlib.compress(json.dumps(obj, ensure_ascii=False).encode("utf-8"), 6)
+
+
+def _unpack(data: bytes) -> Any:
+    return json.loads(zlib.decompress(data).decode("utf-8"))
+
+
+def _role_id_of(item: Dict) -> int:
+    return int(item["role"]["roleId"])
+
+
+def _open_role_store_ro(db: Path) -> sqlite3.Connection:
+    return sqlite3.connect(f"file:{db}?mode=ro", uri=True, timeout=5.0)
+
+
+def _open_role_store_rw(db: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(str(db), timeout=5.0)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS roles ("
+        "role_id INTEGER PRIMARY KEY, ord INTEGER NOT NULL, data BLOB NOT NULL)"
+    )
+    return conn
+
+
+def _load_role_store(db: Path, role_ids: Optional[Iterable[int]] = None) -> Any:
+    """role_ids 为 None 读全部 (按写入顺序的 list), 否则返回 {roleId: item}。"""
+    with closing(_open_role_store_ro(db)) as conn:
+        if role_ids is None:
+            rows = conn.execute("SELECT data FROM roles ORDER BY ord").fetchall()
+            return [_unpack(r[0]) for r in rows]
+        ids = [int(i) for i in role_ids]
+        if not ids:
+            return {}
+        marks = ",".join("?" * len(ids))
+        rows = conn.execute(
+            f"SELECT role_id, data FROM roles WHERE role_id IN ({marks})", ids
+        ).fetchall()
+        return {int(rid): _unpack(data) for rid, data in rows}
+
+
+def _create_role_store(db: Path, items: List[Dict]) -> None:
+    """新建容器: 先写临时库再原子替换, 中途失败不会留下半成品。"""
+    tmp = db.with_name(f"{db.name}.{os.getpid()}.{next(_tmp_counter)}.tmp")
+    try:
+        with closing(_open_role_store_rw(tmp)) as conn:
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO roles (role_id, ord, data) VALUES (?, ?, ?)",
+                    [(_role_id_of(it), i, _pack(it)) for i, it in enumerate(items)],
+                )
+        tmp.replace(db)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def _rewrite_role_store(db: Path, items: List[Dict]) -> None:
+    if not db.exists():
+        _create_role_store(db, items)
+        return
+    with closing(_open_role_store_rw(db)) as conn:
+        with conn:
+            conn.execute("DELETE FROM roles")
+            conn.executemany(
+                "INSERT OR REPLACE INTO roles (role_id, ord, data) VALUES (?, ?, ?)",
+                [(_role_id_of(it), i, _pack(it)) for i, it in enumerate(items)],
+            )
+
+
+def _upsert_role_store(db: Path, items: List[Dict], remove_ids: Iterable[int]) -> None:
+    with closing(_open_role_store_rw(db)) as conn:
+        with conn:
+            remove = [int(i) for i in remove_ids]
+            if remove:
+                conn.executemany("DELETE FROM roles WHERE role_id = ?", [(i,) for i in remove])
+            next_ord = conn.execute("SELECT COALESCE(MAX(ord), -1) + 1 FROM roles").fetchone()[0]
+            for it in items:
+                rid = _role_id_of(it)
+                row = conn.execute("SELECT ord FROM roles WHERE role_id = ?", (rid,)).fetchone()
+                if row is None:
+                    ord_ = next_ord
+                    next_ord += 1
+                else:
+                    ord_ = row[0]
+                conn.execute(
+                    "INSERT OR REPLACE INTO roles (role_id, ord, data) VALUES (?, ?, ?)",
+                    (rid, ord_, _pack(it)),
+                )
+
+
+# ─── 分段容器 (sqlite) ───────────────────────────────────────────────
+
+
+def _open_segment_store_ro(db: Path) -> sqlite3.Connection:
+    return sqlite3.connect(f"file:{db}?mode=ro", uri=True, timeout=5.0)
+
+
+def _open_segment_store_rw(db: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(str(db), timeout=5.0)
+    conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS segments ("
+        "pool TEXT NOT NULL, seq INTEGER NOT NULL, count INTEGER NOT NULL, data BLOB NOT NULL, "
+        "PRIMARY KEY (pool, seq))"
+    )
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS checkpoints ("
+        "id INTEGER PRIMARY KEY AUTOINCREMENT, kind TEXT NOT NULL, created_time TEXT NOT NULL, "
+        "head TEXT NOT NULL, counts TEXT NOT NULL)"
+    )
+    return conn
+
+
+def _segment_meta(conn: sqlite3.Connection) -> Dict[str, Any]:
+    return {k: json.loads(v) for k, v in conn.execute("SELECT key, value FROM meta").fetchall()}
+
+
+def _set_segment_meta(
+    conn: sqlite3.Connection, head: Dict[str, Any], pools: List[str], base_rev: int = 0
+) -> None:
+    rev = max(_segment_meta(conn).get("rev") or 0, base_rev) + 1
+    conn.executemany(
+        "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+        [
+            ("head", json.dumps(head, ensure_ascii=False)),
+            ("pools", json.dumps(pools, ensure_ascii=False)),
+            ("rev", json.dumps(rev)),
+        ],
+    )
+
+
+def _split_segment_obj(obj: Dict[str, Any]) -> tuple[Dict[str, Any], Dict[str, List[Any]]]:
+    head = {k: v for k, v in obj.items() if k != _SEGMENT_DATA_KEY}
+    data = obj.get(_SEGMENT_DATA_KEY) or {}
+    if not isinstance(data, dict):
+        raise ValueError("分段容器只接受 data 为卡池字典的对象")
+    return head, data
+
+
+def _read_segment_pools(conn: sqlite3.Connection) -> Dict[str, List[Any]]:
+    pools: Dict[str, List[Any]] = {}
+    for pool, data in conn.execute("SELECT pool, data FROM segments ORDER BY pool, seq DESC"):
+        pools.setdefault(pool, []).extend(_unpack(data))
+    return pools
+
+
+def _assemble_segment_obj(head: Dict[str, Any], order: List[str], pools: Dict[str, List[Any]]) -> Dict[str, Any]:
+    data = {pool: pools.get(pool, []) for pool in order}
+    for pool, records in pools.items():
+        data.setdefault(pool, records)
+    return {**head, _SEGMENT_DATA_KEY: data}
+
+
+def _load_segment_store(db: Path) -> Any:
+    with closing(_open_segment_store_ro(db)) as conn:
+        meta = _segment_meta(conn)
+        if "head" not in meta:
+            raise ValueError("分段容器缺少元数据")
+        return _assemble_segment_obj(meta["head"], meta.get("pools") or [], _read_segment_pools(conn))
+
+
+def _create_segment_store(db: Path, obj: Dict[str, Any]) -> None:
+    """整体写入 (压实): 每池一段, 先写临时库再原子替换; 旧 checkpoint 随旧文件失效。"""
+    head, data = _split_segment_obj(obj)
+    # 版本号跨整体重写延续, 否则替换后的新文件可能与旧版本号撞上
+    base_rev = _segment_revision(db) or 0
+    tmp = db.with_name(f"{db.name}.{os.getpid()}.{next(_tmp_counter)}.tmp")
+    try:
+        with closing(_open_segment_store_rw(tmp)) as conn:
+            with conn:
+                conn.executemany(
+                    "INSERT INTO segments (pool, seq, count, data) VALUES (?, 0, ?, ?)",
+                    [(pool, len(records), _pack(records)) for pool, records in data.items() if records],
+                )
+                _set_segment_meta(conn, head, list(data.keys()), base_rev)
+        tmp.replace(db)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def _compact_pool(conn: sqlite3.Connection, pool: str) -> None:
+    rows = conn.execute("SELECT seq, data FROM segments WHERE pool = ? ORDER BY seq DESC", (pool,)).fetchall()
+    if len(rows) <= _MAX_POOL_SEGMENTS:
+        return
+    records: List[Any] = []
+    for _, data in rows:
+        records.extend(_unpack(data))
+    conn.execute("DELETE FROM segments WHERE pool = ?", (pool,))
+    conn.execute(
+        "INSERT INTO segments (pool, seq, count, data) VALUES (?, ?, ?, ?)",
+        (pool, rows[0][0], len(records), _pack(records)),
+    )
+
+
+def append_player_segments_sync(
+    path: PathLike,
+    head: Dict[str, Any],
+    new_records: Dict[str, List[Any]],
+    checkpoint: Optional[str] = None,
+    keep_checkpoints: int = 10,
+) -> bool:
+    """向分段容器追加各池的最新记录 (新→旧), 并更新 data 以外的顶层字段。
+
+    追加前可记一个 checkpoint (只存各池条数与旧顶层字段)。容器不存在时返回 False,
+    由调用方改走 ``write_player_json`` 整体写入 (同时完成旧 .gz / 明文的迁移)。
+    """
+    p = Path(path)
+    db = _segment_store_path(p)
+    if db is None:
+        raise ValueError(f"{p.name} 不是分段存储的文件")
+    if not db.exists():
+        return False
+    try:
+        with closing(_open_segment_store_rw(db)) as conn:
+            with conn:
+                meta = _segment_meta(conn)
+                if "head" not in meta:
+                    raise ValueError(f"分段容器缺少元数据 {db}")
+                pools: List[str] = list(meta.get("pools") or [])
+                if checkpoint:
+                    counts = dict(conn.execute("SELECT pool, SUM(count) FROM segments GROUP BY pool").fetchall())
+                    conn.execute(
+                        "INSERT INTO checkpoints (kind, created_time, head, counts) VALUES (?, ?, ?, ?)",
+                        (
+                            checkpoint,
+                            datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                            json.dumps(meta["head"], ensure_ascii=False),
+                            json.dumps(counts, ensure_ascii=False),
+                        ),
+                    )
+                    conn.execute(
+                        "DELETE FROM checkpoints WHERE kind = ? AND id NOT IN "
+                        "(SELECT id FROM checkpoints WHERE kind = ? ORDER BY id DESC LIMIT ?)",
+                        (checkpoint, checkpoint, keep_checkpoints),
+                    )
+                for pool, records in new_records.items():
+                    if pool not in pools:
+                        pools.append(pool)
+                    if not records:
+                        continue
+                    seq = conn.execute(
+                        "SELECT COALESCE(MAX(seq), -1) + 1 FROM segments WHERE pool = ?", (pool,)
+                    ).fetchone()[0]
+                    conn.execute(
+                        "INSERT INTO segments (pool, seq, count, data) VALUES (?, ?, ?, ?)",
+                        (pool, seq, len(records), _pack(records)),
+                    )
+                    _compact_pool(conn, pool)
+                _set_segment_meta(conn, head, pools)
+        return True
+    finally:
+        _notify_write(p)
+
+
+def list_player_checkpoints_sync(path: PathLike) -> List[Dict[str, Any]]:
+    """分段容器内的 checkpoint 列表 (新→旧)。"""
+    db = _segment_store_path(Path(path))
+    if db is None or not db.exists():
+        return []
+    with closing(_open_segment_store_ro(db)) as conn:
+        rows = conn.execute("SELECT id, kind, created_time, counts FROM checkpoints ORDER BY id DESC").fetchall()
+    return [
+        {"id": cid, "kind": kind, "created_time": created, "counts": json.loads(counts)}
+        for cid, kind, created, counts in rows
+    ]
+
+
+def read_player_checkpoint_sync(path: PathLike, checkpoint_id: int) -> Any:
+    """还原某个 checkpoint 时的完整 JSON; 追加写只在头部加记录, 各池取最旧的 N 条即可。"""
+    db = _segment_store_path(Path(path))
+    if db is None or not db.exists():
+        return None
+    with closing(_open_segment_store_ro(db)) as conn:
+        row = conn.execute("SELECT head, counts FROM checkpoints WHERE id = ?", (checkpoint_id,)).fetchone()
+        if row is None:
+            return None
+        head, counts = json.loads(row[0]), json.loads(row[1])
+        meta = _segment_meta(conn)
+        pools = _read_segment_pools(conn)
+    data = {pool: (records[-counts[pool]:] if counts.get(pool) else []) for pool, records in pools.items()}
+    return _assemble_segment_obj(head, meta.get("pools") or [], data)
+
+
+def player_segment_revision(path: PathLike) -> Optional[int]:
+    """分段容器的写入版本号 (每次写入 +1), 原地追加时文件 mtime 精度不足以区分版本。"""
+    db = _segment_store_path(Path(path))
+    return _segment_revision(db) if db is not None else None
+
+
+def _segment_revision(db: Path) -> Optional[int]:
+    if not db.exists():
+        return None
+    try:
+        with closing(_open_segment_store_ro(db)) as conn:
+            return _segment_meta(conn).get("rev")
+    except Exception:
+        return None
+
+
+def _drop_legacy(p: Path) -> None:
+    for lp in _legacy_paths(p):
+        lp.unlink(missing_ok=True)
+
+
 def _gzip_dump(path: Path, obj: Any, level: int = 6) -> None:
     data = json.dumps(obj, ensure_ascii=False).encode("utf-8")
     with open(path, "wb") as raw:
@@ -38,14 +419,22 @@ def _gzip_dump(path: Path, obj: Any, level: int = 6) -> None:
             f.write(data)
 
 
+def _sidecar_doc_path(p: Path) -> Optional[Path]:
+    try:
+        exists = sidecar_store.doc_exists_sync(p.parent, p.name)
+    except Exception as e:
+        # 容器读不出时按存在处理, 避免调用方当作无数据覆盖
+        logger.warning(f"[鸣潮·player_store] 读取失败 {p.parent / sidecar_store.SIDECAR_DB}: {e}")
+        exists = True
+    return p.parent / sidecar_store.SIDECAR_DB if exists else None
+
+
 def resolve_player_path(path: PathLike) -> Optional[Path]:
-    """实际落盘路径：.gz 优先,回退明文;都不存在返回 None。"""
-    p = Path(path)
-    if _is_gzip(p.name):
-        gp = p.with_name(p.name + ".gz")
-        if gp.exists():
-            return gp
-    return p if p.exists() else None
+    """实际落盘路径：角色容器 > .gz > 明文;都不存在返回 None。"""
+    if Path(path).name in _SIDECAR_DOC_NAMES:
+        return _sidecar_doc_path(Path(path))
+    cands = _candidates(Path(path))
+    return cands[0] if cands else None
 
 
 def player_json_exists(path: PathLike) -> bool:
@@ -53,16 +442,10 @@ def player_json_exists(path: PathLike) -> bool:
 
 
 def resolve_readable_player_path(path: PathLike) -> Optional[Path]:
-    """能成功读出的落盘路径(.gz 优先,坏则明文);都读不出返回 None。"""
-    p = Path(path)
-    cands = []
-    if _is_gzip(p.name):
-        gp = p.with_name(p.name + ".gz")
-        if gp.exists():
-            cands.append(gp)
-    if p.exists():
-        cands.append(p)
-    for c in cands:
+    """能成功读出的落盘路径(按优先级, 坏则回退);都读不出返回 None。"""
+    if Path(path).name in _SIDECAR_DOC_NAMES:
+        return resolve_player_path(path) if read_player_json_sync(path) is not None else None
+    for c in _candidates(Path(path)):
         try:
             _load(c)
             return c
@@ -72,16 +455,15 @@ def resolve_readable_player_path(path: PathLike) -> Optional[Path]:
 
 
 def read_player_json_sync(path: PathLike) -> Any:
-    """读 json。.gz 优先, 读坏则回退明文; 都读不到返回 None。"""
+    """读 json。角色容器 / .gz 优先, 读坏则回退; 都读不到返回 None。"""
     p = Path(path)
-    candidates = []
-    if _is_gzip(p.name):
-        gp = p.with_name(p.name + ".gz")
-        if gp.exists():
-            candidates.append(gp)
-    if p.exists():
-        candidates.append(p)
-    for c in candidates:
+    if p.name in _SIDECAR_DOC_NAMES:
+        try:
+            return sidecar_store.read_doc_sync(p.parent, p.name)
+        except Exception as e:
+            logger.warning(f"[鸣潮·player_store] 读取失败 {p.parent / sidecar_store.SIDECAR_DB}: {e}")
+            return None
+    for c in _candidates(p):
         try:
             return _load(c)
         except Exception as e:
@@ -89,9 +471,78 @@ def read_player_json_sync(path: PathLike) -> Any:
     return None
 
 
+def read_player_roles_sync(path: PathLike, role_ids: Iterable[int]) -> Optional[Dict[int, Any]]:
+    """只读指定角色: {roleId: item}。无文件返回 {}; 文件存在但读不出返回 None。"""
+    p = Path(path)
+    ids = [int(i) for i in role_ids]
+    for c in _candidates(p):
+        try:
+            if c.suffix == ".db":
+                return _load_role_store(c, ids)
+            data = _load(c)
+            if not isinstance(data, list):
+                raise ValueError("not a role list")
+            wanted = set(ids)
+            return {_role_id_of(it): it for it in data if _role_id_of(it) in wanted}
+        except Exception as e:
+            logger.warning(f"[鸣潮·player_store] 读取失败 {c}: {e}")
+    return None if player_json_exists(p) else {}
+
+
+def write_player_roles_sync(
+    path: PathLike,
+    items: List[Dict],
+    remove_ids: Iterable[int] = (),
+) -> None:
+    """按角色增量写: upsert items, 删除 remove_ids, 其余角色不动。
+
+    仅用于角色容器文件; 首次写入时把旧 .gz / 明文整体迁入容器。
+    """
+    p = Path(path)
+    db = _role_store_path(p)
+    if db is None:
+        raise ValueError(f"{p.name} 不是按角色存储的文件")
+    try:
+        p.parent.mkdir(parents=True, exist_ok=True)
+        if not db.exists():
+            legacy = read_player_json_sync(p)
+            if legacy is None and player_json_exists(p):
+                raise ValueError(f"旧数据读取失败, 拒绝迁移 {p}")
+            remove = {int(i) for i in remove_ids}
+            merged = {_role_id_of(it): it for it in (legacy or []) if _role_id_of(it) not in remove}
+            for it in items:
+                merged[_role_id_of(it)] = it
+            _create_role_store(db, list(merged.values()))
+        else:
+            _upsert_role_store(db, items, remove_ids)
+        _drop_legacy(p)
+    finally:
+        _notify_write(p)
+
+
 def write_player_json_sync(path: PathLike, obj: Any) -> None:
     p = Path(path)
+    try:
+        _write_player_json(p, obj)
+    finally:
+        _notify_write(p)
+
+
+def _write_player_json(p: Path, obj: Any) -> None:
     p.parent.mkdir(parents=True, exist_ok=True)
+    if p.name in _SIDECAR_DOC_NAMES:
+        sidecar_store.write_doc_sync(p.parent, p.name, obj)
+        return
+    db = _role_store_path(p)
+    if db is not None and isinstance(obj, list):
+        _rewrite_role_store(db, obj)
+        _drop_legacy(p)
+        return
+    db = _segment_store_path(p)
+    if db is not None and isinstance(obj, dict):
+        _create_segment_store(db, obj)
+        _drop_legacy(p)
+        return
     uniq = f".{os.getpid()}.{next(_tmp_counter)}.tmp"
     if _is_gzip(p.name):
         gp = p.with_name(p.name + ".gz")
@@ -121,6 +572,14 @@ async def write_player_json(path: PathLike, obj: Any) -> None:
     await asyncio.to_thread(write_player_json_sync, path, obj)
 
 
+async def read_player_roles(path: PathLike, role_ids: Iterable[int]) -> Optional[Dict[int, Any]]:
+    return await asyncio.to_thread(read_player_roles_sync, path, list(role_ids))
+
+
+async def write_player_roles(path: PathLike, items: List[Dict], remove_ids: Iterable[int] = ()) -> None:
+    await asyncio.to_thread(write_player_roles_sync, path, items, list(remove_ids))
+
+
 def write_gz_json_sync(path: PathLike, obj: Any, level: int = 9) -> None:
     p = Path(path)
     p.parent.mkdir(parents=True, exist_ok=True)
@@ -132,12 +591,57 @@ def write_gz_json_sync(path: PathLike, obj: Any, level: int = 9) -> None:
         tmp.unlink(missing_ok=True)
 
 
+async def append_player_segments(
+    path: PathLike,
+    head: Dict[str, Any],
+    new_records: Dict[str, List[Any]],
+    checkpoint: Optional[str] = None,
+    keep_checkpoints: int = 10,
+) -> bool:
+    return await asyncio.to_thread(
+        append_player_segments_sync, path, head, new_records, checkpoint, keep_checkpoints
+    )
+
+
 async def write_gz_json(path: PathLike, obj: Any, level: int = 9) -> None:
     await asyncio.to_thread(write_gz_json_sync, path, obj, level)
 
 
+def _migrate_role_store(p: Path) -> tuple[int, int, int]:
+    """旧 .gz / 明文 → 角色容器。返回 (1 转换 / 0 无需 / -1 失败, 前字节, 后字节)。"""
+    db = _role_store_path(p)
+    legacy = [lp for lp in _legacy_paths(p) if lp.is_file()]
+    if db is None or not legacy:
+        return 0, 0, 0
+    if db.exists():
+        try:
+            _load(db)
+            _drop_legacy(p)  # 容器可读才删旧文件
+        except Exception as e:
+            logger.warning(f"[鸣潮·player_store] 已存容器损坏, 保留旧文件 {db}: {e}")
+        return 0, 0, 0
+    try:
+        sz = sum(lp.stat().st_size for lp in legacy)
+        obj = read_player_json_sync(p)
+        if not isinstance(obj, list):
+            raise ValueError("旧数据读取失败或格式不符")
+        _create_role_store(db, obj)
+        if len(_load(db)) != len({_role_id_of(it) for it in obj}):  # 读验通过才删旧文件
+            raise ValueError("容器校验条数不一致")
+        _drop_legacy(p)
+        _notify_write(p)
+        return 1, sz, db.stat().st_size
+    except Exception as e:
+        logger.warning(f"[鸣潮·player_store] 容器迁移失败 {p}: {e}")
+        db.unlink(missing_ok=True)
+        return -1, 0, 0
+
+
 def compress_existing_sync(player_root: PathLike) -> tuple[int, int, int, int]:
-    """把 player_root 下白名单明文转 gz。返回 转换数/失败数/前字节/后字节。"""
+    """把 player_root 下白名单明文转 gz, 按角色存储的文件迁入角色容器。
+
+    返回 转换数/失败数/前字节/后字节。
+    """
     root = Path(player_root)
     done = fail = 0
     before = after = 0
@@ -147,6 +651,15 @@ def compress_existing_sync(player_root: PathLike) -> tuple[int, int, int, int]:
         if not uid_dir.is_dir():
             continue
         for name in _GZIP_NAMES:
+            if name in _ROLE_STORE_NAMES:
+                status, b, a = _migrate_role_store(uid_dir / name)
+                if status > 0:
+                    done += 1
+                    before += b
+                    after += a
+                elif status < 0:
+                    fail += 1
+                continue
             plain = uid_dir / name
             gz = uid_dir / (name + ".gz")
             if gz.exists():
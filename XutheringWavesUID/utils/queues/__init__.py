@@ -1,11 +1,10 @@
-from typing import Any
+from typing import Any, List
 
-import httpx
-
-from gsuid_core.logger import logger
+from gsuid_core.server import on_core_shutdown
 
 from .const import QUEUE_SCORE_RANK, QUEUE_ABYSS_RECORD, QUEUE_SLASH_RECORD, QUEUE_MATRIX_RECORD
-from .queues import event_handler, start_dispatcher
+from .queues import batch_handler, start_dispatcher, flush_pending_tasks
+from .uploader import BATCH_SIZE, uploader
 from ..api.wwapi import (
     UPLOAD_URL,
     UPLOAD_ABYSS_RECORD_URL,
@@ -14,7 +13,8 @@ from ..api.wwapi import (
 )
 
 
-# (queue_name, upload_url, log_label)
+# (queue_name, upload_url, log_label); 后端接口目前只接受单条对象, 均不开启数组攒批,
+# 同一批内逐条并发 POST
 _UPLOAD_JOBS = [
     (QUEUE_SCORE_RANK, UPLOAD_URL, "面板"),
     (QUEUE_ABYSS_RECORD, UPLOAD_ABYSS_RECORD_URL, "深渊"),
@@ -23,43 +23,25 @@ _UPLOAD_JOBS = [
 ]
 
 
-async def _post_upload(item: Any, url: str, label: str) -> None:
-    if not item or not isinstance(item, dict):
-        return
-
-    from ...wutheringwaves_config import WutheringWavesConfig
-    WavesToken = WutheringWavesConfig.get_config("WavesToken").data
-    if not WavesToken:
-        return
-
-    res = None
-    try:
-        async with httpx.AsyncClient() as client:
-            res = await client.post(
-                url,
-                json=item,
-                headers={
-                    "Content-Type": "application/json",
-                    "Authorization": f"Bearer {WavesToken}",
-                },
-                timeout=httpx.Timeout(10),
-            )
-        logger.info(f"[鸣潮·队列] 上传{label}结果: {res.status_code} - {res.text}")
-    except Exception as e:
-        logger.exception(f"[鸣潮·队列] 上传{label}失败: {res.text if res else ''} {e}")
-
-
 def _make_handler(queue: str, url: str, label: str):
-    async def _handler(item: Any):
-        await _post_upload(item, url, label)
+    uploader.register(queue, url, label)
+
+    async def _handler(items: List[Any]):
+        return await uploader.upload_batch(queue, items)
     _handler.__name__ = f"send_{queue.removeprefix('waves_')}"
     return _handler
 
 
 for _queue, _url, _label in _UPLOAD_JOBS:
-    event_handler(_queue)(_make_handler(_queue, _url, _label))
+    batch_handler(_queue, BATCH_SIZE)(_make_handler(_queue, _url, _label))
 
 
 def init_queues():
     # 启动任务分发器
     start_dispatcher(daemon=True)
+
+
+@on_core_shutdown
+async def _close_uploader():
+    await flush_pending_tasks()
+    await uploader.close()
@@ -1,18 +1,37 @@
 import sys
+import time
 import asyncio
 from typing import Any, Dict, List, Tuple, Union, Callable, Coroutine, Optional
 
 from gsuid_core.logger import logger
 
+from .store import DEAD_MAX_AGE, DEAD_REQUEUE_INTERVAL, TaskRow, QueueStore
+from ..resource.RESOURCE_PATH import MAIN_PATH
+
+QUEUE_DB_PATH = MAIN_PATH / "task_queue.db"
+# 同时处理中的任务上限, 其余留在磁盘, 内存占用有界
+MAX_INFLIGHT = 32
+FETCH_LIMIT = 32
+# 无新任务时的轮询间隔 (退避重试的任务到期后靠轮询捞回)
+POLL_INTERVAL = 5.0
+
 
 class TaskDispatcher:
     def __init__(self):
-        self.queue: asyncio.Queue[Tuple[str, Any]] = asyncio.Queue()
+        self.store = QueueStore(QUEUE_DB_PATH)
         self.running = False
         self.handlers: Dict[str, List[Callable]] = {}
+        # 批量处理器: 队列名 -> (handler, 每批条数); 一次收到同队列多条任务
+        self.batch_handlers: Dict[str, Tuple[Callable, int]] = {}
         self._loop: Optional[asyncio.AbstractEventLoop] = None
         self._worker: Optional[asyncio.Task] = None
         self._tasks: set = set()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        # 待落盘的新任务; 由 _persist_task 按批在线程里写入 store
+        self._pending: List[Tuple[str, Any]] = []
+        self._persist_task: Optional[asyncio.Task] = None
+        self.stats: Dict[str, Dict[str, float]] = {}
 
     def register_handler(
         self,
@@ -25,6 +44,23 @@ class TaskDispatcher:
         handlers.append(handler)
         logger.info(f"[鸣潮·队列] 注册任务处理器: {task_type} -> {handler.__name__}")
 
+    def register_batch_handler(
+        self,
+        task_type: str,
+        handler: Callable[[List[Any]], Coroutine[Any, Any, Optional[List[Optional[str]]]]],
+        batch_size: int,
+    ) -> None:
+        """注册批量处理器, 取代该队列的逐条处理器。
+
+        handler 收到最多 batch_size 条数据, 返回 None 表示全部成功, 或返回与入参等长的
+        列表逐条给出错误描述 (None 为成功); 抛异常视为整批失败。各条分别 ack / nack。
+        """
+        self.batch_handlers[task_type] = (handler, max(1, batch_size))
+        logger.info(f"[鸣潮·队列] 注册批量任务处理器: {task_type} -> {handler.__name__} (每批 {batch_size})")
+
+    def queues(self) -> List[str]:
+        return list(set(self.handlers) | set(self.batch_handlers))
+
     def start(
         self,
         daemon: bool = True,
@@ -86,7 +122,7 @@ class TaskDispatcher:
             logger.warning("[鸣潮·队列] 任务分发器未启动或已关闭")
             return
 
-        if task_type not in self.handlers:
+        if task_type not in self.handlers and task_type not in self.batch_handlers:
             return
 
         loop = self._loop
@@ -111,27 +147,72 @@ class TaskDispatcher:
     def _enqueue_nowait(self, task_type: str, data: Any) -> None:
         if not self.running:
             return
-        try:
-            self.queue.put_nowait((task_type, data))
-        except Exception as e:
-            logger.exception(f"[鸣潮·队列] 任务入队异常: {e}")
+        self._pending.append((task_type, data))
+        if self._persist_task is None or self._persist_task.done():
+            self._persist_task = asyncio.get_running_loop().create_task(self._persist_pending())
+
+    async def _persist_pending(self) -> None:
+        """把攒下的新任务一个事务写入 store; 写入期间新来的任务归下一批。"""
+        while self._pending:
+            batch, self._pending = self._pending, []
+            try:
+                await asyncio.to_thread(self.store.put_many, batch)
+            except Exception as e:
+                logger.exception(f"[鸣潮·队列] 任务入队异常 ({len(batch)} 条): {e}")
+                continue
+            if self._wakeup is not None:
+                self._wakeup.set()
+
+    async def flush_pending(self) -> None:
+        """等待尚未落盘的新任务写入 (退出时调用)。"""
+        task = self._persist_task
+        if task is not None and not task.done():
+            await task
+        if self._pending:
+            await self._persist_pending()
+
+    async def requeue_dead(self, queue: Optional[str] = None) -> int:
+        count = await asyncio.to_thread(self.store.requeue_dead, queue)
+        if count and self._wakeup is not None:
+            self._wakeup.set()
+        return count
 
     async def _process(self) -> None:
         worker = asyncio.current_task()
+        self._wakeup = asyncio.Event()
+        self._slots = asyncio.Semaphore(MAX_INFLIGHT)
+        last_requeue = time.monotonic()
         try:
             while self.running:
-                task_type, data = await self.queue.get()
+                if time.monotonic() - last_requeue >= DEAD_REQUEUE_INTERVAL:
+                    last_requeue = time.monotonic()
+                    try:
+                        count = await asyncio.to_thread(self.store.requeue_dead, None, DEAD_MAX_AGE)
+                        if count:
+                            logger.info(f"[鸣潮·队列] 自动放回死信 {count} 条")
+                    except Exception as e:
+                        logger.warning(f"[鸣潮·队列] 死信放回异常: {e}")
                 try:
-                    handlers = list(self.handlers.get(task_type, []))
-                    for handler in handlers:
-                        # task retention: keep strong ref + auto-cleanup on done
-                        task = asyncio.create_task(self._run_task(handler, data, task_type))
-                        self._tasks.add(task)
-                        task.add_done_callback(self._tasks.discard)
+                    rows = await asyncio.to_thread(self.store.fetch, self.queues(), FETCH_LIMIT)
                 except Exception as e:
-                    logger.exception(f"[鸣潮·队列] 任务处理异常: {e}")
-                finally:
-                    self.queue.task_done()
+                    logger.exception(f"[鸣潮·队列] 任务读取异常: {e}")
+                    rows = []
+
+                if not rows:
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout=POLL_INTERVAL)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                for group in self._group_rows(rows):
+                    slots = self._slots
+                    await slots.acquire()
+                    # task retention: keep strong ref + auto-cleanup on done
+                    task = asyncio.create_task(self._run_group(group, slots))
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
         except asyncio.CancelledError:
             pass
         finally:
@@ -140,13 +221,98 @@ class TaskDispatcher:
                 self.running = False
                 self._worker = None
 
-    async def _run_task(self, handler: Callable, data: Any, task_type: str) -> None:
+    def _group_rows(self, rows: List[TaskRow]) -> List[List[TaskRow]]:
+        """有批量处理器的队列按每批条数分组, 其余逐条一组。"""
+        groups: List[List[TaskRow]] = []
+        batched: Dict[str, List[TaskRow]] = {}
+        for row in rows:
+            entry = self.batch_handlers.get(row[1])
+            if entry is None:
+                groups.append([row])
+                continue
+            group = batched.get(row[1])
+            if group is None or len(group) >= entry[1]:
+                group = batched[row[1]] = []
+                groups.append(group)
+            group.append(row)
+        return groups
+
+    async def _run_group(self, group: List[TaskRow], slots: asyncio.Semaphore) -> None:
+        task_type = group[0][1]
+        try:
+            entry = self.batch_handlers.get(task_type)
+            if entry is not None:
+                errors = await self._run_batch(entry[0], [row[2] for row in group], task_type)
+            else:
+                handlers = list(self.handlers.get(task_type, []))
+                results = await asyncio.gather(*(self._run_task(h, group[0][2], task_type) for h in handlers))
+                errors = [next((r for r in results if r is not None), None)]
+            for row, error in zip(group, errors):
+                await self._settle(row, error)
+        except Exception as e:
+            logger.exception(f"[鸣潮·队列] 任务处理异常: {e}")
+        finally:
+            slots.release()
+
+    async def _settle(self, row: TaskRow, error: Optional[str]) -> None:
+        task_id, task_type, _, attempts, enqueued_at = row
+        stat = self.stats.setdefault(
+            task_type,
+            {"processed": 0, "failed": 0, "dead": 0, "latency_avg": 0.0, "latency_max": 0.0},
+        )
+        if error is None:
+            await asyncio.to_thread(self.store.ack, task_id)
+            latency = max(time.time() - enqueued_at, 0.0)
+            stat["processed"] += 1
+            # 指数滑动平均, 反映近期排队 + 处理耗时
+            stat["latency_avg"] = latency if stat["processed"] == 1 else stat["latency_avg"] * 0.9 + latency * 0.1
+            stat["latency_max"] = max(stat["latency_max"], latency)
+        else:
+            stat["failed"] += 1
+            if await asyncio.to_thread(self.store.nack, task_id, error):
+                stat["dead"] += 1
+                logger.warning(f"[鸣潮·队列] 任务 {task_type}#{task_id} 重试 {attempts + 1} 次仍失败, 转入死信")
+
+    async def _run_batch(self, handler: Callable, items: List[Any], task_type: str) -> List[Optional[str]]:
+        """执行批量 handler, 返回逐条错误描述。"""
+        try:
+            result = await handler(items)
+        except Exception as e:
+            logger.exception(f"[鸣潮·队列] 批量任务执行错误 ({task_type}): {e}")
+            return [f"{type(e).__name__}: {e}"] * len(items)
+        if result is None:
+            return [None] * len(items)
+        if len(result) != len(items):
+            return ["批量处理器返回条数不符"] * len(items)
+        return list(result)
+
+    async def _run_task(self, handler: Callable, data: Any, task_type: str) -> Optional[str]:
+        """执行单个 handler, 失败返回错误描述。"""
         try:
             result = handler(data)
             if asyncio.iscoroutine(result):
                 await result
+            return None
         except Exception as e:
             logger.exception(f"[鸣潮·队列] 任务执行错误 ({task_type}): {e}")
+            return f"{type(e).__name__}: {e}"
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """各队列积压深度 / 死信数 / 处理数 / 延迟 (秒)。"""
+        depth = self.store.depth()
+        dead = self.store.dead_count()
+        result: Dict[str, Dict[str, Any]] = {}
+        for queue in set(depth) | set(dead) | set(self.stats) | set(self.queues()):
+            stat = self.stats.get(queue, {})
+            result[queue] = {
+                "depth": depth.get(queue, 0),
+                "dead_total": dead.get(queue, 0),
+                "processed": int(stat.get("processed", 0)),
+                "failed": int(stat.get("failed", 0)),
+                "latency_avg": round(stat.get("latency_avg", 0.0), 3),
+                "latency_max": round(stat.get("latency_max", 0.0), 3),
+            }
+        return result
 
 
 _DISPATCHER_KEY = "__waves_task_dispatcher__"
@@ -160,6 +326,9 @@ else:
     old_handlers = getattr(_previous_dispatcher, "handlers", None)
     if isinstance(old_handlers, dict):
         dispatcher.handlers.update(old_handlers)
+    old_batch_handlers = getattr(_previous_dispatcher, "batch_handlers", None)
+    if isinstance(old_batch_handlers, dict):
+        dispatcher.batch_handlers.update(old_batch_handlers)
     if _previous_dispatcher is not None and hasattr(_previous_dispatcher, "running"):
         try:
             setattr(_previous_dispatcher, "running", False)
@@ -199,6 +368,19 @@ def push_item(queue_name: str, item: Any) -> None:
     dispatcher.emit(queue_name, item)
 
 
+async def flush_pending_tasks() -> None:
+    await dispatcher.flush_pending()
+
+
+async def requeue_dead_tasks(queue: Optional[str] = None) -> int:
+    """把死信放回待处理队列, 返回条数; queue 为空时处理全部队列。"""
+    return await dispatcher.requeue_dead(queue)
+
+
+def get_queue_stats() -> Dict[str, Dict[str, Any]]:
+    return dispatcher.get_stats()
+
+
 def event_handler(task_type: str) -> Callable:
     """事件处理器装饰器, 用于本地撰写排行等逻辑.
 
@@ -213,3 +395,19 @@ def event_handler(task_type: str) -> Callable:
         return func
 
     return decorator
+
+
+def batch_handler(task_type: str, batch_size: int) -> Callable:
+    """批量处理器装饰器: 同一队列一次最多处理 batch_size 条, 逐条 ack / nack.
+
+    Examples:
+        @batch_handler("score_rank", 20)
+        async def handle_score_rank(items):
+            ...
+    """
+
+    def decorator(func: Callable) -> Callable:
+        dispatcher.register_batch_handler(task_type, func, batch_size)
+        return func
+
+    return decorator
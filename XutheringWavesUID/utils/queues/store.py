@@ -0,0 +1,179 @@
+"""任务队列持久化存储 (SQLite WAL)。
+
+- ``tasks``: 待处理任务; 取出时置 ``leased`` 并把 ``available_at`` 推后一个租期,
+  ack 删除, nack 清除租约并按指数退避重新可见; 进程重启后只把上次处理中 (leased)
+  的任务立即重投 (至少一次), 退避中的任务仍按原时间重试。
+- ``dead``: 重试 ``MAX_ATTEMPTS`` 次仍失败的任务, 保留最后一次错误便于排查。
+  退避从 ``RETRY_BASE_DELAY`` 翻倍到 ``RETRY_MAX_DELAY`` 封顶, 全部重试约覆盖 6 小时;
+  分发器每 ``DEAD_REQUEUE_INTERVAL`` 把入队不超过 ``DEAD_MAX_AGE`` 的死信自动放回,
+  更旧的只能用「重试死信」命令 (``requeue_dead``) 手动放回。
+
+单连接 + 线程锁, 可在任意线程调用; 分发器经 asyncio.to_thread 调用, 入队按批提交
+(``put_many``), 不在事件循环里做同步 commit。落盘不可用时退化为内存库, 行为一致但不跨重启。
+"""
+import json
+import time
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Tuple, Union, Iterable, Optional
+
+from gsuid_core.logger import logger
+
+# 5s 起翻倍, 第 10 次起封顶 30 分钟: 前 9 次约 43 分钟, 20 次合计约 6 小时
+MAX_ATTEMPTS = 20
+RETRY_BASE_DELAY = 5.0
+RETRY_MAX_DELAY = 1800.0
+# 死信自动放回: 间隔, 以及只放回入队不超过该时长的任务 (更旧的视为放弃, 留待手动处理)
+DEAD_REQUEUE_INTERVAL = 3600.0
+DEAD_MAX_AGE = 3 * 86400.0
+# 处理中任务的租期, 超时未 ack 视为处理方丢失, 重新投递
+LEASE_SECONDS = 300.0
+
+# (id, queue, data, attempts, enqueued_at)
+TaskRow = Tuple[int, str, Any, int, float]
+
+
+class QueueStore:
+    def __init__(self, path: Optional[Union[str, Path]] = None):
+        self.path: Optional[Path] = Path(path) if path else None
+        self._lock = threading.Lock()
+        self._conn = self._open()
+
+    def _open(self) -> sqlite3.Connection:
+        if self.path is not None:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                conn = sqlite3.connect(str(self.path), timeout=5.0, check_same_thread=False)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                self._init_schema(conn)
+                # 上次进程处理中的任务立即可见, 重启后马上重投; 退避中的任务保持原重试时间
+                with conn:
+                    conn.execute("UPDATE tasks SET available_at = ?, leased = 0 WHERE leased = 1", (time.time(),))
+                return conn
+            except Exception as e:
+                logger.warning(f"[鸣潮·队列] 任务队列落盘不可用, 退化为内存队列: {e}")
+                self.path = None
+        conn = sqlite3.connect(":memory:", check_same_thread=False)
+        self._init_schema(conn)
+        return conn
+
+    @staticmethod
+    def _init_schema(conn: sqlite3.Connection) -> None:
+        with conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS tasks ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, queue TEXT NOT NULL, data TEXT NOT NULL, "
+                "attempts INTEGER NOT NULL DEFAULT 0, enqueued_at REAL NOT NULL, available_at REAL NOT NULL)"
+            )
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(tasks)")}
+            if "leased" not in columns:
+                conn.execute("ALTER TABLE tasks ADD COLUMN leased INTEGER NOT NULL DEFAULT 0")
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_tasks_available ON tasks (available_at, id)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS dead ("
+                "id INTEGER PRIMARY KEY, queue TEXT NOT NULL, data TEXT NOT NULL, "
+                "attempts INTEGER NOT NULL, error TEXT, enqueued_at REAL NOT NULL, failed_at REAL NOT NULL)"
+            )
+
+    def put_many(self, items: Iterable[Tuple[str, Any]]) -> int:
+        """一个事务写入多条 (queue, data), 返回条数。"""
+        now = time.time()
+        rows = [(queue, json.dumps(data, ensure_ascii=False, default=str), now, now) for queue, data in items]
+        if not rows:
+            return 0
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO tasks (queue, data, enqueued_at, available_at) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+        return len(rows)
+
+    def fetch(self, queues: Iterable[str], limit: int) -> List[TaskRow]:
+        """取出最多 limit 条可处理任务并加租期。"""
+        queue_list = list(queues)
+        if not queue_list or limit <= 0:
+            return []
+        now = time.time()
+        marks = ",".join("?" * len(queue_list))
+        with self._lock, self._conn:
+            rows = self._conn.execute(
+                f"SELECT id, queue, data, attempts, enqueued_at FROM tasks "
+                f"WHERE available_at <= ? AND queue IN ({marks}) ORDER BY id LIMIT ?",
+                (now, *queue_list, limit),
+            ).fetchall()
+            if rows:
+                self._conn.executemany(
+                    "UPDATE tasks SET available_at = ?, leased = 1 WHERE id = ?",
+                    [(now + LEASE_SECONDS, r[0]) for r in rows],
+                )
+        result: List[TaskRow] = []
+        for task_id, queue, data, attempts, enqueued_at in rows:
+            try:
+                item = json.loads(data)
+            except Exception:
+                item = data
+            result.append((task_id, queue, item, attempts, enqueued_at))
+        return result
+
+    def ack(self, task_id: int) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+
+    def nack(self, task_id: int, error: str = "") -> bool:
+        """记一次失败; 超过重试次数转入死信, 返回 True 表示已转死信。"""
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT queue, data, attempts, enqueued_at FROM tasks WHERE id = ?",
+                (task_id,),
+            ).fetchone()
+            if row is None:
+                return False
+            queue, data, attempts, enqueued_at = row
+            attempts += 1
+            if attempts >= MAX_ATTEMPTS:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO dead (id, queue, data, attempts, error, enqueued_at, failed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (task_id, queue, data, attempts, error[:500], enqueued_at, now),
+                )
+                self._conn.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+                return True
+            delay = min(RETRY_BASE_DELAY * (2 ** (attempts - 1)), RETRY_MAX_DELAY)
+            self._conn.execute(
+                "UPDATE tasks SET attempts = ?, available_at = ?, leased = 0 WHERE id = ?",
+                (attempts, now + delay, task_id),
+            )
+            return False
+
+    def depth(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT queue, COUNT(*) FROM tasks GROUP BY queue").fetchall()
+        return {q: int(n) for q, n in rows}
+
+    def dead_count(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT queue, COUNT(*) FROM dead GROUP BY queue").fetchall()
+        return {q: int(n) for q, n in rows}
+
+    def requeue_dead(self, queue: Optional[str] = None, max_age: Optional[float] = None) -> int:
+        """把死信重新放回待处理队列 (重试次数清零); max_age 限定只放回入队不超过该秒数的。"""
+        now = time.time()
+        conds, args = [], []
+        if queue:
+            conds.append("queue = ?")
+            args.append(queue)
+        if max_age is not None:
+            conds.append("enqueued_at >= ?")
+            args.append(now - max_age)
+        where = f"WHERE {' AND '.join(conds)}" if conds else ""
+        with self._lock, self._conn:
+            rows = self._conn.execute(f"SELECT id, queue, data, enqueued_at FROM dead {where}", args).fetchall()
+            self._conn.executemany(
+                "INSERT INTO tasks (queue, data, enqueued_at, available_at) VALUES (?, ?, ?, ?)",
+                [(q, d, e, now) for _, q, d, e in rows],
+            )
+            self._conn.execute(f"DELETE FROM dead {where}", args)
+        return len(rows)
@@ -0,0 +1,121 @@
+"""排行上传器: 共享 keep-alive 连接池 + 按端点攒批 + 有限并发。
+
+攒批建在持久任务队列之上: 各上传队列注册为批量处理器 (``batch_handler``), 分发器
+一次租出同队列最多 ``BATCH_SIZE`` 条交给 ``upload_batch``。端点声明 ``batch=True``
+时整批以数组 POST 一次, 否则在同一批里以有限并发逐条 POST。每条只发一次, 网络错误 /
+429 / 5xx 记为该条失败, 由任务队列 (store) 按指数退避重投、重试耗尽转入死信; 成功或
+4xx (数据问题, 重试无意义) 的条目才被 ack。未发出的条目本就留在队列库里, 重启后照常重投,
+不再另外落盘。
+"""
+import asyncio
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from gsuid_core.logger import logger
+
+BATCH_SIZE = 20
+MAX_CONCURRENCY = 4
+
+
+class UploadError(Exception):
+    """本次上传失败, 应由任务队列稍后重试。"""
+
+
+class UploadEndpoint:
+    def __init__(self, queue: str, url: str, label: str, batch: bool = False):
+        self.queue = queue
+        self.url = url
+        self.label = label
+        self.batch = batch
+
+
+class Uploader:
+    def __init__(self):
+        self.endpoints: Dict[str, UploadEndpoint] = {}
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def register(self, queue: str, url: str, label: str, batch: bool = False) -> None:
+        ep = self.endpoints.get(queue)
+        if ep is None:
+            self.endpoints[queue] = UploadEndpoint(queue, url, label, batch)
+        else:
+            ep.url, ep.label, ep.batch = url, label, batch
+
+    def _get_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._client_loop is not loop:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(10),
+                limits=httpx.Limits(
+                    max_connections=MAX_CONCURRENCY,
+                    max_keepalive_connections=MAX_CONCURRENCY,
+                ),
+            )
+            self._client_loop = loop
+            self._semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+        return self._client
+
+    async def upload_batch(self, queue: str, items: List[Any]) -> List[Optional[str]]:
+        """上传一批, 返回逐条错误描述 (None 为成功或无需重试)。"""
+        from ...wutheringwaves_config import WutheringWavesConfig
+
+        errors: List[Optional[str]] = [None] * len(items)
+        ep = self.endpoints.get(queue)
+        token = WutheringWavesConfig.get_config("WavesToken").data
+        if ep is None or not token:
+            return errors
+        # 空 / 非对象条目无需上传, 直接 ack
+        valid = [i for i, item in enumerate(items) if item and isinstance(item, dict)]
+        if not valid:
+            return errors
+
+        if ep.batch:
+            try:
+                await self._post(ep, [items[i] for i in valid], token)
+            except UploadError as e:
+                for i in valid:
+                    errors[i] = str(e)
+        else:
+            results = await asyncio.gather(
+                *(self._post(ep, items[i], token) for i in valid), return_exceptions=True
+            )
+            for i, res in zip(valid, results):
+                if isinstance(res, BaseException):
+                    errors[i] = str(res)
+
+        failed = sum(e is not None for e in errors)
+        if failed:
+            logger.warning(f"[鸣潮·队列] 上传{ep.label}失败 {failed}/{len(valid)} 条, 稍后重试")
+        return errors
+
+    async def _post(self, ep: UploadEndpoint, payload: Any, token: str) -> None:
+        """发送一次; 需要重试时抛 UploadError。"""
+        client = self._get_client()
+        assert self._semaphore is not None
+        try:
+            async with self._semaphore:
+                res = await client.post(
+                    ep.url,
+                    json=payload,
+                    headers={
+                        "Content-Type": "application/json",
+                        "Authorization": f"Bearer {token}",
+                    },
+                )
+        except httpx.HTTPError as e:
+            raise UploadError(f"上传{ep.label}失败: {type(e).__name__}: {e}") from e
+        if res.status_code == 429 or res.status_code >= 500:
+            raise UploadError(f"上传{ep.label}失败: HTTP {res.status_code} {res.text[:200]}")
+        # 4xx 视为数据问题, 重试无意义
+        logger.info(f"[鸣潮·队列] 上传{ep.label}结果: {res.status_code} - {res.text}")
+
+    async def close(self) -> None:
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
+
+uploader = Uploader()
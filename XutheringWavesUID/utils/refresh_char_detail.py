@@ -1,11 +1,8 @@
 import re
-import json
 import asyncio
 import contextlib
 from typing import Dict, List, Union, Optional
 
-import aiofiles
-
 from gsuid_core.logger import logger
 from gsuid_core.models import Event
 
@@ -22,8 +19,15 @@ from .expression_ctx import WavesCharRank, get_waves_char_rank, _compute_one_cha
 from ..wutheringwaves_config import PREFIX, WutheringWavesConfig
 from .resource.RESOURCE_PATH import PLAYER_PATH, CACHE_PATH
 from .char_info_utils import get_all_roleid_detail_info_int
-from .player_store import read_player_json, write_player_json, player_json_exists
+from .player_store import (
+    read_player_json,
+    read_player_roles,
+    write_player_json,
+    player_json_exists,
+    write_player_roles,
+)
 from .char_state import record_refresh_batch, bump_single_refresh, mark_owned_checked
+from .char_ownership import schedule_ownership_update
 from .api.model import AccountBaseInfo as _AccountBaseInfo
 
 _BG_TASKS: set = set()
@@ -71,25 +75,21 @@ def schedule_silent_diff_refresh(
 
 
 async def save_base_info_cache(uid: str, account_info: _AccountBaseInfo):
-    """将账户基本信息（世界等级等）缓存到文件"""
-    _dir = PLAYER_PATH / uid
-    _dir.mkdir(parents=True, exist_ok=True)
-    path = _dir / "baseInfo.json"
+    """将账户基本信息（世界等级等）缓存到 sidecar 容器"""
+    path = PLAYER_PATH / uid / "baseInfo.json"
     try:
-        async with aiofiles.open(path, "w", encoding="utf-8") as f:
-            await f.write(account_info.model_dump_json())
+        await write_player_json(path, account_info.model_dump(mode="json"))
     except Exception as e:
         logger.exception(f"[鸣潮·角色状态] save_base_info_cache failed {path}:", e)
 
 
 async def load_base_info_cache(uid: str) -> Optional[_AccountBaseInfo]:
-    """从缓存文件读取账户基本信息"""
+    """从 sidecar 容器读取账户基本信息"""
     path = PLAYER_PATH / uid / "baseInfo.json"
-    if not path.exists():
+    data = await read_player_json(path)
+    if data is None:
         return None
     try:
-        async with aiofiles.open(path, "r", encoding="utf-8") as f:
-            data = json.loads(await f.read())
         return _AccountBaseInfo.model_validate(data)
     except Exception as e:
         logger.exception(f"[鸣潮·角色状态] load_base_info_cache failed {path}:", e)
@@ -246,18 +246,29 @@ async def save_card_info(
     _dir.mkdir(parents=True, exist_ok=True)
     path = _dir / "rawData.json"
 
+    # 单角色刷新只按角色读写 rawData 对应记录, 不整份解压重写
+    partial = len(waves_data) == 1
     old_data = {}
-    old = await read_player_json(path)
-    rawdata_corrupt = old is None and player_json_exists(path)
-    if old:
-        try:
-            old_data = {d["role"]["roleId"]: d for d in old}
-        except Exception as e:
-            logger.exception(f"[鸣潮·角色状态] save_card_info get failed {path}:", e)
+    if partial:
+        want = {item["role"]["roleId"] for item in waves_data}
+        if want & set(SPECIAL_CHAR_INT_ALL):
+            want |= set(SPECIAL_CHAR_INT_ALL)
+        old_map = await read_player_roles(path, want)
+        rawdata_corrupt = old_map is None
+        old_data = dict(old_map or {})
+    else:
+        old = await read_player_json(path)
+        rawdata_corrupt = old is None and player_json_exists(path)
+        if old:
+            try:
+                old_data = {d["role"]["roleId"]: d for d in old}
+            except Exception as e:
+                logger.exception(f"[鸣潮·角色状态] save_card_info get failed {path}:", e)
 
     #
     refresh_update = {}
     refresh_unchanged = {}
+    removed_ids = []
     for item in waves_data:
         role_id = item["role"]["roleId"]
 
@@ -269,6 +280,7 @@ async def save_card_info(
                     continue
                 if piaobo_id != role_id:
                     del old_data[piaobo_id]
+                    removed_ids.append(piaobo_id)
 
         old = old_data.get(role_id)
         cleaned_item = remove_urls_from_data(item)
@@ -292,9 +304,17 @@ async def save_card_info(
     if rawdata_corrupt:
         logger.error(f"[鸣潮·角色状态] rawData 读取失败, 跳过保存以防覆盖 {path}")
     else:
-        cleaned_data = remove_urls_from_data(save_data)
+        if partial:
+            cleaned_data = remove_urls_from_data([old_data[it["role"]["roleId"]] for it in waves_data])
+        else:
+            cleaned_data = remove_urls_from_data(save_data)
         try:
-            await write_player_json(path, cleaned_data)
+            if partial:
+                await write_player_roles(path, cleaned_data, removed_ids)
+            else:
+                await write_player_json(path, cleaned_data)
+            # 群持有率矩阵: 后台写入本次保存的角色共鸣链
+            schedule_ownership_update(uid, cleaned_data, removed_ids, replace=not partial)
         except Exception as e:
             logger.exception(f"[鸣潮·角色状态] save_card_info save failed {path}:", e)
 
@@ -314,6 +334,11 @@ async def save_card_info(
             except Exception as e:
                 logger.exception("[鸣潮·角色状态] save rover.json failed:", e)
 
+        # 群排行索引: 只重算本次变更的角色, 后台写入
+        if refresh_update:
+            from ..wutheringwaves_rank.rank_index import schedule_rank_index_update
+            schedule_rank_index_update(uid, list(refresh_update.values()))
+
     # 保存charListData.json（角色评分缓存）—— 只算本次变更的角色, 未变更角色 score 不变
     waves_char_rank = await get_waves_char_rank(uid, list(refresh_update.values()), True)
 
@@ -394,7 +419,7 @@ async def save_char_list_cache(uid: str, waves_char_rank: Optional[List[WavesCha
         # 加载现有的角色评分数据
         existing_char_list_data = await load_char_list_data(uid)
         if existing_char_list_data is None:
-            if (PLAYER_PATH / uid / "charListData.json").exists():
+            if player_json_exists(PLAYER_PATH / uid / "charListData.json"):
                 logger.error(f"[鸣潮·角色状态] charListData 读取失败, 跳过保存防覆盖 uid={uid}")
                 return
             existing_char_list_data = {}
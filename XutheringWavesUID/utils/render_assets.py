@@ -0,0 +1,167 @@
+"""Playwright 渲染用的内容寻址图片地址。
+
+各卡片把头像 / 立绘 / 背景以 base64 data URL 塞进 HTML, 单次 ``set_content`` 动辄
+数 MB, Chromium 每次都要重新解析、解码。这里提供 ``/waves/assets/{digest}.{ext}``
+路由, 只对外暴露已登记的内容 (文件按 路径+mtime+大小 取摘要, 内存图片按字节取
+摘要), 地址随内容变化, 可长期缓存, 浏览器在多次渲染间复用已解码的图片。
+
+- 模板 / 代码侧用 ``file_asset_url`` / ``bytes_asset_url`` (模板内为 ``asset_url``)
+  得到占位地址 ``wwasset://<digest>.<ext>``;
+- ``render_html`` 本地渲染时 ``externalize_html`` 把占位地址换成本地路由, 并把仍
+  内联的大 data URL 抽出登记; 外置渲染访问不到本机, ``inline_html`` 把占位地址还原
+  为 data URL。
+"""
+import re
+import base64
+import hashlib
+import mimetypes
+from pathlib import Path
+from collections import OrderedDict
+from typing import Tuple, Union, Optional
+
+from starlette.responses import Response, FileResponse
+
+from gsuid_core.web_app import app
+
+ASSET_ROUTE = "/waves/assets"
+ASSET_SCHEME = "wwasset://"
+
+# 文件登记只存路径, 条数上限即可; 内存图片按总字节数淘汰
+_MAX_FILE_ASSETS = 4096
+_MAX_BLOB_BYTES = 64 * 1024 * 1024
+# 过小的 data URL 留在 HTML 里, 多一次请求不划算
+_MIN_EXTERNALIZE_BYTES = 2048
+
+_CACHE_HEADERS = {
+    "Cache-Control": "public, max-age=31536000, immutable",
+    "Access-Control-Allow-Origin": "*",
+}
+
+_DATA_URL_RE = re.compile(r"data:image/([a-zA-Z0-9.+-]+);base64,([A-Za-z0-9+/=]+)")
+_PLACEHOLDER_RE = re.compile(re.escape(ASSET_SCHEME) + r"([0-9a-f]{40}\.[a-z0-9]+)")
+
+
+def _media_type(ext: str) -> str:
+    return mimetypes.types_map.get(f".{ext}") or f"image/{ext}"
+
+
+def _norm_ext(ext: str) -> str:
+    ext = ext.lower().lstrip(".")
+    if ext == "jpg":
+        return "jpeg"
+    if ext == "svg+xml":
+        return "svg"
+    return ext
+
+
+class AssetRegistry:
+    def __init__(self):
+        self._files: "OrderedDict[str, Path]" = OrderedDict()
+        self._blobs: "OrderedDict[str, bytes]" = OrderedDict()
+        self._blob_bytes = 0
+
+    def add_file(self, path: Path) -> str:
+        stat = path.stat()
+        key = f"{path.resolve()}:{stat.st_mtime_ns}:{stat.st_size}"
+        name = f"{hashlib.sha1(key.encode()).hexdigest()}.{_norm_ext(path.suffix) or 'bin'}"
+        self._files[name] = path
+        self._files.move_to_end(name)
+        while len(self._files) > _MAX_FILE_ASSETS:
+            self._files.popitem(last=False)
+        return name
+
+    def add_bytes(self, data: bytes, ext: str) -> str:
+        name = f"{hashlib.sha1(data).hexdigest()}.{_norm_ext(ext)}"
+        if name in self._blobs:
+            self._blobs.move_to_end(name)
+            return name
+        self._blobs[name] = data
+        self._blob_bytes += len(data)
+        while self._blob_bytes > _MAX_BLOB_BYTES and len(self._blobs) > 1:
+            _, old = self._blobs.popitem(last=False)
+            self._blob_bytes -= len(old)
+        return name
+
+    def get(self, name: str) -> Optional[Union[Path, bytes]]:
+        if name in self._blobs:
+            return self._blobs[name]
+        path = self._files.get(name)
+        if path is not None and path.exists():
+            return path
+        return None
+
+    def stats(self) -> Tuple[int, int, int]:
+        return len(self._files), len(self._blobs), self._blob_bytes
+
+
+asset_registry = AssetRegistry()
+
+
+def file_asset_url(path: Union[str, Path]) -> str:
+    """本地文件 → 占位地址; 文件不存在返回空串 (同 img_to_b64)。"""
+    path = Path(path)
+    if not path.exists():
+        return ""
+    return ASSET_SCHEME + asset_registry.add_file(path)
+
+
+def bytes_asset_url(data: bytes, ext: str) -> str:
+    """内存中的图片字节 → 占位地址。"""
+    if not data:
+        return ""
+    return ASSET_SCHEME + asset_registry.add_bytes(data, ext)
+
+
+def _asset_bytes(name: str) -> Optional[bytes]:
+    item = asset_registry.get(name)
+    if item is None:
+        return None
+    if isinstance(item, bytes):
+        return item
+    try:
+        return item.read_bytes()
+    except OSError:
+        return None
+
+
+def externalize_html(html: str, base_url: str) -> str:
+    """本地渲染: 占位地址 → 本地路由, 较大的内联 data URL 抽出登记后同样替换。"""
+    prefix = f"{base_url}{ASSET_ROUTE}/"
+
+    def _replace_data_url(m: "re.Match[str]") -> str:
+        payload = m.group(2)
+        if len(payload) < _MIN_EXTERNALIZE_BYTES:
+            return m.group(0)
+        try:
+            data = base64.b64decode(payload)
+        except Exception:
+            return m.group(0)
+        return prefix + asset_registry.add_bytes(data, m.group(1))
+
+    html = _DATA_URL_RE.sub(_replace_data_url, html)
+    return _PLACEHOLDER_RE.sub(lambda m: prefix + m.group(1), html)
+
+
+def inline_html(html: str) -> str:
+    """外置渲染: 占位地址还原为 data URL。"""
+
+    def _replace(m: "re.Match[str]") -> str:
+        name = m.group(1)
+        data = _asset_bytes(name)
+        if data is None:
+            return ""
+        ext = name.rsplit(".", 1)[-1]
+        return f"data:{_media_type(ext)};base64,{base64.b64encode(data).decode('utf-8')}"
+
+    return _PLACEHOLDER_RE.sub(_replace, html)
+
+
+@app.get(ASSET_ROUTE + "/{name}")
+async def _serve_render_asset(name: str):
+    item = asset_registry.get(name)
+    if item is None:
+        return Response(status_code=404)
+    media_type = _media_type(name.rsplit(".", 1)[-1])
+    if isinstance(item, bytes):
+        return Response(content=item, media_type=media_type, headers=_CACHE_HEADERS)
+    return FileResponse(item, media_type=media_type, headers=_CACHE_HEADERS)
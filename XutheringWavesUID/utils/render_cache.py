@@ -0,0 +1,238 @@
+"""渲染结果缓存。
+
+wiki / 公告 / 帮助等卡片在资源更新前输入不会变, 重复请求却每次都要走一遍 Playwright
+或 PIL。这里按「名称 + 输入摘要 + 资源版本」缓存最终图片字节 (JPEG/PNG) 到磁盘,
+总大小超过 ``RenderCacheSize`` 时按最久未使用淘汰, 资源重新下载后整体清空。
+
+- ``render_html(..., cache=True)``: 以渲染出的 HTML 为输入摘要 (图片已是内容寻址
+  地址或 data URL, 模板改动也会体现在 HTML 里);
+- ``@cached_render(name, key=...)``: 用于直接返回图片字节的 PIL 卡片函数, ``key``
+  把参数映射为可序列化的输入, 被装饰函数所在文件的修改时间一并计入。
+"""
+import os
+import json
+import time
+import asyncio
+import hashlib
+import inspect
+import functools
+import threading
+from pathlib import Path
+from collections import OrderedDict
+from typing import Any, Dict, Tuple, Callable, Optional
+
+from gsuid_core.logger import logger
+
+from ..version import XutheringWavesUID_version
+from .resource.RESOURCE_PATH import RENDER_CACHE_PATH
+
+# 资源重新下载 / 清空缓存时递增, 与插件版本一起计入缓存键
+_resource_generation = 0
+
+
+def is_render_cache_enabled() -> bool:
+    from ..wutheringwaves_config import WutheringWavesConfig
+
+    return bool(WutheringWavesConfig.get_config("RenderCache").data)
+
+
+def _max_cache_bytes() -> int:
+    from ..wutheringwaves_config import WutheringWavesConfig
+
+    return max(1, int(WutheringWavesConfig.get_config("RenderCacheSize").data)) * 1024 * 1024
+
+
+def _stable_default(obj: Any) -> Any:
+    """json.dumps 的兜底: 保证同样的输入得到同样的序列化结果。"""
+    if isinstance(obj, Path):
+        try:
+            stat = obj.stat()
+            return [str(obj), stat.st_mtime_ns, stat.st_size]
+        except OSError:
+            return str(obj)
+    if isinstance(obj, (bytes, bytearray)):
+        return hashlib.sha1(obj).hexdigest()
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj, key=str)
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump()
+    if hasattr(obj, "tobytes") and hasattr(obj, "size") and hasattr(obj, "mode"):
+        # PIL Image
+        return [obj.mode, list(obj.size), hashlib.sha1(obj.tobytes()).hexdigest()]
+    return str(obj)
+
+
+def make_cache_key(name: str, payload: Any) -> str:
+    raw = json.dumps(
+        [name, XutheringWavesUID_version, _resource_generation, payload],
+        sort_keys=True,
+        ensure_ascii=False,
+        default=_stable_default,
+    )
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _image_ext(data: bytes) -> str:
+    return "png" if data.startswith(b"\x89PNG") else "jpg"
+
+
+class RenderCache:
+    def __init__(self, root: Path):
+        self.root = root
+        self._lock = threading.Lock()
+        # key -> (文件路径, 字节数), 顺序即最近使用顺序
+        self._index: Optional["OrderedDict[str, Tuple[Path, int]]"] = None
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _ensure_index(self) -> "OrderedDict[str, Tuple[Path, int]]":
+        if self._index is not None:
+            return self._index
+        entries = []
+        if self.root.exists():
+            for p in self.root.iterdir():
+                if not p.is_file() or p.suffix not in (".jpg", ".png"):
+                    continue
+                try:
+                    stat = p.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, p.stem, p, stat.st_size))
+        entries.sort()
+        self._index = OrderedDict((key, (p, size)) for _, key, p, size in entries)
+        self._bytes = sum(size for _, _, _, size in entries)
+        return self._index
+
+    def get(self, key: str, ttl: int = 0) -> Optional[bytes]:
+        with self._lock:
+            index = self._ensure_index()
+            item = index.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            path, _ = item
+            try:
+                if ttl and time.time() - path.stat().st_mtime > ttl:
+                    raise FileNotFoundError(path)
+                data = path.read_bytes()
+            except OSError:
+                self._drop(key)
+                self.misses += 1
+                return None
+            index.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def put(self, key: str, data: bytes) -> None:
+        with self._lock:
+            index = self._ensure_index()
+            self._drop(key)
+            path = self.root / f"{key}.{_image_ext(data)}"
+            tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            try:
+                self.root.mkdir(parents=True, exist_ok=True)
+                tmp.write_bytes(data)
+                tmp.replace(path)
+            except OSError as e:
+                tmp.unlink(missing_ok=True)
+                logger.warning(f"[鸣潮·渲染缓存] 写入失败 {path.name}: {e}")
+                return
+            index[key] = (path, len(data))
+            self._bytes += len(data)
+            limit = _max_cache_bytes()
+            while self._bytes > limit and len(index) > 1:
+                self._drop(next(iter(index)))
+
+    def _drop(self, key: str) -> None:
+        assert self._index is not None
+        item = self._index.pop(key, None)
+        if item is None:
+            return
+        path, size = item
+        self._bytes -= size
+        path.unlink(missing_ok=True)
+
+    def clear(self) -> Tuple[int, int]:
+        """删除全部缓存文件, 返回 (文件数, 字节数)。"""
+        with self._lock:
+            index = self._ensure_index()
+            count, size = len(index), self._bytes
+            for key in list(index):
+                self._drop(key)
+            self._bytes = 0
+            return count, size
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            index = self._ensure_index()
+            total = self.hits + self.misses
+            return {
+                "entries": len(index),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+    async def aget(self, key: str, ttl: int = 0) -> Optional[bytes]:
+        return await asyncio.to_thread(self.get, key, ttl)
+
+    async def aput(self, key: str, data: bytes) -> None:
+        await asyncio.to_thread(self.put, key, data)
+
+
+render_cache = RenderCache(RENDER_CACHE_PATH)
+
+
+def clear_render_cache() -> Tuple[int, int]:
+    """资源更新后调用: 清空渲染缓存并让旧键全部失效。"""
+    global _resource_generation
+    _resource_generation += 1
+    return render_cache.clear()
+
+
+def get_render_cache_stats() -> Dict[str, Any]:
+    return render_cache.stats()
+
+
+def _source_version(func: Callable[..., Any]) -> Any:
+    try:
+        stat = Path(inspect.getfile(func)).stat()
+        return [func.__module__, func.__qualname__, stat.st_mtime_ns]
+    except (TypeError, OSError):
+        return [func.__module__, func.__qualname__]
+
+
+def cached_render(name: str, key: Callable[..., Any], ttl: int = 0):
+    """缓存返回图片字节的异步绘图函数; 返回非 bytes (如错误提示文本) 时不缓存。
+
+    key: 与被装饰函数同签名, 返回决定输出的全部输入 (可 JSON 序列化, Path / PIL 图片 /
+         pydantic 模型会按内容展开)。ttl: 秒, 0 表示只在资源更新时失效。
+    """
+
+    def decorator(func: Callable[..., Any]):
+        source = _source_version(func)
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            if not is_render_cache_enabled():
+                return await func(*args, **kwargs)
+            try:
+                cache_key = make_cache_key(name, [source, key(*args, **kwargs)])
+            except Exception as e:
+                logger.debug(f"[鸣潮·渲染缓存] {name} 计算缓存键失败, 跳过缓存: {e}")
+                return await func(*args, **kwargs)
+
+            cached = await render_cache.aget(cache_key, ttl)
+            if cached is not None:
+                logger.debug(f"[鸣潮·渲染缓存] 命中 {name}")
+                return cached
+            result = await func(*args, **kwargs)
+            if isinstance(result, bytes) and result:
+                await render_cache.aput(cache_key, result)
+            return result
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,401 @@
+"""HTML 渲染池。
+
+本地 Chromium:
+- 一个浏览器进程, ``RenderPoolPages`` 个常驻页面 (每 ``_PAGES_PER_CONTEXT`` 个页面共用
+  一个 context, 共享图片 / 字体的 HTTP 缓存), 启动时一次建好, 渲染时借出、用完归还;
+- 无空闲页面时排队, 排队数超过 ``RenderQueueSize`` 直接拒绝, 等待超过
+  ``RenderQueueTimeout`` 秒放弃; 两种情况 ``render_html`` 返回 None, 调用方回退 PIL;
+- 浏览器进程树 RSS 超过 ``RenderRestartRss`` (MB)、渲染次数过多、长时间空闲或断开时
+  标记重启: 之后归还的页面暂扣不再借出, 在途渲染全部结束后整体重建, 排队中的请求
+  直接拿到新页面。
+
+外置渲染服务共用一个 httpx.AsyncClient (连接复用)。两种后端都可用时按
+``RemoteRenderWeight`` (%) 随机决定先走哪个, 失败再试另一个。
+
+每个 模板 + 后端 的耗时以及排队时间记入直方图, 见 ``get_render_stats``。
+"""
+import time
+import bisect
+import random
+import asyncio
+from typing import Any, Dict, List, Tuple, Optional
+
+import httpx
+
+from gsuid_core.logger import logger
+from gsuid_core.server import on_core_shutdown
+
+from ..wutheringwaves_config.wutheringwaves_config import WutheringWavesConfig
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+def _import_playwright():
+    try:
+        from playwright.async_api import async_playwright
+        return async_playwright
+    except ImportError:
+        if not WutheringWavesConfig.get_config("RemoteRenderEnable").data:
+            logger.warning("[鸣潮·渲染工具] 未安装 playwright，无法使用渲染公告、wiki图等功能。")
+            logger.warning("[鸣潮·渲染工具] 可选择配置外置渲染方法！")
+            logger.info("[鸣潮·渲染工具] 安装方法 Linux/Mac: 在当前目录下执行 source .venv/bin/activate && uv pip install playwright && uv run playwright install chromium")
+            logger.info("[鸣潮·渲染工具] 安装方法 Windows: 在当前目录下执行 .venv\\Scripts\\activate; uv pip install playwright; uv run playwright install chromium")
+        return None
+
+
+async_playwright = _import_playwright()
+PLAYWRIGHT_AVAILABLE = async_playwright is not None
+
+_VIEWPORT = {"width": 1200, "height": 1000}
+_PAGES_PER_CONTEXT = 4
+_MAX_BROWSER_USES = 1000
+_BROWSER_IDLE_TTL = 3600
+_RSS_CHECK_INTERVAL = 30.0
+# 启动失败后的重试间隔, 避免缺 chromium 时每次请求都尝试拉起
+_START_RETRY_INTERVAL = 60.0
+
+_REMOTE_TIMEOUT = 60.0
+_REMOTE_MAX_CONNECTIONS = 8
+
+# 耗时直方图桶上界 (ms)
+_BUCKETS_MS = (50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000)
+
+# (page, context 序号, 代数)
+PageSlot = Tuple[Any, int, int]
+
+
+def _cfg(name: str) -> Any:
+    return WutheringWavesConfig.get_config(name).data
+
+
+class TimingHistogram:
+    __slots__ = ("counts", "count", "total_ms")
+
+    def __init__(self):
+        self.counts = [0] * (len(_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+
+    def observe(self, ms: float) -> None:
+        self.counts[bisect.bisect_left(_BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+
+    def percentile(self, q: float) -> float:
+        """按桶上界估算分位数 (ms), 落在最后一个桶返回 inf。"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        acc = 0
+        for i, n in enumerate(self.counts):
+            acc += n
+            if acc >= target:
+                return float(_BUCKETS_MS[i]) if i < len(_BUCKETS_MS) else float("inf")
+        return float("inf")
+
+    def to_dict(self) -> Dict[str, Any]:
+        labels = [f"<={b}ms" for b in _BUCKETS_MS] + [f">{_BUCKETS_MS[-1]}ms"]
+        return {
+            "count": self.count,
+            "avg_ms": self.total_ms / self.count if self.count else 0.0,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+# (模板, 后端) -> 成功渲染耗时
+_render_hist: Dict[Tuple[str, str], TimingHistogram] = {}
+_render_total = TimingHistogram()
+_queue_wait = TimingHistogram()
+_render_failures: Dict[str, int] = {}
+
+
+def observe_render(template_name: str, backend: str, seconds: float) -> None:
+    ms = seconds * 1000
+    hist = _render_hist.get((template_name, backend))
+    if hist is None:
+        hist = _render_hist[(template_name, backend)] = TimingHistogram()
+    hist.observe(ms)
+    _render_total.observe(ms)
+
+
+def record_render_failure(backend: str) -> None:
+    _render_failures[backend] = _render_failures.get(backend, 0) + 1
+
+
+def _browser_rss_mb() -> float:
+    """本进程派生的 Chromium 进程树 RSS 合计 (MB)。"""
+    if psutil is None:
+        return 0.0
+    total = 0
+    for proc in psutil.Process().children(recursive=True):
+        try:
+            name = proc.name().lower()
+            if "chrom" in name or "headless" in name:
+                total += proc.memory_info().rss
+        except psutil.Error:
+            continue
+    return total / 1024 / 1024
+
+
+class LocalRenderPool:
+    def __init__(self):
+        self._lock = asyncio.Lock()
+        self._idle: asyncio.Queue = asyncio.Queue()
+        self._playwright = None
+        self._browser = None
+        self._contexts: List[Any] = []
+        self._size = 0
+        self._generation = 0
+        self._active = 0
+        self._waiting = 0
+        self._uses = 0
+        self._last_used = 0.0
+        self._last_rss_check = 0.0
+        self._start_failed_at = 0.0
+        self._restart_reason = ""
+        self.rejected = 0
+        self.timeouts = 0
+        self.restarts = 0
+        self.last_rss_mb = 0.0
+
+    def _request_restart(self, reason: str) -> None:
+        if not self._restart_reason:
+            logger.info(f"[鸣潮·渲染池] 计划重启浏览器: {reason}")
+            self._restart_reason = reason
+
+    async def _start(self) -> bool:
+        """(持锁) 启动浏览器并建好全部常驻页面。"""
+        if async_playwright is None:
+            return False
+        if self._start_failed_at and time.monotonic() - self._start_failed_at < _START_RETRY_INTERVAL:
+            return False
+
+        size = max(1, int(_cfg("RenderPoolPages")))
+        try:
+            if self._playwright is None:
+                self._playwright = await async_playwright().start()
+            self._browser = await self._playwright.chromium.launch(
+                args=["--no-sandbox", "--disable-setuid-sandbox"]
+            )
+            n_ctx = -(-size // _PAGES_PER_CONTEXT)
+            self._contexts = [await self._browser.new_context(viewport=_VIEWPORT) for _ in range(n_ctx)]
+            for i in range(size):
+                page = await self._contexts[i % n_ctx].new_page()
+                self._idle.put_nowait((page, i % n_ctx, self._generation))
+        except Exception as e:
+            logger.error(f"[鸣潮·渲染池] 浏览器启动失败: {e}")
+            self._start_failed_at = time.monotonic()
+            await self._close_browser()
+            return False
+
+        self._size = size
+        self._uses = 0
+        self._start_failed_at = 0.0
+        self._last_used = time.monotonic()
+        logger.info(f"[鸣潮·渲染池] 浏览器已启动, 常驻页面 {size} 个 / context {len(self._contexts)} 个")
+        return True
+
+    async def _close_browser(self) -> None:
+        """(持锁) 关闭浏览器, 作废全部页面。"""
+        self._generation += 1
+        while not self._idle.empty():
+            self._idle.get_nowait()
+        browser, self._browser = self._browser, None
+        self._contexts = []
+        if browser is not None:
+            try:
+                await browser.close()
+            except Exception:
+                pass
+
+    async def _restart(self) -> None:
+        """(持锁, 无在途渲染) 重建浏览器与页面。"""
+        self._restart_reason = ""
+        self.restarts += 1
+        await self._close_browser()
+        self._start_failed_at = 0.0
+        await self._start()
+
+    async def _ensure_ready(self) -> bool:
+        browser = self._browser
+        if browser is not None and browser.is_connected() and not self._restart_reason:
+            idle = time.monotonic() - self._last_used
+            if not (self._active == 0 and self._last_used and idle > _BROWSER_IDLE_TTL):
+                return True
+            self._request_restart(f"空闲 {idle:.0f}s")
+
+        async with self._lock:
+            if self._browser is None:
+                return await self._start()
+            if not self._browser.is_connected():
+                self._request_restart("浏览器已断开")
+            if self._restart_reason and self._active == 0:
+                await self._restart()
+            # 仍有在途渲染时先排队, 最后一个归还时重建并补充页面
+            return self._browser is not None
+
+    async def acquire(self) -> Optional[PageSlot]:
+        """借出一个页面; 排队已满、等待超时或浏览器不可用时返回 None。"""
+        if self._idle.empty() and self._waiting >= int(_cfg("RenderQueueSize")):
+            self.rejected += 1
+            logger.warning(f"[鸣潮·渲染池] 排队已满 ({self._waiting}), 本次回退")
+            return None
+
+        self._waiting += 1
+        start = time.perf_counter()
+        try:
+            if not await self._ensure_ready():
+                return None
+            try:
+                slot = await asyncio.wait_for(self._idle.get(), timeout=float(_cfg("RenderQueueTimeout")))
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                logger.warning(f"[鸣潮·渲染池] 等待页面超时 ({time.perf_counter() - start:.1f}s), 本次回退")
+                return None
+        finally:
+            self._waiting -= 1
+
+        _queue_wait.observe((time.perf_counter() - start) * 1000)
+        self._active += 1
+        return slot
+
+    async def release(self, slot: PageSlot, broken: bool = False) -> None:
+        """归还页面; broken=True 表示页面状态不可信, 关闭后在同一 context 里重建。"""
+        page, ctx_index, gen = slot
+        self._active = max(0, self._active - 1)
+        self._uses += 1
+        self._last_used = time.monotonic()
+
+        if self._uses >= _MAX_BROWSER_USES:
+            self._request_restart(f"已渲染 {self._uses} 次")
+        if self._size and int(_cfg("RenderPoolPages")) != self._size:
+            self._request_restart("页面数配置已修改")
+        await self._check_rss()
+
+        if gen != self._generation:
+            await _close_page(page)
+            return
+
+        if self._restart_reason:
+            # 暂扣页面不再借出, 最后一个在途渲染结束时整体重建
+            if self._active == 0:
+                async with self._lock:
+                    if self._restart_reason and self._active == 0:
+                        await self._restart()
+            return
+
+        if broken or page.is_closed():
+            await _close_page(page)
+            try:
+                page = await self._contexts[ctx_index].new_page()
+            except Exception as e:
+                logger.warning(f"[鸣潮·渲染池] 重建页面失败: {e}")
+                self._request_restart("重建页面失败")
+                if self._active == 0:
+                    async with self._lock:
+                        if self._restart_reason and self._active == 0:
+                            await self._restart()
+                return
+
+        self._idle.put_nowait((page, ctx_index, gen))
+
+    async def _check_rss(self) -> None:
+        limit = int(_cfg("RenderRestartRss"))
+        if limit <= 0 or psutil is None or self._browser is None:
+            return
+        now = time.monotonic()
+        if now - self._last_rss_check < _RSS_CHECK_INTERVAL:
+            return
+        self._last_rss_check = now
+        try:
+            self.last_rss_mb = await asyncio.to_thread(_browser_rss_mb)
+        except Exception as e:
+            logger.debug(f"[鸣潮·渲染池] 读取浏览器内存失败: {e}")
+            return
+        if self.last_rss_mb > limit:
+            self._request_restart(f"RSS {self.last_rss_mb:.0f}MB 超过 {limit}MB")
+
+    async def close(self) -> None:
+        async with self._lock:
+            await self._close_browser()
+            if self._playwright is not None:
+                try:
+                    await self._playwright.stop()
+                except Exception:
+                    pass
+                self._playwright = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pages": self._size,
+            "active": self._active,
+            "waiting": self._waiting,
+            "uses": self._uses,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+            "restarts": self.restarts,
+            "rss_mb": self.last_rss_mb,
+            "restart_pending": self._restart_reason,
+        }
+
+
+async def _close_page(page) -> None:
+    try:
+        await page.close()
+    except Exception:
+        pass
+
+
+local_pool = LocalRenderPool()
+
+_remote_client: Optional[httpx.AsyncClient] = None
+
+
+def get_remote_client() -> httpx.AsyncClient:
+    """外置渲染共用的 HTTP 客户端 (保持连接, 限制并发连接数)。"""
+    global _remote_client
+    if _remote_client is None or _remote_client.is_closed:
+        _remote_client = httpx.AsyncClient(
+            timeout=_REMOTE_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=_REMOTE_MAX_CONNECTIONS,
+                max_keepalive_connections=_REMOTE_MAX_CONNECTIONS,
+            ),
+        )
+    return _remote_client
+
+
+def backend_order(remote_available: bool, local_available: bool) -> List[str]:
+    """本次渲染依次尝试的后端。"""
+    backends = []
+    if remote_available:
+        backends.append("remote")
+    if local_available:
+        backends.append("local")
+    if len(backends) == 2 and random.randrange(100) >= int(_cfg("RemoteRenderWeight")):
+        backends.reverse()
+    return backends
+
+
+@on_core_shutdown
+async def close_render_pool() -> None:
+    global _remote_client
+    await local_pool.close()
+    if _remote_client is not None:
+        await _remote_client.aclose()
+        _remote_client = None
+
+
+def get_render_stats() -> Dict[str, Any]:
+    return {
+        "pool": local_pool.stats(),
+        "queue_wait": _queue_wait.to_dict(),
+        "total": _render_total.to_dict(),
+        "failures": dict(_render_failures),
+        "templates": {f"{name}@{backend}": hist.to_dict() for (name, backend), hist in _render_hist.items()},
+    }
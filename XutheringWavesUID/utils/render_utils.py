@@ -1,8 +1,7 @@
 import base64
-import asyncio
 import time
 import logging
-from typing import Union, Optional
+from typing import Tuple, Union, Optional
 from pathlib import Path
 
 import httpx
@@ -13,11 +12,28 @@ from gsuid_core.config import core_config, CONFIG_DEFAULT
 from gsuid_core.app_life import app as fastapi_app
 from fastapi.staticfiles import StaticFiles
 from .resource.RESOURCE_PATH import TEMP_PATH
+from .render_assets import (
+    ASSET_ROUTE,
+    inline_html,
+    file_asset_url,
+    bytes_asset_url,
+    externalize_html,
+)
+from .render_pool import (
+    PLAYWRIGHT_AVAILABLE,
+    local_pool,
+    backend_order,
+    observe_render,
+    get_remote_client,
+    record_render_failure,
+)
+from .render_cache import render_cache, make_cache_key, is_render_cache_enabled
 from ..wutheringwaves_config.wutheringwaves_config import WutheringWavesConfig
 from ..wutheringwaves_config.config_default import CONFIG_DEFAULT as WW_CONFIG_DEFAULT
 
 logging.getLogger("uvicorn.access").addFilter(
     lambda record: "/waves/fonts" not in record.getMessage()
+    and ASSET_ROUTE not in record.getMessage()
 )
 
 TEMPLATES_ABS_PATH = Path(__file__).parent.parent / "templates"
@@ -30,37 +46,6 @@ class CORSStaticFiles(StaticFiles):
         response.headers["Access-Control-Allow-Methods"] = "GET, HEAD"
         return response
 
-def _import_playwright():
-    try:
-        from playwright.async_api import async_playwright
-        return async_playwright
-    except ImportError:
-        if not WutheringWavesConfig.get_config("RemoteRenderEnable").data:
-            logger.warning("[鸣潮·渲染工具] 未安装 playwright，无法使用渲染公告、wiki图等功能。")
-            logger.warning("[鸣潮·渲染工具] 可选择配置外置渲染方法！")
-            logger.info("[鸣潮·渲染工具] 安装方法 Linux/Mac: 在当前目录下执行 source .venv/bin/activate && uv pip install playwright && uv run playwright install chromium")
-            logger.info("[鸣潮·渲染工具] 安装方法 Windows: 在当前目录下执行 .venv\\Scripts\\activate; uv pip install playwright; uv run playwright install chromium")
-        return None
-
-
-async_playwright = _import_playwright()
-PLAYWRIGHT_AVAILABLE = async_playwright is not None
-
-_playwright = None
-_browser = None
-_browser_lock = asyncio.Lock()
-_browser_uses = 0
-_last_used = 0.0
-_active_renders = 0
-
-_MAX_BROWSER_USES = 1000
-_BROWSER_IDLE_TTL = 3600
-
-# Page pool for reuse (avoids context/page creation overhead per render)
-_page_pool: asyncio.Queue = asyncio.Queue()
-_pool_ctx = None
-_pool_generation = 0  # Incremented on browser restart to invalidate stale pages
-
 _FONT_CSS_NAME = "fonts.css"
 _FONTS_DIR = TEMP_PATH / "fonts"
 
@@ -99,145 +84,27 @@ def _get_local_base_url() -> str:
 _mount_fonts()
 
 
-async def _ensure_browser():
-    """Get a reusable browser instance; restart periodically to bound memory."""
-    global _playwright, _browser, _browser_uses, _last_used, _active_renders
-    global _pool_ctx, _pool_generation
-
-    if not PLAYWRIGHT_AVAILABLE or async_playwright is None:
-        return None
-
-    async with _browser_lock:
-        now = time.monotonic()
-
-        if _browser is not None and not _browser.is_connected():
-            try:
-                await _browser.close()
-            except Exception:
-                pass
-            _browser = None
-
-        need_restart = (
-            _browser is None
-            or _browser_uses >= _MAX_BROWSER_USES
-            or (_last_used > 0 and now - _last_used > _BROWSER_IDLE_TTL)
-        )
-
-        if need_restart and _browser is not None and _active_renders > 0:
-            need_restart = False
-
-        if need_restart:
-            if _browser is not None:
-                try:
-                    await _browser.close()
-                except Exception:
-                    pass
-                _browser = None
-
-            # Invalidate page pool (old pages belong to dead browser)
-            _pool_ctx = None
-            _pool_generation += 1
-            # Drain stale pages
-            while not _page_pool.empty():
-                try:
-                    _page_pool.get_nowait()
-                except asyncio.QueueEmpty:
-                    break
-
-            if _playwright is None:
-                _playwright = await async_playwright().start()
-
-            _browser = await _playwright.chromium.launch(
-                args=["--no-sandbox", "--disable-setuid-sandbox"]
-            )
-            _browser_uses = 0
-
-        _last_used = now
-        return _browser
-
-
-_pool_lock = asyncio.Lock()
-
-
-async def _acquire_page():
-    """Get a reusable page from the pool, or create a new one."""
-    global _pool_ctx, _active_renders
-
-    browser = await _ensure_browser()
-    if browser is None:
-        return None, -1
-
-    async with _pool_lock:
-        gen = _pool_generation
-
-        # Try to reuse a pooled page
-        while not _page_pool.empty():
-            try:
-                page, page_gen = _page_pool.get_nowait()
-                if page_gen == gen and not page.is_closed():
-                    _active_renders += 1
-                    return page, gen
-            except asyncio.QueueEmpty:
-                break
-
-        # Create shared context if needed (rare, only first time)
-        ctx_closed = _pool_ctx is None
-        if not ctx_closed:
-            try:
-                ctx_closed = _pool_ctx._impl_obj._is_closed
-            except AttributeError:
-                # Playwright 版本不支持 _is_closed，尝试创建页面来检测
-                ctx_closed = True
-        if ctx_closed:
-            _pool_ctx = await browser.new_context(
-                viewport={"width": 1200, "height": 1000}
-            )
-
-    # Create page outside lock — allows parallel page creation
-    page = await _pool_ctx.new_page()
-    _active_renders += 1
-    return page, _pool_generation
-
-
-async def _release_page(page, gen: int):
-    """Return a page to the pool for reuse, or discard if stale."""
-    global _active_renders, _browser_uses, _last_used
-
-    _active_renders = max(0, _active_renders - 1)
-    _browser_uses += 1
-    _last_used = time.monotonic()
-
-    if gen == _pool_generation and not page.is_closed():
-        await _page_pool.put((page, gen))
-    else:
-        try:
-            await page.close()
-        except Exception:
-            pass
-
-
 async def _render_via_remote(html_content: str, remote_url: str) -> Optional[bytes]:
     """使用外置渲染服务渲染 HTML"""
     start_time = time.time()
     try:
         logger.debug(f"[鸣潮·渲染工具] 尝试使用外置渲染服务: {remote_url}")
 
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(
-                remote_url,
-                json={"html": html_content},
-                headers={"Content-Type": "application/json"}
-            )
+        response = await get_remote_client().post(
+            remote_url,
+            json={"html": html_content},
+            headers={"Content-Type": "application/json"}
+        )
 
-            if response.status_code == 200:
-                image_data = response.content
-                elapsed_time = time.time() - start_time
-                html_kb = len(html_content) / 1024
-                logger.info(f"[鸣潮·渲染工具] 外置渲染成功，耗时: {elapsed_time:.2f}s，HTML大小: {html_kb:.1f}KB，图片大小: {len(image_data)} bytes")
-                return image_data
-            else:
-                logger.warning(f"[鸣潮·渲染工具] 外置渲染失败，状态码: {response.status_code}, 错误: {response.text}")
-                return None
+        if response.status_code == 200:
+            image_data = response.content
+            elapsed_time = time.time() - start_time
+            html_kb = len(html_content) / 1024
+            logger.info(f"[鸣潮·渲染工具] 外置渲染成功，耗时: {elapsed_time:.2f}s，HTML大小: {html_kb:.1f}KB，图片大小: {len(image_data)} bytes")
+            return image_data
+        else:
+            logger.warning(f"[鸣潮·渲染工具] 外置渲染失败，状态码: {response.status_code}, 错误: {response.text}")
+            return None
     except httpx.TimeoutException:
         elapsed_time = time.time() - start_time
         logger.warning(f"[鸣潮·渲染工具] 外置渲染超时 ({elapsed_time:.2f}s)，将回退到本地渲染")
@@ -248,7 +115,32 @@ async def _render_via_remote(html_content: str, remote_url: str) -> Optional[byt
         return None
 
 
-async def render_html(waves_templates, template_name: str, context: dict) -> Optional[bytes]:
+async def render_html(
+    waves_templates, template_name: str, context: dict, cache: bool = False
+) -> Optional[bytes]:
+    """渲染模板为图片; cache=True 时按模板名 + 渲染出的 HTML 缓存结果 (见 render_cache)。"""
+    # 模板内可用 {{ asset_url(path) }} 引用本地图片, 不再内联 base64
+    waves_templates.globals.setdefault("asset_url", file_asset_url)
+    if not cache or not is_render_cache_enabled():
+        return await _render_html(waves_templates, template_name, context)
+
+    try:
+        cache_key = make_cache_key(template_name, waves_templates.get_template(template_name).render(**context))
+    except Exception as e:
+        logger.debug(f"[鸣潮·渲染工具] 计算渲染缓存键失败: {e}")
+        return await _render_html(waves_templates, template_name, context)
+
+    cached = await render_cache.aget(cache_key)
+    if cached is not None:
+        logger.debug(f"[鸣潮·渲染工具] 渲染缓存命中: {template_name}")
+        return cached
+    result = await _render_html(waves_templates, template_name, context)
+    if result:
+        await render_cache.aput(cache_key, result)
+    return result
+
+
+async def _render_html(waves_templates, template_name: str, context: dict) -> Optional[bytes]:
 
     try:
         logger.debug(f"[鸣潮·渲染工具] HTML渲染开始: {template_name}")
@@ -258,106 +150,109 @@ async def render_html(waves_templates, template_name: str, context: dict) -> Opt
         remote_render_enable = WutheringWavesConfig.get_config("RemoteRenderEnable").data
         remote_url = WutheringWavesConfig.get_config("RemoteRenderUrl").data if remote_render_enable else None
 
-        if remote_render_enable and remote_url:
-            try:
-                font_css_url = _get_font_css_url()
-                context["font_css_url"] = font_css_url
-                html_content = template.render(**context)
-                logger.debug(f"[鸣潮·渲染工具] 使用在线字体渲染 HTML: {template_name}")
-                logger.debug(f"[鸣潮·渲染工具] 外置渲染已启用，尝试使用: {remote_url}")
-                remote_result = await _render_via_remote(html_content, remote_url)
-                if remote_result is not None:
-                    return remote_result
-
-                logger.info("[鸣潮·渲染工具] 外置渲染失败，回退到本地渲染")
-            except Exception as e:
-                logger.warning(f"[鸣潮·渲染工具] 外置渲染异常: {e}，回退到本地渲染")
-
-        try:
-            font_css_path = _FONTS_DIR / _FONT_CSS_NAME
-            base_url = _get_local_base_url()
-
-            if font_css_path.exists():
-                context["font_css_url"] = f"{base_url}/waves/fonts/{_FONT_CSS_NAME}"
+        for backend in backend_order(bool(remote_render_enable and remote_url), PLAYWRIGHT_AVAILABLE):
+            t0 = time.perf_counter()
+            if backend == "remote":
+                result = await _render_remote_backend(template, template_name, context, remote_url)
             else:
-                context["font_css_url"] = _get_font_css_url()
+                result = await _render_local_backend(template, template_name, context)
+            if result is not None:
+                observe_render(template_name, backend, time.perf_counter() - t0)
+                return result
+            record_render_failure(backend)
+            logger.info(f"[鸣潮·渲染工具] {'外置' if backend == 'remote' else '本地'}渲染失败: {template_name}")
+
+        if not PLAYWRIGHT_AVAILABLE:
+            logger.warning("[鸣潮·渲染工具] Playwright 未安装，无法渲染，将回退到 PIL 渲染（如有）")
+        return None
 
-            html_content = template.render(**context)
-            logger.debug(f"[鸣潮·渲染工具] 使用本地字体渲染 HTML: {template_name}")
-        except Exception as e:
-            logger.error(f"[鸣潮·渲染工具] Template render failed: {e}")
-            raise e
+    except Exception as e:
+        logger.error(f"[鸣潮·渲染工具] HTML渲染失败: {e}")
+        return None
 
-        # 本地渲染
-        if not PLAYWRIGHT_AVAILABLE or async_playwright is None:
-            logger.warning("[鸣潮·渲染工具] Playwright 未安装，无法渲染，将回退到 PIL 渲染（如有）")
-            return None
 
-        logger.debug(f"[鸣潮·渲染工具] 使用本地 Playwright 渲染")
+async def _render_remote_backend(template, template_name: str, context: dict, remote_url: str) -> Optional[bytes]:
+    try:
+        context["font_css_url"] = _get_font_css_url()
+        # 外置渲染访问不到本机资源路由, 图片仍以 data URL 内联
+        html_content = inline_html(template.render(**context))
+        logger.debug(f"[鸣潮·渲染工具] 使用在线字体渲染 HTML: {template_name}")
+        return await _render_via_remote(html_content, remote_url)
+    except Exception as e:
+        logger.warning(f"[鸣潮·渲染工具] 外置渲染异常: {e}")
+        return None
 
-        local_start_time = time.time()
-        page, gen = None, -1
-        try:
-            t0 = time.perf_counter()
-            page, gen = await _acquire_page()
-            if page is None:
-                return None
-            t_acquire = time.perf_counter() - t0
 
-            t0 = time.perf_counter()
-            await page.set_content(html_content, wait_until='load')
-            t_content = time.perf_counter() - t0
+async def _render_local_backend(template, template_name: str, context: dict) -> Optional[bytes]:
+    font_css_path = _FONTS_DIR / _FONT_CSS_NAME
+    base_url = _get_local_base_url()
 
-            t0 = time.perf_counter()
-            container = page.locator(".container")
-            await page.wait_for_selector(".container", timeout=2000)
-            size = await container.evaluate(
-                """(el) => {
-                    const rect = el.getBoundingClientRect();
-                    const width = Math.ceil(Math.max(rect.width, el.scrollWidth));
-                    const height = Math.ceil(Math.max(rect.height, el.scrollHeight));
-                    return { width, height };
-                }"""
-            )
+    if font_css_path.exists():
+        context["font_css_url"] = f"{base_url}/waves/fonts/{_FONT_CSS_NAME}"
+    else:
+        context["font_css_url"] = _get_font_css_url()
+
+    try:
+        html_content = externalize_html(template.render(**context), base_url)
+        logger.debug(f"[鸣潮·渲染工具] 使用本地字体渲染 HTML: {template_name}")
+    except Exception as e:
+        logger.error(f"[鸣潮·渲染工具] Template render failed: {e}")
+        raise e
 
-            if size and size.get("width") and size.get("height"):
-                await page.set_viewport_size(
-                    {
-                        "width": max(1, int(size["width"])),
-                        "height": max(1, int(size["height"])),
-                    }
-                )
-            t_layout = time.perf_counter() - t0
+    # 排队已满 / 等待超时返回 None, 由调用方回退 PIL
+    t0 = time.perf_counter()
+    slot = await local_pool.acquire()
+    if slot is None:
+        return None
+    t_acquire = time.perf_counter() - t0
 
-            t0 = time.perf_counter()
-            screenshot = await container.screenshot(type='jpeg', quality=90)
-            t_screenshot = time.perf_counter() - t0
-
-            render_time = time.time() - local_start_time
-            html_mb = len(html_content) / 1024 / 1024
-            reused = "复用" if t_acquire < 0.01 else "新建"
-            logger.info(
-                f"[鸣潮·渲染工具] 渲染完成({reused}) {render_time:.2f}s | "
-                f"传输HTML({html_mb:.1f}MB)={t_content*1000:.0f}ms "
-                f"布局={t_layout*1000:.0f}ms 截图={t_screenshot*1000:.0f}ms"
-            )
-            return screenshot
-        except Exception as e:
-            logger.error(f"[鸣潮·渲染工具] Playwright execution failed: {e}")
-            if page is not None:
-                try:
-                    await page.close()
-                except Exception:
-                    pass
-                page = None
-            raise e
-        finally:
-            if page is not None:
-                await _release_page(page, gen)
+    page = slot[0]
+    broken = False
+    local_start_time = time.time()
+    try:
+        t0 = time.perf_counter()
+        await page.set_content(html_content, wait_until='load')
+        t_content = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        container = page.locator(".container")
+        await page.wait_for_selector(".container", timeout=2000)
+        size = await container.evaluate(
+            """(el) => {
+                const rect = el.getBoundingClientRect();
+                const width = Math.ceil(Math.max(rect.width, el.scrollWidth));
+                const height = Math.ceil(Math.max(rect.height, el.scrollHeight));
+                return { width, height };
+            }"""
+        )
 
+        if size and size.get("width") and size.get("height"):
+            await page.set_viewport_size(
+                {
+                    "width": max(1, int(size["width"])),
+                    "height": max(1, int(size["height"])),
+                }
+            )
+        t_layout = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        screenshot = await container.screenshot(type='jpeg', quality=90)
+        t_screenshot = time.perf_counter() - t0
+
+        render_time = time.time() - local_start_time
+        html_kb = len(html_content) / 1024
+        logger.info(
+            f"[鸣潮·渲染工具] 渲染完成 {render_time:.2f}s | 排队={t_acquire*1000:.0f}ms "
+            f"传输HTML({html_kb:.1f}KB)={t_content*1000:.0f}ms "
+            f"布局={t_layout*1000:.0f}ms 截图={t_screenshot*1000:.0f}ms"
+        )
+        return screenshot
     except Exception as e:
-        logger.error(f"[鸣潮·渲染工具] HTML渲染失败: {e}")
+        logger.error(f"[鸣潮·渲染工具] Playwright execution failed: {e}")
+        broken = True
         return None
+    finally:
+        await local_pool.release(slot, broken)
 
 
 def image_to_base64(image_path: Union[str, Path]) -> str:
@@ -449,54 +344,74 @@ async def get_image_b64_with_cache(
         return ""
 
     try:
-        from .image import pic_download_from_url
-        from .resource.RESOURCE_PATH import BAKE_PATH
-        from PIL import Image
-        from io import BytesIO
-
-        await pic_download_from_url(cache_path, url)
-
-        filename = url.split("/")[-1]
-        local_path = cache_path / filename
-        # pic_download_from_url 会将图片转为 webp 并删除原文件
-        webp_path = local_path.with_suffix(".webp")
-        if not local_path.exists() and webp_path.exists():
-            local_path = webp_path
-
-        # 不压缩也不裁切，直接返回原图
-        if quality is None and cover_size is None:
-            ext = local_path.suffix.lstrip(".").lower()
-            if ext == "jpg":
-                ext = "jpeg"
-            with open(local_path, "rb") as f:
-                data = f.read()
-            return f"data:image/{ext};base64,{base64.b64encode(data).decode('utf-8')}"
-
-        # 烘焙缓存: bake/{文件名}_{路径hash}_{quality}_{宽x高}.webp
-        import hashlib
-        path_hash = hashlib.md5(str(local_path.resolve()).encode()).hexdigest()[:8]
-        stem = Path(filename).stem
-        size_tag = f"_{cover_size[0]}x{cover_size[1]}" if cover_size else ""
-        bake_name = f"{stem}_{path_hash}_q{quality or 80}{size_tag}.webp"
-        bake_path = BAKE_PATH / bake_name
-
-        # 命中烘焙缓存 — 直接读文件 + base64，跳过 PIL
-        if bake_path.exists() and bake_path.stat().st_mtime >= local_path.stat().st_mtime:
-            with open(bake_path, "rb") as f:
-                data = f.read()
-            return f"data:image/webp;base64,{base64.b64encode(data).decode('utf-8')}"
-
-        # 未命中 — PIL 处理 + 写入烘焙缓存（卸到线程池）
-        data = await _bake_image_to_webp(local_path, bake_path, cover_size, quality or 80)
-
-        orig_size = local_path.stat().st_size
-        logger.debug(
-            f"[鸣潮·渲染工具] 烘焙: {filename} → {bake_name}, "
-            f"原始: {orig_size} bytes, 烘焙后: {len(data)} bytes"
-        )
+        src, ext = await _get_cached_image(url, cache_path, quality, cover_size)
+        if isinstance(src, Path):
+            with open(src, "rb") as f:
+                src = f.read()
+        return f"data:image/{ext};base64,{base64.b64encode(src).decode('utf-8')}"
+    except Exception as e:
+        logger.warning(f"[鸣潮·渲染工具] 获取图片 base64 失败: {url}, {e}")
+        return ""
 
-        return f"data:image/webp;base64,{base64.b64encode(data).decode('utf-8')}"
 
+async def get_image_url_with_cache(
+    url: str, cache_path: Path, quality=None, cover_size: tuple = None,
+) -> str:
+    """同 get_image_b64_with_cache，但返回渲染资源地址，原图 / 烘焙命中时不读文件内容。"""
+    if not url:
+        return ""
+
+    try:
+        src, ext = await _get_cached_image(url, cache_path, quality, cover_size)
+        if isinstance(src, Path):
+            return file_asset_url(src)
+        return bytes_asset_url(src, ext)
     except Exception as e:
-        logger.warning(f"[鸣潮·渲染工具] 获取图片 base64 失败: {url}, {e}")
+        logger.warning(f"[鸣潮·渲染工具] 获取图片地址失败: {url}, {e}")
         return ""
+
+
+async def _get_cached_image(
+    url: str, cache_path: Path, quality=None, cover_size: tuple = None,
+) -> Tuple[Union[Path, bytes], str]:
+    """下载 (带本地缓存) 并按需烘焙，返回 (文件 或 烘焙字节, 扩展名)。"""
+    from .image import pic_download_from_url
+    from .resource.RESOURCE_PATH import BAKE_PATH
+
+    await pic_download_from_url(cache_path, url)
+
+    filename = url.split("/")[-1]
+    local_path = cache_path / filename
+    # pic_download_from_url 会将图片转为 webp 并删除原文件
+    webp_path = local_path.with_suffix(".webp")
+    if not local_path.exists() and webp_path.exists():
+        local_path = webp_path
+
+    # 不压缩也不裁切，直接返回原图
+    if quality is None and cover_size is None:
+        ext = local_path.suffix.lstrip(".").lower()
+        if ext == "jpg":
+            ext = "jpeg"
+        return local_path, ext
+
+    # 烘焙缓存: bake/{文件名}_{路径hash}_{quality}_{宽x高}.webp
+    import hashlib
+    path_hash = hashlib.md5(str(local_path.resolve()).encode()).hexdigest()[:8]
+    stem = Path(filename).stem
+    size_tag = f"_{cover_size[0]}x{cover_size[1]}" if cover_size else ""
+    bake_name = f"{stem}_{path_hash}_q{quality or 80}{size_tag}.webp"
+    bake_path = BAKE_PATH / bake_name
+
+    # 命中烘焙缓存 — 直接用烘焙文件，跳过 PIL
+    if bake_path.exists() and bake_path.stat().st_mtime >= local_path.stat().st_mtime:
+        return bake_path, "webp"
+
+    # 未命中 — PIL 处理 + 写入烘焙缓存（卸到线程池）
+    data = await _bake_image_to_webp(local_path, bake_path, cover_size, quality or 80)
+
+    orig_size = local_path.stat().st_size
+    logger.debug(
+        f"[鸣潮·渲染工具] 烘焙: {filename} → {bake_name}, "
+        f"原始: {orig_size} bytes, 烘焙后: {len(data)} bytes"
+    )
+    return data, "webp"
@@ -100,6 +100,7 @@ ANN_CARD_PATH = OTHER_PATH / "ann_card"
 BAKE_PATH = OTHER_PATH / "bake"
 POKER_PATH = OTHER_PATH / "poker"
 WIKI_CACHE_PATH = OTHER_PATH / "wiki"
+RENDER_CACHE_PATH = OTHER_PATH / "render_cache"
 BBS_PATH = OTHER_PATH / "bbs"
 SIGN_SURFACE_PATH = OTHER_PATH / "sign_surface"
 
@@ -145,6 +146,7 @@ def init_dir():
         ANN_CARD_PATH,
         BAKE_PATH,
         WIKI_CACHE_PATH,
+        RENDER_CACHE_PATH,
         BBS_PATH,
         SIGN_SURFACE_PATH,
         BUILD_PATH,
@@ -246,6 +246,10 @@ async def reload_all_modules():
     from ..calc import reload_wuwacalc_module
     from ..damage.damage import reload_damage_module
     from ...wutheringwaves_wiki.char_wiki_render import clear_wiki_cache
+    from ...wutheringwaves_rank.rank_index import reset_rank_index_version
+    from ..score_pool import restart_score_pool
+    from ..render_cache import clear_render_cache
+    from ..texture_cache import clear_texture_cache
 
     # 在下载完成后强制加载所有数据
     ensure_name_convert_loaded(force=True)
@@ -258,6 +262,10 @@ async def reload_all_modules():
     reload_damage_module()
     reload_all_register()
     clear_wiki_cache()
+    reset_rank_index_version()
+    await restart_score_pool()
+    clear_render_cache()
+    clear_texture_cache()
     card_list = await load_limit_user_card()
     if card_list:
         logger.info(f"[鸣潮·加载角色极限面板] 数量: {len(card_list)}")
@@ -0,0 +1,189 @@
+"""评分批处理执行器: 把角色面板分块丢进常驻进程池并行跑 WuWaCalc。
+
+- 进程数取 ScoreProcessWorkers 配置 (0 关闭), 不超过 CPU 核数 - 1。
+- 进程用 forkserver (不支持时 spawn) 启动, 不从已有多个线程的主进程 fork。worker 以
+  ``runpy.run_path(score_worker.py)`` 初始化: 不执行插件根包 __init__, 只导入计算模块
+  并注册各 Register, 即为「热」worker。
+- 资源模块加载 / 重载完成后 (见 reload_all_modules) 由 ``restart_score_pool`` 重建并预热;
+  之后按需懒创建, 配置的进程数变化时随之重建。执行异常时关闭进程池、本次回退线程串行,
+  下次按退避时间 (``RETRY_BASE_DELAY`` 起翻倍, 至多 ``RETRY_MAX_DELAY``) 再重建。
+- 每批记录耗时日志, 便于观察全量刷新 / 群排行回填的并行收益。
+"""
+import os
+import time
+import runpy
+import asyncio
+import functools
+import multiprocessing
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, List, Tuple, Callable, Optional, Sequence
+
+from gsuid_core.logger import logger
+
+# 少于此数量直接线程串行, 进程间序列化开销不划算
+MIN_PARALLEL_ITEMS = 4
+# 单批上限, 控制单次 pickle 体积与尾部等待
+MAX_CHUNK_SIZE = 8
+# 进程池异常后重建的退避 (秒)
+RETRY_BASE_DELAY = 30.0
+RETRY_MAX_DELAY = 1800.0
+
+_WORKER_ENTRY = Path(__file__).with_name("score_worker.py")
+_PLUGIN_PACKAGE = __name__.rsplit(".utils.", 1)[0]
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_workers = 0
+_failures = 0
+_retry_at = 0.0
+
+
+def _run_batch(func: Callable[[Any], Any], chunk: Sequence[Any]) -> Tuple[List[Any], float, int]:
+    start = time.perf_counter()
+    results = [func(item) for item in chunk]
+    return results, time.perf_counter() - start, os.getpid()
+
+
+def get_score_workers() -> int:
+    from ..wutheringwaves_config import WutheringWavesConfig
+
+    workers = int(WutheringWavesConfig.get_config("ScoreProcessWorkers").data or 0)
+    if workers <= 0:
+        return 0
+    return min(workers, max((os.cpu_count() or 1) - 1, 1))
+
+
+def _mp_context():
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def _create_executor(workers: int) -> ProcessPoolExecutor:
+    global _executor, _executor_workers
+    shutdown_score_pool()
+    _executor = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=_mp_context(),
+        initializer=runpy.run_path,
+        initargs=(
+            str(_WORKER_ENTRY),
+            {"PLUGIN_PACKAGE": _PLUGIN_PACKAGE, "PLUGIN_DIR": str(_WORKER_ENTRY.parents[1])},
+        ),
+    )
+    _executor_workers = workers
+    logger.info(f"[鸣潮·评分] 评分进程池已创建 workers={workers}")
+    return _executor
+
+
+def _get_executor() -> Optional[ProcessPoolExecutor]:
+    """按当前配置取进程池, 需要时懒创建; 异常退避期内返回 None (线程串行)。"""
+    workers = get_score_workers()
+    if workers <= 0:
+        shutdown_score_pool()
+        return None
+    if _executor is not None and _executor_workers == workers:
+        return _executor
+    if time.monotonic() < _retry_at:
+        return None
+    try:
+        return _create_executor(workers)
+    except Exception as e:
+        _record_failure(e)
+        return None
+
+
+def _record_failure(e: BaseException) -> None:
+    global _failures, _retry_at
+    shutdown_score_pool()
+    _failures += 1
+    delay = min(RETRY_BASE_DELAY * (2 ** (_failures - 1)), RETRY_MAX_DELAY)
+    _retry_at = time.monotonic() + delay
+    logger.warning(f"[鸣潮·评分] 评分进程池异常, {delay:.0f}s 内使用线程串行: {type(e).__name__}: {e}")
+
+
+async def restart_score_pool() -> None:
+    """按当前配置重建进程池并预热 worker; 在模块加载 / 重载完成后调用。"""
+    global _failures, _retry_at
+    shutdown_score_pool()
+    _failures, _retry_at = 0, 0.0
+    executor = _get_executor()
+    if executor is None:
+        return
+    loop = asyncio.get_running_loop()
+    try:
+        # 同时提交 workers 个空任务, 让进程池按需拉起全部 worker 并跑完 initializer
+        await asyncio.gather(*(loop.run_in_executor(executor, os.getpid) for _ in range(_executor_workers)))
+    except Exception as e:
+        _record_failure(e)
+
+
+def shutdown_score_pool() -> None:
+    """关闭进程池; 执行异常或重建前调用。"""
+    global _executor, _executor_workers
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+    _executor = None
+    _executor_workers = 0
+
+
+async def map_in_pool(
+    func: Callable[[Any], Any],
+    items: Sequence[Any],
+    tag: str = "评分",
+) -> List[Any]:
+    """对 items 逐个执行 func (须可 pickle 的模块级函数 / partial), 结果保持原顺序。"""
+    global _failures
+    items = list(items)
+    if not items:
+        return []
+
+    executor = _get_executor() if len(items) >= MIN_PARALLEL_ITEMS else None
+    workers = _executor_workers
+    if executor is None:
+        results, cost, _ = await asyncio.to_thread(_run_batch, func, items)
+        logger.debug(f"[鸣潮·{tag}] 串行 {len(items)} 项 耗时 {cost:.3f}s")
+        return results
+
+    chunk_size = max(1, min(MAX_CHUNK_SIZE, -(-len(items) // workers)))
+    chunks = [items[i : i + chunk_size] for i in range(0, len(items), chunk_size)]
+    loop = asyncio.get_running_loop()
+    start = time.perf_counter()
+    try:
+        outs = await asyncio.gather(
+            *(loop.run_in_executor(executor, _run_batch, func, chunk) for chunk in chunks)
+        )
+    except Exception as e:
+        if isinstance(e, BrokenProcessPool):
+            _record_failure(e)
+        else:
+            logger.warning(f"[鸣潮·{tag}] 进程池执行失败, 回退串行: {type(e).__name__}: {e}")
+        results, cost, _ = await asyncio.to_thread(_run_batch, func, items)
+        logger.debug(f"[鸣潮·{tag}] 串行 {len(items)} 项 耗时 {cost:.3f}s")
+        return results
+
+    _failures = 0
+    results: List[Any] = []
+    for idx, (chunk_results, cost, pid) in enumerate(outs, start=1):
+        logger.debug(f"[鸣潮·{tag}] 批次 {idx}/{len(outs)} pid={pid} {len(chunk_results)} 项 耗时 {cost:.3f}s")
+        results.extend(chunk_results)
+    logger.info(
+        f"[鸣潮·{tag}] 进程池 {len(items)} 项 / {len(chunks)} 批 总耗时 {time.perf_counter() - start:.3f}s"
+    )
+    return results
+
+
+async def score_char_ranks(
+    role_details: Sequence[Any],
+    need_expected_damage: bool = False,
+    need_overall_score: bool = False,
+) -> List[Any]:
+    """批量计算 WavesCharRank, 入参为 RoleDetailData 或其 dict。"""
+    from .expression_ctx import _compute_one_char_rank
+
+    func = functools.partial(
+        _compute_one_char_rank,
+        need_expected_damage=need_expected_damage,
+        need_overall_score=need_overall_score,
+    )
+    return await map_in_pool(func, role_details, tag="评分")
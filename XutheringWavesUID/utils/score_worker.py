@@ -0,0 +1,49 @@
+"""评分进程池 worker 的初始化入口。
+
+由 score_pool 以 ``runpy.run_path(本文件, init_globals)`` 作为 initializer 在子进程里
+直接按路径执行, 不经插件包导入。子进程 (forkserver / spawn) 反序列化任务时要按模块名
+导入 ``<插件包>.utils.xxx``, 这会先执行插件根包的 __init__ (起后台任务、注册命令和
+hook)。这里先在 sys.modules 放一个只带 __path__ 的插件根包占位, 再只导入计算相关模块
+并完成各 Register 注册, worker 即为「热」状态。
+
+init_globals:
+    PLUGIN_PACKAGE: 插件根包的模块名
+    PLUGIN_DIR: 插件根包目录
+"""
+import sys
+import types
+import importlib
+
+PLUGIN_PACKAGE: str = globals().get("PLUGIN_PACKAGE", "")
+PLUGIN_DIR: str = globals().get("PLUGIN_DIR", "")
+
+
+def _stub_plugin_package() -> None:
+    if not PLUGIN_PACKAGE or PLUGIN_PACKAGE in sys.modules:
+        return
+    parent, _, child = PLUGIN_PACKAGE.rpartition(".")
+    if parent:
+        importlib.import_module(parent)
+    module = types.ModuleType(PLUGIN_PACKAGE)
+    module.__path__ = [PLUGIN_DIR]
+    module.__package__ = PLUGIN_PACKAGE
+    sys.modules[PLUGIN_PACKAGE] = module
+    if parent:
+        setattr(sys.modules[parent], child, module)
+
+
+def _warm() -> None:
+    utils = f"{PLUGIN_PACKAGE}.utils"
+    importlib.import_module(f"{utils}.calc")
+    importlib.import_module(f"{utils}.expression_ctx")
+    register = importlib.import_module(f"{utils}.map.damage.register")
+    importlib.import_module(f"{utils}.damage.register_weapon").register_weapon()
+    importlib.import_module(f"{utils}.damage.register_echo").register_echo()
+    register.register_damage()
+    register.register_rank()
+    register.register_score()
+    importlib.import_module(f"{utils}.damage.register_char").register_char()
+
+
+_stub_plugin_package()
+_warm()
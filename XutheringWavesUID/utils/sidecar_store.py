@@ -0,0 +1,505 @@
+"""per-uid 小文件合并容器 (sidecar.db)。
+
+state.json (角色查看 / 刷新计数)、baseInfo.json (账号总览缓存)、charListData.json
+(练度评分缓存) 原先是同一 uid 目录下的几个小 JSON, 每次命令都要整文件读改写,
+并发命令之间没有锁, 计数会互相覆盖。这里合并进 ``PLAYER_PATH/<uid>/sidecar.db``
+(SQLite WAL):
+
+- ``chars``: 每个角色一行状态, 自增 / 赋值在一个写事务内完成; 查看计数先进内存
+  缓冲, 由后台刷写循环 (``flush_views_sync``) 按 uid 合并成一个事务落盘, 读时合并待写值;
+- ``uid_state``: uid 级的单刷计数 / 持有校验时间 (单行), 读改写同样在写事务内;
+- ``docs``: 其余小 JSON 按逻辑文件名整份存一行, 经 player_store 读写, 带进程内读缓存。
+
+各 uid 的连接按 LRU 保持打开 (``_CONN_MAX``), 建表与旧文件导入每个连接只做一次,
+WAL 也不会随每次关闭连接被 checkpoint 删除。
+
+首次打开某 uid 的容器时把旧 JSON 一次性导入, 入库后删除旧文件;【压缩数据】也会
+顺带批量导入全部 uid (``import_existing_sync``)。
+"""
+import json
+import time
+import sqlite3
+import threading
+from pathlib import Path
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, List, Tuple, Callable, Iterable, Iterator, Optional
+
+from gsuid_core.logger import logger
+
+SIDECAR_DB = "sidecar.db"
+STATE_NAME = "state.json"
+# 整份存为一行的小 JSON (逻辑文件名)
+DOC_NAMES = {"baseInfo.json", "charListData.json"}
+LEGACY_NAMES = (STATE_NAME, *sorted(DOC_NAMES))
+
+CHAR_DEFAULTS: Dict[str, Any] = {
+    "view_count": 0,
+    "refresh_count": 0,
+    "last_view_at": 0,
+    "last_refresh_at": 0,
+    "last_advice_sent_at": 0,
+    "last_advice_text": "",
+    "advice_dirty": True,
+}
+UID_STATE_DEFAULTS: Dict[str, int] = {
+    "single_refresh_count": 0,
+    "last_owned_check_at": 0,
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS docs (name TEXT PRIMARY KEY, data TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS chars (
+    char_id TEXT PRIMARY KEY,
+    view_count INTEGER NOT NULL DEFAULT 0,
+    refresh_count INTEGER NOT NULL DEFAULT 0,
+    last_view_at INTEGER NOT NULL DEFAULT 0,
+    last_refresh_at INTEGER NOT NULL DEFAULT 0,
+    last_advice_sent_at INTEGER NOT NULL DEFAULT 0,
+    last_advice_text TEXT NOT NULL DEFAULT '',
+    advice_dirty INTEGER NOT NULL DEFAULT 1
+);
+CREATE TABLE IF NOT EXISTS uid_state (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    single_refresh_count INTEGER NOT NULL DEFAULT 0,
+    last_owned_check_at INTEGER NOT NULL DEFAULT 0
+);
+"""
+_CHAR_COLUMNS = tuple(CHAR_DEFAULTS)
+_UID_STATE_COLUMNS = tuple(UID_STATE_DEFAULTS)
+
+# docs 读缓存: (uid 目录, 逻辑文件名) -> (容器文件戳, JSON 文本)
+_CACHE_MAX = 1024
+_cache_lock = threading.Lock()
+_doc_cache: "OrderedDict[Tuple[str, str], Tuple[tuple, Optional[str]]]" = OrderedDict()
+# uid 目录 -> 写入代数; 读库期间有写入则读到的结果不进缓存
+_doc_generation: Dict[str, int] = {}
+
+# 保持打开的 uid 连接数
+_CONN_MAX = 64
+_conn_lock = threading.Lock()
+_conns: "OrderedDict[str, _Conn]" = OrderedDict()
+
+# 待写的查看计数: uid 目录 -> {char_id: [增量, 最后查看时间]}
+_pending_lock = threading.Lock()
+_pending_views: Dict[str, Dict[str, List[int]]] = {}
+
+# 一个 (角色ID 列表, 自增字段, 赋值字段) 组
+CharUpdate = Tuple[Iterable[str], Dict[str, int], Dict[str, Any]]
+
+
+def _legacy_files(uid_dir: Path) -> List[Path]:
+    return [uid_dir / name for name in LEGACY_NAMES if (uid_dir / name).is_file()]
+
+
+def _stamp(uid_dir: Path) -> tuple:
+    """容器与 WAL 文件的 (mtime_ns, 大小), 其它途径改动容器后读缓存随之失效。"""
+    out = []
+    for name in (SIDECAR_DB, f"{SIDECAR_DB}-wal"):
+        try:
+            st = (uid_dir / name).stat()
+            out.append((st.st_mtime_ns, st.st_size))
+        except OSError:
+            out.append(None)
+    return tuple(out)
+
+
+def _invalidate(uid_dir: Path) -> None:
+    key = str(uid_dir)
+    with _cache_lock:
+        _doc_generation[key] = _doc_generation.get(key, 0) + 1
+        for k in [k for k in _doc_cache if k[0] == key]:
+            del _doc_cache[k]
+
+
+@contextmanager
+def _write(conn: sqlite3.Connection) -> Iterator[None]:
+    """写事务; BEGIN IMMEDIATE 先拿写锁, 事务内的读改写不会与其它连接交错。"""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+def _open(uid_dir: Path, create: bool) -> Optional[sqlite3.Connection]:
+    """打开容器; 不存在时 create=False 且没有旧 JSON 可导入则返回 None, 不建空库。"""
+    db = uid_dir / SIDECAR_DB
+    if not db.exists():
+        if not create and not _legacy_files(uid_dir):
+            return None
+        uid_dir.mkdir(parents=True, exist_ok=True)
+    # 连接在线程池的不同线程间复用, 由 _Conn.lock 保证同一时刻只有一个线程在用
+    conn = sqlite3.connect(str(db), timeout=5.0, isolation_level=None, check_same_thread=False)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        if conn.execute("SELECT 1 FROM meta WHERE key = 'imported'").fetchone() is None:
+            _import_legacy(conn, uid_dir)
+    except BaseException:
+        conn.close()
+        raise
+    return conn
+
+
+class _Conn:
+    __slots__ = ("conn", "lock", "closed")
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        self.lock = threading.Lock()
+        self.closed = False
+
+
+def _close_entry(entry: _Conn) -> None:
+    # 等正在使用它的线程用完再关
+    with entry.lock:
+        if not entry.closed:
+            entry.closed = True
+            entry.conn.close()
+
+
+def _get_entry(uid_dir: Path, create: bool) -> Optional[_Conn]:
+    key = str(uid_dir)
+    evicted: List[_Conn] = []
+    try:
+        with _conn_lock:
+            entry = _conns.get(key)
+            if entry is not None and not (uid_dir / SIDECAR_DB).exists():
+                # 容器已被删除 (如清理 uid 数据), 旧连接指向已删除的文件
+                evicted.append(_conns.pop(key))
+                entry = None
+            if entry is not None:
+                _conns.move_to_end(key)
+                return entry
+            conn = _open(uid_dir, create)
+            if conn is None:
+                return None
+            entry = _conns[key] = _Conn(conn)
+            while len(_conns) > _CONN_MAX:
+                evicted.append(_conns.popitem(last=False)[1])
+            return entry
+    finally:
+        for old in evicted:
+            _close_entry(old)
+
+
+@contextmanager
+def _connection(uid_dir: Path, create: bool) -> Iterator[Optional[sqlite3.Connection]]:
+    """独占借用 uid 的常驻连接; 容器不存在且 create=False 时给出 None。"""
+    while True:
+        entry = _get_entry(uid_dir, create)
+        if entry is None:
+            yield None
+            return
+        with entry.lock:
+            # 取到后、加锁前可能刚被 LRU 淘汰关闭, 重取
+            if entry.closed:
+                continue
+            yield entry.conn
+            return
+
+
+def close_all_sync() -> None:
+    """先落盘待写的查看计数, 再关闭全部常驻连接 (退出时调用)。"""
+    flush_views_sync()
+    with _conn_lock:
+        entries = list(_conns.values())
+        _conns.clear()
+    for entry in entries:
+        _close_entry(entry)
+
+
+# ─── 旧 JSON 导入 ────────────────────────────────────────────────────
+
+
+def _state_rows(state: Dict[str, Any]) -> List[tuple]:
+    rows = []
+    for char_id, rec in (state.get("chars") or {}).items():
+        rec = {**CHAR_DEFAULTS, **(rec or {})}
+        rows.append(
+            (
+                str(char_id),
+                *(int(rec[c] or 0) for c in _CHAR_COLUMNS[:5]),
+                str(rec["last_advice_text"] or ""),
+                1 if rec["advice_dirty"] else 0,
+            )
+        )
+    return rows
+
+
+def _import_legacy(conn: sqlite3.Connection, uid_dir: Path) -> None:
+    loaded: Dict[str, Any] = {}
+    for path in _legacy_files(uid_dir):
+        try:
+            loaded[path.name] = json.loads(path.read_text(encoding="utf-8"))
+        except Exception as e:
+            # 读不出的旧文件保留原样, 不导入也不删除
+            logger.warning(f"[鸣潮·sidecar] 旧文件读取失败, 跳过导入 {path}: {e}")
+
+    with _write(conn):
+        # 并发打开时可能已由其它连接导入完成
+        if conn.execute("SELECT 1 FROM meta WHERE key = 'imported'").fetchone() is not None:
+            return
+        state = loaded.get(STATE_NAME)
+        if isinstance(state, dict):
+            conn.executemany(
+                f"INSERT OR REPLACE INTO chars (char_id, {', '.join(_CHAR_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * (len(_CHAR_COLUMNS) + 1))})",
+                _state_rows(state),
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO uid_state (id, single_refresh_count, last_owned_check_at) "
+                "VALUES (0, ?, ?)",
+                (
+                    int(state.get("single_refresh_count", 0) or 0),
+                    int(state.get("last_owned_check_at", 0) or 0),
+                ),
+            )
+        conn.executemany(
+            "INSERT OR REPLACE INTO docs (name, data) VALUES (?, ?)",
+            [
+                (name, json.dumps(obj, ensure_ascii=False))
+                for name, obj in loaded.items()
+                if name in DOC_NAMES
+            ],
+        )
+        conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('imported', ?)",
+            (str(int(time.time())),),
+        )
+    for name in loaded:
+        (uid_dir / name).unlink(missing_ok=True)
+
+
+def import_existing_sync(player_root: Path) -> Tuple[int, int]:
+    """把 player_root 下各 uid 的旧 JSON 导入容器。返回 (导入 uid 数, 失败数)。"""
+    done = fail = 0
+    root = Path(player_root)
+    if not root.exists():
+        return done, fail
+    for uid_dir in root.iterdir():
+        # 已有容器的 uid 早已导入过, 剩下的旧文件是读不出而跳过的
+        if not uid_dir.is_dir() or (uid_dir / SIDECAR_DB).exists() or not _legacy_files(uid_dir):
+            continue
+        try:
+            with _connection(uid_dir, create=True):
+                pass
+            _invalidate(uid_dir)
+            done += 1
+        except Exception as e:
+            logger.warning(f"[鸣潮·sidecar] 导入失败 {uid_dir}: {e}")
+            fail += 1
+    return done, fail
+
+
+# ─── 角色状态 ────────────────────────────────────────────────────────
+
+
+def _char_record(row: tuple, pending: Optional[List[int]] = None) -> Dict[str, Any]:
+    """行 -> 记录, pending 为该角色尚未落盘的 [查看增量, 最后查看时间]。"""
+    rec = dict(zip(_CHAR_COLUMNS, row))
+    rec["advice_dirty"] = bool(rec["advice_dirty"])
+    if pending:
+        rec["view_count"] += pending[0]
+        rec["last_view_at"] = max(rec["last_view_at"], pending[1])
+    return rec
+
+
+def record_view_sync(uid_dir: Path, char_id: str, now: int) -> Dict[str, Any]:
+    """查看计数 +1 记入缓冲, 返回合并待写值后的角色记录。
+
+    与刷写在同一个连接锁内完成, 返回的计数不会因刷写时机重复或遗漏。
+    """
+    char_id = str(char_id)
+    with _connection(uid_dir, create=False) as conn:
+        with _pending_lock:
+            item = _pending_views.setdefault(str(uid_dir), {}).setdefault(char_id, [0, 0])
+            item[0] += 1
+            item[1] = max(item[1], now)
+            pending = list(item)
+        row = None
+        if conn is not None:
+            row = conn.execute(
+                f"SELECT {', '.join(_CHAR_COLUMNS)} FROM chars WHERE char_id = ?", (char_id,)
+            ).fetchone()
+    if row is None:
+        row = tuple(int(v) if isinstance(v, bool) else v for v in CHAR_DEFAULTS.values())
+    return _char_record(row, pending)
+
+
+def flush_views_sync() -> int:
+    """把缓冲的查看计数按 uid 各一个事务写入, 返回写入的 uid 数; 失败的放回缓冲。"""
+    with _pending_lock:
+        uid_keys = list(_pending_views)
+    done = 0
+    for key in uid_keys:
+        uid_dir = Path(key)
+        try:
+            with _connection(uid_dir, create=True) as conn:
+                with _pending_lock:
+                    views = _pending_views.pop(key, None)
+                if not views:
+                    continue
+                try:
+                    with _write(conn):
+                        conn.executemany(
+                            "INSERT OR IGNORE INTO chars (char_id) VALUES (?)",
+                            [(c,) for c in views],
+                        )
+                        conn.executemany(
+                            "UPDATE chars SET view_count = view_count + ?, "
+                            "last_view_at = MAX(last_view_at, ?) WHERE char_id = ?",
+                            [(n, ts, c) for c, (n, ts) in views.items()],
+                        )
+                except Exception:
+                    with _pending_lock:
+                        merged = _pending_views.setdefault(key, {})
+                        for c, (n, ts) in views.items():
+                            item = merged.setdefault(c, [0, 0])
+                            item[0] += n
+                            item[1] = max(item[1], ts)
+                    raise
+            done += 1
+        except Exception as e:
+            logger.warning(f"[鸣潮·sidecar] 查看计数写入失败 {uid_dir}: {e}")
+    return done
+
+
+def update_chars_sync(uid_dir: Path, groups: Iterable[CharUpdate]) -> Dict[str, Dict[str, Any]]:
+    """一个写事务内批量更新角色状态行, 每组 (角色ID, {字段: 增量}, {字段: 新值})。
+
+    没有记录的角色先按默认值建行。返回涉及角色更新后的记录 {char_id: record}。
+    """
+    groups = [([str(c) for c in ids], incr, values) for ids, incr, values in groups]
+    touched = list(dict.fromkeys(c for ids, _, _ in groups for c in ids))
+    if not touched:
+        return {}
+    for _, incr, values in groups:
+        unknown = (set(incr) | set(values)) - set(_CHAR_COLUMNS)
+        if unknown:
+            raise ValueError(f"未知的角色状态字段: {sorted(unknown)}")
+
+    with _connection(uid_dir, create=True) as conn:
+        with _write(conn):
+            conn.executemany(
+                "INSERT OR IGNORE INTO chars (char_id) VALUES (?)", [(c,) for c in touched]
+            )
+            for ids, incr, values in groups:
+                if not ids or not (incr or values):
+                    continue
+                sets = [f"{k} = {k} + ?" for k in incr] + [f"{k} = ?" for k in values]
+                params = [int(v) for v in incr.values()] + [
+                    int(v) if isinstance(v, bool) else v for v in values.values()
+                ]
+                conn.executemany(
+                    f"UPDATE chars SET {', '.join(sets)} WHERE char_id = ?",
+                    [(*params, c) for c in ids],
+                )
+            marks = ",".join("?" * len(touched))
+            rows = conn.execute(
+                f"SELECT char_id, {', '.join(_CHAR_COLUMNS)} FROM chars WHERE char_id IN ({marks})",
+                touched,
+            ).fetchall()
+        with _pending_lock:
+            pending = dict(_pending_views.get(str(uid_dir), {}))
+    return {row[0]: _char_record(row[1:], pending.get(row[0])) for row in rows}
+
+
+def transact_uid_state_sync(
+    uid_dir: Path,
+    func: Callable[[Dict[str, int]], Optional[Dict[str, int]]],
+) -> Dict[str, int]:
+    """在写事务内读 uid 级状态交给 func, func 返回要写入的字段 (None 不写)。返回最终状态。"""
+    with _connection(uid_dir, create=True) as conn:
+        with _write(conn):
+            row = conn.execute(
+                f"SELECT {', '.join(_UID_STATE_COLUMNS)} FROM uid_state WHERE id = 0"
+            ).fetchone()
+            state = dict(zip(_UID_STATE_COLUMNS, row)) if row else dict(UID_STATE_DEFAULTS)
+            changes = func(dict(state))
+            if changes:
+                unknown = set(changes) - set(_UID_STATE_COLUMNS)
+                if unknown:
+                    raise ValueError(f"未知的 uid 状态字段: {sorted(unknown)}")
+                state.update({k: int(v) for k, v in changes.items()})
+                conn.execute(
+                    f"INSERT OR REPLACE INTO uid_state (id, {', '.join(_UID_STATE_COLUMNS)}) "
+                    f"VALUES (0, {', '.join('?' * len(_UID_STATE_COLUMNS))})",
+                    [state[c] for c in _UID_STATE_COLUMNS],
+                )
+    return state
+
+
+def read_state_sync(uid_dir: Path) -> Dict[str, Any]:
+    """按旧 state.json 的结构拼出全部状态; 容器不存在时返回空骨架。"""
+    chars: List[tuple] = []
+    row = None
+    with _connection(uid_dir, create=False) as conn:
+        if conn is not None:
+            chars = conn.execute(f"SELECT char_id, {', '.join(_CHAR_COLUMNS)} FROM chars").fetchall()
+            row = conn.execute(
+                f"SELECT {', '.join(_UID_STATE_COLUMNS)} FROM uid_state WHERE id = 0"
+            ).fetchone()
+        with _pending_lock:
+            pending = dict(_pending_views.get(str(uid_dir), {}))
+    records = {r[0]: _char_record(r[1:], pending.pop(r[0], None)) for r in chars}
+    defaults = tuple(int(v) if isinstance(v, bool) else v for v in CHAR_DEFAULTS.values())
+    for char_id, item in pending.items():
+        records[char_id] = _char_record(defaults, item)
+    state: Dict[str, Any] = {"chars": records}
+    if row:
+        state.update(zip(_UID_STATE_COLUMNS, row))
+    return state
+
+
+# ─── 整份小 JSON ─────────────────────────────────────────────────────
+
+
+def _read_doc_text(uid_dir: Path, name: str) -> Optional[str]:
+    key = (str(uid_dir), name)
+    stamp = _stamp(uid_dir)
+    with _cache_lock:
+        item = _doc_cache.get(key)
+        if item is not None and item[0] == stamp:
+            _doc_cache.move_to_end(key)
+            return item[1]
+
+        generation = _doc_generation.get(key[0], 0)
+
+    with _connection(uid_dir, create=False) as conn:
+        if conn is None:
+            return None
+        row = conn.execute("SELECT data FROM docs WHERE name = ?", (name,)).fetchone()
+    text = row[0] if row else None
+
+    with _cache_lock:
+        # 用读库前的文件戳; 读库期间有写入提交则不缓存, 下次重读
+        if _doc_generation.get(key[0], 0) == generation:
+            _doc_cache[key] = (stamp, text)
+            _doc_cache.move_to_end(key)
+            while len(_doc_cache) > _CACHE_MAX:
+                _doc_cache.popitem(last=False)
+    return text
+
+
+def read_doc_sync(uid_dir: Path, name: str) -> Any:
+    """读一份小 JSON, 没有则返回 None。每次返回新解码的对象, 调用方可随意修改。"""
+    text = _read_doc_text(uid_dir, name)
+    return None if text is None else json.loads(text)
+
+
+def doc_exists_sync(uid_dir: Path, name: str) -> bool:
+    return _read_doc_text(uid_dir, name) is not None
+
+
+def write_doc_sync(uid_dir: Path, name: str, obj: Any) -> None:
+    text = json.dumps(obj, ensure_ascii=False)
+    with _connection(uid_dir, create=True) as conn:
+        with _write(conn):
+            conn.execute("INSERT OR REPLACE INTO docs (name, data) VALUES (?, ?)", (name, text))
+        _invalidate(uid_dir)
@@ -0,0 +1,129 @@
+"""PIL 卡片用的解码贴图缓存。
+
+面板 / 声骸 / 练度等卡片在每个声骸、每一行里反复 ``Image.open(...).convert("RGBA")``
+同一批 PNG, 一张角色卡要解码几十次。这里按 (路径, 尺寸, 模式) 缓存解码 (及缩放)
+后的图片:
+
+- ``get_texture``: 共享实例, 只能作为 ``paste`` / ``alpha_composite`` 的源或读取尺寸,
+  不要在上面画或 paste 东西;
+- ``open_texture``: 返回副本, 调用方可以随意修改, 仍省去了解码。
+
+按像素字节数做 LRU, 上限为 ``TextureCacheSize``; 每次取图校验文件 mtime / 大小,
+资源更新后旧图自然失效, ``clear_texture_cache`` 在资源重新加载时整体清空。
+"""
+import threading
+from pathlib import Path
+from collections import OrderedDict
+from typing import Any, Dict, Tuple, Union, Optional
+
+from PIL import Image
+
+_BYTES_PER_PIXEL = {"1": 1, "L": 1, "P": 1, "LA": 2, "RGB": 3, "RGBA": 4}
+
+_Key = Tuple[str, Optional[Tuple[int, int]], str]
+
+
+def _max_cache_bytes() -> int:
+    from ..wutheringwaves_config import WutheringWavesConfig
+
+    return max(1, int(WutheringWavesConfig.get_config("TextureCacheSize").data)) * 1024 * 1024
+
+
+def _image_bytes(img: Image.Image) -> int:
+    return img.width * img.height * _BYTES_PER_PIXEL.get(img.mode, 4)
+
+
+class TextureCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        # key -> (mtime_ns, 文件大小, 图片, 占用字节), 顺序即最近使用顺序
+        self._items: "OrderedDict[_Key, Tuple[int, int, Image.Image, int]]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(
+        self,
+        path: Union[str, Path],
+        size: Optional[Tuple[int, int]] = None,
+        mode: str = "RGBA",
+    ) -> Image.Image:
+        path = Path(path)
+        stat = path.stat()
+        key: _Key = (str(path), tuple(size) if size else None, mode)
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None and item[0] == stat.st_mtime_ns and item[1] == stat.st_size:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return item[2]
+            self.misses += 1
+
+        if size:
+            # 缩放版本从缓存的原图派生, 原图同样计入缓存
+            img = self.get(path, None, mode).resize(tuple(size))
+        else:
+            with Image.open(path) as im:
+                img = im.convert(mode) if im.mode != mode else im.copy()
+
+        with self._lock:
+            self._drop(key)
+            nbytes = _image_bytes(img)
+            self._items[key] = (stat.st_mtime_ns, stat.st_size, img, nbytes)
+            self._bytes += nbytes
+            limit = _max_cache_bytes()
+            while self._bytes > limit and len(self._items) > 1:
+                self._drop(next(iter(self._items)))
+        return img
+
+    def _drop(self, key: _Key) -> None:
+        item = self._items.pop(key, None)
+        if item is not None:
+            self._bytes -= item[3]
+
+    def clear(self) -> int:
+        with self._lock:
+            count = len(self._items)
+            self._items.clear()
+            self._bytes = 0
+            return count
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._items),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+texture_cache = TextureCache()
+
+
+def get_texture(
+    path: Union[str, Path],
+    size: Optional[Tuple[int, int]] = None,
+    mode: str = "RGBA",
+) -> Image.Image:
+    """共享的只读贴图; size 指定时返回按 Image.resize 默认插值缩放后的版本。"""
+    return texture_cache.get(path, size, mode)
+
+
+def open_texture(
+    path: Union[str, Path],
+    size: Optional[Tuple[int, int]] = None,
+    mode: str = "RGBA",
+) -> Image.Image:
+    """可修改的贴图副本。"""
+    return texture_cache.get(path, size, mode).copy()
+
+
+def clear_texture_cache() -> int:
+    return texture_cache.clear()
+
+
+def get_texture_cache_stats() -> Dict[str, Any]:
+    return texture_cache.stats()
@@ -142,7 +142,7 @@ async def char_alias_list(char_name: str) -> Union[str, bytes]:
             }
 
             # 渲染HTML
-            img_bytes = await render_html(waves_templates, "alias_card.html", context)
+            img_bytes = await render_html(waves_templates, "alias_card.html", context, cache=True)
             if img_bytes:
                 logger.info(f"[鸣潮·别名] 角色【{std_char_name}】别名列表渲染成功")
                 return img_bytes
@@ -188,7 +188,7 @@ async def ann_list_card(user_id: str = None) -> bytes:
         }
 
         logger.debug(f"[鸣潮·公告] 准备通过HTML渲染列表, sections: {len(sections)}")
-        img_bytes = await render_html(waves_templates, "ann_card.html", context)
+        img_bytes = await render_html(waves_templates, "ann_card.html", context, cache=True)
         if img_bytes:
             return img_bytes
         else:
@@ -316,7 +316,7 @@ async def ann_detail_card(ann_id: Union[int, str], is_check_time=False) -> Union
         }
 
         logger.debug(f"[鸣潮·公告] 准备通过HTML渲染详情, content items: {len(processed_content)}")
-        img_bytes = await render_html(waves_templates, "ann_card.html", context)
+        img_bytes = await render_html(waves_templates, "ann_card.html", context, cache=True)
         if img_bytes:
             if result_images:
                 result_images = [img_bytes] + result_images
@@ -0,0 +1,82 @@
+"""自定义图查重: 指纹预筛 + ORB 校验 与 全量两两 ORB 的对照基准。
+
+对每个角色目录先预热 (ORB npz 与指纹索引都算好), 再分别计时两种实现, 以全量
+结果为准统计预筛的召回率。需要 opencv-python, 在 gsuid_core 环境下运行:
+
+    python -m XutheringWavesUID.wutheringwaves_charinfo.card_dedup_bench [类型] [角色ID ...]
+
+类型缺省为 card, 角色ID 缺省为该类型下全部目录。
+"""
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from . import card_phash_index
+from .card_utils import (
+    cv2,
+    _iter_images,
+    _fingerprints,
+    get_orb_features,
+    find_duplicate_pairs_in_dir,
+)
+from ..utils.resource.RESOURCE_PATH import CUSTOM_DIRS
+
+
+def _pair_keys(pairs) -> set:
+    return {frozenset((a, b)) for a, b, _ in pairs}
+
+
+def run(target_type: str = "card", char_ids: Optional[List[str]] = None) -> bool:
+    if cv2 is None:
+        print("未安装 opencv-python, 无法对照")
+        return False
+    base = CUSTOM_DIRS[target_type]
+    dirs = [base / c for c in char_ids] if char_ids else sorted(
+        (d for d in base.iterdir() if d.is_dir()), key=lambda p: p.name
+    )
+
+    total_brute = total_fast = 0.0
+    total_pairs = total_found = total_checks = total_all = 0
+    for d in dirs:
+        images: List[Path] = list(_iter_images(d)) if d.is_dir() else []
+        if len(images) < 2:
+            continue
+        for p in images:
+            get_orb_features(p)
+        fps = _fingerprints(images)
+        card_phash_index.flush(force=True)
+
+        start = time.perf_counter()
+        brute = _pair_keys(find_duplicate_pairs_in_dir(d, prefilter=False))
+        t_brute = time.perf_counter() - start
+        start = time.perf_counter()
+        fast = _pair_keys(find_duplicate_pairs_in_dir(d))
+        t_fast = time.perf_counter() - start
+
+        n = len(images)
+        checks = len(card_phash_index.shortlist_pairs(fps))
+        found = len(brute & fast)
+        total_brute += t_brute
+        total_fast += t_fast
+        total_pairs += len(brute)
+        total_found += found
+        total_checks += checks
+        total_all += n * (n - 1) // 2
+        print(
+            f"{d.name:<10} 图 {n:>4}  ORB 比较 {checks:>6}/{n * (n - 1) // 2:<7} "
+            f"重复对 {found}/{len(brute)}  全量 {t_brute:7.2f}s  预筛 {t_fast:7.2f}s"
+        )
+
+    recall = total_found / total_pairs if total_pairs else 1.0
+    print(
+        f"合计: ORB 比较 {total_checks}/{total_all}  召回 {recall:.2%} "
+        f"({total_found}/{total_pairs})  全量 {total_brute:.2f}s  预筛 {total_fast:.2f}s  "
+        f"x{total_brute / max(total_fast, 1e-9):.1f}"
+    )
+    return total_found == total_pairs
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    sys.exit(0 if run(args[0] if args else "card", args[1:]) else 1)
@@ -0,0 +1,331 @@
+"""自定义图感知哈希索引, 给 ORB 查重做候选预筛。
+
+ORB 查重要两两做 knnMatch + 单应性校验, 角色目录里图一多就是 O(n²) 的分钟级耗时。
+这里给每张图算一个 128 位指纹 (64 位 pHash + 64 位 dHash, 与 ORB 用同一块预处理区域),
+按类型持久化在 ``CUSTOM_ORB_PATH/<type>/_phash.json`` (与 npz 缓存同目录, 按
+mtime + 大小校验), 再用 BK-tree 按汉明距离取候选:
+
+  - 距离在 ``SHORTLIST_RADIUS`` 内的全部进入候选;
+  - 另外每张图至少取最近的 ``SHORTLIST_TOP_K`` 张, 兜住裁剪 / 调色后指纹距离变大的重复图。
+
+只有候选对才交给 ORB 校验。numpy 缺失或指纹算不出来的图退回与全部图比较。
+"""
+
+from __future__ import annotations
+
+import os
+import json
+import time
+import heapq
+import threading
+from pathlib import Path
+from collections import OrderedDict
+from typing import Any, Set, Dict, List, Tuple, Callable, Optional, Sequence
+
+from PIL import Image
+from gsuid_core.logger import logger
+
+from . import card_hash_index
+from ..utils.resource.RESOURCE_PATH import CUSTOM_ORB_PATH
+
+
+def _import_np():
+    try:
+        import numpy as np  # type: ignore
+        return np
+    except Exception:
+        return None
+
+
+np = _import_np()
+
+PHASH_VERSION = 1
+SHORTLIST_RADIUS = 24
+SHORTLIST_TOP_K = 6
+
+_INDEX_NAME = "_phash.json"
+_MEMORY_MAX = 2048
+# 全库扫描时各目录并发结束, 索引文件不必每个目录都整体重写一次
+_FLUSH_INTERVAL = 10.0
+_last_flush = 0.0
+
+_lock = threading.RLock()
+# type -> {相对路径: [mtime_ns, size, 指纹 hex]}
+_indexes: Dict[str, Dict[str, list]] = {}
+_dirty: Set[str] = set()
+# 不在三类目录下的图 (tmp / pending) 只做内存缓存: (路径, mtime_ns, size, type) -> 指纹
+_memory: "OrderedDict[Tuple[str, int, int, Optional[str]], Optional[int]]" = OrderedDict()
+
+
+def _dct_matrix(n: int):
+    k = np.arange(n)
+    m = np.cos(np.pi * (2 * k[None, :] + 1) * k[:, None] / (2 * n)) * np.sqrt(2.0 / n)
+    m[0] /= np.sqrt(2.0)
+    return m
+
+
+_DCT32 = _dct_matrix(32) if np is not None else None
+
+
+def _bits_to_int(bits) -> int:
+    value = 0
+    for b in bits.ravel():
+        value = (value << 1) | int(b)
+    return value
+
+
+def image_fingerprint(image: Image.Image) -> Optional[int]:
+    """pHash (32x32 DCT 左上 8x8 与中位数比较) 拼 dHash (9x8 相邻像素比较), 共 128 位。"""
+    if np is None:
+        return None
+    gray = image.convert("L")
+    small = np.asarray(gray.resize((32, 32), Image.Resampling.LANCZOS), dtype=np.float64)
+    dct = _DCT32 @ small @ _DCT32.T
+    low = dct[:8, :8].ravel()
+    phash = _bits_to_int(low > np.median(low[1:]))
+    diff = np.asarray(gray.resize((9, 8), Image.Resampling.LANCZOS), dtype=np.int16)
+    dhash = _bits_to_int(diff[:, 1:] > diff[:, :-1])
+    return (phash << 64) | dhash
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def _index_path(t: str) -> Path:
+    return CUSTOM_ORB_PATH / t / _INDEX_NAME
+
+
+def _load_index(t: str) -> Dict[str, list]:
+    entries = _indexes.get(t)
+    if entries is not None:
+        return entries
+    entries = {}
+    path = _index_path(t)
+    if path.exists():
+        try:
+            raw = json.loads(path.read_text(encoding="utf-8"))
+            if raw.get("version") == PHASH_VERSION:
+                base = card_hash_index.TYPE_BASES[t]
+                # 顺带清掉已删除图片的条目
+                entries = {
+                    rel: item
+                    for rel, item in raw.get("entries", {}).items()
+                    if (base / rel).is_file()
+                }
+                if len(entries) != len(raw.get("entries", {})):
+                    _dirty.add(t)
+        except Exception as e:
+            logger.warning(f"[鸣潮·卡片指纹] 读取指纹索引失败, 将重建 {path}: {e}")
+    _indexes[t] = entries
+    return entries
+
+
+def flush(force: bool = False) -> None:
+    """把有改动的类型索引写回磁盘; 非 force 时距上次写入不足 _FLUSH_INTERVAL 秒则跳过。"""
+    global _last_flush
+    with _lock:
+        if not _dirty or (not force and time.monotonic() - _last_flush < _FLUSH_INTERVAL):
+            return
+        _last_flush = time.monotonic()
+        for t in list(_dirty):
+            path = _index_path(t)
+            tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp.write_text(
+                    json.dumps(
+                        {"version": PHASH_VERSION, "entries": _indexes.get(t, {})},
+                        ensure_ascii=False,
+                        separators=(",", ":"),
+                    ),
+                    encoding="utf-8",
+                )
+                tmp.replace(path)
+                _dirty.discard(t)
+            except OSError as e:
+                tmp.unlink(missing_ok=True)
+                logger.warning(f"[鸣潮·卡片指纹] 写入指纹索引失败 {path}: {e}")
+
+
+def _persist_key(image_path: Path, t: Optional[str]) -> Optional[Tuple[str, str]]:
+    # 与 ORB 缓存同口径: 显式指定的类型与路径真实类型不一致时不落盘
+    real = card_hash_index.detect_type(image_path)
+    if real is None or (t is not None and t != real):
+        return None
+    rel = image_path.relative_to(card_hash_index.TYPE_BASES[real]).as_posix()
+    return real, rel
+
+
+def get_fingerprint(
+    image_path: Path,
+    compute: Callable[[Path], Optional[int]],
+    t: Optional[str] = None,
+) -> Optional[int]:
+    """取一张图的指纹, 命中索引且 mtime / 大小未变时不重算。compute 负责预处理与计算。"""
+    try:
+        stat = image_path.stat()
+    except OSError:
+        return None
+    stamp = [stat.st_mtime_ns, stat.st_size]
+    persist = _persist_key(image_path, t)
+
+    with _lock:
+        if persist is not None:
+            item = _load_index(persist[0]).get(persist[1])
+            if item is not None and item[:2] == stamp:
+                return int(item[2], 16)
+        else:
+            mkey = (str(image_path), stamp[0], stamp[1], t)
+            if mkey in _memory:
+                _memory.move_to_end(mkey)
+                return _memory[mkey]
+
+    value = compute(image_path)
+
+    with _lock:
+        if persist is not None:
+            if value is not None:
+                _load_index(persist[0])[persist[1]] = [*stamp, format(value, "x")]
+                _dirty.add(persist[0])
+        else:
+            _memory[mkey] = value
+            while len(_memory) > _MEMORY_MAX:
+                _memory.popitem(last=False)
+    return value
+
+
+def forget(image_path: Path) -> None:
+    """图片删除 / 重算 ORB 时同步丢掉对应指纹。"""
+    persist = _persist_key(image_path, None)
+    if persist is None:
+        return
+    with _lock:
+        if _load_index(persist[0]).pop(persist[1], None) is not None:
+            _dirty.add(persist[0])
+
+
+class BKTree:
+    """汉明距离 BK-tree, 节点为 [指纹, 条目列表, {边距离: 子节点}]。"""
+
+    def __init__(self) -> None:
+        self.root: Optional[list] = None
+
+    def add(self, value: int, item: Any) -> None:
+        if self.root is None:
+            self.root = [value, [item], {}]
+            return
+        node = self.root
+        while True:
+            d = hamming(value, node[0])
+            if d == 0:
+                node[1].append(item)
+                return
+            child = node[2].get(d)
+            if child is None:
+                node[2][d] = [value, [item], {}]
+                return
+            node = child
+
+    def search(self, value: int, radius: int) -> List[Tuple[int, Any]]:
+        out: List[Tuple[int, Any]] = []
+        stack = [self.root] if self.root is not None else []
+        while stack:
+            node = stack.pop()
+            d = hamming(value, node[0])
+            if d <= radius:
+                out.extend((d, item) for item in node[1])
+            for edge, child in node[2].items():
+                if d - radius <= edge <= d + radius:
+                    stack.append(child)
+        return out
+
+    def nearest(self, value: int, k: int, exclude: Any = None) -> List[Tuple[int, Any]]:
+        """最近的 k 个条目 (不含 exclude)。"""
+        if k <= 0 or self.root is None:
+            return []
+        # 大顶堆 (-距离, 序号, 条目), 序号避免条目之间直接比较
+        best: List[Tuple[int, int, Any]] = []
+        seq = 0
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            d = hamming(value, node[0])
+            for item in node[1]:
+                if item == exclude:
+                    continue
+                if len(best) < k:
+                    heapq.heappush(best, (-d, seq, item))
+                elif d < -best[0][0]:
+                    heapq.heapreplace(best, (-d, seq, item))
+                seq += 1
+            bound = -best[0][0] if len(best) >= k else None
+            for edge, child in node[2].items():
+                if bound is None or d - bound <= edge <= d + bound:
+                    stack.append(child)
+        return sorted((-nd, item) for nd, _, item in best)
+
+
+def _candidates(
+    tree: BKTree,
+    value: int,
+    exclude: Any,
+    radius: int,
+    top_k: int,
+) -> Set[Any]:
+    found = {item for _, item in tree.search(value, radius)}
+    found.update(item for _, item in tree.nearest(value, top_k, exclude))
+    found.discard(exclude)
+    return found
+
+
+def shortlist_pairs(
+    fingerprints: Sequence[Optional[int]],
+    radius: int = SHORTLIST_RADIUS,
+    top_k: int = SHORTLIST_TOP_K,
+) -> List[Tuple[int, int]]:
+    """同一批图内部的候选对 (i < j), 按下标升序。"""
+    tree = BKTree()
+    unknown: List[int] = []
+    for i, fp in enumerate(fingerprints):
+        if fp is None:
+            unknown.append(i)
+        else:
+            tree.add(fp, i)
+    pairs: Set[Tuple[int, int]] = set()
+    for i, fp in enumerate(fingerprints):
+        if fp is None:
+            continue
+        for j in _candidates(tree, fp, i, radius, top_k):
+            pairs.add((min(i, j), max(i, j)))
+    n = len(fingerprints)
+    for i in unknown:
+        for j in range(n):
+            if j != i:
+                pairs.add((min(i, j), max(i, j)))
+    return sorted(pairs)
+
+
+def shortlist_against(
+    queries: Sequence[Optional[int]],
+    existing: Sequence[Optional[int]],
+    radius: int = SHORTLIST_RADIUS,
+    top_k: int = SHORTLIST_TOP_K,
+) -> List[List[int]]:
+    """每张新图在已有图中的候选下标列表 (升序)。"""
+    tree = BKTree()
+    unknown: List[int] = []
+    for j, fp in enumerate(existing):
+        if fp is None:
+            unknown.append(j)
+        else:
+            tree.add(fp, j)
+    out: List[List[int]] = []
+    for fp in queries:
+        if fp is None:
+            out.append(list(range(len(existing))))
+            continue
+        found = _candidates(tree, fp, None, radius, top_k)
+        found.update(unknown)
+        out.append(sorted(found))
+    return out
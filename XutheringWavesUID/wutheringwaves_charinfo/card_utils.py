@@ -10,7 +10,7 @@ from PIL import Image, ImageChops
 from gsuid_core.logger import logger
 from gsuid_core.pool import to_thread
 
-from . import card_hash_index
+from . import card_hash_index, card_phash_index
 from .card_hash_index import compute_hash as get_hash_id  # 对外别名, 旧 import 不破
 
 
@@ -400,6 +400,7 @@ def _save_orb_cache(image_path: Path, pts, des) -> None:
 
 
 def delete_orb_cache(image_path: Path) -> None:
+    card_phash_index.forget(image_path)
     cache_path = _get_orb_cache_path(image_path)
     if cache_path and cache_path.exists():
         try:
@@ -451,6 +452,7 @@ def get_orb_features(image_path: Path, t: Optional[str] = None):
 
 
 def update_orb_cache(image_path: Path) -> bool:
+    card_phash_index.forget(image_path)
     computed = _compute_orb_features(image_path)
     if computed is None:
         return False
@@ -522,52 +524,91 @@ class UnionFind:
         return list(grouped.values())
 
 
+def _compute_fingerprint(image_path: Path, t: Optional[str] = None) -> Optional[int]:
+    """与 ORB 同一块区域的感知指纹 (card 取面板可见区, 无需 ORB 那步 ×2 放大)。"""
+    if t is None:
+        t = card_hash_index.detect_type(image_path)
+    try:
+        with Image.open(image_path) as im:
+            im.load()
+            if t == "card":
+                im = resize_and_center_image(im, is_custom=True).crop(_PANEL_VISIBLE_BOX_LOCAL)
+            return card_phash_index.image_fingerprint(im)
+    except Exception:
+        return None
+
+
+def _fingerprints(paths: List[Path], as_type: Optional[str] = None) -> List[Optional[int]]:
+    return [
+        card_phash_index.get_fingerprint(p, lambda x: _compute_fingerprint(x, as_type), as_type)
+        for p in paths
+    ]
+
+
+class _LazyFeatures:
+    """只在候选对真正要校验时才读 / 算 ORB 特征。"""
+
+    def __init__(self, as_type: Optional[str] = None) -> None:
+        self.as_type = as_type
+        self._feats: Dict[Path, object] = {}
+
+    def get(self, path: Path):
+        if path not in self._feats:
+            self._feats[path] = get_orb_features(path, self.as_type)
+        return self._feats[path]
+
+
+def _verified_pairs_in(
+    images: List[Path],
+    threshold: float,
+    prefilter: bool,
+) -> List[Tuple[Path, Path, float]]:
+    if prefilter:
+        candidates = card_phash_index.shortlist_pairs(_fingerprints(images))
+        card_phash_index.flush()
+    else:
+        candidates = [(i, j) for i in range(len(images)) for j in range(i + 1, len(images))]
+    feats = _LazyFeatures()
+    pairs: List[Tuple[Path, Path, float]] = []
+    for i, j in candidates:
+        f1 = feats.get(images[i])
+        if f1 is None:
+            continue
+        f2 = feats.get(images[j])
+        if f2 is None:
+            continue
+        sim = _orb_similarity(f1, f2)
+        if sim is not None and sim >= threshold:
+            pairs.append((images[i], images[j], sim))
+    return pairs
+
+
 def find_duplicate_pairs_in_dir(
     dir_path: Path,
     threshold: float = ORB_THRESHOLD,
+    prefilter: bool = True,
 ) -> List[Tuple[Path, Path, float]]:
+    """prefilter=False 时退回全量两两 ORB (基准对照用)。"""
     images = list(_iter_images(dir_path))
     if len(images) < 2:
         return []
-    features = []
-    for img_path in images:
-        feat = get_orb_features(img_path)
-        if feat is not None:
-            features.append((img_path, feat))
-    pairs: List[Tuple[Path, Path, float]] = []
-    for i in range(len(features)):
-        p1, f1 = features[i]
-        for j in range(i + 1, len(features)):
-            p2, f2 = features[j]
-            sim = _orb_similarity(f1, f2)
-            if sim is not None and sim >= threshold:
-                pairs.append((p1, p2, sim))
-    return pairs
+    return _verified_pairs_in(images, threshold, prefilter)
 
 
 def find_duplicate_groups_in_dir(
     dir_path: Path,
     threshold: float = ORB_THRESHOLD,
+    prefilter: bool = True,
 ) -> List[Tuple[List[Path], Dict[Tuple[Path, Path], float]]]:
     images = list(_iter_images(dir_path))
     if len(images) < 2:
         return []
-    features = []
-    for img_path in images:
-        feat = get_orb_features(img_path)
-        if feat is not None:
-            features.append((img_path, feat))
 
-    uf = UnionFind([p for p, _ in features])
+    uf = UnionFind(images)
     sim_map: Dict[Tuple[Path, Path], float] = {}
-    for i in range(len(features)):
-        p1, f1 = features[i]
-        for j in range(i + 1, len(features)):
-            p2, f2 = features[j]
-            sim = _orb_similarity(f1, f2)
-            if sim is not None and sim >= threshold:
-                uf.union(p1, p2)
-                sim_map[(p1, p2)] = sim
+    for p1, p2, sim in _verified_pairs_in(images, threshold, prefilter):
+        uf.union(p1, p2)
+        sim_map[(p1, p2)] = sim
 
     groups = [g for g in uf.groups() if len(g) >= 2]
     return [(g, sim_map) for g in groups]
@@ -578,21 +619,29 @@ def find_duplicates_for_new_images(
     new_images: List[Path],
     threshold: float = ORB_THRESHOLD,
     as_type: Optional[str] = None,
+    prefilter: bool = True,
 ) -> Dict[Path, List[Tuple[Path, float]]]:
     existing = [p for p in _iter_images(dir_path) if p not in new_images]
-    existing_feats = {}
-    for p in existing:
-        feat = get_orb_features(p, as_type)
-        if feat is not None:
-            existing_feats[p] = feat
+    if prefilter:
+        shortlists = card_phash_index.shortlist_against(
+            _fingerprints(new_images, as_type), _fingerprints(existing, as_type)
+        )
+        card_phash_index.flush()
+    else:
+        shortlists = [list(range(len(existing)))] * len(new_images)
 
+    feats = _LazyFeatures(as_type)
     result: Dict[Path, List[Tuple[Path, float]]] = {}
-    for new_path in new_images:
-        feat_new = get_orb_features(new_path, as_type)
+    for new_path, shortlist in zip(new_images, shortlists):
+        feat_new = feats.get(new_path)
         if feat_new is None:
             continue
         dup_list: List[Tuple[Path, float]] = []
-        for old_path, feat_old in existing_feats.items():
+        for j in shortlist:
+            old_path = existing[j]
+            feat_old = feats.get(old_path)
+            if feat_old is None:
+                continue
             sim = _orb_similarity(feat_new, feat_old)
             if sim is not None and sim >= threshold:
                 dup_list.append((old_path, sim))
@@ -640,6 +689,7 @@ async def send_repeated_custom_cards(
         ]
         for result in await asyncio.gather(*tasks):
             groups.extend(result)
+    card_phash_index.flush(force=True)
 
     if not groups:
         msg = "[鸣潮] 未找到重复图片！"
@@ -113,6 +113,7 @@ from ..utils.image import (
     get_custom_gaussian_blur,
 )
 from ..utils.imagetool import get_weapon_icon_bg
+from ..utils.texture_cache import get_texture, open_texture
 
 TEXT_PATH = Path(__file__).parent / "texture2d"
 
@@ -243,15 +244,15 @@ async def ph_card_draw(
     char_name = role_detail.role.roleName
 
     phantom_temp = Image.new("RGBA", (1200, 1280 + ph_sum_value))
-    banner3 = Image.open(TEXT_PATH / "banner3.png")
+    banner3 = get_texture(TEXT_PATH / "banner3.png")
     phantom_temp.alpha_composite(banner3, dest=(0, 0))
 
     from .role_info_change import ensure_default_modal
     from ..utils.damage.modal import get_role_modal
     ensure_default_modal(role_detail)
 
-    ph_0 = Image.open(TEXT_PATH / "ph_0.png")
-    ph_1 = Image.open(TEXT_PATH / "ph_1.png")
+    ph_0 = get_texture(TEXT_PATH / "ph_0.png")
+    ph_1 = get_texture(TEXT_PATH / "ph_1.png")
     calc = WuWaCalc(role_detail, enemy_detail, is_limit=is_limit_query or phantom_dirty)
     phantom_score = 0  # 初始化声骸评分
     if role_detail.phantomData and role_detail.phantomData.equipPhantomList:
@@ -270,7 +271,7 @@ async def ph_card_draw(
         for i, _phantom in enumerate(equipPhantomList):
             sh_temp = Image.new("RGBA", (350, 550))
             sh_temp_draw = ImageDraw.Draw(sh_temp)
-            sh_bg = Image.open(TEXT_PATH / "sh_bg.png")
+            sh_bg = get_texture(TEXT_PATH / "sh_bg.png")
             sh_temp.alpha_composite(sh_bg, dest=(0, 0))
             if _phantom and _phantom.phantomProp:
                 props = _phantom.get_props()
@@ -279,7 +280,7 @@ async def ph_card_draw(
                     _score = 50.0
 
                 phantom_score += _score
-                sh_title = Image.open(TEXT_PATH / f"sh_title_{_bg}.png")
+                sh_title = get_texture(TEXT_PATH / f"sh_title_{_bg}.png")
 
                 sh_temp.alpha_composite(sh_title, dest=(0, 0))
 
@@ -309,8 +310,7 @@ async def ph_card_draw(
                 sh_temp.alpha_composite(ph_score_img, (223, 58))
 
                 for index in range(0, _phantom.cost):
-                    promote_icon = Image.open(TEXT_PATH / "promote_icon.png")
-                    promote_icon = promote_icon.resize((30, 30))
+                    promote_icon = get_texture(TEXT_PATH / "promote_icon.png", (30, 30))
                     sh_temp.alpha_composite(promote_icon, dest=(128 + 30 * index, 90))
 
                 for index, _prop in enumerate(props):
@@ -354,10 +354,10 @@ async def ph_card_draw(
             if phantom_score > 249.9:
                 phantom_score = 250.0
             _bg = get_total_score_bg(char_name, phantom_score, calc.calc_temp)
-            sh_score_bg_c = Image.open(TEXT_PATH / f"sh_score_bg_{_bg}.png")
+            sh_score_bg_c = get_texture(TEXT_PATH / f"sh_score_bg_{_bg}.png")
             score_temp = Image.new("RGBA", sh_score_bg_c.size)
             score_temp.alpha_composite(sh_score_bg_c)
-            sh_score_c = Image.open(TEXT_PATH / f"sh_score_{_bg}.png")
+            sh_score_c = get_texture(TEXT_PATH / f"sh_score_{_bg}.png")
             score_temp.alpha_composite(sh_score_c)
             score_temp_draw = ImageDraw.Draw(score_temp)
 
@@ -365,7 +365,7 @@ async def ph_card_draw(
             draw_text_with_fallback(score_temp_draw, (180, 380), f"{phantom_score:.2f}{t('分', locale)}", "white", waves_font_40, "mm")
             draw_text_with_fallback(score_temp_draw, (180, 440), t("声骸评分", locale), GREY, waves_font_30 if locale == 'en' else waves_font_40, "mm")
         else:
-            abs_bg = Image.open(TEXT_PATH / "abs.png")
+            abs_bg = get_texture(TEXT_PATH / "abs.png")
             score_temp = Image.new("RGBA", abs_bg.size)
             score_temp.alpha_composite(abs_bg)
             score_temp_draw = ImageDraw.Draw(score_temp)
@@ -503,14 +503,14 @@ async def get_role_need(
 # TODO: PIL 卸到线程池 (await/PIL 深度交错)
 async def draw_fixed_img(img, avatar, account_info, role_detail, locale="", uid=None, char_name=None, user_pref=""):
     # 头像部分
-    avatar_ring = Image.open(TEXT_PATH / "avatar_ring.png")
+    avatar_ring = get_texture(TEXT_PATH / "avatar_ring.png")
 
     img.paste(avatar, (45, 20), avatar)
     avatar_ring = avatar_ring.resize((180, 180))
     img.paste(avatar_ring, (55, 30), avatar_ring)
 
     # base_info 特例: 名字/特征码走 draw_text_with_fallback(emoji)+i18n, 不接公共 draw_base_info_bg
-    base_info_bg = Image.open(TEXT_PATH / "base_info_bg.png")
+    base_info_bg = open_texture(TEXT_PATH / "base_info_bg.png")
     base_info_draw = ImageDraw.Draw(base_info_bg)
     # account_info 缺失时(baseinfo API 失败) 用 uid 兜底
     _name = account_info.name[:10] if account_info else (uid or "")
@@ -520,7 +520,7 @@ async def draw_fixed_img(img, avatar, account_info, role_detail, locale="", uid=
     img.paste(base_info_bg, (35, -30), base_info_bg)
 
     if account_info and account_info.is_full:
-        title_bar = Image.open(TEXT_PATH / "title_bar.png")
+        title_bar = open_texture(TEXT_PATH / "title_bar.png")
         title_bar_draw = ImageDraw.Draw(title_bar)
         _level_font = waves_font_20 if locale == 'en' else waves_font_26
         draw_text_with_fallback(title_bar_draw, (510, 125), t("联觉等级", locale), GREY, _level_font, "mm")
@@ -555,8 +555,8 @@ async def draw_fixed_img(img, avatar, account_info, role_detail, locale="", uid=
     finally:
         if _pin_token is not None:
             _force_pile_path.reset(_pin_token)
-    char_mask = Image.open(TEXT_PATH / "char_mask.png")
-    char_fg = Image.open(TEXT_PATH / "char_fg.png")
+    char_mask = get_texture(TEXT_PATH / "char_mask.png")
+    char_fg = open_texture(TEXT_PATH / "char_fg.png")
 
     role_attribute = await get_attribute(role_detail.role.attributeName)
     role_attribute = role_attribute.resize((50, 50)).convert("RGBA")
@@ -890,15 +890,15 @@ async def draw_char_detail_img(
         weapon_bg_y = 620
 
     # 武器banner
-    banner2 = Image.open(TEXT_PATH / "banner2.png")
+    banner2 = get_texture(TEXT_PATH / "banner2.png")
     right_image_temp.alpha_composite(banner2, dest=(-9, right_weapon_banner_y))
 
     # 右侧属性-武器-激活技能
     skill_branch = role_detail.get_skill_branch()
     if skill_branch:
-        weapon_bg = Image.open(TEXT_PATH / "weapon_branch_bg.png")
+        weapon_bg = get_texture(TEXT_PATH / "weapon_branch_bg.png")
     else:
-        weapon_bg = Image.open(TEXT_PATH / "weapon_bg.png")
+        weapon_bg = get_texture(TEXT_PATH / "weapon_bg.png")
 
     weapon_bg_temp = Image.new("RGBA", right_image_temp.size)
     weapon_bg_temp.alpha_composite(weapon_bg, dest=(0, weapon_bg_y))
@@ -923,7 +923,7 @@ async def draw_char_detail_img(
 
     weapon_breach = get_breach(weaponData.breach, weaponData.level)
     for i in range(0, weapon_breach):  # type: ignore
-        promote_icon = Image.open(TEXT_PATH / "promote_icon.png")
+        promote_icon = get_texture(TEXT_PATH / "promote_icon.png")
         weapon_bg_temp.alpha_composite(promote_icon, dest=(200 + 40 * i, weapon_name_y + 70))
 
     weapon_bg_temp.alpha_composite(weapon_icon_bg, dest=(45, weapon_name_y - 30))
@@ -964,7 +964,7 @@ async def draw_char_detail_img(
 
     shuxing_color = WAVES_SHUXING_MAP[role_detail.role.attributeName]  # type: ignore
     for i, _mz in enumerate(role_detail.chainList):
-        mz_bg = Image.open(TEXT_PATH / "mz_bg.png")
+        mz_bg = open_texture(TEXT_PATH / "mz_bg.png")
         mz_bg_temp = Image.new("RGBA", mz_bg.size)
         mz_bg_temp_draw = ImageDraw.Draw(mz_bg_temp)
         chain = await get_chain_img(role_detail.role.roleId, _mz.order, _mz.iconUrl)  # type: ignore
@@ -1077,9 +1077,9 @@ async def draw_char_detail_img(
                     dest=(0, 2600 + ph_sum_value + jineng_len + (dindex + 1) * 60),
                 )
 
-    banner1 = Image.open(TEXT_PATH / "banner4.png")
+    banner1 = get_texture(TEXT_PATH / "banner4.png")
     right_image_temp.alpha_composite(banner1, dest=(-9, 0)) # 因为属性图不是居中对称的，banner偏移和属性居中对齐
-    sh_bg = Image.open(TEXT_PATH / "prop_bg.png")
+    sh_bg = open_texture(TEXT_PATH / "prop_bg.png")
     sh_bg_draw = ImageDraw.Draw(sh_bg)
 
     shuxing = f"{role_detail.role.attributeName}伤害加成"
@@ -1134,8 +1134,8 @@ async def draw_char_detail_img(
     img.paste(right_image_temp, (570, 200 + bar_shift), right_image_temp)
 
     # 技能
-    skill_bar = Image.open(TEXT_PATH / "skill_bar.png")
-    skill_bg_1 = Image.open(TEXT_PATH / "skill_bg.png")
+    skill_bar = open_texture(TEXT_PATH / "skill_bar.png")
+    skill_bg_1 = get_texture(TEXT_PATH / "skill_bg.png")
 
     temp_i = 0
     for _, _skill in enumerate(role_detail.get_skill_list()):
@@ -1164,7 +1164,7 @@ async def draw_char_detail_img(
     # 综合评分块: 立绘下方 / skill_bar 上方 (score_offset 同步)
     if score_report is not None:
         grade = get_panel_score_grade(score_report.score)
-        grade_icon = Image.open(TEXT_PATH / f"panel_score_{grade}.png")
+        grade_icon = get_texture(TEXT_PATH / f"panel_score_{grade}.png")
         grade_icon = grade_icon.resize((200, 200))
         img.alpha_composite(grade_icon, dest=(90, 1080 + bar_shift))
         score_draw = ImageDraw.Draw(img)
@@ -1254,8 +1254,8 @@ async def draw_char_score_img(ev: Event, uid: str, char: str, user_id: str, wave
     from .role_info_change import ensure_default_modal
     ensure_default_modal(role_detail)
 
-    ph_0 = Image.open(TEXT_PATH / "ph_0.png")
-    ph_1 = Image.open(TEXT_PATH / "ph_1.png")
+    ph_0 = get_texture(TEXT_PATH / "ph_0.png")
+    ph_1 = get_texture(TEXT_PATH / "ph_1.png")
     # phantom_sum_value = {}
     calc: WuWaCalc = WuWaCalc(role_detail, is_limit=is_limit_query)
     if role_detail.phantomData and role_detail.phantomData.equipPhantomList:
@@ -1276,7 +1276,7 @@ async def draw_char_score_img(ev: Event, uid: str, char: str, user_id: str, wave
         for i, _phantom in enumerate(equipPhantomList):
             sh_temp = Image.new("RGBA", (600, 1100))
             sh_temp_draw = ImageDraw.Draw(sh_temp)
-            sh_bg = Image.open(TEXT_PATH / "sh_bg.png")
+            sh_bg = get_texture(TEXT_PATH / "sh_bg.png")
             sh_temp.alpha_composite(sh_bg, dest=(0, 0))
             if _phantom and _phantom.phantomProp:
                 props = _phantom.get_props()
@@ -1285,7 +1285,7 @@ async def draw_char_score_img(ev: Event, uid: str, char: str, user_id: str, wave
                     _score = 50.0
 
                 phantom_score += _score
-                sh_title = Image.open(TEXT_PATH / f"sh_title_{_bg}.png")
+                sh_title = get_texture(TEXT_PATH / f"sh_title_{_bg}.png")
 
                 sh_temp.alpha_composite(sh_title, dest=(0, 0))
 
@@ -1315,8 +1315,7 @@ async def draw_char_score_img(ev: Event, uid: str, char: str, user_id: str, wave
                 sh_temp.alpha_composite(ph_score_img, (228, 58))
 
                 for index in range(0, _phantom.cost):
-                    promote_icon = Image.open(TEXT_PATH / "promote_icon.png")
-                    promote_icon = promote_icon.resize((30, 30))
+                    promote_icon = get_texture(TEXT_PATH / "promote_icon.png", (30, 30))
                     sh_temp.alpha_composite(promote_icon, dest=(128 + 30 * index, 90))
 
                 for index, _prop in enumerate(props):
@@ -1381,10 +1380,10 @@ async def draw_char_score_img(ev: Event, uid: str, char: str, user_id: str, wave
             if phantom_score > 249.9:
                 phantom_score = 250.0
             _bg = get_total_score_bg(char_name, phantom_score, calc.calc_temp)
-            sh_score_bg_c = Image.open(TEXT_PATH / f"sh_score_bg_{_bg}.png")
+            sh_score_bg_c = get_texture(TEXT_PATH / f"sh_score_bg_{_bg}.png")
             score_temp = Image.new("RGBA", sh_score_bg_c.size)
             score_temp.alpha_composite(sh_score_bg_c)
-            sh_score_c = Image.open(TEXT_PATH / f"sh_score_{_bg}.png")
+            sh_score_c = get_texture(TEXT_PATH / f"sh_score_{_bg}.png")
             score_temp.alpha_composite(sh_score_c)
             score_temp_draw = ImageDraw.Draw(score_temp)
 
@@ -1392,7 +1391,7 @@ async def draw_char_score_img(ev: Event, uid: str, char: str, user_id: str, wave
             draw_text_with_fallback(score_temp_draw, (180, 380), f"{phantom_score:.2f}{t('分', locale)}", "white", waves_font_40, "mm")
             draw_text_with_fallback(score_temp_draw, (180, 440), t("声骸评分", locale), GREY, waves_font_30 if locale == 'en' else waves_font_40, "mm")
         else:
-            abs_bg = Image.open(TEXT_PATH / "abs.png")
+            abs_bg = get_texture(TEXT_PATH / "abs.png")
             score_temp = Image.new("RGBA", abs_bg.size)
             score_temp.alpha_composite(abs_bg)
             score_temp_draw = ImageDraw.Draw(score_temp)
@@ -1449,7 +1448,7 @@ async def draw_char_score_img(ev: Event, uid: str, char: str, user_id: str, wave
             weight_table = await draw_weight(weight_table, role_detail.role.roleName, weight_rows, ct, modal_name)
             img.alpha_composite(weight_table, (0, weight_base_y + ti * weight_block_h))
 
-    char_bg = Image.open(TEXT_PATH / "char.png")
+    char_bg = get_texture(TEXT_PATH / "char.png")
     img.paste(char_bg, (1100, 220), char_bg)
     img.paste(phantom_temp, (0, 1050), phantom_temp)
     img.paste(right_image_temp, (605, 225), right_image_temp)
@@ -1490,16 +1489,16 @@ def _fmt_opt_val(name: str, value: float) -> str:
 def _render_optimal_phantom_card(slot) -> Image.Image:
     """渲染单张最优声骸卡片 (350×550), 不显示 score."""
     sh_temp = Image.new("RGBA", (350, 550))
-    sh_bg = Image.open(TEXT_PATH / "sh_bg.png")
+    sh_bg = get_texture(TEXT_PATH / "sh_bg.png")
     sh_temp.alpha_composite(sh_bg, dest=(0, 0))
 
-    sh_title = Image.open(TEXT_PATH / "sh_title_s.png")
+    sh_title = get_texture(TEXT_PATH / "sh_title_s.png")
     sh_temp.alpha_composite(sh_title, dest=(0, 0))
 
     draw = ImageDraw.Draw(sh_temp)
 
     # COST 星形图标
-    promote_icon_raw = Image.open(TEXT_PATH / "promote_icon.png")
+    promote_icon_raw = get_texture(TEXT_PATH / "promote_icon.png")
     promote_icon = promote_icon_raw.resize((24, 24))
     for idx in range(slot.cost):
         sh_temp.alpha_composite(promote_icon, dest=(10 + 26 * idx, 8))
@@ -1576,7 +1575,7 @@ async def ph_card_draw_optimal(
     )
 
     phantom_temp = Image.new("RGBA", (1200, 1280 + ph_sum_value))
-    banner3 = Image.open(TEXT_PATH / "banner3.png")
+    banner3 = get_texture(TEXT_PATH / "banner3.png")
     phantom_temp.alpha_composite(banner3, dest=(0, 0))
 
     # "声骸培养目标参考" 标题条 (复用 damage_bar1)
@@ -1590,17 +1589,17 @@ async def ph_card_draw_optimal(
     )
     phantom_temp.alpha_composite(target_title, dest=((1200 - _tt_w) // 2, 85))
 
-    ph_0 = Image.open(TEXT_PATH / "ph_0.png")
-    ph_1 = Image.open(TEXT_PATH / "ph_1.png")
+    ph_0 = get_texture(TEXT_PATH / "ph_0.png")
+    ph_1 = get_texture(TEXT_PATH / "ph_1.png")
 
     async def _draw_best_card(i, slot):
         sh_temp = Image.new("RGBA", (350, 550))
         sh_temp_draw = ImageDraw.Draw(sh_temp)
-        sh_bg = Image.open(TEXT_PATH / "sh_bg.png")
+        sh_bg = get_texture(TEXT_PATH / "sh_bg.png")
         sh_temp.alpha_composite(sh_bg, dest=(0, 0))
 
         # 优化卡顶栏统一用 S 级 (不算 score, 视觉中性)
-        sh_title = Image.open(TEXT_PATH / "sh_title_s.png")
+        sh_title = get_texture(TEXT_PATH / "sh_title_s.png")
         sh_temp.alpha_composite(sh_title, dest=(0, 0))
 
         real_phantom = equipPhantomList[i] if i < len(equipPhantomList) else None
@@ -1627,7 +1626,7 @@ async def ph_card_draw_optimal(
         sh_temp.alpha_composite(tpl_badge, (128, 58))
 
         for ci in range(slot.cost):
-            promote_icon = Image.open(TEXT_PATH / "promote_icon.png").resize((30, 30))
+            promote_icon = get_texture(TEXT_PATH / "promote_icon.png", (30, 30))
             sh_temp.alpha_composite(promote_icon, dest=(128 + 30 * ci, 90))
 
         props_display = []
@@ -1680,10 +1679,10 @@ async def ph_card_draw_optimal(
         )
 
     grade = "sss"
-    sh_score_bg_c = Image.open(TEXT_PATH / f"sh_score_bg_{grade}.png")
+    sh_score_bg_c = get_texture(TEXT_PATH / f"sh_score_bg_{grade}.png")
     score_temp = Image.new("RGBA", sh_score_bg_c.size)
     score_temp.alpha_composite(sh_score_bg_c)
-    sh_score_c = Image.open(TEXT_PATH / f"sh_score_{grade}.png")
+    sh_score_c = get_texture(TEXT_PATH / f"sh_score_{grade}.png")
     score_temp.alpha_composite(sh_score_c)
     score_temp_draw = ImageDraw.Draw(score_temp)
     draw_text_with_fallback(score_temp_draw, (180, 260), t("综合评级", locale), GREY, waves_font_30 if locale == "en" else waves_font_40, "mm")
@@ -1906,15 +1905,15 @@ async def draw_char_optimize_img(ev: Event, uid: str, char: str, user_id: str, w
     weapon_bg_y = 750
 
     # 武器 banner
-    banner2 = Image.open(TEXT_PATH / "banner2.png")
+    banner2 = get_texture(TEXT_PATH / "banner2.png")
     right_image_temp.alpha_composite(banner2, dest=(-9, right_weapon_banner_y))
 
     # 武器底板
     skill_branch = role_detail.get_skill_branch()
     if skill_branch:
-        weapon_bg = Image.open(TEXT_PATH / "weapon_branch_bg.png")
+        weapon_bg = get_texture(TEXT_PATH / "weapon_branch_bg.png")
     else:
-        weapon_bg = Image.open(TEXT_PATH / "weapon_bg.png")
+        weapon_bg = get_texture(TEXT_PATH / "weapon_bg.png")
 
     weapon_bg_temp = Image.new("RGBA", right_image_temp.size)
     weapon_bg_temp.alpha_composite(weapon_bg, dest=(0, weapon_bg_y))
@@ -1937,7 +1936,7 @@ async def draw_char_optimize_img(ev: Event, uid: str, char: str, user_id: str, w
 
     weapon_breach = get_breach(weaponData.breach, weaponData.level)
     for i in range(0, weapon_breach):
-        promote_icon = Image.open(TEXT_PATH / "promote_icon.png")
+        promote_icon = get_texture(TEXT_PATH / "promote_icon.png")
         weapon_bg_temp.alpha_composite(promote_icon, dest=(200 + 40 * i, weapon_name_y + 70))
 
     weapon_bg_temp.alpha_composite(weapon_icon_bg, dest=(45, weapon_name_y - 30))
@@ -1977,7 +1976,7 @@ async def draw_char_optimize_img(ev: Event, uid: str, char: str, user_id: str, w
     mz_temp = Image.new("RGBA", (1200, 300))
     shuxing_color = WAVES_SHUXING_MAP[role_detail.role.attributeName]
     for i, _mz in enumerate(role_detail.chainList):
-        mz_bg = Image.open(TEXT_PATH / "mz_bg.png")
+        mz_bg = open_texture(TEXT_PATH / "mz_bg.png")
         mz_bg_temp = Image.new("RGBA", mz_bg.size)
         mz_bg_temp_draw = ImageDraw.Draw(mz_bg_temp)
         chain = await get_chain_img(role_detail.role.roleId, _mz.order, _mz.iconUrl)
@@ -2055,10 +2054,10 @@ async def draw_char_optimize_img(ev: Event, uid: str, char: str, user_id: str, w
     img.alpha_composite(rule_panel, dest=(30, rules_y))
 
     # ── 右侧 banner1 + 单列 prop_bg_single (与最优 panel 的 diff) ─────────
-    banner1 = Image.open(TEXT_PATH / "banner4.png")
+    banner1 = get_texture(TEXT_PATH / "banner4.png")
     right_image_temp.alpha_composite(banner1, dest=(-9, 0))
 
-    sh_bg = Image.open(TEXT_PATH / "prop_bg_single.png")
+    sh_bg = open_texture(TEXT_PATH / "prop_bg_single.png")
     sh_bg_draw = ImageDraw.Draw(sh_bg)
 
     shuxing = f"{role_detail.role.attributeName}伤害加成"
@@ -2146,8 +2145,8 @@ async def draw_char_optimize_img(ev: Event, uid: str, char: str, user_id: str, w
     img.paste(right_image_temp, (570, 200 + bar_shift), right_image_temp)
 
     # ── 技能条 (skill_bar) ────────────────────────────────────────────────
-    skill_bar = Image.open(TEXT_PATH / "skill_bar.png")
-    skill_bg_1 = Image.open(TEXT_PATH / "skill_bg.png")
+    skill_bar = open_texture(TEXT_PATH / "skill_bar.png")
+    skill_bg_1 = get_texture(TEXT_PATH / "skill_bg.png")
     temp_i = 0
     for _, _skill in enumerate(role_detail.get_skill_list()):
         if _skill.skill.type in ["延奏技能", "谐度破坏"]:
@@ -2170,7 +2169,7 @@ async def draw_char_optimize_img(ev: Event, uid: str, char: str, user_id: str, w
 
     # 综合评分块: 立绘下方 / skill_bar 上方 (与面板一致)
     grade = get_panel_score_grade(score_report.score)
-    grade_icon = Image.open(TEXT_PATH / f"panel_score_{grade}.png")
+    grade_icon = get_texture(TEXT_PATH / f"panel_score_{grade}.png")
     grade_icon = grade_icon.resize((200, 200))
     img.alpha_composite(grade_icon, dest=(90, 1080 + bar_shift))
     score_draw = ImageDraw.Draw(img)
@@ -2302,7 +2301,7 @@ async def draw_char_with_ring(char_id):
 
 @to_thread
 def _compose_avatar_ring(pic):
-    mask_pic = Image.open(TEXT_PATH / "avatar_mask.png")
+    mask_pic = get_texture(TEXT_PATH / "avatar_mask.png")
     img = Image.new("RGBA", (180, 180))
     mask = mask_pic.resize((160, 160))
     resize_pic = crop_center_img(pic, 160, 160)
@@ -181,6 +181,40 @@ CONFIG_DEFAULT: Dict[str, GSC] = {
         10,
         50,
     ),
+    "PanelCacheSize": GsIntConfig(
+        "面板解析缓存上限(MB)",
+        "进程内缓存已解析的玩家面板数据, 重复查询同一账号时跳过解压与校验; 按估算内存占用淘汰, 0 表示关闭",
+        64,
+        2048,
+    ),
+    "ScoreProcessWorkers": GsIntConfig(
+        "评分计算进程数",
+        "全量刷新、群排行回填等批量评分使用的常驻进程数; 0 表示不用进程池(线程串行), 实际不超过CPU核数-1",
+        2,
+        16,
+    ),
+    "ApiCoalesce": GsBoolConfig(
+        "合并并发的相同查询请求",
+        "开启后同一账号同时发起的相同只读查询(角色/面板/深塔等)只请求一次库街区, 结果共享, 可减少风控验证码",
+        False,
+    ),
+    "ApiCacheTTL": GsIntConfig(
+        "玩家数据查询结果缓存(秒)",
+        "只读玩家数据接口成功结果的短时缓存秒数, 期间重复查询直接复用; 0 表示不缓存(仅合并并发请求)",
+        0,
+        60,
+    ),
+    "ApiRateLimit": GsIntConfig(
+        "库街区接口限流上限(次/秒)",
+        "每个接口族(按域名+路径前缀与代理区分)的请求速率上限, 遇到限流/5xx/风控时自动减半并逐步恢复; 0 表示不限流",
+        20,
+        100,
+    ),
+    "ApiCircuitBreaker": GsBoolConfig(
+        "库街区接口熔断",
+        "开启后接口族连续失败时暂停请求一段时间并直接返回错误, 避免维护期间所有指令都卡在重试上",
+        True,
+    ),
     "UseGlobalSemaphore": GsBoolConfig(
         "开启后刷新角色面板并发数为全局共享",
         "开启后刷新角色面板并发数为全局共享",
@@ -274,6 +308,53 @@ CONFIG_DEFAULT: Dict[str, GSC] = {
         "http://127.0.0.1:3000/render",
         secret=True,
     ),
+    "RemoteRenderWeight": GsIntConfig(
+        "外置渲染权重(%)",
+        "外置与本地渲染都可用时, 优先走外置渲染的请求比例, 失败自动改用另一个; 100 为总是先外置",
+        100,
+        100,
+    ),
+    "RenderPoolPages": GsIntConfig(
+        "本地渲染页面数",
+        "本地 Chromium 常驻页面数, 即本地渲染最大并发, 修改后空闲时自动重建",
+        3,
+        16,
+    ),
+    "RenderQueueSize": GsIntConfig(
+        "本地渲染排队上限",
+        "等待页面的渲染请求超过此数量时直接回退 PIL 绘制",
+        20,
+        200,
+    ),
+    "RenderQueueTimeout": GsIntConfig(
+        "本地渲染排队超时(秒)",
+        "等待页面超过此时间则放弃本次 HTML 渲染并回退 PIL 绘制",
+        20,
+        120,
+    ),
+    "RenderRestartRss": GsIntConfig(
+        "本地渲染内存上限(MB)",
+        "Chromium 进程树占用内存超过此值时, 在途渲染结束后重启浏览器, 0 为不检查",
+        1536,
+        16384,
+    ),
+    "RenderCache": GsBoolConfig(
+        "渲染结果缓存",
+        "wiki/公告/帮助等卡片输入未变化时直接返回上次渲染的图片, 资源更新后自动失效",
+        True,
+    ),
+    "RenderCacheSize": GsIntConfig(
+        "渲染结果缓存上限(MB)",
+        "渲染结果缓存占用的磁盘上限, 超出后按最久未使用淘汰",
+        200,
+        4096,
+    ),
+    "TextureCacheSize": GsIntConfig(
+        "贴图缓存上限(MB)",
+        "PIL 卡片贴图解码后的内存缓存上限, 超出后按最久未使用淘汰",
+        128,
+        2048,
+    ),
     "EnableLocalization": GsBoolConfig(
         "启用多语言本地化",
         "启用后将加载多语言翻译字典到内存，用户可通过【设置语言】切换界面语言。",
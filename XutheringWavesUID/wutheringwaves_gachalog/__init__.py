@@ -24,7 +24,9 @@ from .get_gachalogs import (
     save_gachalogs,
     export_gachalogs,
     import_gachalogs,
+    restore_gachalogs,
     prune_gacha_backups,
+    list_gacha_checkpoints,
 )
 from .draw_gachalogs import draw_card, draw_card_help
 from .web_view import (  # 导入即注册路由
@@ -34,7 +36,7 @@ from .web_view import (  # 导入即注册路由
 )
 from ..utils.waves_api import waves_api
 from ..utils.error_reply import ERROR_CODE, WAVES_CODE_102, WAVES_CODE_103
-from ..utils.database.models import WavesBind
+from ..utils.database.models import WavesBind, WavesGachaStats
 from ..wutheringwaves_config import PREFIX
 from ..utils.resource.RESOURCE_PATH import GACHA_BACKUP_PATH, PLAYER_PATH
 from ..utils.player_store import resolve_player_path, resolve_readable_player_path
@@ -49,6 +51,7 @@ sv_import_gacha_log = SV("waves导入抽卡记录") # , area="DIRECT"
 sv_export_json_gacha_log = SV("waves导出抽卡记录")
 sv_delete_gacha_log = SV("waves删除抽卡记录")
 sv_delete_import_gacha_log = SV("waves删除抽卡导入", pm=0)
+sv_restore_gacha_log = SV("waves恢复抽卡记录", pm=0)
 sv_gacha_web = SV("waves抽卡网页")
 
 ERROR_MSG_NOTIFY = f"请给出正确的抽卡记录链接, 可发送【{PREFIX}抽卡帮助】"
@@ -546,6 +549,9 @@ async def delete_gacha_history(bot: Bot, ev: Event):
         dst_name = f"delete_gacha_logs_{datetime.now().strftime('%Y-%m-%d.%H%M%S')}.json"
         if gacha_log_file.suffix == ".gz":
             dst_name += ".gz"
+        elif gacha_log_file.suffix == ".db":
+            # 分段容器整体移走，容器内 checkpoint 一并保留
+            dst_name = dst_name[: -len(".json")] + ".db"
         dst_file = backup_dir / dst_name
 
         try:
@@ -556,7 +562,12 @@ async def delete_gacha_history(bot: Bot, ev: Event):
         # 清理同名残留(明文/gz 共存)+ 失效 stats 缓存
         (player_dir / "gacha_logs.json").unlink(missing_ok=True)
         (player_dir / "gacha_logs.json.gz").unlink(missing_ok=True)
+        (player_dir / "gacha_logs.db").unlink(missing_ok=True)
         (player_dir / "gachaStats.json").unlink(missing_ok=True)
+        try:
+            await WavesGachaStats.delete_by_uid(uid)
+        except Exception as e:
+            logger.warning(f"[鸣潮·抽卡删除] 清理统计表失败 uid={uid}: {e}")
         prune_gacha_backups(uid, "delete")
 
         await bot.send(f"UID{hide_uid(uid, user_pref)}抽卡记录已删除！")
@@ -564,6 +575,43 @@ async def delete_gacha_history(bot: Bot, ev: Event):
         gacha_import_lock.release(lock_key)
 
 
+@sv_restore_gacha_log.on_command(("恢复抽卡记录", "还原抽卡记录"), block=True)
+async def restore_gacha_history(bot: Bot, ev: Event):
+    """恢复抽卡记录123456789 列出可还原的 checkpoint; 再附编号即还原到该 checkpoint。"""
+    args = ev.text.split()
+    if not args or not args[0].isdigit() or len(args[0]) != 9:
+        return await bot.send(f"请附带特征码，例如【{PREFIX}恢复抽卡记录123456789】")
+    uid = args[0]
+
+    if len(args) < 2:
+        checkpoints = await list_gacha_checkpoints(uid)
+        if not checkpoints:
+            return await bot.send(f"UID{uid}没有可还原的抽卡记录")
+        lines = [f"UID{uid}可还原的抽卡记录 (新→旧):"]
+        for cp in checkpoints:
+            total = sum(cp["counts"].values())
+            lines.append(f"[{cp['id']}] {cp['created_time']} {cp['kind']}前 共{total}抽")
+        lines.append(f"发送【{PREFIX}恢复抽卡记录{uid} 编号】还原")
+        return await bot.send("\n".join(lines))
+
+    if not args[1].isdigit():
+        return await bot.send("编号应为数字")
+    lock_key = _gacha_import_lock_key(uid)
+    if not gacha_import_lock.acquire(lock_key):
+        return await bot.send(f"UID{uid}抽卡导入正在进行，请稍后再试")
+    try:
+        restored = await restore_gachalogs(uid, int(args[1]))
+    except Exception as e:
+        logger.exception(f"[鸣潮·抽卡还原] 还原失败 uid={uid}: {e}")
+        return await bot.send("还原抽卡记录失败，原记录未修改")
+    finally:
+        gacha_import_lock.release(lock_key)
+    if restored is None:
+        return await bot.send(f"UID{uid}没有编号为{args[1]}的还原点")
+    total = sum(len(v) for v in (restored.get("data") or {}).values())
+    await bot.send(f"UID{uid}抽卡记录已还原，共{total}抽，原记录已备份")
+
+
 @sv_delete_import_gacha_log.on_command(("删除抽卡导入", "删除导入记录", "删除导入抽卡"), block=True)
 async def delete_import_gacha_files(bot: Bot, ev: Event):
     delete_count = 0
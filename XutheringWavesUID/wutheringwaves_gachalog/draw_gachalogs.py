@@ -1,5 +1,6 @@
 import os
 import random
+import asyncio
 import warnings
 from typing import Dict, List
 from pathlib import Path
@@ -10,6 +11,7 @@ from PIL import Image, ImageDraw, ImageFilter
 warnings.filterwarnings('ignore', category=Image.DecompressionBombWarning)
 
 from gsuid_core.pool import to_thread
+from gsuid_core.logger import logger
 from gsuid_core.models import Event
 from gsuid_core.utils.image.convert import convert_img
 from gsuid_core.utils.image.image_tools import crop_center_img
@@ -20,6 +22,7 @@ from ..utils.player_store import (
     read_player_json,
     write_player_json,
     resolve_player_path,
+    player_segment_revision,
 )
 from ..utils.imagetool import draw_base_info_bg
 from ..utils.image import (
@@ -32,6 +35,7 @@ from ..utils.image import (
     cropped_square_avatar,
 )
 from ..utils.api.model import AccountBaseInfo
+from ..utils.database.waves_gacha_stats import WavesGachaStats
 from ..utils.waves_api import waves_api
 from ..utils.error_reply import WAVES_CODE_102
 from ..wutheringwaves_config import PREFIX
@@ -55,6 +59,7 @@ from .merge_utils import (
 
 TEXT_PATH = Path(__file__).parent / "texture2d"
 HOMO_TAG = ["非到极致", "运气不好", "平稳保底", "小欧一把", "欧狗在此"]
+_BG_TASKS: set = set()
 
 gacha_type_meta_rename = {
     "角色精准调谐": "角色精准调谐",
@@ -259,12 +264,16 @@ def _gacha_source_version(gacha_log_path: Path) -> Dict | None:
         if actual_path is None:
             return None
         stat = actual_path.stat()
-        return {
+        version = {
             "name": actual_path.name,
             "inode": stat.st_ino,
             "mtime_ns": stat.st_mtime_ns,
             "size": stat.st_size,
         }
+        if actual_path.suffix == ".db":
+            # 分段容器原地追加, 以容器内写入版本号区分
+            version["rev"] = player_segment_revision(gacha_log_path)
+        return version
     except OSError:
         return None
 
@@ -372,10 +381,41 @@ async def save_gacha_stats(
             # atomically replace it on the next rebuild.  Do not unlink here,
             # otherwise a newer concurrent writer could be removed by TOCTOU.
             return False
-        return True
     except Exception:
         return False
 
+    # 同步写入物化表供群排行批量读取；失败只影响排行走回退重算
+    try:
+        await WavesGachaStats.upsert_stats(uid, expected, stats_data)
+    except Exception as e:
+        logger.warning(f"[鸣潮·抽卡统计] uid={uid} 写入统计表失败: {e}")
+    return True
+
+
+def schedule_gacha_stats_refresh(uid: str) -> None:
+    """抽卡记录写入后在后台重建统计 (gachaStats.json + 统计表)，不阻塞导入回复。"""
+
+    async def _run():
+        try:
+            await get_gacha_stats(uid)
+        except Exception as e:
+            logger.warning(f"[鸣潮·抽卡统计] uid={uid} 统计重建失败: {e}")
+
+    task = asyncio.create_task(_run())
+    _BG_TASKS.add(task)
+    task.add_done_callback(_BG_TASKS.discard)
+
+
+@to_thread
+def get_gacha_source_versions(uids: List[str]) -> Dict[str, Dict]:
+    """批量获取抽卡文件版本（仅 stat），无抽卡记录的 uid 不在结果中。"""
+    versions = {}
+    for uid in uids:
+        version = _gacha_source_version(PLAYER_PATH / str(uid) / "gacha_logs.json")
+        if version is not None:
+            versions[uid] = version
+    return versions
+
 
 async def draw_card(uid: str, ev: Event):
     # 获取数据
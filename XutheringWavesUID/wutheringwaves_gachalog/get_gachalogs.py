@@ -26,7 +26,15 @@ from .merge_utils import (
 )
 from ..utils.api.model import GachaLog
 from ..utils.waves_api import waves_api
-from ..utils.player_store import write_gz_json, read_player_json, write_player_json, player_json_exists
+from ..utils.player_store import (
+    write_gz_json,
+    read_player_json,
+    write_player_json,
+    player_json_exists,
+    append_player_segments,
+    list_player_checkpoints_sync,
+    read_player_checkpoint_sync,
+)
 from .model_for_waves_plugin import WavesPluginGacha
 from ..utils.resource.RESOURCE_PATH import PLAYER_PATH, GACHA_BACKUP_PATH
 
@@ -552,7 +560,11 @@ def prune_gacha_backups(uid: str, type: str, limit: int = GACHA_BACKUP_LIMIT):
     if not backup_dir.exists():
         return
     files = sorted(
-        [*backup_dir.glob(f"{type}_gacha_logs_*.json"), *backup_dir.glob(f"{type}_gacha_logs_*.json.gz")],
+        [
+            *backup_dir.glob(f"{type}_gacha_logs_*.json"),
+            *backup_dir.glob(f"{type}_gacha_logs_*.json.gz"),
+            *backup_dir.glob(f"{type}_gacha_logs_*.db"),
+        ],
         key=lambda p: p.stat().st_mtime,
         reverse=True,
     )
@@ -563,6 +575,23 @@ def prune_gacha_backups(uid: str, type: str, limit: int = GACHA_BACKUP_LIMIT):
             logger.warning(f"[鸣潮·抽卡备份] 清理旧备份失败 {old}: {e}")
 
 
+def _split_appended_heads(old_data: Dict, new_data: Dict) -> Optional[Dict[str, List]]:
+    """新数据是否为「各池旧记录不变、仅在头部新增」，是则返回各池新增的头部记录。
+
+    合并可能替换占位周期或调整断档标记而改动旧记录，此时返回 None 走整体重写。
+    """
+    if set(old_data) - set(new_data):
+        return None
+    heads: Dict[str, List] = {}
+    for gacha_name, new_logs in new_data.items():
+        old_logs = old_data.get(gacha_name, [])
+        added = len(new_logs) - len(old_logs)
+        if added < 0 or new_logs[added:] != old_logs:
+            return None
+        heads[gacha_name] = new_logs[:added]
+    return heads
+
+
 async def backup_gachalogs(uid: str, gachalogs_history: Dict, type: str):
     backup_dir = GACHA_BACKUP_PATH / str(uid)
     backup_dir.mkdir(parents=True, exist_ok=True)
@@ -607,8 +636,6 @@ async def save_gachalogs(
     if gachalogs_history is None and player_json_exists(gachalogs_path):
         return "[鸣潮] 抽卡记录读取失败，已中止以防覆盖，请稍后重试"
     if gachalogs_history is not None:
-        if not record_id:
-            await backup_gachalogs(uid, gachalogs_history, type="import")
         temp_gachalogs_history = copy.deepcopy(gachalogs_history)
         gachalogs_history = gachalogs_history["data"]
     else:
@@ -696,14 +723,27 @@ async def save_gachalogs(
         for gacha_name in gacha_type_meta_data.keys()
     }
 
-    if record_id and temp_gachalogs_history:
-        await backup_gachalogs(uid, temp_gachalogs_history, type="update")
-
     vo = msgspec.to_builtins(result)
-    await write_player_json(gachalogs_path, vo)
+    backup_type = "update" if record_id else "import"
+    appended = False
+    if temp_gachalogs_history and not is_need_backup:
+        # 旧记录原样保留时只追加各池新增的头部，并以容器内 checkpoint 代替整份备份
+        new_heads = _split_appended_heads(temp_gachalogs_history.get("data", {}), vo["data"])
+        if new_heads is not None:
+            head = {k: v for k, v in vo.items() if k != "data"}
+            appended = await append_player_segments(
+                gachalogs_path, head, new_heads, checkpoint=backup_type, keep_checkpoints=GACHA_BACKUP_LIMIT
+            )
+    if not appended:
+        if temp_gachalogs_history:
+            await backup_gachalogs(uid, temp_gachalogs_history, type=backup_type)
+        await write_player_json(gachalogs_path, vo)
 
-    # 失效 stats 缓存：下次抽卡记录/抽卡排行查询时 lazy 重建
+    # 失效 stats 缓存并在后台重建，同步刷新抽卡排行用的统计表
     (path / "gachaStats.json").unlink(missing_ok=True)
+    from .draw_gachalogs import schedule_gacha_stats_refresh
+
+    schedule_gacha_stats_refresh(uid)
 
     # 计算数据
     all_add = sum(gachalogs_count_add.values())
@@ -815,6 +855,35 @@ async def import_gachalogs(ev: Event, history_url: str, type: str, uid: str, for
     return res
 
 
+async def list_gacha_checkpoints(uid: str) -> List[Dict]:
+    """抽卡记录容器内的 checkpoint (新→旧), 每项含 id / kind / created_time / counts。"""
+    return await asyncio.to_thread(list_player_checkpoints_sync, PLAYER_PATH / uid / "gacha_logs.json")
+
+
+async def restore_gachalogs(uid: str, checkpoint_id: int) -> Optional[Dict]:
+    """把抽卡记录还原到某个 checkpoint, 返回还原后的数据; checkpoint 不存在返回 None。
+
+    还原是整体写入, 会压实容器并清掉其中全部 checkpoint, 所以写入前先把当前记录
+    整份备份为 restore 类型, 还原错了还能从备份重新导入。
+    """
+    gachalogs_path = PLAYER_PATH / uid / "gacha_logs.json"
+    restored = await asyncio.to_thread(read_player_checkpoint_sync, gachalogs_path, checkpoint_id)
+    if restored is None:
+        return None
+
+    current = await read_player_json(gachalogs_path)
+    if current is not None:
+        await backup_gachalogs(uid, current, type="restore")
+    await write_player_json(gachalogs_path, restored)
+
+    (PLAYER_PATH / uid / "gachaStats.json").unlink(missing_ok=True)
+    from .draw_gachalogs import schedule_gacha_stats_refresh
+
+    schedule_gacha_stats_refresh(uid)
+    logger.info(f"[鸣潮·抽卡还原] uid={uid} 已还原到 checkpoint {checkpoint_id}")
+    return restored
+
+
 async def export_gachalogs(uid: str) -> dict:
     path = PLAYER_PATH / uid
     if not path.exists():
@@ -10,6 +10,7 @@ from gsuid_core.help.draw_new_plugin_help import get_new_help
 
 from ..version import XutheringWavesUID_version
 from ..utils.image import get_footer
+from ..utils.render_cache import cached_render
 from ..wutheringwaves_config import PREFIX, ShowConfig, WutheringWavesConfig
 
 ICON = Path(__file__).parent.parent.parent / "ICON.png"
@@ -151,6 +152,18 @@ def get_help_data() -> Dict[str, PluginHelp]:
 plugin_help = get_help_data()
 
 
+def _help_cache_key(pm: int):
+    # 自定义图片按 路径+修改时间 计入, 同路径替换上传也会失效
+    configs = []
+    for name in ("HelpBannerBgUpload", "HelpBgUpload", "HelpIconUpload", "HelpColumn"):
+        data = ShowConfig.get_config(name).data
+        if isinstance(data, str) and data and Path(data).exists():
+            data = Path(data)
+        configs.append(data)
+    return [pm, PREFIX, plugin_help, configs]
+
+
+@cached_render("help", key=_help_cache_key)
 async def get_help(pm: int):
     # 从 ShowConfig 获取自定义配置，如果未配置或路径不存在则使用默认值
     banner_bg_config = ShowConfig.get_config("HelpBannerBgUpload").data
@@ -9,11 +9,14 @@ from gsuid_core.subscribe import gs_subscribe
 from ..utils.database.waves_subscribe import WavesSubscribe
 from ..utils.resource.RESOURCE_PATH import PLAYER_PATH
 from ..utils.player_store import compress_existing_sync
+from ..utils.sidecar_store import import_existing_sync
+from ..utils.queues.queues import get_queue_stats, requeue_dead_tasks
 
 sv_master = SV("联系主人", pm=0)
 master_name_ann = "联系主人"
 
 sv_waves_compress = SV("waves压缩数据", pm=0)
+sv_waves_queue = SV("waves任务队列", pm=0)
 
 
 def _fmt_size(n: float) -> str:
@@ -28,17 +31,31 @@ def _fmt_size(n: float) -> str:
 async def compress_player_data(bot: Bot, ev: Event):
     await bot.send("[鸣潮] 开始批量压缩存量逐用户数据")
     done, fail, before, after = await asyncio.to_thread(compress_existing_sync, PLAYER_PATH)
+    imported, import_fail = await asyncio.to_thread(import_existing_sync, PLAYER_PATH)
+    fail += import_fail
     fail_txt = f"（失败 {fail}）" if fail else ""
+    import_txt = f"\n合并小文件 {imported} 个UID" if imported else ""
     if not done:
-        return await bot.send(f"[鸣潮] 压缩数据完成，无需转换{fail_txt}")
+        return await bot.send(f"[鸣潮] 压缩数据完成，无需转换{fail_txt}{import_txt}")
     ratio = after / before * 100 if before else 0
     await bot.send(
         f"[鸣潮] 压缩数据完成{fail_txt}\n"
         f"压缩前 {_fmt_size(before)} → 压缩后 {_fmt_size(after)}\n"
-        f"压缩率 {ratio:.1f}%（省 {100 - ratio:.1f}%）"
+        f"压缩率 {ratio:.1f}%（省 {100 - ratio:.1f}%）{import_txt}"
     )
 
 
+@sv_waves_queue.on_command("重试死信", block=True)
+async def requeue_dead_queue_tasks(bot: Bot, ev: Event):
+    """重试死信 [队列名]: 把重试耗尽的任务放回队列, 不带队列名时处理全部队列。"""
+    queue = ev.text.strip() or None
+    stats = get_queue_stats()
+    if queue is not None and queue not in stats:
+        return await bot.send(f"[鸣潮] 未知队列 {queue}，可选：{'、'.join(sorted(stats))}")
+    count = await requeue_dead_tasks(queue)
+    await bot.send(f"[鸣潮] 已将 {count} 条死信放回任务队列")
+
+
 @sv_master.on_regex(("^(联系|取消联系)主人$"))
 async def rover_sign_result(bot: Bot, ev: Event):
 
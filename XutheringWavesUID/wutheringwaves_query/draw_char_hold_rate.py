@@ -1,6 +1,5 @@
 import copy
 import time
-import asyncio
 from typing import Dict, Union
 from pathlib import Path
 
@@ -25,7 +24,7 @@ from ..utils.image import (
 )
 from ..utils.api.wwapi import GET_HOLD_RATE_URL
 from ..utils.ascension.char import get_char_model
-from ..utils.char_info_utils import get_all_role_detail_info_list
+from ..utils.char_ownership import get_hold_rate_for_uids
 from ..utils.database.models import WavesBind
 from ..utils.fonts.waves_fonts import (
     waves_font_20,
@@ -303,96 +302,16 @@ async def get_group_char_hold_rate_data(group_id: str) -> Dict:
     if not users:
         return res
 
-    uid_fiter = {}
-
-    # 创建用于处理并发请求的Semaphore
-    semaphore = asyncio.Semaphore(20)
-
-    async def process_uid(uid):
-        """处理单个UID的数据"""
-        role_details = await get_all_role_detail_info_list(uid)
-        if role_details is None:
-            return None
-
-        uid_data = {}
-        for role_detail in role_details:
-            uid_data[role_detail.role.roleId] = role_detail.get_chain_num()
-
-        return uid, uid_data
-
-    # 提取所有需要处理的UID,入口去重避免重复并发请求
+    # 提取所有需要处理的UID,入口去重
     uid_set = set()
     for user in users:
         if not user.uid:
             continue
         for uid in user.uid.split("_"):
             uid_set.add(uid)
-    all_uids = list(uid_set)
-
-    # 使用Semaphore限制并发处理UID
-    async def process_with_semaphore(uid):
-        async with semaphore:
-            return await process_uid(uid)
-
-    # 并发执行所有UID的任务
-    tasks = [process_with_semaphore(uid) for uid in all_uids]
-    results = await asyncio.gather(*tasks)
-
-    # 合并结果
-    for result in results:
-        if result:
-            uid, uid_data = result
-            uid_fiter[uid] = uid_data
-
-    # 计算持有率
-    total_player_count = len(uid_fiter)
-
-    if total_player_count == 0:
-        return res
-
-    # 统计角色持有情况
-    char_stats = {}
-
-    for uid, chars in uid_fiter.items():
-        for char_id, chain_num in chars.items():
-            if char_id not in char_stats:
-                char_stats[char_id] = {
-                    "player_count": 0,
-                    "chains": {str(i): 0 for i in range(7)},
-                }
-
-            # 增加持有人数
-            char_stats[char_id]["player_count"] += 1
-
-            # 增加对应共鸣链数量
-            char_stats[char_id]["chains"][str(chain_num)] += 1
-
-    # 构建结果数据
-    char_hold_rate = []
-
-    for char_id, stats in char_stats.items():
-        player_count = stats["player_count"]
-        hold_rate = round(player_count / total_player_count * 100, 1)
-
-        # 计算共鸣链分布百分比
-        chain_hold_rate = {}
-        for chain, count in stats["chains"].items():
-            if count > 0:
-                chain_hold_rate[chain] = round(count / player_count * 100, 2)
-
-        char_data = {
-            "char_id": char_id,
-            "player_count": player_count,
-            "hold_rate": hold_rate,
-            "chain_hold_rate": chain_hold_rate,
-        }
-
-        char_hold_rate.append(char_data)
-
-    # 构建最终结果
-    res = {"total_player_count": total_player_count, "char_hold_rate": char_hold_rate}
 
-    return res
+    # 持有向量矩阵统计, 缺失 / 过期的 uid 才读面板重建
+    return await get_hold_rate_for_uids(uid_set)
 
 
 # 主入口函数
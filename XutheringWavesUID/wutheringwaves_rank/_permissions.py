@@ -10,6 +10,28 @@ from ..utils.database.models import WavesBind, WavesUser, WavesUserActivity
 from ..wutheringwaves_config import WutheringWavesConfig
 
 
+# (user_id, uid) -> cookie 全表映射的短时缓存, 连续排行指令不重复全表扫描
+_TOKEN_MAP_TTL = 60
+_token_map_cache: Optional[Tuple[float, Dict[Tuple[str, str], str]]] = None
+_token_map_lock = asyncio.Lock()
+
+
+async def get_waves_token_users_map() -> Dict[Tuple[str, str], str]:
+    global _token_map_cache
+    cached = _token_map_cache
+    if cached is not None and cached[0] > time.time():
+        return cached[1]
+
+    async with _token_map_lock:
+        cached = _token_map_cache
+        if cached is not None and cached[0] > time.time():
+            return cached[1]
+        wavesTokenUsers = await WavesUser.get_waves_all_user()
+        token_map = {(w.user_id, w.uid): w.cookie for w in wavesTokenUsers}
+        _token_map_cache = (time.time() + _TOKEN_MAP_TTL, token_map)
+        return token_map
+
+
 async def get_rank_token_condition(ev) -> Tuple[bool, Dict[Tuple[str, str], str]]:
     """检查排行的 token 权限配置。
 
@@ -27,8 +49,7 @@ async def get_rank_token_condition(ev) -> Tuple[bool, Dict[Tuple[str, str], str]
     WavesRankUseTokenGroup = WutheringWavesConfig.get_config("WavesRankUseTokenGroup").data
     RankUseToken = WutheringWavesConfig.get_config("RankUseToken").data
     if (ev.group_id and WavesRankUseTokenGroup and ev.group_id in WavesRankUseTokenGroup) or RankUseToken:
-        wavesTokenUsers = await WavesUser.get_waves_all_user()
-        wavesTokenUsersMap = {(w.user_id, w.uid): w.cookie for w in wavesTokenUsers}
+        wavesTokenUsersMap = await get_waves_token_users_map()
         tokenLimitFlag = True
 
     return tokenLimitFlag, wavesTokenUsersMap
@@ -54,23 +75,9 @@ async def filter_active_group_users(
     if not user_pairs:
         return []
 
-    semaphore = asyncio.Semaphore(50)
-
-    async def check(user_id: str, platform: str, check_bot_self_id: str):
-        async with semaphore:
-            try:
-                last_active_time = await WavesUserActivity.get_user_last_active_time(
-                    user_id, platform, check_bot_self_id
-                )
-                current_time = int(time.time())
-                threshold_time = current_time - (active_days * 24 * 60 * 60)
-                is_active = last_active_time is not None and last_active_time >= threshold_time
-            except Exception:
-                is_active = False
-            return user_id, is_active
-
-    results = await asyncio.gather(
-        *(check(uid, plat, sid) for uid, plat, sid in user_pairs)
-    )
-    active_user_ids = {uid for uid, is_active in results if is_active}
+    try:
+        active_keys = await WavesUserActivity.get_active_keys(user_pairs, active_days)
+    except Exception:
+        active_keys = set()
+    active_user_ids = {key[0] for key in active_keys}
     return [user for user in users if user.user_id in active_user_ids]
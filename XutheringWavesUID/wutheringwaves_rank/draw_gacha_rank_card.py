@@ -37,10 +37,16 @@ from ..utils.fonts.waves_fonts import (
     waves_font_34,
     waves_font_58,
 )
-from ..wutheringwaves_gachalog.draw_gachalogs import get_gacha_stats
+from ..utils.database.waves_gacha_stats import WavesGachaStats, source_version_key
+from ..wutheringwaves_gachalog.draw_gachalogs import (
+    get_gacha_stats,
+    get_gacha_source_versions,
+)
 
 TEXT_PATH = Path(__file__).parent / "texture2d"
 GACHA_GREEN = (90, 220, 120)
+# 统计表缺失 / 过期时回退重算的并发数
+GACHA_STATS_CONCURRENCY = 8
 
 
 class GachaRankCard:
@@ -83,11 +89,12 @@ async def get_all_gacha_rank_info(
     tokenLimitFlag: bool = False,
     wavesTokenUsersMap: Optional[Dict[Tuple[str, str], str]] = None,
 ) -> Tuple[List[GachaRankCard], int, int]:
-    """获取所有用户的抽卡排行信息，附带未达阈值的人数与其中最高总抽数"""
-    rankInfoList = []
-    below_count = 0
-    below_max = 0
+    """获取所有用户的抽卡排行信息，附带未达阈值的人数与其中最高总抽数
 
+    统计优先取 WavesGachaStats 物化表（一次查询），仅对缺失或与抽卡文件版本
+    不一致的 uid 并发回退到 get_gacha_stats 重算（重算结果会回写表）。
+    """
+    candidates: List[Tuple[str, str]] = []
     for user in users:
         if not user.user_id:
             continue
@@ -99,21 +106,57 @@ async def get_all_gacha_rank_info(
             if tokenLimitFlag and wavesTokenUsersMap is not None:
                 if (user.user_id, uid) not in wavesTokenUsersMap:
                     continue
-            try:
-                stats = await get_gacha_stats(uid)
-                if not stats:
-                    continue
+            candidates.append((user.user_id, uid))
 
-                rankInfo = GachaRankCard(user.user_id, uid, stats)
-                if rankInfo.total_count < min_pull:
-                    below_count += 1
-                    below_max = max(below_max, rankInfo.total_count)
-                    continue
+    uids = list(dict.fromkeys(uid for _, uid in candidates))
+    versions = await get_gacha_source_versions(uids)
+    stats_map: Dict[str, dict] = {}
+    try:
+        rows = await WavesGachaStats.select_by_uids(list(versions.keys()))
+    except Exception as e:
+        logger.warning(f"[鸣潮·唤取排行] 读取统计表失败, 全部回退重算: {e}")
+        rows = []
+    for row in rows:
+        if row.source_version == source_version_key(versions.get(row.uid)):
+            stats = row.get_stats()
+            if stats:
+                stats_map[row.uid] = stats
+
+    missing = [uid for uid in versions if uid not in stats_map]
+    if missing:
+        semaphore = asyncio.Semaphore(GACHA_STATS_CONCURRENCY)
+
+        async def _load(uid: str):
+            async with semaphore:
+                try:
+                    return uid, await get_gacha_stats(uid)
+                except Exception as e:
+                    logger.debug(f"[鸣潮·唤取排行] 获取 uid={uid} 数据失败: {e}")
+                    return uid, {}
+
+        for uid, stats in await asyncio.gather(*(_load(uid) for uid in missing)):
+            if stats:
+                stats_map[uid] = stats
+        logger.debug(f"[鸣潮·唤取排行] 统计表命中 {len(versions) - len(missing)} 个, 重算 {len(missing)} 个")
+
+    rankInfoList = []
+    below_count = 0
+    below_max = 0
+    for user_id, uid in candidates:
+        stats = stats_map.get(uid)
+        if not stats:
+            continue
+        try:
+            rankInfo = GachaRankCard(user_id, uid, stats)
+        except Exception as e:
+            logger.debug(f"[鸣潮·唤取排行] 获取 uid={uid} 数据失败: {e}")
+            continue
+        if rankInfo.total_count < min_pull:
+            below_count += 1
+            below_max = max(below_max, rankInfo.total_count)
+            continue
 
-                rankInfoList.append(rankInfo)
-            except Exception as e:
-                logger.debug(f"[鸣潮·唤取排行] 获取 uid={uid} 数据失败: {e}")
-                continue
+        rankInfoList.append(rankInfo)
 
     return rankInfoList, below_count, below_max
 
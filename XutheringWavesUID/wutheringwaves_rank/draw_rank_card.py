@@ -18,6 +18,7 @@ from .pagination import (
     group_rank_empty_page_message,
     paginate_group_rank,
 )
+from .rank_index import get_rank_index_rows, drop_rank_index_rows
 from ._permissions import get_rank_token_condition, filter_active_group_users
 from ..utils.util import build_uid_masker
 from ..utils.image import (
@@ -36,13 +37,7 @@ from ..utils.image import (
     get_sonata_effect_image,
 )
 from ..utils.api.model import WeaponData, RoleDetailData
-from ..utils.calculate import (
-    get_calc_map,
-    calc_phantom_score,
-    get_total_score_bg,
-)
 from ..utils.name_convert import alias_to_char_name, char_name_to_char_id
-from ..utils.ascension.sonata import detect_combo_sonata
 from ..utils.char_info_utils import get_all_role_detail_info_list, get_rover_detail_map
 from ..utils.damage.abstract import DamageRankRegister
 from ..utils.database.models import WavesBind, WavesUser
@@ -73,7 +68,7 @@ logo_img = Image.open(TEXT_PATH / "logo_small_2.png")
 
 
 class RankInfo(BaseModel):
-    roleDetail: RoleDetailData  # 角色明细
+    roleDetail: Optional[RoleDetailData] = None  # 角色明细 (索引行仅在渲染当页时补读)
     qid: str  # qq id
     uid: str  # uid
     level: int  # 角色等级
@@ -86,90 +81,6 @@ class RankInfo(BaseModel):
     sonata_name: str  # 合鸣效果
 
 
-async def get_one_rank_info(user_id, uid, role_detail, rankDetail):
-    from ..utils.calc import WuWaCalc
-    equipPhantomList = role_detail.phantomData.equipPhantomList
-
-    calc: WuWaCalc = WuWaCalc(role_detail)
-    calc.phantom_pre = calc.prepare_phantom()
-    calc.phantom_card = calc.enhance_summation_phantom_value(calc.phantom_pre)
-    calc.calc_temp = get_calc_map(
-        calc.phantom_card,
-        role_detail.role.roleName,
-        role_detail.role.roleId,
-    )
-
-    # 评分
-    phantom_score = 0
-    # calc_temp = get_calc_map(phantom_sum_value, role_detail.role.roleName)
-    for i, _phantom in enumerate(equipPhantomList):
-        if _phantom and _phantom.phantomProp:
-            props = _phantom.get_props()
-            _score, _bg = calc_phantom_score(role_detail.role.roleId, props, _phantom.cost, calc.calc_temp)
-            phantom_score += _score
-
-    if phantom_score == 0:
-        return
-
-    phantom_score = round(phantom_score, 2)
-    phantom_bg = get_total_score_bg(role_detail.role.roleName, phantom_score, calc.calc_temp)
-
-    calc.role_card = calc.enhance_summation_card_value(calc.phantom_card)
-    calc.damageAttribute = calc.card_sort_map_to_attribute(calc.role_card)
-
-    if rankDetail:
-        crit_damage, expected_damage = rankDetail["func"](calc.damageAttribute, role_detail)
-    else:
-        expected_damage = "0"
-
-    sonata_name = ""
-    ph_detail = calc.phantom_card.get("ph_detail", [])
-    if isinstance(ph_detail, list):
-        for ph in ph_detail:
-            if ph.get("ph_num") == 5:
-                sonata_name = ph.get("ph_name", "")
-                break
-
-            if ph.get("isFull"):
-                sonata_name = ph.get("ph_name", "")
-                break
-
-        combo_sonata = detect_combo_sonata(role_detail.role.roleId, ph_detail)
-        if combo_sonata:
-            sonata_name = combo_sonata
-
-    expected_damage_int = 0
-    if expected_damage is not None:
-        if isinstance(expected_damage, (int, float)):
-            expected_damage_int = int(expected_damage)
-        elif isinstance(expected_damage, str):
-            temp = expected_damage.replace(",", "").strip()
-            if temp.isdigit():
-                expected_damage_int = int(temp)
-            else:
-                try:
-                    expected_damage_int = int(float(temp))
-                except ValueError:
-                    expected_damage_int = 0
-
-    rankInfo = RankInfo(
-        **{
-            "roleDetail": role_detail,
-            "qid": user_id,
-            "uid": uid,
-            "level": role_detail.role.level,
-            "chain": role_detail.get_chain_num(),
-            "chainName": role_detail.get_chain_name(),
-            "score": round(int(phantom_score * 100) / 100, ndigits=2),
-            "score_bg": phantom_bg,
-            "expected_damage": expected_damage,
-            "expected_damage_int": expected_damage_int,
-            "sonata_name": sonata_name,
-        }
-    )
-    return rankInfo
-
-
 async def find_role_detail(uid: str, char_id: Union[int, str, List[str], List[int]]) -> Optional[RoleDetailData]:
     ids = char_id if isinstance(char_id, list) else [char_id]
     char_id_list = [str(cid) for cid in ids]
@@ -186,71 +97,61 @@ async def find_role_detail(uid: str, char_id: Union[int, str, List[str], List[in
     return next((role for role in role_details if str(role.role.roleId) in char_id_list), None)
 
 
-async def get_rank_info_for_user(
-    user: WavesBind,
+async def get_all_rank_info(
+    users: List[WavesBind],
     char_id,
     find_char_id,
     rankDetail,
     tokenLimitFlag,
     wavesTokenUsersMap,
 ):
-    rankInfoList = []
-    if not user.uid:
-        return rankInfoList
-
-    tasks = [find_role_detail(uid, find_char_id) for uid in user.uid.split("_")]
-    role_details = await asyncio.gather(*tasks)
-
-    for uid, role_detail in zip(user.uid.split("_"), role_details):
-        if (
-            tokenLimitFlag
-            and (
-                user.user_id,
-                uid,
-            )
-            not in wavesTokenUsersMap
-        ):
-            continue
-        if not role_detail:
-            continue
-        if not role_detail.phantomData or not role_detail.phantomData.equipPhantomList:
+    """走排行索引: 一次按角色查询, 返回不含 roleDetail 的 RankInfo (渲染当页时再补读)。"""
+    pairs = []
+    for user in users:
+        if not user.uid:
             continue
+        for uid in user.uid.split("_"):
+            if not uid:
+                continue
+            if tokenLimitFlag and (user.user_id, uid) not in wavesTokenUsersMap:
+                continue
+            pairs.append((user.user_id, uid))
 
-        rankInfo = await get_one_rank_info(user.user_id, uid, role_detail, rankDetail)
-        if not rankInfo:
-            continue
-        rankInfoList.append(rankInfo)
-
-    return rankInfoList
+    rows = await get_rank_index_rows(char_id, [uid for _, uid in pairs])
 
-
-async def get_all_rank_info(
-    users: List[WavesBind],
-    char_id,
-    find_char_id,
-    rankDetail,
-    tokenLimitFlag,
-    wavesTokenUsersMap,
-):
-    semaphore = asyncio.Semaphore(50)
-
-    async def process_user(user):
-        async with semaphore:
-            return await get_rank_info_for_user(
-                user,
-                char_id,
-                find_char_id,
-                rankDetail,
-                tokenLimitFlag,
-                wavesTokenUsersMap,
+    rankInfoList = []
+    for user_id, uid in pairs:
+        row = rows.get(uid)
+        if row is None:
+            continue
+        rankInfoList.append(
+            RankInfo(
+                qid=user_id,
+                uid=uid,
+                level=row.level,
+                chain=row.chain,
+                chainName=row.chain_name,
+                score=row.score,
+                score_bg=row.score_bg,
+                expected_damage=row.expected_damage,
+                expected_damage_int=row.expected_damage_int,
+                sonata_name=row.sonata_name,
             )
+        )
+    return rankInfoList
 
-    tasks = [process_user(user) for user in users]
-    results = await asyncio.gather(*tasks)
 
-    # Flatten the results list
-    rankInfoList = [rank_info for result in results for rank_info in result]
-    return rankInfoList
+async def fill_rank_role_detail(rankInfoList: List[RankInfo], find_char_id) -> List[Optional[RankInfo]]:
+    """为当页行补读面板明细; 面板已不存在的行返回 None。"""
+    details = await asyncio.gather(*(find_role_detail(r.uid, find_char_id) for r in rankInfoList))
+    out: List[Optional[RankInfo]] = []
+    for rank, detail in zip(rankInfoList, details):
+        if detail is None:
+            out.append(None)
+            continue
+        rank.roleDetail = detail
+        out.append(rank)
+    return out
 
 
 # TODO: PIL 卸到线程池 (loop body 多处 await get_attribute / get_square_weapon / get_attribute_effect, 重构成本大)
@@ -352,10 +253,9 @@ async def draw_rank_img(
             reverse=True,
         )
 
-    rankId = None
-    rankInfo = None
-
-    if not rankId:
+    # 面板刚被移除、索引还没来得及删的行在补读时才会暴露: 删掉对应索引行后重新分页,
+    # 保证页满、名次连续、总数不含残留
+    while True:
         rankId, rankInfo = next(
             (
                 (rankId, rankInfo)
@@ -365,14 +265,22 @@ async def draw_rank_img(
             (None, None),
         )
 
-    rankInfoList, display_rank_ids, page_count, page_item_count = paginate_group_rank(
-        rankInfoList,
-        page,
-        rankId,
-        rankInfo,
-    )
-    if page_item_count == 0:
-        return group_rank_empty_page_message(page, page_count)
+        pageInfoList, display_rank_ids, page_count, page_item_count = paginate_group_rank(
+            rankInfoList,
+            page,
+            rankId,
+            rankInfo,
+        )
+        if page_item_count == 0:
+            return group_rank_empty_page_message(page, page_count)
+
+        filled = await fill_rank_role_detail(pageInfoList, find_char_id)
+        ghosts = {r.uid for r, f in zip(pageInfoList, filled) if f is None}
+        if not ghosts:
+            break
+        await drop_rank_index_rows(char_id, list(ghosts))
+        rankInfoList = [r for r in rankInfoList if r.uid not in ghosts]
+    rankInfoList = pageInfoList
 
     totalNum = len(rankInfoList)
     title_h = 500
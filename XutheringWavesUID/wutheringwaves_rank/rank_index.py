@@ -0,0 +1,274 @@
+"""群角色排行物化索引。
+
+面板刷新 (save_card_info) 时把变更角色的评分 / 期望伤害 / 合鸣 / 共鸣链写进
+WavesCharRankIndex；群排行按角色一次索引查询，只对缺失或评分版本过期的 uid
+懒重算回填，渲染阶段再读当前页的面板详情。面板已不存在的索引行在分页前剔除并删除,
+渲染补读时才发现缺失的行同样删除后重新分页。
+"""
+import time
+import asyncio
+from typing import Any, Dict, List, Union, Optional
+
+from gsuid_core.logger import logger
+
+from ..utils.api.model import RoleDetailData
+from ..utils.calculate import get_calc_map, calc_phantom_score, get_total_score_bg
+from ..utils.score_pool import map_in_pool
+from ..utils.ascension.sonata import detect_combo_sonata
+from ..utils.damage.abstract import DamageRankRegister
+from ..utils.database.waves_char_rank_index import WavesCharRankIndex
+from ..utils.resource.constant import SPECIAL_CHAR, SPECIAL_CHAR_RANK_MAP
+from ..utils.player_store import player_json_exists
+from ..utils.resource.RESOURCE_PATH import BUILD_PATH, PLAYER_PATH
+
+_BG_TASKS: set = set()
+_calc_version: Optional[str] = None
+
+
+def get_rank_index_version() -> str:
+    """评分版本 = 插件版本 + waves_build (含子目录) 最新 mtime; 构建文件更新后旧索引自动失效。"""
+    global _calc_version
+    if _calc_version is None:
+        from ..version import XutheringWavesUID_version
+
+        mtime = 0
+        try:
+            for p in BUILD_PATH.rglob("*"):
+                if p.is_file():
+                    mtime = max(mtime, int(p.stat().st_mtime))
+        except Exception:
+            pass
+        _calc_version = f"{XutheringWavesUID_version}-{mtime}"
+    return _calc_version
+
+
+def reset_rank_index_version() -> None:
+    global _calc_version
+    _calc_version = None
+
+
+def rank_char_key(char_id: Union[int, str]) -> str:
+    cid = str(char_id)
+    return SPECIAL_CHAR_RANK_MAP.get(cid, cid)
+
+
+def compute_rank_fields(role_detail: RoleDetailData, rankDetail) -> Optional[Dict[str, Any]]:
+    """群排行单行字段 (评分 / 期望伤害 / 合鸣); 无声骸或评分为 0 返回 None。"""
+    from ..utils.calc import WuWaCalc
+
+    if not role_detail.phantomData or not role_detail.phantomData.equipPhantomList:
+        return None
+    equipPhantomList = role_detail.phantomData.equipPhantomList
+
+    calc: WuWaCalc = WuWaCalc(role_detail)
+    calc.phantom_pre = calc.prepare_phantom()
+    calc.phantom_card = calc.enhance_summation_phantom_value(calc.phantom_pre)
+    calc.calc_temp = get_calc_map(
+        calc.phantom_card,
+        role_detail.role.roleName,
+        role_detail.role.roleId,
+    )
+
+    # 评分
+    phantom_score = 0
+    for i, _phantom in enumerate(equipPhantomList):
+        if _phantom and _phantom.phantomProp:
+            props = _phantom.get_props()
+            _score, _bg = calc_phantom_score(role_detail.role.roleId, props, _phantom.cost, calc.calc_temp)
+            phantom_score += _score
+
+    if phantom_score == 0:
+        return None
+
+    phantom_score = round(phantom_score, 2)
+    phantom_bg = get_total_score_bg(role_detail.role.roleName, phantom_score, calc.calc_temp)
+
+    calc.role_card = calc.enhance_summation_card_value(calc.phantom_card)
+    calc.damageAttribute = calc.card_sort_map_to_attribute(calc.role_card)
+
+    if rankDetail:
+        crit_damage, expected_damage = rankDetail["func"](calc.damageAttribute, role_detail)
+    else:
+        expected_damage = "0"
+
+    sonata_name = ""
+    ph_detail = calc.phantom_card.get("ph_detail", [])
+    if isinstance(ph_detail, list):
+        for ph in ph_detail:
+            if ph.get("ph_num") == 5:
+                sonata_name = ph.get("ph_name", "")
+                break
+
+            if ph.get("isFull"):
+                sonata_name = ph.get("ph_name", "")
+                break
+
+        combo_sonata = detect_combo_sonata(role_detail.role.roleId, ph_detail)
+        if combo_sonata:
+            sonata_name = combo_sonata
+
+    expected_damage_int = 0
+    if expected_damage is not None:
+        if isinstance(expected_damage, (int, float)):
+            expected_damage_int = int(expected_damage)
+        elif isinstance(expected_damage, str):
+            temp = expected_damage.replace(",", "").strip()
+            if temp.isdigit():
+                expected_damage_int = int(temp)
+            else:
+                try:
+                    expected_damage_int = int(float(temp))
+                except ValueError:
+                    expected_damage_int = 0
+
+    return {
+        "level": role_detail.role.level,
+        "chain": role_detail.get_chain_num(),
+        "chainName": role_detail.get_chain_name(),
+        "score": round(int(phantom_score * 100) / 100, ndigits=2),
+        "score_bg": phantom_bg,
+        "expected_damage": expected_damage,
+        "expected_damage_int": expected_damage_int,
+        "sonata_name": sonata_name,
+    }
+
+
+def _build_index_entry(role_detail: Union[RoleDetailData, Dict, None]) -> Dict[str, Any]:
+    """索引行字段; 无面板 / 无评分时为 role_id=0 的负缓存行。模块级函数, 可丢进程池。"""
+    version = get_rank_index_version()
+    fields = None
+    if isinstance(role_detail, dict):
+        role_detail = RoleDetailData(**role_detail)
+    if role_detail is not None:
+        rankDetail = DamageRankRegister.find_class(str(role_detail.role.roleId))
+        try:
+            fields = compute_rank_fields(role_detail, rankDetail)
+        except Exception as e:
+            logger.debug(f"[鸣潮·排行索引] 索引计算失败 {role_detail.role.roleId}: {e}")
+    if not fields or role_detail is None:
+        return {
+            "role_id": 0,
+            "level": 0,
+            "chain": 0,
+            "chain_name": "",
+            "score": 0.0,
+            "score_bg": "",
+            "expected_damage": "",
+            "expected_damage_int": 0,
+            "sonata_name": "",
+            "calc_version": version,
+        }
+    return {
+        "role_id": role_detail.role.roleId,
+        "level": fields["level"],
+        "chain": fields["chain"],
+        "chain_name": fields["chainName"],
+        "score": fields["score"],
+        "score_bg": fields["score_bg"],
+        "expected_damage": str(fields["expected_damage"] or ""),
+        "expected_damage_int": fields["expected_damage_int"],
+        "sonata_name": fields["sonata_name"],
+        "calc_version": version,
+    }
+
+
+async def update_rank_index(uid: str, role_details: List[Any]) -> int:
+    """面板刷新后重算并写入这些角色的索引行, 返回写入条数。"""
+    if not role_details:
+        return 0
+    keys = []
+    for rd in role_details:
+        role_id = rd.role.roleId if isinstance(rd, RoleDetailData) else rd["role"]["roleId"]
+        keys.append(rank_char_key(role_id))
+    entries = await map_in_pool(_build_index_entry, role_details, tag="排行索引")
+    return await WavesCharRankIndex.upsert_entries(uid, dict(zip(keys, entries)))
+
+
+def schedule_rank_index_update(uid: str, role_details: List[Any]) -> None:
+    """后台更新索引, 不阻塞刷新出图。"""
+
+    async def _run():
+        try:
+            await update_rank_index(uid, role_details)
+        except Exception as e:
+            logger.warning(f"[鸣潮·排行索引] 索引更新失败 uid={uid}: {e}")
+
+    task = asyncio.create_task(_run())
+    _BG_TASKS.add(task)
+    task.add_done_callback(_BG_TASKS.discard)
+
+
+def _has_panel_sync(uid: str, char_key: str) -> bool:
+    """uid 是否仍有可供该角色排行读取的面板文件 (漂泊者另看 rover.json)。"""
+    _dir = PLAYER_PATH / uid
+    if player_json_exists(_dir / "rawData.json"):
+        return True
+    return char_key in SPECIAL_CHAR_RANK_MAP.values() and player_json_exists(_dir / "rover.json")
+
+
+async def drop_rank_index_rows(char_id: Union[int, str], uids: List[str]) -> None:
+    """删除面板已不存在的 (uid, 角色) 索引行, 下次排行不再计入。"""
+    if not uids:
+        return
+    char_key = rank_char_key(char_id)
+    try:
+        count = await WavesCharRankIndex.delete_by_char(char_key, uids)
+    except Exception as e:
+        logger.warning(f"[鸣潮·排行索引] 残留行删除失败 char={char_key}: {e}")
+        return
+    logger.info(f"[鸣潮·排行索引] char={char_key} 删除无面板残留行 {count} 条")
+
+
+async def get_rank_index_rows(
+    char_id: Union[int, str],
+    uids: List[str],
+) -> Dict[str, WavesCharRankIndex]:
+    """取一批 uid 在该角色上的有效排行行 {uid: row}。
+
+    索引缺失 / 版本过期的 uid 读面板懒重算并回填 (含负缓存), 首次上线后逐步收敛到
+    纯索引查询。命中的有效行先检查面板文件仍在, 不在的删掉索引行并剔除。
+    """
+    from .draw_rank_card import find_role_detail
+
+    char_key = rank_char_key(char_id)
+    find_char_id = SPECIAL_CHAR.get(str(char_id), str(char_id))
+    version = get_rank_index_version()
+
+    rows = await WavesCharRankIndex.select_by_char(char_key, uids)
+    fresh: Dict[str, WavesCharRankIndex] = {r.uid: r for r in rows if r.calc_version == version}
+    missing = [u for u in dict.fromkeys(uids) if u and u not in fresh]
+
+    hits = [u for u, r in fresh.items() if r.role_id]
+    if hits:
+        alive = await asyncio.to_thread(lambda: [_has_panel_sync(u, char_key) for u in hits])
+        ghosts = [u for u, ok in zip(hits, alive) if not ok]
+        for uid in ghosts:
+            del fresh[uid]
+        await drop_rank_index_rows(char_id, ghosts)
+
+    if missing:
+        start = time.time()
+        semaphore = asyncio.Semaphore(50)
+
+        async def _read(uid: str) -> Optional[RoleDetailData]:
+            async with semaphore:
+                try:
+                    return await find_role_detail(uid, find_char_id)
+                except Exception as e:
+                    logger.warning(f"[鸣潮·排行索引] 面板读取失败 uid={uid}: {e}")
+                    return None
+
+        details = await asyncio.gather(*(_read(u) for u in missing))
+        entries = await map_in_pool(_build_index_entry, details, tag="排行索引")
+        backfill = dict(zip(missing, entries))
+        try:
+            await WavesCharRankIndex.upsert_by_char(char_key, backfill)
+        except Exception as e:
+            logger.warning(f"[鸣潮·排行索引] 回填写入失败 char={char_key}: {e}")
+        for uid, entry in backfill.items():
+            fresh[uid] = WavesCharRankIndex(char_key=char_key, uid=uid, **entry)
+        logger.info(
+            f"[鸣潮·排行索引] char={char_key} 回填 {len(missing)} 个 uid, 耗时 {time.time() - start:.2f}s"
+        )
+
+    return {uid: row for uid, row in fresh.items() if row.role_id}
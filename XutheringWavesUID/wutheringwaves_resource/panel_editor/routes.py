@@ -647,6 +647,7 @@ def _scan_all_duplicates(threshold: float) -> List[dict]:
     """遍历所有自定义图角色目录, 各目录内分组查重 (复用 find_duplicate_groups_in_dir)。"""
     from ...utils.name_convert import easy_id_to_name
     from ...wutheringwaves_charinfo.card_hash_index import compute_hash
+    from ...wutheringwaves_charinfo import card_phash_index
     from ...wutheringwaves_charinfo.card_utils import find_duplicate_groups_in_dir
 
     char_dirs = [
@@ -679,6 +680,7 @@ def _scan_all_duplicates(threshold: float) -> List[dict]:
                                 "sim": round(float(s), 3),
                             })
                 out.append({"images": images, "pairs": pairs})
+    card_phash_index.flush(force=True)
     out.sort(key=lambda g: len(g["images"]), reverse=True)
     return out
 
@@ -24,12 +24,12 @@ from ..utils.render_utils import (
     PLAYWRIGHT_AVAILABLE,
     render_html,
     get_footer_b64,
-    get_image_b64_with_cache,
+    get_image_url_with_cache,
 )
 from ..utils.resource.RESOURCE_PATH import waves_templates
 from ..utils.image import (
-    pil_to_b64,
-    img_to_b64,
+    pil_to_url,
+    img_to_url,
     get_waves_bg,
     get_event_avatar,
     get_square_avatar,
@@ -130,14 +130,14 @@ async def draw_role_img(uid: str, ck: str, ev: Event):
         for role in role_info.roleList:
             # 获取属性图标
             attribute_img = await get_attribute(role.attributeName)
-            attribute_b64 = pil_to_b64(attribute_img) if attribute_img else ""
+            attribute_url = pil_to_url(attribute_img) if attribute_img else ""
 
             # 默认头像兜底, 高品质皮肤成功时再覆盖
-            role_avatar_b64 = img_to_b64(get_square_avatar_path(role.roleId), quality=75, bake=True, cover_size=(128, 128))
+            role_avatar_url = img_to_url(get_square_avatar_path(role.roleId), quality=75, bake=True, cover_size=(128, 128))
             if role.roleSkin and role.roleSkin.quality and role.roleSkin.quality > 3 and role.roleSkin.skinIcon:
-                skin_b64 = await get_image_b64_with_cache(role.roleSkin.skinIcon, SKIN_IMAGE_PATH, quality=75, cover_size=(128, 128))
-                if skin_b64:
-                    role_avatar_b64 = skin_b64
+                skin_url = await get_image_url_with_cache(role.roleSkin.skinIcon, SKIN_IMAGE_PATH, quality=75, cover_size=(128, 128))
+                if skin_url:
+                    role_avatar_url = skin_url
 
             # 查找角色详细信息
             if role.roleId in SPECIAL_CHAR_INT:
@@ -151,13 +151,13 @@ async def draw_role_img(uid: str, ck: str, ev: Event):
                     temp = role_detail_info_map[char_id]
                     break
 
-            weapon_icon_b64 = ""
+            weapon_icon_url = ""
             weapon_reson = 1
             chain_num = 0
             chain_name = ""
             if temp:
                 # 获取武器图标
-                weapon_icon_b64 = img_to_b64(get_square_weapon_path(temp.weaponData.weapon.weaponId), quality=75, bake=True, cover_size=(128, 128))
+                weapon_icon_url = img_to_url(get_square_weapon_path(temp.weaponData.weapon.weaponId), quality=75, bake=True, cover_size=(128, 128))
                 weapon_reson = temp.weaponData.resonLevel or 1
                 chain_num = temp.get_chain_num()
                 chain_name = temp.get_chain_name()
@@ -167,9 +167,9 @@ async def draw_role_img(uid: str, ck: str, ev: Event):
                 "level": role.level,
                 "star_level": role.starLevel,
                 "rarity": role.starLevel,
-                "attribute_icon": attribute_b64,
-                "avatar_icon": role_avatar_b64,
-                "weapon_icon": weapon_icon_b64,
+                "attribute_icon": attribute_url,
+                "avatar_icon": role_avatar_url,
+                "weapon_icon": weapon_icon_url,
                 "weapon_reson": weapon_reson,
                 "weapon_reson_name": f"{['零', '一', '二', '三', '四', '五'][weapon_reson]}阶",
                 "chain_num": chain_num,
@@ -178,11 +178,11 @@ async def draw_role_img(uid: str, ck: str, ev: Event):
 
         # 准备头像
         avatar = await get_event_avatar(ev)
-        avatar_url = pil_to_b64(avatar, quality=75)
+        avatar_url = pil_to_url(avatar, quality=75)
 
         # 准备背景
         bg_img = get_waves_bg(bg="bg", crop=False)
-        bg_url = pil_to_b64(bg_img, quality=75)
+        bg_url = pil_to_url(bg_img, quality=75)
 
         # 将 CHAIN_COLOR 转换为 RGB 字符串格式
         chain_colors = {i: f"rgba({r}, {g}, {b}, 0.8)" for i, (r, g, b) in CHAIN_COLOR.items()}
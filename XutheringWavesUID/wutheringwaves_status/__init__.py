@@ -1,6 +1,13 @@
 from gsuid_core.status.plugin_status import register_status
 
 from ..utils.image import get_ICON
+from ..utils.api.limiter import get_guard_states
+from ..utils.api.coalesce import get_coalesce_stats
+from ..utils.queues.queues import get_queue_stats
+from ..utils.render_pool import get_render_stats
+from ..utils.render_cache import get_render_cache_stats
+from ..utils.texture_cache import get_texture_cache_stats
+from ..utils.char_info_utils import get_panel_cache_stats
 from ..utils.database.models import WavesBind, WavesUser
 from ..wutheringwaves_config import WutheringWavesConfig
 
@@ -22,6 +29,49 @@ async def get_active_user_num():
     return count
 
 
+async def get_panel_cache_hit_rate():
+    stats = get_panel_cache_stats()
+    return f"{stats['hit_rate'] * 100:.1f}%"
+
+
+async def get_render_cache_hit_rate():
+    stats = get_render_cache_stats()
+    return f"{stats['hit_rate'] * 100:.1f}% ({stats['bytes'] / 1024 / 1024:.1f}MB)"
+
+
+async def get_texture_cache_hit_rate():
+    stats = get_texture_cache_stats()
+    return f"{stats['hit_rate'] * 100:.1f}% ({stats['bytes'] / 1024 / 1024:.1f}MB)"
+
+
+async def get_render_pool_state():
+    stats = get_render_stats()
+    pool = stats["pool"]
+    return (
+        f"{pool['active']}/{pool['pages']} 排队{pool['waiting']} "
+        f"p95 {stats['total']['p95_ms']:.0f}ms 超时{pool['timeouts'] + pool['rejected']}"
+    )
+
+
+async def get_api_coalesce_num():
+    stats = get_coalesce_stats()
+    return f"{stats['deduped'] + stats['cache_hits']}/{stats['total']}"
+
+
+async def get_api_breaker_state():
+    opened = [s for s in get_guard_states() if s["state"] != "closed"]
+    if not opened:
+        return "正常"
+    return f"{len(opened)}个接口族熔断中"
+
+
+async def get_task_queue_depth():
+    stats = get_queue_stats()
+    depth = sum(s["depth"] for s in stats.values())
+    dead = sum(s["dead_total"] for s in stats.values())
+    return f"{depth} (死信 {dead})"
+
+
 register_status(
     get_ICON(),
     "XutheringWavesUID",
@@ -29,5 +79,12 @@ register_status(
         "绑定UID": get_add_num,
         "登录账号": get_user_num,
         "活跃账号数": get_active_user_num,
+        "面板缓存命中率": get_panel_cache_hit_rate,
+        "渲染缓存命中率": get_render_cache_hit_rate,
+        "贴图缓存命中率": get_texture_cache_hit_rate,
+        "渲染池": get_render_pool_state,
+        "API合并请求": get_api_coalesce_num,
+        "API熔断状态": get_api_breaker_state,
+        "任务队列积压": get_task_queue_depth,
     },
 )
@@ -157,7 +157,7 @@ async def draw_char_skill_render(char_id: str):
             for b in char_model.skillBranches
         ]
 
-    res = await render_html(waves_templates, "wiki/char_wiki.html", context)
+    res = await render_html(waves_templates, "wiki/char_wiki.html", context, cache=True)
     if res:
         save_wiki_cache(char_id, "skill", res)
     return res
@@ -179,7 +179,7 @@ async def draw_char_chain_render(char_id: str):
     context["section"] = "chain"
     context["chains"] = await prepare_char_chain_data(char_model.chains)
 
-    res = await render_html(waves_templates, "wiki/char_wiki.html", context)
+    res = await render_html(waves_templates, "wiki/char_wiki.html", context, cache=True)
     if res:
         save_wiki_cache(char_id, "chain", res)
     return res
@@ -208,7 +208,7 @@ async def draw_char_forte_render(char_id: str):
     context["section"] = "forte"
     context["forte"] = await prepare_char_forte_data_render(data, str(char_id))
 
-    res = await render_html(waves_templates, "wiki/char_wiki.html", context)
+    res = await render_html(waves_templates, "wiki/char_wiki.html", context, cache=True)
     if res:
         save_wiki_cache(char_id, "forte", res)
     return res